@@ -0,0 +1,222 @@
+"""Asyncio webcrawler: download the search result pages and the inner listing pages as coroutines over a single shared aiohttp session, so one process can keep hundreds of GET requests in flight.
+
+The thread-based fetch paths (see search_page_planner.py and concurrent_webcrawler.py) need one thread per concurrent request, so their concurrency is bounded by the number of workers.
+Instead, the async webcrawler runs every GET request as a coroutine within a single event loop:
+a.) the search-page walk downloads the search result pages via their offsets, in waves of pages--ie, the same walk as the pagination planner (see Search_Page_Walk), including the early stop on known listing IDs and the search-page harvest.
+b.) the detail fetches download the inner listing pages and parse every field via the same xpaths as the HTTP fetch backend (see fetch_backends.py), and yield each listing as a single Listing_Record--ie, in the same order as the listing URLs,
+    so the listings are cleaned & written to CSV by the same data pipeline (see Craigslist_Rentals.stream_listing_records_to_csv()).
+The politeness budget is enforced the same way as for the other fetch paths: each GET request first awaits its host's token bucket of the shared rate limiter (see rate_limiter.py), which also adapts to slow or throttled responses,
+and at most max_in_flight GET requests (ie, including the requests awaiting their token) are pending at any time. Each listing fetch is retried via the shared retry policy (see retry_policy.py).
+NB: the pages that need JavaScript are scraped via the selenium fetch backend, within a single background thread--ie, the event loop is never blocked by the webdriver.
+NB: aiohttp is only imported if the async webcrawler is actually used (ie, via the --async-crawler command-line argument of main.py)."""
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import aiohttp
+
+from .fetch_backends import Selenium_Listing_Fetch_Backend, extract_listing_fields_from_html, page_needs_javascript
+from .listing_page_fields import Listing_Record
+from .rate_limiter import throttling_status_codes
+from .retry_policy import Listing_Fetch_Failure, classify_status_code
+from .search_page_planner import Search_Page_Walk
+from .http_response_cache import shared_http_response_cache, default_headers
+
+
+class Async_Craigslist_Crawler(object):
+    """Download the search result pages and the inner listing pages of a Craigslist_Rentals search as coroutines, over a single aiohttp session with at most max_in_flight pending GET requests.
+    NB: the crawler runs its own event loop, so its methods can be called from the (synchronous) webcrawler pipeline of main.py."""
+
+    def __init__(self, craigslist_crawler, rate_limiter=None, max_in_flight: int = 100, n_pages_per_wave: int = 4, request_timeout: float = 30, response_cache=shared_http_response_cache):
+        self.search_url = craigslist_crawler.url
+        self.field_extraction_timer = craigslist_crawler.field_extraction_timer  # record the time spent extracting each field
+        self.html_archive = craigslist_crawler.html_archive  # optional archive of the fetched listing pages (see html_archive.py)
+        self.rate_limiter = rate_limiter  # rate limiter shared by every fetch path of the webcrawler (see rate_limiter.py)
+        self.retry_policy = craigslist_crawler.retry_policy  # retry policy shared by every fetch path of the webcrawler (see retry_policy.py)
+        self.telemetry = craigslist_crawler.telemetry  # record the time spent fetching each listing, and the number of bytes downloaded (see crawler_telemetry.py)
+        self.max_in_flight = max(1, max_in_flight)
+        self.n_pages_per_wave = max(1, n_pages_per_wave)  # number of search result pages downloaded at a time--NB: small waves let the early stop on known listing IDs skip most of the older pages
+        self.request_timeout = request_timeout  # maximum number of seconds to wait for the server to respond to a GET request
+        self.response_cache = response_cache  # HTTP response cache, so a search result page downloaded again shortly after is served from disk or revalidated (see http_response_cache.py)
+        self.n_failed_pages = 0
+
+        self.loop = asyncio.new_event_loop()
+        # NB: the session and the semaphore are only initialized within the event loop (see get_session())
+        self.session = None
+        self.in_flight_semaphore = None
+
+        # fallback backend for pages that need JavaScript--NB: a single background thread, so the fallback's webdriver is always borrowed, used & restarted by the same thread
+        self.selenium_fallback = Selenium_Listing_Fetch_Backend(craigslist_crawler, rate_limiter)
+        self.selenium_fallback_executor = ThreadPoolExecutor(max_workers=1)
+        self.n_selenium_fallbacks = 0
+
+    def run(self, coroutine):
+        """Run the given coroutine within the crawler's event loop until it is done, and return its result."""
+        return self.loop.run_until_complete(coroutine)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the crawler's aiohttp session, and initialize it the first time it is used--ie, its connection pool is shared by the search-page walk and the detail fetches, so TCP/TLS connections to craigslist are reused."""
+        if self.session is None:
+            self.in_flight_semaphore = asyncio.Semaphore(self.max_in_flight)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                headers=default_headers,
+                )
+        return self.session
+
+    async def fetch_page(self, page_url: str) -> tuple:
+        """Await the host's rate limiter, and download the given page via the shared session--unless the response cache has a fresh copy of the page (see http_response_cache.py). Return the response's HTTP status code and the page's HTML.
+        NB: a failed GET request raises an aiohttp.ClientError or asyncio.TimeoutError."""
+        cached_response, cached_entry, request_headers = self.response_cache.prepare_request(page_url)
+        if cached_response is not None:
+            return cached_response.status_code, cached_response.text
+
+        session = await self.get_session()
+        async with self.in_flight_semaphore:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve(page_url))  # wait until the host's rate limiter allows another GET request--ie, without blocking the event loop
+            start_time = time.perf_counter()
+            async with session.get(page_url, headers=request_headers) as response:
+                content = await response.read()
+                response_seconds = time.perf_counter() - start_time
+                response = self.response_cache.process_response(page_url, cached_entry, response.status, response.headers, content, response_seconds)
+
+        # slow down if the server responds slowly, or is throttling the webcrawler (ie, HTTP 429 or 403)
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_response(page_url, response_seconds=response_seconds, status_code=response.status_code)
+        if response.ok and not response.from_cache:
+            self.telemetry.record_download(len(content))
+        return response.status_code, response.text
+
+    async def fetch_search_page(self, page_url: str) -> str:
+        """Download the given search result page. Return its HTML, or None if the page could not be downloaded."""
+        try:
+            status_code, page_source = await self.fetch_page(page_url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"\n\nSearch result page {page_url} is not accessible since the HTTP request failed:\n{e!r}\n\n")
+            self.n_failed_pages += 1
+            return None
+        if status_code >= 400:
+            reason = "craigslist is throttling the webcrawler" if status_code in throttling_status_codes else "the server responded with an error"
+            print(f"\n\nSearch result page {page_url} is not accessible since {reason} (HTTP {status_code}).\n\n")
+            self.n_failed_pages += 1
+            return None
+        return page_source
+
+    async def walk_search_pages(self, xpaths_listing_urls: str, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Download every search result page via its offset, and return the (deduplicated) listing URLs of all pages--or None if the 1st page does not contain any listing URLs (see Search_Page_Planner.obtain_listing_urls())."""
+        start_time = time.perf_counter()
+        search_page_walk = Search_Page_Walk(self.search_url, xpaths_listing_urls, known_listing_ids_filter=known_listing_ids_filter, search_page_harvest=search_page_harvest)
+        first_page_source = await self.fetch_search_page(search_page_walk.first_page_url)
+        if first_page_source is None or not search_page_walk.start(first_page_source):
+            return None
+
+        while True:
+            wave_page_urls = search_page_walk.next_wave_page_urls(self.n_pages_per_wave)
+            if not wave_page_urls:
+                break
+            search_page_walk.process_wave(wave_page_urls, await asyncio.gather(*(self.fetch_search_page(page_url) for page_url in wave_page_urls)))
+
+        listing_urls = search_page_walk.unique_listing_urls()
+        print(f"\nDownloaded {search_page_walk.n_pages} search result pages ({self.n_failed_pages} failed) in {round(time.perf_counter() - start_time, 2)} seconds.\n")
+        print(f'The total number of scraped rental listing urls are:{len(listing_urls)}\n')
+        return listing_urls
+
+    def obtain_listing_urls(self, xpaths_listing_urls: str, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Run the search-page walk within the crawler's event loop--see walk_search_pages()."""
+        return self.run(self.walk_search_pages(xpaths_listing_urls, known_listing_ids_filter, search_page_harvest))
+
+    async def fetch_listing_once(self, list_url: str) -> dict:
+        """Download the given listing page via the shared session, and parse each of the fields specified in listing_field_xpaths from the page's lxml tree--ie, a single attempt, which raises an exception if the listing could not be scraped.
+        NB: a failed GET request or an error response raises a Listing_Fetch_Failure, which the retry policy classifies (see retry_policy.py)."""
+        try:
+            status_code, page_source = await self.fetch_page(list_url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise Listing_Fetch_Failure('transient', f"Rental listing posting {list_url} is not accessible since the HTTP request failed: {e!r}")
+
+        # account for listings that have expired or have been deleted, and for error responses--NB: do not fall back to selenium, which would only send more requests to the server
+        failure_category = classify_status_code(status_code)
+        if failure_category is not None:
+            raise Listing_Fetch_Failure(failure_category, f"Rental listing posting {list_url} responded with HTTP {status_code}.")
+
+        if self.html_archive is not None:
+            self.html_archive.archive_page(list_url, page_source)
+        record = extract_listing_fields_from_html(page_source, self.field_extraction_timer)
+
+        # fall back to selenium (within the background thread) if the listing data could not be parsed from the raw HTML (ie, the page needs JavaScript)
+        if page_needs_javascript(record):
+            self.n_selenium_fallbacks += 1
+            return await self.loop.run_in_executor(self.selenium_fallback_executor, self.selenium_fallback.fetch_listing_once, list_url)
+        return record
+
+    async def restart_selenium_fallback_webdriver(self):
+        """Quit the webdriver of the selenium fallback's background thread (eg, if its connection has been lost)."""
+        await self.loop.run_in_executor(self.selenium_fallback_executor, self.selenium_fallback.restart_worker_webdriver)
+
+    async def fetch_listing(self, list_url: str, crawl_journal=None) -> dict:
+        """Scrape a given rental listing URL via the retry policy, and record the listing to the crawl journal (if given) as soon as it has been scraped."""
+        with self.telemetry.stage('fetch_listing'):  # NB: summed over all of the coroutines, so the stage's total time includes the time awaiting the rate limiter
+            record = await self.retry_policy.fetch_with_retries_async(list_url, self.fetch_listing_once, self.restart_selenium_fallback_webdriver)
+        if crawl_journal is not None:
+            crawl_journal.record_listing(list_url, record)
+        return record
+
+    def iter_listing_records(self, listing_urls: list, crawl_journal=None):
+        """Scrape each of the listing URLs as a coroutine, and yield each listing as a single Listing_Record, in the same order as the listing URLs.
+        NB: only a bounded number of listings (ie, twice max_in_flight) are scheduled at any time, so the scraped data are not accumulated in memory if the consumer--e.g., stream_listing_records_to_csv()--is slower than the crawler.
+        The event loop only runs while the generator waits for the next listing, so the pending requests are paused while the consumer cleans & writes a batch of listings."""
+        remaining_listing_urls = iter(listing_urls)
+        in_flight = deque()  # (listing URL, task) pairs, in the same order as the listing URLs
+        n_yielded = 0
+        try:
+            # schedule the first batch of tasks (ie, one task per listing URL)
+            for list_url in islice(remaining_listing_urls, 2 * self.max_in_flight):
+                in_flight.append((list_url, self.loop.create_task(self.fetch_listing(list_url, crawl_journal))))
+
+            while in_flight:
+                list_url, task = in_flight[0]
+                record = self.run(task)
+                in_flight.popleft()
+                # schedule the next listing URL, to replace the listing that has been completed
+                for next_list_url in islice(remaining_listing_urls, 1):
+                    in_flight.append((next_list_url, self.loop.create_task(self.fetch_listing(next_list_url, crawl_journal))))
+                n_yielded += 1
+                if n_yielded % 100 == 0:
+                    print(f"\nNumber of listings we have crawled over:\n{n_yielded}\n")
+                yield Listing_Record(list_url, record)
+
+        # enable user to exit the webcrawler program--all previously scraped listings will still be saved
+        except KeyboardInterrupt:
+            print('\n\nNB: A keyboard interrupt has occurred.\nAll previously scraped listings for this session will be saved and outputted to CSV.')
+            # yield the listings whose scraping has already been completed, so the listing URLs remain in order
+            for list_url, task in in_flight:
+                if not task.done() or task.cancelled() or task.exception() is not None:
+                    break
+                n_yielded += 1
+                yield Listing_Record(list_url, task.result())
+
+        finally:
+            # cancel any remaining listings, and close the session & the selenium fallback
+            for list_url, task in in_flight:
+                task.cancel()
+            if in_flight:
+                self.run(asyncio.gather(*(task for _, task in in_flight), return_exceptions=True))
+            self.close()
+
+        print(f"\nThe async webcrawler has crawled over {n_yielded} listings, with up to {self.max_in_flight} requests in flight.\n")
+
+    def close(self):
+        """Close the aiohttp session and the event loop, and return any webdriver borrowed by the selenium fallback to the webdriver pool."""
+        if self.loop.is_closed():
+            return
+        if self.session is not None:
+            self.run(self.session.close())
+            self.session = None
+        self.loop.close()
+        self.selenium_fallback_executor.shutdown(wait=True)
+        self.selenium_fallback.close()
+        if self.n_selenium_fallbacks:
+            print(f"\nNB: {self.n_selenium_fallbacks} listing pages needed JavaScript, and were scraped via selenium instead.\n")
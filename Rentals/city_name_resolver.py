@@ -0,0 +1,134 @@
+"""Resolve the scraped city names of a subregion (e.g., SF neighborhood names such as 'Noe Valley') to their canonical city names (e.g., 'San Francisco'), via a single pass of the cities col.
+
+df_to_CSV_data_pipeline() used to call clean_given_city_names_data() once per city (e.g., 4 times in a row for the East Bay), and each call removed the null city names, split the city names on '/', and scanned every row via a case-insensitive regex of the city's neighborhoods.
+Instead, a City_Name_Resolver loads the neighborhood names of every city of the subregion into a single (lower-case) prefix trie, and resolves each distinct raw city name once--NB: the resolved names are cached, since there are only a few thousand distinct city names across millions of rows.
+NB: the resolved city names are the same as those of the chain of clean_city_names_for_sf(), clean_mislabelled_santa_cruz_data(), or clean_given_city_names_data() calls of each subregion (see clean_city_names.py & clean_santa_cruz_data.py)."""
+import threading
+
+import pandas as pd
+from pandas.core.frame import DataFrame
+
+from .clean_city_names import sf_neighborhoods, sj_neighborhoods, santa_clara_neighborhoods, oakland_neighborhoods, hayward_neighborhoods, alameda_neighborhoods, richmond_neighborhoods
+from .clean_santa_cruz_data import san_cruz_cities
+
+
+class City_Name_Resolver(object):
+    """Gazetteer of (canonical city name, list of neighborhood names) rules, applied in the given order--ie, the same as a chain of clean_given_city_names_data() calls:
+    a raw city name that contains (case insensitive) any neighborhood name of a rule is resolved to the rule's city name, and the resolved name is then checked against the later rules.
+    A canonical city name of None keeps the raw city name as is (ie, merely checks whether it contains any of the names--e.g., the Santa Cruz county cities).
+    NB: a raw city name that matches none of the rules is either kept as is (unmatched='keep'), or its row is removed (unmatched='drop')--e.g., since only the SF city names are kept for the 'sfc' subregion."""
+    terminal = ''  # key of the trie nodes that end a neighborhood name--NB: an empty str, so it never collides with a char of a name
+
+    def __init__(self, city_rules: list, unmatched: str = 'keep', split_delimiter: str = '/'):
+        if unmatched not in ('keep', 'drop'):
+            raise ValueError(f"unmatched must be either 'keep' or 'drop', not '{unmatched}'.")
+        self.city_rules = [(city_name, tuple(neighborhood_names)) for city_name, neighborhood_names in city_rules]
+        self.unmatched = unmatched
+        self.split_delimiter = split_delimiter  # NB: a raw city name listed as multiple city names (e.g., 'Oakland/Berkeley') is resolved from the 1st one only--or None, to resolve the whole raw city name
+        self.trie = {}
+        for rule_index, (_, neighborhood_names) in enumerate(self.city_rules):
+            for neighborhood_name in neighborhood_names:
+                self.add_to_trie(neighborhood_name.lower(), rule_index)
+        self.resolved_city_names = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def add_to_trie(self, neighborhood_name: str, rule_index: int):
+        """Add a (lower-case) neighborhood name to the trie, whose terminal node holds the indexes of the rules the name belongs to."""
+        trie_node = self.trie
+        for char in neighborhood_name:
+            trie_node = trie_node.setdefault(char, {})
+        trie_node.setdefault(self.terminal, set()).add(rule_index)
+
+    def matched_rule_indexes(self, city_name: str) -> set:
+        """Return the indexes of every rule that has a neighborhood name contained within the city name--ie, walk the trie from each position of the (lower-case) city name."""
+        city_name = city_name.lower()
+        rule_indexes = set()
+        for start in range(len(city_name)):
+            trie_node = self.trie
+            for char in city_name[start:]:
+                trie_node = trie_node.get(char)
+                if trie_node is None:
+                    break
+                if self.terminal in trie_node:
+                    rule_indexes.update(trie_node[self.terminal])
+        if self.terminal in self.trie:  # ie, an empty neighborhood name, which is contained within every city name
+            rule_indexes.update(self.trie[self.terminal])
+        return rule_indexes
+
+    def resolve(self, raw_city_name):
+        """Return the canonical city name of a raw city name, or None if its row should be removed (ie, a missing city name, or an unmatched one given unmatched='drop')."""
+        if not isinstance(raw_city_name, str):
+            return None
+        city_name = raw_city_name.split(self.split_delimiter, 1)[0] if self.split_delimiter is not None else raw_city_name
+        matched = False
+        next_rule_index = 0
+        while True:
+            # NB: apply the first matching rule (in order) that comes after the last applied one, and then check the resolved name against the later rules--ie, the same as the chain of calls
+            rule_indexes = [rule_index for rule_index in self.matched_rule_indexes(city_name) if rule_index >= next_rule_index]
+            if not rule_indexes:
+                break
+            rule_index = min(rule_indexes)
+            matched = True
+            canonical_city_name = self.city_rules[rule_index][0]
+            if canonical_city_name is not None:
+                city_name = canonical_city_name
+            next_rule_index = rule_index + 1
+        if not matched and self.unmatched == 'drop':
+            return None
+        return city_name
+
+    def resolve_city_names(self, raw_city_names) -> list:
+        """Return the canonical city name (or None) of each raw city name--NB: via the cache of the resolved city names, so each distinct raw city name is resolved once."""
+        with self.lock:
+            resolved_city_names = self.resolved_city_names
+            resolved = []
+            for raw_city_name in raw_city_names:
+                try:
+                    resolved.append(resolved_city_names[raw_city_name])
+                    self.hits += 1
+                except KeyError:
+                    resolved_city_name = resolved_city_names[raw_city_name] = self.resolve(raw_city_name)
+                    resolved.append(resolved_city_name)
+                    self.misses += 1
+                except TypeError:  # ie, an unhashable (non-str) city name
+                    resolved.append(None)
+            return resolved
+
+    def clean_city_names(self, df: DataFrame, col: str = 'cities') -> DataFrame:
+        """Replace the raw city names of the given col with their canonical city names, and remove the rows whose city names are missing (or unmatched, given unmatched='drop')."""
+        resolved_city_names = pd.Series(self.resolve_city_names(df[col].tolist()), index=df.index, dtype=object)
+        keep_rows = resolved_city_names.notna()
+        filtered_df = df.loc[keep_rows].copy()
+        filtered_df[col] = resolved_city_names[keep_rows]
+        return filtered_df
+
+    def cache_info(self) -> dict:
+        """Return the number of cached (ie, distinct) raw city names, and the cache hits & misses."""
+        with self.lock:
+            return {'distinct_city_names': len(self.resolved_city_names), 'hits': self.hits, 'misses': self.misses}
+
+
+# specify the city name resolver of each subregion whose city names are cleaned--NB: the rules of each subregion are in the same order as its former chain of clean_given_city_names_data() calls
+subregion_city_name_resolvers = {
+    # transform the SF neighborhood names to 'San Francisco', and remove any data misclassified as being within SF
+    'sfc': City_Name_Resolver([('San Francisco', sf_neighborhoods)], unmatched='drop'),
+    # remove any data misclassified as being within Santa Cruz county--NB: the Santa Cruz county city names are kept as is, and are not split on '/'
+    'scz': City_Name_Resolver([(None, san_cruz_cities)], unmatched='drop', split_delimiter=None),
+    # South Bay cities such as San Jose & Santa Clara
+    'sby': City_Name_Resolver([('San Jose', sj_neighborhoods), ('Santa Clara', santa_clara_neighborhoods)]),
+    # East Bay cities such as Oakland & Hayward
+    'eby': City_Name_Resolver([('Oakland', oakland_neighborhoods), ('Hayward', hayward_neighborhoods), ('Alameda', alameda_neighborhoods), ('Richmond', richmond_neighborhoods)]),
+    }
+
+
+def clean_city_names_for_subregion(df: DataFrame, subregion: str) -> DataFrame:
+    """Resolve the city names of a given subregion via its city name resolver--NB: the df is returned as is for any subregion without a resolver."""
+    city_name_resolver = subregion_city_name_resolvers.get(subregion)
+    if city_name_resolver is None:
+        return df
+    if subregion == 'scz':
+        # NB: also remove any rows that are not labelled as the 'scz' subregion, as clean_mislabelled_santa_cruz_data() does
+        df = df[df['sub_region'].astype(str).str.contains('scz', regex=False)]
+    return city_name_resolver.clean_city_names(df)
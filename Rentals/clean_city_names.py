@@ -1,6 +1,8 @@
 # data analysis libraries 
 import numpy as np
 import pandas as pd
+# import the registry of compiled (and escaped) regex patterns shared by the string cleaning helpers
+from data_cleaning.string_pattern_registry import shared_pattern_registry
 
 
 # clean SJ or other city name data
@@ -17,7 +19,7 @@ def clean_given_city_names_data(city_name, list_of_neighborhood_names, df):
     filtered_df['cities'] = filtered_df['cities'].str.split('/', expand = False).str[0]   # split cities based on presence of the forward-slash delimiter (ie: '/'), and then parse only the 1st such element. This way, we will have only the primary (first) city listed for each 'split' city name. 
 
     # 3.) use str.contains() to look up city names with given neighborhood names. Replace these with simply the city name of 'San Jose'
-    filtered_df['cities'] =  np.where(filtered_df['cities'].str.contains('|'.join(list_of_neighborhood_names), case=False), city_name, filtered_df['cities']) # assign city name for any rows containing given city neighborhood names, else simply leave row unchanged.     
+    filtered_df['cities'] =  np.where(shared_pattern_registry.contains(filtered_df['cities'], list_of_neighborhood_names, case=False), city_name, filtered_df['cities']) # assign city name for any rows containing given city neighborhood names, else simply leave row unchanged.     
     return filtered_df
 
 
@@ -62,7 +64,7 @@ def clean_city_names_for_sf(list_of_sf_neighborhoods, df):
     filtered_df['cities'] = filtered_df['cities'].str.split('/', expand = False).str[0]   # split cities based on presence of the forward-slash delimiter (ie: '/'), and then parse only the 1st such element. This way, we will have only the primary (first) city listed for each 'split' city name. 
     
     # 3.) use str.contains() to look up any neighborhoods that are located within SF, and use np.where() to replace the neighborhood names with simply the city name (ie, 'San Francisco'). NB: if no SF neighborhoods are found, then impute row as null using np.null.  
-    filtered_df['cities'] = np.where(filtered_df['cities'].str.contains('|'.join(sf_neighborhoods), case=False), "San Francisco", '') # assign city name for any rows that contain sf neighborhood names for the cities col
+    filtered_df['cities'] = np.where(shared_pattern_registry.contains(filtered_df['cities'], sf_neighborhoods, case=False), "San Francisco", '') # assign city name for any rows that contain sf neighborhood names for the cities col
     # 4.) Remove all of the rows with cities imputed as empty strings--ie, because they are not actually located within San Francisco
     filtered_df_final = filtered_df[filtered_df['cities'].str.strip().astype(bool)]
     return filtered_df_final
@@ -1,6 +1,8 @@
 # data analysis libraries 
 import numpy as np
 import pandas as pd
+# import the registry of compiled (and escaped) regex patterns shared by the string cleaning helpers
+from data_cleaning.string_pattern_registry import shared_pattern_registry
 
 # filter Santa Cruz data if city is mislabelled as being within the county
 def clean_mislabelled_santa_cruz_data(santa_cruz_cities: list, df):
@@ -9,7 +11,7 @@ def clean_mislabelled_santa_cruz_data(santa_cruz_cities: list, df):
     b.) check if the given city (ie, based on city name in cities col) actually resides within Santa Cruz county."""
     filered_df = df.dropna(subset = ['cities'], how='any') # remove any records without city names (ie, null for cities column)
     filered_df = filered_df[(filered_df['sub_region'].str.contains('scz')) \
-        & (filered_df['cities'].str.contains('|'.join(san_cruz_cities), case=False))] # check that sub_region is scz, and then do str contains filters to look up each santa cruz city  
+        & (shared_pattern_registry.contains(filered_df['cities'], san_cruz_cities, case=False))] # check that sub_region is scz, and then do str contains filters to look up each santa cruz city  
     return filered_df 
 
 # specify list of all santa cruz county cities
@@ -1,3 +1,7 @@
+# import the registry of compiled (and escaped) regex patterns shared by the string cleaning helpers
+from data_cleaning.string_pattern_registry import shared_pattern_registry
+
+
 def clean_split_city_names(df, address_critera: list, neighborhood_criteria:list, split_city_delimiters: list, incorrect_city_names:dict, cities_not_in_region:dict, cities_that_need_extra_cleaning:dict):
     """Clean city names data in several ways:
     a.) Remove extraneous address & neighborhood data placed in the city names HTML object, such as 'Rd', 'Blvd', or 'Downtown'.
@@ -8,20 +12,16 @@ def clean_split_city_names(df, address_critera: list, neighborhood_criteria:list
     f.) Remove any whitespace to avoid the same city names from being treated as different entities by Pandas, Python, or SQL. 
     g.) Use str.capwords() to capitalize words (ie, excluding apostrophes).
     h.) Replace city names that are mispelled after having removed various street and neighborhood substrings such as 'St' or 'Ca'--e.g., '. Helena' should be 'St. Helena'. """
-    # specify extraneous street & address data (e.g., 'Rd') that we want to remove from the city names column:
-    addr_criteria = '|'.join(address_critera) # Join pipe ('|') symbols to address list so we can str.split() on any one of these criteria (ie, 'or' condition splitting on each element separated by pipes):
-    # specify extraneous neighborhood criteria we should also remove from col
-    nbhood_criteria = '|'.join(neighborhood_criteria) # remove neighborhood names as well as state abbreviation (shown on website as 'Ca') that is shown without the usual comma delimiter!
-    # b.) specify delimiters we need to refer to un-split city names:
-    split_city_delimiters = '|'.join(split_city_delimiters) # join pipes to delimiters so we can use str.split() based on multiple 'or' criteria simultaneously
+    # NB: each list of criteria (ie, extraneous street & address data such as 'Rd', neighborhood names as well as the state abbreviation shown on website as 'Ca', and the delimiters of split city names) is compiled by the pattern registry into a single, escaped 'OR' pattern, once per list
     # clean city names data by removing extraneous address & neighborhood data, and unsplitting city names based on ',' & '\' delimiters
-    df['cities'] =  df['cities'].str.split(addr_criteria).str[-1].str.replace(nbhood_criteria, '', case=True).str.lstrip()
-    df['cities'] = df['cities'].str.split(split_city_delimiters).str[0] #unsplit city names based on comma or forward-slash delimiters
+    df['cities'] = shared_pattern_registry.split_part(df['cities'], address_critera, -1)
+    df['cities'] = shared_pattern_registry.replace(df['cities'], neighborhood_criteria, '').str.lstrip()
+    df['cities'] = shared_pattern_registry.split_part(df['cities'], split_city_delimiters, 0) #unsplit city names based on comma or forward-slash delimiters
     # c.) replace specific abbreviated or mispelled city names, and remove cities that are not actually located in the sfbay region:
     df = df.replace({'cities':incorrect_city_names}) # replace mispelled & abbreviated city names
     df = df.replace({'cities':cities_not_in_region})  # remove (via empty string) cities that are not actually located in the sfbay region
     # d.) Remove digits/integer-like data from cities column:
-    df['cities'] = df['cities'].str.replace('\d+', '')  # remove any digits by using '/d+' regex to look up digits, and then replace with empty string
+    df['cities'] = shared_pattern_registry.replace(df['cities'], r'\d+', '')  # remove any digits by using '/d+' regex to look up digits, and then replace with empty string
     # e.) Remove any rows that have empty strings or null values for cities col (having performed the various data filtering and cleaning above)
     df = df[df['cities'].str.strip().astype(bool)] # remove rows with empty strings (ie, '') for cities col 
     df = df.dropna(subset=['cities']) # remove any remaining 'cities' null records
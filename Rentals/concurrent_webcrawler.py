@@ -0,0 +1,92 @@
+"""Concurrent fetch engine for the inner rental listing pages.
+
+Instead of accessing each listing URL one at a time with a single Chrome webdriver (as scrape_listing_data() does),
+this script uses a pool of worker threads to scrape several listings at the same time--via a pool of webdrivers
+or plain HTTP workers (see fetch_backends.py).
+All of the workers share a single rate limiter (see rate_limiter.py), which has a token bucket per host, so that the combined rate
+of GET requests sent to craigslist remains bounded regardless of the number of workers."""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from .listing_page_fields import Listing_Record, listing_records_to_dict_of_lists, nan_listing_record
+
+
+class Concurrent_Listing_Scraper(object):
+    """Scrape the inner rental listing pages by using a pool of worker threads, which fetch the listings via the given fetch backend (see fetch_backends.py)."""
+
+    def __init__(self, fetch_backend, n_workers: int = 4, crawl_journal=None):
+        self.fetch_backend = fetch_backend  # e.g., a Selenium_Listing_Fetch_Backend, in which each worker borrows its own Chrome webdriver
+        self.n_workers = n_workers
+        self.crawl_journal = crawl_journal  # optional Crawl_Journal, to which each listing is checkpointed as soon as it has been scraped (see crawl_journal.py)
+        self.n_scraped = 0  # number of listings crawled over so far, across all workers (for progress diagnostics)
+        self.progress_lock = threading.Lock()
+
+    def scrape_single_listing(self, list_url: str) -> dict:
+        """Fetch a given rental listing URL via the fetch backend, and return the scraped data as a single record (ie, a dict of the field values)."""
+        record = self.fetch_backend.fetch_listing(list_url)
+        if self.crawl_journal is not None:
+            self.crawl_journal.record_listing(list_url, record)
+
+        ## print some webcrawler progress diagnostics--such as the number of listings accessed--in CLI:
+        with self.progress_lock:
+            self.n_scraped += 1
+            print(f"\nNumber of listings we have crawled over:\n{self.n_scraped}\n")
+        return record
+
+    @staticmethod
+    def result_of_listing(list_url: str, future) -> dict:
+        """Return the scraped record of a completed listing--or a 'nan' record if its worker raised an exception that the retry policy does not recognise, so a single listing cannot abort the whole run."""
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"\n\nRental listing posting {list_url} could not be scraped, due to an unexpected {type(e).__name__}: {e}\n\n")
+            return nan_listing_record()
+
+    def iter_listing_records(self, listing_urls: list):
+        """Scrape each of the listing URLs via the pool of workers, and yield each listing as a single Listing_Record, in the same order as the listing URLs.
+        NB: only a bounded number of listings (ie, twice the number of workers) are in flight at any time, so the scraped data are not accumulated in memory if the consumer--e.g., stream_listing_records_to_csv()--is slower than the workers."""
+        max_in_flight = 2 * self.n_workers
+        remaining_listing_urls = iter(listing_urls)
+        in_flight = deque()  # (listing URL, future) pairs, in the same order as the listing URLs
+        n_yielded = 0
+        executor = ThreadPoolExecutor(max_workers=self.n_workers)
+        try:
+            # submit the first batch of tasks (ie, one task per listing URL)
+            for list_url in islice(remaining_listing_urls, max_in_flight):
+                in_flight.append((list_url, executor.submit(self.scrape_single_listing, list_url)))
+
+            while in_flight:
+                list_url, future = in_flight[0]
+                record = self.result_of_listing(list_url, future)
+                in_flight.popleft()
+                # submit the next listing URL, to replace the listing that has been completed
+                for next_list_url in islice(remaining_listing_urls, 1):
+                    in_flight.append((next_list_url, executor.submit(self.scrape_single_listing, next_list_url)))
+                n_yielded += 1
+                yield Listing_Record(list_url, record)
+
+        # enable user to exit the webcrawler program--all previously scraped listings will still be saved
+        except KeyboardInterrupt:
+            print('\n\nNB: A keyboard interrupt has occurred.\nAll previously scraped listings for this session will be saved and outputted to CSV.')
+            for list_url, future in in_flight:
+                future.cancel()  # do not start any of the remaining listings
+            # yield the listings whose scraping has already been completed, so the listing URLs remain in order
+            for list_url, future in in_flight:
+                if not future.done() or future.cancelled():
+                    break
+                n_yielded += 1
+                yield Listing_Record(list_url, self.result_of_listing(list_url, future))
+
+        finally:
+            executor.shutdown(wait=True)
+            # close every webdriver or HTTP session used by the workers
+            self.fetch_backend.close()
+
+        print(f"\nThe concurrent webcrawler has crawled over {n_yielded} listings, using {self.n_workers} workers.\n")
+
+    def scrape_listing_data(self, listing_urls: list) -> dict:
+        """Scrape each of the listing URLs via the pool of workers. Return the scraped data as the same dictionary of lists as Craigslist_Rentals.scrape_listing_data()."""
+        listing_records = list(self.iter_listing_records(listing_urls))
+        return listing_records_to_dict_of_lists([listing_record.listing_url for listing_record in listing_records], listing_records)
@@ -0,0 +1,133 @@
+"""Crash-safe checkpoint journal for long webcrawler runs.
+
+Instead of only holding the scraped data in memory until the end of the run, record each scraped listing--as soon as it has
+been scraped--to an append-only journal file (one JSON record per line), along with the full list of listing URLs to crawl
+(ie, the 'frontier'). If Chrome crashes or the WebDriver connection is lost hours into a run, the --resume mode of main.py
+reloads the journal and only scrapes the listing URLs of the frontier that have not been journaled yet.
+
+The journal & frontier files are saved within the scraped data directory of the given region & subregion, and the date of the run
+is appended to their file names--e.g., crawl_journal_sfbay_sby_09_30_2023.jsonl & crawl_frontier_sfbay_sby_09_30_2023.json."""
+import datetime
+import glob
+import json
+import os
+import threading
+
+from .listing_page_fields import Listing_Record, listing_field_xpaths, listing_records_to_dict_of_lists, nan_listing_record
+
+
+class Crawl_Journal(object):
+    """Append-only journal of the listings scraped during a given run of the webcrawler, for a given region & subregion."""
+
+    journal_preface_name = 'crawl_journal'
+    frontier_preface_name = 'crawl_frontier'
+
+    def __init__(self, scraped_data_path: str, region: str, subregion: str, date_str: str = None):
+        self.scraped_data_path = scraped_data_path
+        self.date_str = date_str if date_str is not None else datetime.date.today().strftime("%m_%d_%Y")  # get today's date in 'mm_dd_YYYY' format
+        # regions with no subregions: do not use subregion in the file names
+        self.file_name_suffix = f"{region}_{subregion}_{self.date_str}" if subregion else f"{region}_{self.date_str}"
+        self.journal_path = os.path.join(scraped_data_path, f"{self.journal_preface_name}_{self.file_name_suffix}.jsonl")
+        self.frontier_path = os.path.join(scraped_data_path, f"{self.frontier_preface_name}_{self.file_name_suffix}.json")
+        self.lock = threading.Lock()  # the journal can be shared by several concurrent workers
+
+    @classmethod
+    def latest(cls, scraped_data_path: str, region: str, subregion: str):
+        """Return the journal of the most recent run for the given region & subregion (ie, whose frontier was saved last), or None if no frontier has been saved yet."""
+        file_name_suffix = f"{region}_{subregion}" if subregion else f"{region}"
+        frontier_paths = glob.glob(os.path.join(scraped_data_path, f"{cls.frontier_preface_name}_{file_name_suffix}_*.json"))
+        if not frontier_paths:
+            return None
+        latest_frontier_path = max(frontier_paths, key=os.path.getmtime)
+        # parse the date of the run from the frontier's file name--ie, the last 3 underscore-separated parts
+        date_str = '_'.join(os.path.splitext(os.path.basename(latest_frontier_path))[0].split('_')[-3:])
+        crawl_journal = cls(scraped_data_path, region, subregion, date_str)
+        crawl_journal.terminate_truncated_line()
+        return crawl_journal
+
+    def terminate_truncated_line(self):
+        """If the webcrawler crashed while writing the last line of the journal, end the truncated line--ie, so the listings journaled when resuming the run start on a new line."""
+        if not os.path.exists(self.journal_path) or os.path.getsize(self.journal_path) == 0:
+            return
+        with open(self.journal_path, 'rb+') as fh:
+            fh.seek(-1, os.SEEK_END)
+            if fh.read(1) != b'\n':
+                fh.write(b'\n')
+
+    def start_new_crawl(self, listing_urls: list):
+        """Save the listing URLs to crawl (ie, the frontier), and clear any journaled listings from a previous crawl of the same day."""
+        # write the frontier to a temporary file first, so a crash while writing it cannot leave a truncated frontier behind
+        tmp_frontier_path = f"{self.frontier_path}.tmp"
+        with open(tmp_frontier_path, 'w') as fh:
+            json.dump(listing_urls, fh)
+        os.replace(tmp_frontier_path, self.frontier_path)
+        with self.lock:
+            open(self.journal_path, 'w').close()
+
+    def load_frontier(self) -> list:
+        """Load the listing URLs to crawl, as saved by start_new_crawl(). Return None if no frontier has been saved."""
+        if not os.path.exists(self.frontier_path):
+            return None
+        with open(self.frontier_path, 'r') as fh:
+            return json.load(fh)
+
+    def record_listing(self, list_url: str, record: dict):
+        """Append a scraped listing (ie, its URL and a dict of the field values) to the journal, and flush it to disk right away.
+        NB: listings in which every field is missing (e.g., since the WebDriver connection was lost) are not journaled, so they will be retried when resuming the run."""
+        if record == nan_listing_record():
+            return
+        line = json.dumps({'listing_url': list_url, **{field_name: record[field_name] for field_name in listing_field_xpaths}})
+        with self.lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as fh:
+                fh.write(line + '\n')
+                fh.flush()
+                os.fsync(fh.fileno())
+
+    def record_listings(self, listings: list):
+        """Append several scraped listings (ie, (listing URL, record) pairs) to the journal at once, and flush them to disk a single time--e.g., for the listings harvested from the search result pages (see search_page_harvest.py)."""
+        lines = [json.dumps({'listing_url': list_url, **{field_name: record[field_name] for field_name in listing_field_xpaths}}) for list_url, record in listings if record != nan_listing_record()]
+        if not lines:
+            return
+        with self.lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as fh:
+                fh.writelines(line + '\n' for line in lines)
+                fh.flush()
+                os.fsync(fh.fileno())
+
+    def load_journaled_records(self) -> dict:
+        """Load the journaled listings, as a dict of listing URL to the listing's record.
+        NB: skip a truncated last line--ie, if the webcrawler crashed while writing it."""
+        journaled_records = {}
+        if not os.path.exists(self.journal_path):
+            return journaled_records
+        with open(self.journal_path, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    journal_entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                journaled_records[journal_entry.pop('listing_url')] = journal_entry
+        return journaled_records
+
+    def iter_journaled_listing_records(self):
+        """Yield each journaled listing as a single Listing_Record, without loading the whole journal into memory--e.g., so the listings scraped before a run was interrupted can be streamed to CSV along with the remaining listings."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    journal_entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                yield Listing_Record(journal_entry.pop('listing_url'), journal_entry)
+
+    def remaining_listing_urls(self, listing_urls: list) -> list:
+        """Return the listing URLs that have not been journaled yet, in the same order."""
+        journaled_records = self.load_journaled_records()
+        return [list_url for list_url in listing_urls if list_url not in journaled_records]
+
+    def load_dict_of_lists(self, listing_urls: list) -> dict:
+        """Transform the journaled listings to the same dictionary of lists as Craigslist_Rentals.scrape_listing_data(), in the order of the given listing URLs."""
+        journaled_records = self.load_journaled_records()
+        scraped_urls = [list_url for list_url in listing_urls if list_url in journaled_records]
+        return listing_records_to_dict_of_lists(scraped_urls, [journaled_records[list_url] for list_url in scraped_urls])
@@ -0,0 +1,97 @@
+"""Per-run telemetry of the webcrawler: the duration of each stage, counters (eg, pages & bytes downloaded), and a json run report.
+
+Each Craigslist_Rentals instance has its own Crawler_Telemetry, which records:
+a.) the number of calls and the total number of seconds of each stage--ie, each method decorated with timed_stage() (eg, load_craigslist_form_URL(), obtain_listing_urls(), clean_scraped_data(), dict_to_df_pipeline(), export_to_csv()),
+    and the 'fetch_listing' stage of each listing page (NB: summed over all of the workers, so it can exceed the run's wall-clock time).
+b.) counters--eg, the number of pages & bytes downloaded via the webdrivers and the HTTP sessions.
+At the end of each run, main.py writes these--along with the request counts of the rate limiter, the fetch outcomes of the retry policy, and the time spent extracting each field--to a json run report
+next to the CSV file within scraped_data/<region>/<subregion>, so the webcrawler's performance can be trended over time."""
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+# specify the preface of the file name of the run reports
+run_report_preface_name = 'crawl_run_report'
+
+
+class Crawler_Telemetry(object):
+    """Record the duration of each stage and various counters of a single webcrawler run. NB: the telemetry is thread-safe, so it can be shared by several concurrent workers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = datetime.datetime.now()
+        self.total_seconds_by_stage = {}
+        self.n_calls_by_stage = {}
+        self.counters = Counter()
+
+    def record_stage(self, stage_name: str, seconds: float):
+        """Add the number of seconds spent on a single call of the given stage."""
+        with self.lock:
+            self.total_seconds_by_stage[stage_name] = self.total_seconds_by_stage.get(stage_name, 0) + seconds
+            self.n_calls_by_stage[stage_name] = self.n_calls_by_stage.get(stage_name, 0) + 1
+
+    @contextmanager
+    def stage(self, stage_name: str):
+        """Record the time spent within the with block as a single call of the given stage--NB: the time is recorded even if the block raises an exception."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage_name, time.perf_counter() - start_time)
+
+    def count(self, counter_name: str, n: int = 1):
+        with self.lock:
+            self.counters[counter_name] += n
+
+    def record_download(self, n_bytes: int):
+        """Count a downloaded page, and its size in bytes."""
+        with self.lock:
+            self.counters['n_pages_downloaded'] += 1
+            self.counters['n_bytes_downloaded'] += n_bytes
+
+    def summary(self) -> dict:
+        """Return the number of calls & total number of seconds of each stage, and the counters."""
+        with self.lock:
+            return {
+                'stages': {
+                    stage_name: {'n_calls': self.n_calls_by_stage[stage_name], 'total_seconds': round(total_seconds, 4)}
+                    for stage_name, total_seconds in self.total_seconds_by_stage.items()
+                    },
+                'counters': dict(self.counters),
+                }
+
+    def write_run_report(self, scraped_data_path: str, region: str, subregion: str, run_metrics: dict) -> str:
+        """Write the telemetry--along with any other metrics of the run (eg, the rate limiter's request counts)--to a json run report within the scraped data directory. Return the report's path.
+        NB: the report's file name has the same region, subregion & date format as the CSV file (see Craigslist_Rentals.export_to_csv()), plus the time the run started, so several runs of the same day do not overwrite each other."""
+        finished_at = datetime.datetime.now()
+        run_report = {
+            'region': region,
+            'subregion': subregion,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': finished_at.isoformat(timespec='seconds'),
+            'total_seconds': round((finished_at - self.started_at).total_seconds(), 2),
+            **self.summary(),
+            **run_metrics,
+            }
+        region_and_subregion = f"{region}_{subregion}" if subregion else region
+        run_report_path = os.path.join(scraped_data_path, f"{run_report_preface_name}_{region_and_subregion}_{self.started_at.strftime('%m_%d_%Y_%H%M%S')}.json")
+        with open(run_report_path, 'w') as fh:
+            json.dump(run_report, fh, indent=4, default=str)  # NB: default=str accounts for any values that are not json serializable (eg, paths)
+        return run_report_path
+
+
+def timed_stage(stage_name: str):
+    """Decorator to record each call of a Craigslist_Rentals method as a call of the given stage of the webcrawler's telemetry."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.telemetry.stage(stage_name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
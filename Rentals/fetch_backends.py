@@ -0,0 +1,205 @@
+"""Pluggable fetch backends for the inner rental listing pages.
+
+Each backend implements a fetch_listing(list_url) method, which returns a single record (ie, a dict of the scraped fields, as
+specified in listing_field_xpaths) for the given listing URL, and a close() method to release its resources.
+
+a.) Selenium_Listing_Fetch_Backend: access each listing via a Chrome webdriver, wait once for the page to load, and scrape every field from the page source in a single pass.
+b.) HTTP_Listing_Fetch_Backend: download each listing page once via a pooled HTTP session, and run the same xpaths against an lxml tree.
+NB: The HTTP backend falls back to the Selenium backend *only* for pages that need JavaScript to render the listing data.
+Both backends fetch each listing via the webcrawler's retry policy (see retry_policy.py): ie, each fetch_listing_once() attempt raises an exception if the listing could not be scraped,
+and the retry policy classifies the failure, retries the transient failures, and restarts the worker's webdriver on crashes."""
+import threading
+import time
+
+from lxml import html as lxml_html
+
+from .listing_page_fields import listing_field_xpaths, nan_val
+from .webdriver_setup import shared_webdriver_pool
+from .retry_policy import Listing_Fetch_Failure, classify_status_code
+from .http_response_cache import shared_http_response_cache, new_pooled_session
+
+
+## Parse the scraped fields from the raw HTML of a listing page, via lxml:
+
+def visible_text_of_element(element) -> str:
+    """Extract the text of an lxml HTML element similarly to selenium's .text attribute: ie, treat <br> tags as line breaks,
+    skip any 'print-information' elements (e.g., the 'QR Code Link to This Post' text, which is hidden when the page is displayed),
+    and remove extraneous whitespace from each line."""
+    # skip hidden print-only elements within the given element
+    for hidden_element in element.xpath('.//*[contains(@class, "print-information")]'):
+        hidden_element.drop_tree()
+    # treat <br> tags as line breaks
+    for br in element.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    # remove extraneous whitespace from each line, and remove any leading or trailing empty lines
+    lines = [' '.join(line.split()) for line in element.text_content().splitlines()]
+    return '\n'.join(lines).strip()
+
+
+def extract_listing_fields_from_html(page_source: str, field_extraction_timer=None) -> dict:
+    """Parse the raw HTML of a rental listing page into an lxml tree, and resolve the xpath of each field specified in listing_field_xpaths.
+    Return a single record (ie, dict of the field values), in which any fields that are missing from the page are 'nan'.
+    NB: If a Field_Extraction_Timer is given, record the time spent parsing the page (ie, 'parse_html') and extracting each field."""
+    start_time = time.perf_counter()
+    tree = lxml_html.fromstring(page_source)
+    if field_extraction_timer is not None:
+        field_extraction_timer.record('parse_html', time.perf_counter() - start_time)
+
+    record = {}
+    for field_name, (xpath_arg, attr_to_parse) in listing_field_xpaths.items():
+        start_time = time.perf_counter()
+        elements = tree.xpath(xpath_arg)
+        if not elements:  # the listing page does not contain the given element
+            record[field_name] = nan_val
+        elif attr_to_parse == 'datetime':
+            datetime_attr = elements[0].get('datetime')
+            record[field_name] = datetime_attr if datetime_attr is not None else nan_val
+        else:
+            record[field_name] = visible_text_of_element(elements[0])
+        if field_extraction_timer is not None:
+            field_extraction_timer.record(field_name, time.perf_counter() - start_time)
+    return record
+
+
+def page_needs_javascript(record: dict) -> bool:
+    """Determine whether a downloaded listing page needs JavaScript to render the listing data: ie, if *none* of the key fields
+    (listing id, price, or listing description) could be parsed from the raw HTML."""
+    key_fields = ['ids', 'prices', 'listing_descrip']
+    return all(record[field_name] == nan_val for field_name in key_fields)
+
+
+class Selenium_Listing_Fetch_Backend(object):
+    """Access each listing page via a Chrome webdriver, and scrape each field via the single-pass HTML-parsing method of the Craigslist_Rentals class.
+    NB: Each worker thread borrows (and keeps) its own webdriver from the shared webdriver pool (see webdriver_setup.py)."""
+
+    def __init__(self, craigslist_crawler, rate_limiter=None, webdriver_pool=shared_webdriver_pool):
+        self.craigslist_crawler = craigslist_crawler  # the Craigslist_Rentals instance, whose HTML-parsing methods we reuse
+        self.rate_limiter = rate_limiter  # rate limiter shared by all of the workers (see rate_limiter.py)
+        self.retry_policy = craigslist_crawler.retry_policy  # retry policy shared by all of the workers (see retry_policy.py)
+        self.telemetry = craigslist_crawler.telemetry  # record the time spent fetching each listing (see crawler_telemetry.py)
+        self.webdriver_pool = webdriver_pool
+        self.thread_data = threading.local()  # each worker thread keeps its own webdriver
+        self.web_drivers = []  # keep track of every webdriver we borrow, so we can return all of them to the pool once we are done
+        self.web_drivers_lock = threading.Lock()
+
+    def set_worker_webdriver(self, web_driver):
+        """Replace the webdriver of the current worker thread (or None), and keep track of the webdrivers borrowed by the workers."""
+        previous_web_driver = getattr(self.thread_data, 'web_driver', None)
+        with self.web_drivers_lock:
+            if previous_web_driver is not None:
+                self.web_drivers.remove(previous_web_driver)
+            if web_driver is not None:
+                self.web_drivers.append(web_driver)
+        self.thread_data.web_driver = web_driver
+
+    def get_worker_webdriver(self):
+        """Return the webdriver of the current worker thread, and borrow one from the webdriver pool if the worker does not have one yet.
+        NB: once the worker's webdriver has loaded max_pages_per_webdriver pages, it is recycled (ie, quit and replaced by a new one)."""
+        web_driver = getattr(self.thread_data, 'web_driver', None)
+        renewed_web_driver = self.webdriver_pool.borrow() if web_driver is None else self.webdriver_pool.renew_if_exhausted(web_driver)
+        if renewed_web_driver is not web_driver:
+            self.set_worker_webdriver(renewed_web_driver)
+        return renewed_web_driver
+
+    def restart_worker_webdriver(self):
+        """Quit the webdriver of the current worker thread (e.g., if its connection has been lost), so a new one will be borrowed for the next listing."""
+        web_driver = getattr(self.thread_data, 'web_driver', None)
+        self.set_worker_webdriver(None)
+        self.webdriver_pool.discard(web_driver)
+
+    def fetch_listing_once(self, list_url: str) -> dict:
+        """Access a given rental listing URL with the worker's webdriver, and scrape each of the fields specified in listing_field_xpaths--ie, a single attempt, which raises an exception if the listing could not be scraped."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(list_url)  # wait until the host's rate limiter allows another GET request
+        web_driver = self.get_worker_webdriver()
+        start_time = time.perf_counter()
+        web_driver.get(list_url)  # access the individual rental listing via the href URL
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_response(list_url, response_seconds=time.perf_counter() - start_time)  # slow down if the server responds slowly
+
+        # wait once for the page to load, and then scrape every field from the page source in a single pass--NB: any fields missing from the listing are 'nan'
+        return self.craigslist_crawler.parse_listing_page_single_pass(web_driver, list_url)
+
+    def fetch_listing(self, list_url: str) -> dict:
+        """Scrape a given rental listing URL via the retry policy--ie, retry transient failures, and borrow a new webdriver if the worker's webdriver connection has been lost."""
+        with self.telemetry.stage('fetch_listing'):
+            return self.retry_policy.fetch_with_retries(list_url, self.fetch_listing_once, self.restart_worker_webdriver)
+
+    def close(self):
+        """Return every webdriver borrowed by the workers to the webdriver pool."""
+        with self.web_drivers_lock:
+            web_drivers, self.web_drivers = self.web_drivers, []
+        for web_driver in web_drivers:
+            self.webdriver_pool.release(web_driver)
+
+
+class HTTP_Listing_Fetch_Backend(object):
+    """Download each listing page once via a pooled HTTP session (ie, without a browser), and parse every field from the page's lxml tree.
+    Fall back to the Selenium backend only for the pages that need JavaScript to render the listing data."""
+
+    def __init__(self, craigslist_crawler, rate_limiter=None, pool_size: int = 4, request_timeout: float = 30, response_cache=shared_http_response_cache):
+        self.field_extraction_timer = craigslist_crawler.field_extraction_timer  # record the time spent extracting each field
+        self.html_archive = craigslist_crawler.html_archive  # optional archive of the fetched listing pages (see html_archive.py)
+        self.rate_limiter = rate_limiter  # rate limiter shared by all of the workers (see rate_limiter.py)
+        self.retry_policy = craigslist_crawler.retry_policy  # retry policy shared by all of the workers (see retry_policy.py)
+        self.telemetry = craigslist_crawler.telemetry  # record the time spent fetching each listing, and the number of bytes downloaded (see crawler_telemetry.py)
+        self.request_timeout = request_timeout  # maximum number of seconds to wait for the server to respond to a GET request
+        self.response_cache = response_cache  # HTTP response cache--NB: the listing pages themselves are not cached (see http_cache_url_classes), but they are downloaded with compressed transfer encoding
+
+        # initialize a session, whose connection pool is shared by all of the workers--ie, so TCP/TLS connections to craigslist are reused in between listings
+        self.session = new_pooled_session(pool_size)
+
+        # fallback backend for pages that need JavaScript--NB: it only borrows a webdriver if it is actually needed
+        self.selenium_fallback = Selenium_Listing_Fetch_Backend(craigslist_crawler, rate_limiter)
+        self.n_selenium_fallbacks = 0
+        self.lock = threading.Lock()  # NB: the backend is shared by the concurrent workers, so the count of selenium fallbacks is updated under a lock
+
+    def fetch_listing_once(self, list_url: str) -> dict:
+        """Download the given listing page via the HTTP session, and parse each of the fields specified in listing_field_xpaths from the page's lxml tree--ie, a single attempt, which raises an exception if the listing could not be scraped.
+        NB: a failed HTTP request raises a requests.RequestException, and an error response raises a Listing_Fetch_Failure of the status code's category (see retry_policy.py)."""
+        # NB: the response cache waits for the host's rate limiter (and slows down if the server responds slowly, or is throttling the webcrawler) only if a GET request is actually sent
+        response = self.response_cache.get(list_url, self.session, self.rate_limiter, self.request_timeout)
+
+        # account for listings that have expired or have been deleted, and for error responses--NB: do not fall back to selenium, which would only send more requests to the server
+        failure_category = classify_status_code(response.status_code)
+        if failure_category is not None:
+            raise Listing_Fetch_Failure(failure_category, f"Rental listing posting {list_url} responded with HTTP {response.status_code}.")
+
+        if not response.from_cache:
+            self.telemetry.record_download(len(response.content))
+        if self.html_archive is not None:
+            self.html_archive.archive_page(list_url, response.text)
+        record = extract_listing_fields_from_html(response.text, self.field_extraction_timer)
+
+        # fall back to selenium if the listing data could not be parsed from the raw HTML (ie, the page needs JavaScript)
+        if page_needs_javascript(record):
+            with self.lock:
+                self.n_selenium_fallbacks += 1
+            return self.selenium_fallback.fetch_listing_once(list_url)
+        return record
+
+    def fetch_listing(self, list_url: str) -> dict:
+        """Scrape a given rental listing URL via the retry policy--ie, retry transient failures (eg, HTTP 5xx or connection errors), and mark expired listings (ie, HTTP 404 or 410) as 'nan' right away."""
+        with self.telemetry.stage('fetch_listing'):
+            return self.retry_policy.fetch_with_retries(list_url, self.fetch_listing_once, self.selenium_fallback.restart_worker_webdriver)
+
+    def close(self):
+        """Close the HTTP session, and return any webdrivers borrowed by the selenium fallback to the webdriver pool."""
+        self.session.close()
+        self.selenium_fallback.close()
+        if self.n_selenium_fallbacks:
+            print(f"\nNB: {self.n_selenium_fallbacks} listing pages needed JavaScript, and were scraped via selenium instead.\n")
+
+
+# specify the fetch backends the user can select (e.g., via the --fetch-backend command-line argument of main.py)
+fetch_backends = {
+    'selenium': Selenium_Listing_Fetch_Backend,
+    'http': HTTP_Listing_Fetch_Backend,
+    }
+
+
+def initialize_fetch_backend(backend_name: str, craigslist_crawler, rate_limiter=None, n_workers: int = 4):
+    """Initialize the fetch backend with the given name (ie, 'selenium' or 'http')."""
+    if backend_name == 'http':
+        return HTTP_Listing_Fetch_Backend(craigslist_crawler, rate_limiter, pool_size=n_workers)
+    return Selenium_Listing_Fetch_Backend(craigslist_crawler, rate_limiter)
@@ -0,0 +1,97 @@
+"""Raw HTML archive of every fetched rental listing page, so the listings can be re-parsed offline once the xpaths change.
+
+Each listing page's HTML is gzip-compressed and stored under the SHA-256 hash of its content (ie, a content-addressed archive: a page that
+has not changed in between 2 runs is only stored once), within the html_archive directory of the given region & subregion's scraped data--e.g.:
+    scraped_data/sfbay/sby/html_archive/objects/3f/3fa4...e1.html.gz
+
+An append-only index file (one JSON entry per line) maps each listing ID & fetch date to the hash of the page fetched that day, so
+reparse_html_archive.py can re-run the field extraction & data cleaning over the archive without sending any GET requests."""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+from .known_listing_ids import parse_listing_id_from_url
+from .fetch_backends import extract_listing_fields_from_html
+
+
+class Listing_HTML_Archive(object):
+    """Content-addressed, gzip-compressed archive of the listing pages fetched by the webcrawler, along with an index keyed by listing ID and fetch date."""
+
+    archive_folder = 'html_archive'
+    index_file_name = 'html_archive_index.jsonl'
+
+    def __init__(self, scraped_data_path: str):
+        self.archive_path = os.path.join(scraped_data_path, self.archive_folder)
+        self.objects_path = os.path.join(self.archive_path, 'objects')
+        self.index_path = os.path.join(self.archive_path, self.index_file_name)
+        self.lock = threading.Lock()  # the archive can be shared by several concurrent workers
+        os.makedirs(self.objects_path, exist_ok=True)
+
+    def page_path(self, content_hash: str) -> str:
+        """Return the path of the compressed page with the given content hash--NB: the pages are spread over subdirectories named after the 1st 2 characters of the hash, to avoid a single huge directory."""
+        return os.path.join(self.objects_path, content_hash[:2], f"{content_hash}.html.gz")
+
+    def archive_page(self, list_url: str, page_source: str, fetch_date: str = None) -> str:
+        """Compress & store the HTML of a fetched listing page (unless a page with the same content has already been archived), and add the listing ID & fetch date to the index. Return the page's content hash."""
+        page_bytes = page_source.encode('utf-8')
+        content_hash = hashlib.sha256(page_bytes).hexdigest()
+        page_path = self.page_path(content_hash)
+
+        if not os.path.exists(page_path):
+            os.makedirs(os.path.dirname(page_path), exist_ok=True)
+            # write the compressed page to a temporary file first, so a crash while writing it cannot leave a truncated page behind
+            tmp_page_path = f"{page_path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_page_path, 'wb') as fh:
+                fh.write(page_bytes)
+            os.replace(tmp_page_path, page_path)
+
+        index_entry = {
+            'listing_id': parse_listing_id_from_url(list_url),
+            'listing_url': list_url,
+            'fetch_date': fetch_date if fetch_date is not None else datetime.date.today().strftime("%Y-%m-%d"),  # NB: same format as the date_of_webcrawler col
+            'content_hash': content_hash,
+            }
+        with self.lock:
+            with open(self.index_path, 'a', encoding='utf-8') as fh:
+                fh.write(json.dumps(index_entry) + '\n')
+        return content_hash
+
+    def load_index(self, since_date: str = None) -> list:
+        """Load the index entries of the archived pages--ie, one entry per listing ID & fetch date (if a listing was fetched several times on the same day, keep the last fetch).
+        NB: since_date (in 'YYYY-mm-dd' format) only keeps the pages fetched on or after the given date."""
+        index_entries = {}
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    index_entry = json.loads(line)
+                except json.JSONDecodeError:  # skip a truncated last line--ie, if the webcrawler crashed while writing it
+                    continue
+                if since_date is not None and index_entry['fetch_date'] < since_date:
+                    continue
+                index_entries[(index_entry['listing_id'] or index_entry['listing_url'], index_entry['fetch_date'])] = index_entry
+        return list(index_entries.values())
+
+    def load_page(self, content_hash: str) -> str:
+        """Return the decompressed HTML of the archived page with the given content hash."""
+        with gzip.open(self.page_path(content_hash), 'rb') as fh:
+            return fh.read().decode('utf-8')
+
+
+def extract_archived_listing_records(scraped_data_path: str, index_entries: list) -> list:
+    """Re-run the field extraction (ie, the current xpaths of listing_field_xpaths) over the archived pages of the given index entries, without any network access.
+    Return a list of (listing URL, fetch date, record) tuples--NB: pages missing from the archive are skipped."""
+    html_archive = Listing_HTML_Archive(scraped_data_path)
+    listing_records = []
+    for index_entry in index_entries:
+        try:
+            page_source = html_archive.load_page(index_entry['content_hash'])
+        except (OSError, EOFError):
+            print(f"\nThe archived page of {index_entry['listing_url']} (fetched on {index_entry['fetch_date']}) is missing or corrupted, so it will be skipped.\n")
+            continue
+        listing_records.append((index_entry['listing_url'], index_entry['fetch_date'], extract_listing_fields_from_html(page_source)))
+    return listing_records
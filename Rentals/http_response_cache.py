@@ -0,0 +1,275 @@
+"""Local cache of HTTP responses for every non-browser GET request of the webcrawler--ie, the search result pages, the subregion lists of each region's homepage, and the wikipedia city tables of the data pipelines.
+
+Each cacheable response is gzip-compressed and stored under the SHA-256 hash of its URL, within the http_cache directory of the scraped data--e.g.:
+    scraped_data/http_cache/objects/3f/3fa4...e1.gz
+whose 1st line is a json header (ie, the URL, status code, ETag, Last-Modified, content type, and the time it was fetched), followed by the response body.
+
+a.) TTLs per URL class: each URL is matched against http_cache_url_classes, which specify how long a cached response is served as is (ie, without sending any GET request)--e.g., a week for the subregion lists,
+    but only a few minutes for the search result pages. URL classes with a TTL of None (eg, the listing pages, which are already archived via html_archive.py) are never cached.
+b.) revalidation: once a cached response has expired, the GET request is sent with If-None-Match / If-Modified-Since headers, so an unchanged page costs a HTTP 304 response rather than the full page.
+c.) LRU eviction: once the cache exceeds max_bytes on disk, the least recently used responses are deleted--NB: the modification time of each cached file records its last use, so the LRU order is kept in between runs.
+d.) compressed transfer: every request accepts gzip (and brotli, if a brotli decoder is installed) transfer encoding.
+NB: the cache is thread-safe, and a GET request only waits for the host's rate limiter if it is actually sent--ie, cache hits are not rate-limited."""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data_cleaning.configurable_settings import Configurable_Settings
+
+
+# specify the URL classes of the cache, ie, (url class, regex of the URLs, number of seconds each cached response is served without revalidating it)--NB: the 1st matching class applies, and a TTL of None means the responses are never cached
+http_cache_url_classes = [
+    ('region_homepage', re.compile(r'^https?://[^/]+\.craigslist\.org/?$'), 7 * 24 * 3600),  # ie, the subregion lists (see parse_subregions_via_xpath())
+    ('wikipedia', re.compile(r'^https?://[^/]+\.wikipedia\.org/'), 30 * 24 * 3600),  # ie, the city names tables of the data pipelines
+    ('search_page', re.compile(r'/search/'), 10 * 60),  # ie, search result pages that are downloaded again shortly after--eg, by a resumed or repeated run
+    ('listing_page', re.compile(r'\.html?(\?|$)'), None),  # NB: the listing pages are already archived (see html_archive.py), and are only fetched once per run
+    ]
+
+# specify the transfer encodings accepted by every request--NB: requests (via urllib3) and aiohttp only decode brotli if the brotli package is installed
+try:
+    import brotli  # noqa: F401
+    accept_encoding = 'gzip, deflate, br'
+except ImportError:
+    accept_encoding = 'gzip, deflate'
+
+# specify the default headers of every non-browser GET request--ie, the User-Agent of a desktop Chrome browser
+default_headers = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0 Safari/537.36'
+    }
+
+# specify the default directory of the cache--ie, scraped_data/http_cache within the project's root directory, which is resolved from this module's own path (rather than the current working directory), so main.py, the benchmarks & the data pipelines (which are run as modules from the root directory) share the same cache
+default_http_cache_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scraped_data', 'http_cache')
+
+
+def new_pooled_session(pool_size: int = 4) -> requests.Session:
+    """Return a requests session with the default headers, whose connection pool keeps up to pool_size connections per host--ie, so the TCP/TLS connections are reused in between the GET requests of the workers that share the session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(default_headers)
+    return session
+
+
+def url_class_ttl(url: str) -> tuple:
+    """Return the URL class of the given URL, and the TTL (in seconds) of its cached responses--or (None, None) if the URL does not match any URL class (ie, it is never cached)."""
+    for url_class, url_regex, ttl_seconds in http_cache_url_classes:
+        if url_regex.search(url):
+            return url_class, ttl_seconds
+    return None, None
+
+
+def decode_response_body(content: bytes, content_type: str = None) -> str:
+    """Decode a response body via the charset of its content type (or utf-8, if none is specified)."""
+    charset = re.search(r'charset=([\w-]+)', content_type or '')
+    try:
+        return content.decode(charset.group(1) if charset else 'utf-8', errors='replace')
+    except LookupError:  # ie, an unknown charset
+        return content.decode('utf-8', errors='replace')
+
+
+class Cached_Response(object):
+    """Response of a GET request sent via the cache--ie, the same attributes as a requests.Response that the webcrawler uses, plus the cache status of the response:
+    'hit' (served from the cache, without any request), 'revalidated' (HTTP 304, so the cached body was served), 'miss' (downloaded & cached), or 'bypass' (downloaded, but not cacheable)."""
+    __slots__ = ('url', 'status_code', 'content', 'content_type', 'response_seconds', 'cache_status')
+
+    def __init__(self, url: str, status_code: int, content: bytes, content_type: str = None, response_seconds: float = 0, cache_status: str = 'bypass'):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.content_type = content_type
+        self.response_seconds = response_seconds
+        self.cache_status = cache_status
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return decode_response_body(self.content, self.content_type)
+
+    @property
+    def from_cache(self) -> bool:
+        """Whether the body was served from the cache (ie, it was not downloaded)."""
+        return self.cache_status in ('hit', 'revalidated')
+
+
+class HTTP_Response_Cache(Configurable_Settings):
+    """Disk cache of HTTP responses, with a TTL per URL class, ETag / Last-Modified revalidation, and LRU eviction once the cache exceeds max_bytes on disk."""
+
+    settings_owner_name = 'HTTP response cache'
+
+    def __init__(self, cache_path: str = default_http_cache_path, max_bytes: int = 200 * 1024 ** 2, enabled: bool = False, request_timeout: float = 30):
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self.enabled = enabled  # NB: the cache is opt-in (e.g., via main.py's --http-cache argument)--ie, if the cache is disabled, every GET request is sent as is (the same as a URL class with a TTL of None)
+        self.request_timeout = request_timeout
+        self.lock = threading.RLock()
+        self.lru_index = None  # OrderedDict of {url hash: size in bytes}, from the least to the most recently used--NB: only loaded once the cache is first used
+        self.total_bytes = 0
+        self.status_counts = Counter()
+        self.session = None  # default session for the GET requests that are not sent via a session of their own (eg, the subregion lists)
+
+    def reset_after_configure(self, settings: dict):
+        """NB: the cache status counts are reset, and the LRU index is reloaded from the (new) cache directory."""
+        self.lru_index = None
+        self.total_bytes = 0
+        self.status_counts = Counter()
+
+    def entry_path(self, url_hash: str) -> str:
+        """Return the path of the cached response with the given URL hash--NB: the responses are spread over subdirectories named after the 1st 2 characters of the hash, the same way as the html archive."""
+        return os.path.join(self.cache_path, 'objects', url_hash[:2], f"{url_hash}.gz")
+
+    def load_lru_index(self):
+        """Load the size & last use (ie, modification time) of every cached response, from the least to the most recently used. NB: the lock needs to be held."""
+        if self.lru_index is not None:
+            return
+        cached_files = []
+        for dir_path, _, file_names in os.walk(os.path.join(self.cache_path, 'objects')):
+            for file_name in file_names:
+                if file_name.endswith('.gz'):
+                    file_stat = os.stat(os.path.join(dir_path, file_name))
+                    cached_files.append((file_stat.st_mtime, file_name[:-len('.gz')], file_stat.st_size))
+        self.lru_index = OrderedDict((url_hash, size) for _, url_hash, size in sorted(cached_files))
+        self.total_bytes = sum(self.lru_index.values())
+
+    def load_entry(self, url: str) -> dict:
+        """Return the cached response of the given URL (ie, its json header, plus its body as 'content'), or None if it is not cached. NB: the response is marked as the most recently used."""
+        url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        entry_path = self.entry_path(url_hash)
+        try:
+            with gzip.open(entry_path, 'rb') as fh:
+                entry = json.loads(fh.readline())
+                entry['content'] = fh.read()
+            os.utime(entry_path)
+        except (OSError, EOFError, ValueError):  # ie, not cached, or a corrupted file--which is simply downloaded again
+            return None
+        with self.lock:
+            self.load_lru_index()
+            if url_hash in self.lru_index:
+                self.lru_index.move_to_end(url_hash)
+        return entry if entry.get('url') == url else None
+
+    def store_entry(self, url: str, status_code: int, headers, content: bytes, fetched_at: float = None):
+        """Compress & store the response of the given URL, and evict the least recently used responses if the cache exceeds max_bytes."""
+        url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        entry_path = self.entry_path(url_hash)
+        header = {
+            'url': url,
+            'status_code': status_code,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': headers.get('Content-Type'),
+            'fetched_at': fetched_at if fetched_at is not None else time.time(),
+            }
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        # write the compressed response to a temporary file first, so a crash while writing it cannot leave a truncated response behind
+        tmp_entry_path = f"{entry_path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_entry_path, 'wb') as fh:
+            fh.write(json.dumps(header).encode('utf-8') + b'\n')
+            fh.write(content)
+        os.replace(tmp_entry_path, entry_path)
+
+        with self.lock:
+            self.load_lru_index()
+            self.total_bytes += os.path.getsize(entry_path) - self.lru_index.pop(url_hash, 0)
+            self.lru_index[url_hash] = os.path.getsize(entry_path)
+            # evict the least recently used responses--NB: never the response that has just been stored
+            while self.total_bytes > self.max_bytes and len(self.lru_index) > 1:
+                evicted_url_hash, evicted_size = self.lru_index.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.status_counts['evicted'] += 1
+                try:
+                    os.remove(self.entry_path(evicted_url_hash))
+                except OSError:
+                    pass
+
+    def prepare_request(self, url: str) -> tuple:
+        """Look up the cached response of the given URL before sending a GET request. Return (Cached_Response if the cached response is still fresh, else None; cached entry or None; request headers)--
+        ie, the caller only sends the GET request if no fresh response is returned, along with the request headers (which revalidate the cached entry, if any)."""
+        request_headers = {'Accept-Encoding': accept_encoding}
+        _, ttl_seconds = url_class_ttl(url)
+        if not self.enabled or ttl_seconds is None:
+            return None, None, request_headers
+        entry = self.load_entry(url)
+        if entry is None:
+            return None, None, request_headers
+        if time.time() - entry['fetched_at'] < ttl_seconds:
+            self.count_status('hit')
+            return Cached_Response(url, entry['status_code'], entry['content'], entry['content_type'], cache_status='hit'), entry, request_headers
+        # the cached response has expired, so revalidate it via its ETag and/or Last-Modified date
+        if entry['etag']:
+            request_headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            request_headers['If-Modified-Since'] = entry['last_modified']
+        return None, entry, request_headers
+
+    def process_response(self, url: str, entry: dict, status_code: int, headers, content: bytes, response_seconds: float = 0) -> Cached_Response:
+        """Process the response of a GET request sent after prepare_request(): serve the cached body if the server responded with HTTP 304 (Not Modified), and cache any successful response of a cacheable URL."""
+        if status_code == 304 and entry is not None:
+            # NB: reset the cached response's TTL, since the server has confirmed it has not changed
+            self.store_entry(url, entry['status_code'], {'ETag': headers.get('ETag') or entry['etag'], 'Last-Modified': headers.get('Last-Modified') or entry['last_modified'], 'Content-Type': entry['content_type']}, entry['content'])
+            self.count_status('revalidated')
+            return Cached_Response(url, entry['status_code'], entry['content'], entry['content_type'], response_seconds, 'revalidated')
+
+        _, ttl_seconds = url_class_ttl(url)
+        cache_status = 'bypass'
+        if self.enabled and ttl_seconds is not None and status_code == 200 and 'no-store' not in (headers.get('Cache-Control') or ''):
+            self.store_entry(url, status_code, headers, content)
+            cache_status = 'miss'
+        self.count_status(cache_status)
+        return Cached_Response(url, status_code, content, headers.get('Content-Type'), response_seconds, cache_status)
+
+    def get(self, url: str, session: requests.Session = None, rate_limiter=None, timeout: float = None) -> Cached_Response:
+        """Send a GET request for the given URL via the cache (and the given requests session, or the cache's own session)--ie, serve a fresh cached response as is, or revalidate an expired one.
+        NB: the request only waits for the host's rate limiter (and adapts its request rate to the response) if it is actually sent. A failed GET request raises a requests.RequestException."""
+        cached_response, entry, request_headers = self.prepare_request(url)
+        if cached_response is not None:
+            return cached_response
+
+        session = session if session is not None else self.get_session()
+        if rate_limiter is not None:
+            rate_limiter.acquire(url)  # wait until the host's rate limiter allows another GET request
+        response = session.get(url, headers=request_headers, timeout=timeout if timeout is not None else self.request_timeout)
+        # slow down if the server responds slowly, or is throttling the webcrawler (ie, HTTP 429 or 403)
+        if rate_limiter is not None:
+            rate_limiter.record_response(url, response_seconds=response.elapsed.total_seconds(), status_code=response.status_code)
+        return self.process_response(url, entry, response.status_code, response.headers, response.content, response.elapsed.total_seconds())
+
+    def get_text(self, url: str, rate_limiter=None) -> str:
+        """Return the HTML of the given page via get()--or None if the page could not be downloaded (eg, to fall back to a webdriver)."""
+        try:
+            response = self.get(url, rate_limiter=rate_limiter)
+        except requests.RequestException as e:
+            print(f"\n\nThe page {url} is not accessible since the HTTP request failed:\n{e}\n\n")
+            return None
+        return response.text if response.ok else None
+
+    def get_session(self) -> requests.Session:
+        """Return the cache's own requests session, and initialize it the first time it is used."""
+        with self.lock:
+            if self.session is None:
+                self.session = new_pooled_session()
+            return self.session
+
+    def count_status(self, cache_status: str):
+        with self.lock:
+            self.status_counts[cache_status] += 1
+
+    def summary(self) -> dict:
+        """Return the number of responses of each cache status (ie, 'hit', 'revalidated', 'miss', 'bypass' and 'evicted'), and the size of the cache on disk."""
+        with self.lock:
+            return {**self.status_counts, 'cache_mb': round(self.total_bytes / 1024 ** 2, 2) if self.lru_index is not None else None}
+
+
+# specify a response cache shared by every non-browser fetch path of the webcrawler within a given process (ie, the same way as the shared rate limiter)
+shared_http_response_cache = HTTP_Response_Cache()
@@ -0,0 +1,116 @@
+"""Known listing ID filter for incremental crawls.
+
+Most of the rental listings on the search result pages have already been scraped (and stored in the SQL Server 'rental' table)
+during previous runs of the webcrawler. Since the listing ID is embedded in each listing's URL, we can skip the listings whose IDs
+we already know *before* accessing the inner listing pages, and stop paginating once a result page is made up entirely of known IDs.
+
+The known IDs for a given region & subregion are loaded either from the 'rental' table, or from a local index file
+(ie, a plain text file with one listing ID per line) that is updated after each run of the webcrawler."""
+import glob
+import json
+import os
+import re
+
+import pandas as pd
+
+
+# specify regex pattern of the (10-digit) listing IDs, which are embedded in each listing URL--e.g., https://sfbay.craigslist.org/sby/apa/d/san-jose-.../7654321098.html
+listing_id_regex = re.compile(r"([0-9]{10})")
+
+# specify file name of the local index of known listing IDs, which we save within the scraped data directory of each region & subregion
+known_listing_ids_index_file_name = 'known_listing_ids.txt'
+
+
+def parse_listing_id_from_url(list_url: str):
+    """Parse the listing ID from a given rental listing URL. Return None if the URL does not contain a listing ID."""
+    listing_id = listing_id_regex.search(list_url or '')
+    return listing_id.group(1) if listing_id else None
+
+
+def load_known_listing_ids_from_SQL(path_for_SQL_config: str, region: str, subregion: str) -> set:
+    """Query the listing IDs already stored in the SQL Server 'rental' table for the given region & subregion, and return them as a set of str."""
+    import pyodbc  # NB: only import pyodbc if we actually query the SQL database
+
+    with open(path_for_SQL_config, 'r') as fh:
+        config = json.load(fh)  # open config.json file, which contains all SQL database credentials--ie, username, password, database name, etc.
+
+    try:  # try to establish connection to SQL Server table via pyodbc connector
+        conn = pyodbc.connect(
+        f"DRIVER={config['driver']};"
+        f"SERVER={config['server']};"
+        f"DATABASE={config['database']};"
+        f"UID={config['username']};"
+        f"PWD={config['password']};"
+        'Trusted_Connection=yes;'
+        )
+
+    except pyodbc.Error as err:  # account for possible pyodbc SQL Server connection error
+        print(f"We were not able to connect to the SQL server database properly ({err}), so no known listing IDs will be skipped. Please double-check config.json and try again.")
+        return set()
+
+    # initialize cursor so we can execute SQL code
+    cursor = conn.cursor()
+
+    # specify SQL query--NB: regions with no subregions are stored with a sub_region value of 'None'
+    query = "SELECT listing_id FROM rental WHERE region = ? AND sub_region = ?;"
+    cursor.execute(query, (region, f"{subregion}"))
+    known_listing_ids = {str(row[0]) for row in cursor.fetchall()}
+
+    cursor.close()
+    conn.close()
+
+    return known_listing_ids
+
+
+def load_known_listing_ids_from_index_file(scraped_data_path: str) -> set:
+    """Load the known listing IDs from the local index file within the given region & subregion's scraped data directory.
+    If the index file does not yet exist, build the index from the listing IDs of the CSV files previously saved within the directory."""
+    index_path = os.path.join(scraped_data_path, known_listing_ids_index_file_name)
+
+    if os.path.exists(index_path):
+        with open(index_path, 'r') as fh:
+            return {line.strip() for line in fh if line.strip()}
+
+    # no index file yet: parse the listing IDs from any previously scraped CSV files
+    known_listing_ids = set()
+    for csv_file in glob.glob(os.path.join(scraped_data_path, '*.csv')):
+        df = pd.read_csv(csv_file, usecols=['ids'], dtype=str)
+        known_listing_ids.update(df['ids'].dropna().str.strip())
+    return known_listing_ids
+
+
+def update_known_listing_ids_index_file(scraped_data_path: str, listing_ids) -> int:
+    """Append the newly scraped listing IDs to the local index file within the given region & subregion's scraped data directory.
+    Return the number of IDs that were added to the index."""
+    known_listing_ids = load_known_listing_ids_from_index_file(scraped_data_path)
+    # include any IDs from previously saved CSVs (ie, if the index file has just been built), along with the newly scraped IDs
+    new_listing_ids = known_listing_ids | {str(listing_id).strip() for listing_id in listing_ids if listing_id_regex.fullmatch(str(listing_id).strip())}
+
+    index_path = os.path.join(scraped_data_path, known_listing_ids_index_file_name)
+    with open(index_path, 'w') as fh:
+        fh.writelines(f"{listing_id}\n" for listing_id in sorted(new_listing_ids))
+
+    return len(new_listing_ids) - len(known_listing_ids)
+
+
+class Known_Listing_IDs_Filter(object):
+    """Skip the rental listing URLs whose listing IDs have already been scraped, given a set of known listing IDs."""
+
+    def __init__(self, known_listing_ids: set):
+        self.known_listing_ids = set(known_listing_ids)
+        self.n_skipped = 0  # number of listing URLs skipped since their IDs are already known
+
+    def is_known(self, list_url: str) -> bool:
+        """Determine whether the listing ID of the given URL has already been scraped."""
+        return parse_listing_id_from_url(list_url) in self.known_listing_ids
+
+    def page_is_entirely_known(self, page_listing_urls: list) -> bool:
+        """Determine whether a given page of listings is made up entirely of known listing IDs--ie, in which case there is no need to paginate any further, since the listings are sorted by date posted."""
+        return len(page_listing_urls) > 0 and all(self.is_known(list_url) for list_url in page_listing_urls)
+
+    def filter_new_listing_urls(self, listing_urls: list) -> list:
+        """Return only the listing URLs whose IDs have not been scraped yet, in the same order."""
+        new_listing_urls = [list_url for list_url in listing_urls if not self.is_known(list_url)]
+        self.n_skipped += len(listing_urls) - len(new_listing_urls)
+        print(f"\nSkipping {len(listing_urls) - len(new_listing_urls)} listings whose IDs have already been scraped. There are {len(new_listing_urls)} new listings to scrape.\n")
+        return new_listing_urls
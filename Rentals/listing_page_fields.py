@@ -0,0 +1,102 @@
+"""Define the xpaths of each field we scrape from an individual (ie, 'inner') rental listing page,
+along with a few helpers to assemble the per-listing scraped data back into the
+dictionary of lists that the clean_scraped_data() and dict_to_df_pipeline() methods expect."""
+import time
+import threading
+
+
+# specify the xpath for each field of a given rental listing page, and whether we parse the element's text or its datetime attribute:
+# NB: the fields are listed in the same order as the serial webcrawler (ie, scrape_listing_data()) scrapes them
+listing_field_xpaths = {
+    'date_posted': ('//time[@class="date timeago"]', 'datetime'),  # date on which listing was originally posted
+    'ids': ('/html/body/section/section/section/div[2]/p[1]', 'text'),  # listing IDs
+    'prices': ('//span[@class="price"]', 'text'),  # rental prices
+    'cities': ('/html/body/section/section/h1/span/span[4]', 'text'),  # city names
+    'bedrooms': ('//span[@class="shared-line-bubble"]', 'text'),  # number of bedrooms
+    'bathrooms': ('//span[@class="shared-line-bubble"]', 'text'),  # number of bathrooms
+    'sqft': ('//span[@class="housing"]', 'text'),  # size of rental in square feet
+    'listing_descrip': ('//*[@id="postingbody"]', 'text'),  # poster's text description of rental listing
+    'attr_vars': ('//p[@class="attrgroup"][last()]', 'text'),  # the attributes are always the *last* p tag with a class name of "attrgroup"
+    }
+
+# specify nan value, which indicates missing data for a given field
+nan_val = 'nan'
+
+
+def nan_listing_record() -> dict:
+    """Return a record in which every scraped field is missing (ie, 'nan')--e.g., for a listing that has expired or could not be accessed."""
+    return {field_name: nan_val for field_name in listing_field_xpaths}
+
+
+class Listing_Record(object):
+    """Compact record of the fields scraped from a single rental listing page, along with the listing's URL.
+    NB: __slots__ avoids a per-record __dict__, so a batch of records uses little memory beyond the scraped text itself."""
+    __slots__ = ('listing_url',) + tuple(listing_field_xpaths)
+
+    def __init__(self, listing_url: str, record: dict):
+        self.listing_url = listing_url
+        for field_name in listing_field_xpaths:
+            setattr(self, field_name, record[field_name])
+
+    def __getitem__(self, field_name: str):
+        """Access a given field by name--ie, the same way as the dict records returned by the fetch backends."""
+        return getattr(self, field_name)
+
+    def as_dict(self) -> dict:
+        """Return the scraped fields as a dict (ie, without the listing's URL)."""
+        return {field_name: getattr(self, field_name) for field_name in listing_field_xpaths}
+
+
+def listing_records_to_dict_of_lists(listing_urls: list, listing_records: list, dates_of_webcrawler: list = None) -> dict:
+    """Transform a list of per-listing records (ie, one dict of scraped fields--or one Listing_Record--per listing URL) to the dictionary of lists
+    returned by scrape_listing_data(). NB: listing_urls and listing_records need to be aligned--ie, the nth record corresponds to the nth URL.
+    By default, today's date is imputed as the date_of_webcrawler of every record--NB: the offline reparse mode (see reparse_html_archive.py) passes the date on which each archived page was fetched instead."""
+    dict_scraped_lists = {
+        'listing_urls': listing_urls,
+        'ids': [record['ids'] for record in listing_records],
+        'sqft': [record['sqft'] for record in listing_records],
+        'cities': [record['cities'] for record in listing_records],
+        'prices': [record['prices'] for record in listing_records],
+        'bedrooms': [record['bedrooms'] for record in listing_records],
+        'bathrooms': [record['bathrooms'] for record in listing_records],
+        'attr_vars': [record['attr_vars'] for record in listing_records],
+        'listing_descrip': [record['listing_descrip'] for record in listing_records],
+        'date_of_webcrawler': list(dates_of_webcrawler) if dates_of_webcrawler is not None else [time.strftime("%Y-%m-%d")] * len(listing_records),  # impute today's date to all records that we scraped from the latest run of this webcrawler script
+        'kitchen': [],   # NB: the kitchen data are parsed from the listing descriptions by clean_scraped_data()
+        'date_posted': [record['date_posted'] for record in listing_records]
+        }
+    return dict_scraped_lists
+
+
+class Field_Extraction_Timer(object):
+    """Record the time spent extracting each field of the listing pages (summed over all listings), so we can compare the
+    runtime of the various extraction approaches--e.g., a WebDriverWait() per field vs. resolving every xpath in a single pass."""
+
+    def __init__(self):
+        self.lock = threading.Lock()  # the timer can be shared by several concurrent workers
+        self.total_seconds_by_field = {}
+        self.n_extractions_by_field = {}
+
+    def record(self, field_name: str, seconds: float):
+        """Add the number of seconds spent extracting the given field from a single listing page."""
+        with self.lock:
+            self.total_seconds_by_field[field_name] = self.total_seconds_by_field.get(field_name, 0) + seconds
+            self.n_extractions_by_field[field_name] = self.n_extractions_by_field.get(field_name, 0) + 1
+
+    def summary(self) -> dict:
+        """Return the total & mean number of seconds spent extracting each field."""
+        with self.lock:
+            return {
+                field_name: {
+                    'n_listings': self.n_extractions_by_field[field_name],
+                    'total_seconds': round(total_seconds, 4),
+                    'mean_seconds': round(total_seconds / self.n_extractions_by_field[field_name], 6),
+                    }
+                for field_name, total_seconds in self.total_seconds_by_field.items()
+                }
+
+    def print_summary(self):
+        """Print the time spent extracting each field, in the CLI."""
+        print("\nTime spent extracting each field from the listing pages (in seconds):")
+        for field_name, field_summary in self.summary().items():
+            print(f"{field_name}: total = {field_summary['total_seconds']}, mean per listing = {field_summary['mean_seconds']}")
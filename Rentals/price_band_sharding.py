@@ -0,0 +1,131 @@
+"""Price-band sharding: split the search query of Craigslist_Rentals into price bands (and optionally bedroom bands), so that no band hits craigslist's cap on the number of search results, and crawl the bands in parallel.
+
+Craigslist only returns up to search_result_cap listings for any search query, so a single min_price=50 to max_price=12000 query loses the oldest listings of large regions.
+So, the sharder:
+a.) downloads the 1st search result page of the full price range, and parses the total number of listings (see search_page_planner.py).
+b.) if a band contains search_result_cap or more listings, bisects its price range and counts the listings of both halves--ie, adaptively, so the bands are narrow where the listings are dense (e.g., $2,000-$3,000) and wide elsewhere.
+    NB: if a band cannot be split any further (ie, its price range is narrower than min_price_band_width) and bedroom sharding is enabled, the band is split by the number of bedrooms instead.
+c.) crawls each band via the pagination planner (ie, several bands at a time, which share the rate limiter for craigslist), and merges the listing URLs of every band, removing any duplicates--ie, a listing whose price is edited in between 2 bands being crawled.
+NB: the 1st page of each band is only downloaded once--ie, the page downloaded to count the band's listings is reused by the pagination planner."""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import html as lxml_html
+
+from .search_page_planner import Search_Page_Planner, update_search_url_query, parse_total_count, search_result_cap
+
+# specify the narrowest price band (in dollars) that will be split by price
+min_price_band_width = 50
+
+# specify the bedroom bands used to split any (narrowest) price band that still hits the search result cap--ie, (min_bedrooms, max_bedrooms), in which None is unbounded
+bedroom_bands = [(0, 0), (1, 1), (2, 2), (3, 3), (4, None)]
+
+
+class Search_Band(object):
+    """A price band (and optionally a bedroom band) of the search query."""
+    __slots__ = ('min_price', 'max_price', 'min_bedrooms', 'max_bedrooms')
+
+    def __init__(self, min_price: int, max_price: int, min_bedrooms: int = None, max_bedrooms: int = None):
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_bedrooms = min_bedrooms
+        self.max_bedrooms = max_bedrooms
+
+    def search_url(self, search_url: str) -> str:
+        """Return the given search URL, restricted to the band's price range (and bedroom range)."""
+        return update_search_url_query(search_url, {
+            'min_price': self.min_price, 'max_price': self.max_price,
+            'min_bedrooms': self.min_bedrooms, 'max_bedrooms': self.max_bedrooms,
+            })
+
+    def split(self, split_by_bedrooms: bool = False) -> list:
+        """Split the band into 2 price bands--or, if its price range cannot be split any further, into bedroom bands (given split_by_bedrooms). Return an empty list if the band cannot be split."""
+        if self.max_price - self.min_price >= min_price_band_width:
+            mid_price = (self.min_price + self.max_price) // 2
+            return [Search_Band(self.min_price, mid_price, self.min_bedrooms, self.max_bedrooms), Search_Band(mid_price + 1, self.max_price, self.min_bedrooms, self.max_bedrooms)]
+        if split_by_bedrooms and self.min_bedrooms is None and self.max_bedrooms is None:
+            return [Search_Band(self.min_price, self.max_price, min_bedrooms, max_bedrooms) for min_bedrooms, max_bedrooms in bedroom_bands]
+        return []
+
+    def __repr__(self):
+        bedrooms = '' if self.min_bedrooms is None and self.max_bedrooms is None else f", {self.min_bedrooms}-{self.max_bedrooms if self.max_bedrooms is not None else ''} bedrooms"
+        return f"${self.min_price}-${self.max_price}{bedrooms}"
+
+
+class Price_Band_Sharder(object):
+    """Plan the price bands of a given search URL, so that no band hits the search result cap, and crawl the bands in parallel via the pagination planner."""
+
+    def __init__(self, search_url: str, xpaths_listing_urls: str, min_price: int, max_price: int, rate_limiter=None, n_parallel_bands: int = 2, n_workers_per_band: int = 2,
+                 split_by_bedrooms: bool = False, result_cap: int = search_result_cap, telemetry=None):
+        self.search_url = search_url
+        self.xpaths_listing_urls = xpaths_listing_urls
+        self.min_price = min_price
+        self.max_price = max_price
+        self.rate_limiter = rate_limiter  # rate limiter shared by every fetch path of the webcrawler (see rate_limiter.py)
+        self.n_parallel_bands = max(1, n_parallel_bands)
+        self.n_workers_per_band = max(1, n_workers_per_band)
+        self.split_by_bedrooms = split_by_bedrooms
+        self.result_cap = result_cap
+        self.telemetry = telemetry  # optional Crawler_Telemetry, which counts the pages & bytes downloaded (see crawler_telemetry.py)
+        self.counting_planner = Search_Page_Planner(search_url, xpaths_listing_urls, rate_limiter, self.n_parallel_bands, result_cap=result_cap, telemetry=telemetry)  # NB: only used to download the 1st page of each band
+
+    def count_band(self, search_band: Search_Band) -> tuple:
+        """Download the 1st search result page of a given band. Return the page's HTML and the band's total number of listings (either of which is None if unknown)."""
+        first_page_source = self.counting_planner.fetch_search_page(search_band.search_url(self.search_url))
+        if first_page_source is None:
+            return None, None
+        return first_page_source, parse_total_count(lxml_html.fromstring(first_page_source))
+
+    def plan_bands(self, executor) -> list:
+        """Split the price range into bands until no band hits the search result cap. Return a list of (band, HTML of the band's 1st page, total number of listings) tuples."""
+        planned_bands = []
+        pending_bands = [Search_Band(self.min_price, self.max_price)]
+        while pending_bands:
+            band_counts = list(executor.map(self.count_band, pending_bands))
+            next_pending_bands = []
+            for search_band, (first_page_source, total_count) in zip(pending_bands, band_counts):
+                # NB: crawl a band as is if its number of listings is unknown, ie, rather than splitting it blindly
+                if total_count is None or total_count < self.result_cap:
+                    planned_bands.append((search_band, first_page_source, total_count))
+                    continue
+                split_bands = search_band.split(self.split_by_bedrooms)
+                if not split_bands:
+                    print(f"\nNB: the {search_band} band still contains {total_count} listings, but cannot be split any further--so, some of its listings will be missed.\n")
+                    planned_bands.append((search_band, first_page_source, total_count))
+                next_pending_bands.extend(split_bands)
+            pending_bands = next_pending_bands
+
+        # crawl the bands in order of price (and bedrooms)
+        planned_bands.sort(key=lambda planned_band: (planned_band[0].min_price, planned_band[0].min_bedrooms or 0))
+        return planned_bands
+
+    def crawl_band(self, search_band: Search_Band, first_page_source: str, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Crawl over each search result page of a given band via the pagination planner, and return the band's listing URLs (or None if the band's 1st page could not be downloaded, or does not contain any listing URLs)."""
+        if first_page_source is None:
+            return None
+        search_page_planner = Search_Page_Planner(search_band.search_url(self.search_url), self.xpaths_listing_urls, self.rate_limiter, self.n_workers_per_band, result_cap=self.result_cap, telemetry=self.telemetry)
+        try:
+            return search_page_planner.obtain_listing_urls(known_listing_ids_filter, search_page_harvest, first_page_source)
+        finally:
+            search_page_planner.close()
+
+    def obtain_listing_urls(self, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Plan the price bands, crawl them in parallel, and return the merged (deduplicated) listing URLs of every band--or None if none of the bands' search result pages contain any listing URLs.
+        NB: the Known_Listing_IDs_Filter & Search_Page_Harvest are applied to each band, the same way as for a single search query."""
+        with ThreadPoolExecutor(max_workers=self.n_parallel_bands) as executor:
+            planned_bands = self.plan_bands(executor)
+            print(f"\nThe search query has been split into {len(planned_bands)} bands:\n" + '\n'.join(f"{search_band}: {total_count if total_count is not None else 'unknown number of'} listings" for search_band, _, total_count in planned_bands) + '\n')
+            if self.telemetry is not None:
+                self.telemetry.count('n_price_bands', len(planned_bands))
+            bands_listing_urls = list(executor.map(
+                lambda planned_band: self.crawl_band(planned_band[0], planned_band[1], known_listing_ids_filter, search_page_harvest),
+                planned_bands
+                ))
+        self.counting_planner.close()
+
+        # NB: an empty band (ie, whose 1st page has no listings) returns None, the same as a page that needs JavaScript--so, only fall back if *every* band returned None
+        if all(band_listing_urls is None for band_listing_urls in bands_listing_urls):
+            return None
+        listing_urls = list(OrderedDict.fromkeys(list_url for band_listing_urls in bands_listing_urls if band_listing_urls for list_url in band_listing_urls))
+        print(f'\nThe total number of scraped rental listing urls across every band are:{len(listing_urls)}\n')
+        return listing_urls
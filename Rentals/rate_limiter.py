@@ -0,0 +1,128 @@
+"""Shared rate limiter for every GET request the webcrawler sends--ie, to craigslist (the search pages, the inner listing pages,
+and the subregion codes of a region's homepage) as well as to wikipedia (the city names used by the data pipelines).
+
+Each host gets its own token bucket: a GET request can only be sent once the host's bucket has a token, and the bucket refills at
+the host's current request rate. A random jitter is added to each wait, in order to mimic a more human-like browser activity.
+The request rate of each host adapts to the server's responses:
+a.) if a response is slow, or the server responds with HTTP 429 (Too Many Requests) or 403 (Forbidden)--ie, the server is
+throttling the webcrawler--the host's rate is divided by backoff_factor (down to min_requests_per_second), and the host is paused for a cooldown period.
+b.) otherwise, the host's rate slowly increases (up to max_requests_per_second), so the webcrawler converges to the highest rate the site tolerates."""
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from data_cleaning.configurable_settings import Configurable_Settings
+
+
+# specify the HTTP status codes that indicate the server is throttling the webcrawler
+throttling_status_codes = (429, 403)
+
+
+class Host_Token_Bucket(object):
+    """Token bucket for a single host: hold up to burst tokens, which refill at requests_per_second tokens per second."""
+
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill_time = time.monotonic()
+        self.paused_until = 0  # the host is paused (eg, after a 429 response) until this time
+
+    def reserve(self, now: float) -> float:
+        """Reserve a token for a GET request, and return the number of seconds to wait until the token is available.
+        NB: the bucket may go into 'debt' (ie, a negative number of tokens), so concurrent workers are scheduled one after the other."""
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill_time) * self.requests_per_second)
+        self.last_refill_time = now
+        self.tokens -= 1
+        wait_seconds = 0 if self.tokens >= 0 else -self.tokens / self.requests_per_second
+        return max(wait_seconds, self.paused_until - now)
+
+
+class Adaptive_Rate_Limiter(Configurable_Settings):
+    """Rate limiter with a token bucket per host, jitter, and adaptive backoff on slow or throttled responses. NB: the rate limiter is thread-safe, so it can be shared by several concurrent workers."""
+
+    settings_owner_name = 'rate limiter'
+
+    def __init__(self, requests_per_second: float = 0.5, max_requests_per_second: float = None, min_requests_per_second: float = 0.05,
+                 burst: int = 1, jitter: float = 1, slow_response_seconds: float = 10, backoff_factor: float = 2,
+                 recovery_step: float = 0.01, cooldown_seconds: float = 60):
+        self.requests_per_second = requests_per_second  # initial request rate for each host
+        self.max_requests_per_second = max_requests_per_second if max_requests_per_second is not None else requests_per_second  # the rate never increases beyond this ceiling
+        self.min_requests_per_second = min_requests_per_second  # the rate never decreases below this floor
+        self.burst = burst
+        self.jitter = jitter  # maximum number of seconds of random delay added to each wait
+        self.slow_response_seconds = slow_response_seconds  # responses that take longer than this many seconds indicate the server is overloaded
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step  # increase of the request rate after each fast & successful response
+        self.cooldown_seconds = cooldown_seconds  # pause the host for this many seconds after a throttling response
+        self.lock = threading.Lock()
+        self.buckets_by_host = {}
+        self.n_requests_by_host = {}
+        self.n_backoffs_by_host = {}
+
+    @staticmethod
+    def settings_from_delays(min_delay: float, max_delay: float) -> dict:
+        """Return the settings for which the delay in between any 2 GET requests to the same host ranges from about min_delay to max_delay seconds--ie, given the --min-delay & --max-delay command-line arguments of main.py."""
+        return {'requests_per_second': 1 / max(min_delay, 1e-3), 'jitter': max(max_delay - min_delay, 0)}
+
+    def reset_after_configure(self, settings: dict):
+        """NB: the request rate (and request counts) of hosts that have already been accessed are reset to the new settings."""
+        if 'requests_per_second' in settings and 'max_requests_per_second' not in settings:
+            self.max_requests_per_second = max(self.max_requests_per_second, self.requests_per_second)
+        self.buckets_by_host = {}
+        self.n_requests_by_host = {}
+        self.n_backoffs_by_host = {}
+
+    def get_bucket(self, host: str) -> Host_Token_Bucket:
+        """Return the token bucket of the given host, and initialize one if the host has not been accessed yet. NB: the lock needs to be held."""
+        if host not in self.buckets_by_host:
+            self.buckets_by_host[host] = Host_Token_Bucket(self.requests_per_second, self.burst)
+        return self.buckets_by_host[host]
+
+    def reserve(self, url: str) -> float:
+        """Reserve a GET request to the host of the given URL, and return the number of seconds to wait before sending it (ie, including a random jitter)--NB: the caller does the waiting, so the async webcrawler can await the delay instead of blocking (see async_webcrawler.py)."""
+        host = urlsplit(url).netloc or url
+        with self.lock:
+            wait_seconds = self.get_bucket(host).reserve(time.monotonic())
+            self.n_requests_by_host[host] = self.n_requests_by_host.get(host, 0) + 1
+        return wait_seconds + random.uniform(0, self.jitter)
+
+    def acquire(self, url: str):
+        """Wait until the host of the given URL allows another GET request, plus a random jitter."""
+        time.sleep(self.reserve(url))
+
+    def record_response(self, url: str, response_seconds: float = None, status_code: int = None):
+        """Adapt the request rate of the host of the given URL, given the response time (in seconds) and/or HTTP status code of a GET request."""
+        host = urlsplit(url).netloc or url
+        backoff_message = None
+        with self.lock:
+            bucket = self.get_bucket(host)
+            throttled = status_code in throttling_status_codes
+            if throttled or (response_seconds is not None and response_seconds > self.slow_response_seconds):
+                bucket.requests_per_second = max(self.min_requests_per_second, bucket.requests_per_second / self.backoff_factor)
+                self.n_backoffs_by_host[host] = self.n_backoffs_by_host.get(host, 0) + 1
+                if throttled:
+                    bucket.paused_until = time.monotonic() + self.cooldown_seconds
+                backoff_message = f"\nThe webcrawler is slowing down requests to {host} to {bucket.requests_per_second:.3f} requests per second, since the server responded {'with HTTP ' + str(status_code) if throttled else 'slowly'}.\n"
+            else:
+                bucket.requests_per_second = min(self.max_requests_per_second, bucket.requests_per_second + self.recovery_step)
+        # NB: print the backoff message only once the lock has been released, so the other workers' reserve() calls are never blocked on stdout
+        if backoff_message is not None:
+            print(backoff_message)
+
+    def summary(self) -> dict:
+        """Return the number of requests, number of backoffs, and current request rate of each host."""
+        with self.lock:
+            return {
+                host: {
+                    'n_requests': n_requests,
+                    'n_backoffs': self.n_backoffs_by_host.get(host, 0),
+                    'requests_per_second': round(self.buckets_by_host[host].requests_per_second, 3),
+                    }
+                for host, n_requests in self.n_requests_by_host.items()
+                }
+
+
+# specify a rate limiter shared by every fetch path of the webcrawler within a given process, so that the GET requests sent to a given host are rate-limited together
+shared_rate_limiter = Adaptive_Rate_Limiter()
@@ -0,0 +1,167 @@
+"""Retry policy for the inner listing pages: classify each failed fetch, and retry only the failures that are likely to succeed on a later attempt.
+
+Each fetch of a listing page ends with one of the following outcomes:
+a.) 'scraped': the listing page has been scraped.
+b.) 'expired': the listing has expired or has been deleted (ie, HTTP 404/410, or craigslist's 'This posting has expired' page)--NB: such listings are never retried, and are marked as 'nan' right away.
+c.) 'transient': the page timed out, the connection failed, or the server responded with an error (ie, HTTP 5xx)--ie, retried after an exponential backoff.
+d.) 'throttled': the server is throttling the webcrawler (ie, HTTP 429 or 403)--ie, retried after an exponential backoff, on top of the rate limiter's own cooldown (see rate_limiter.py).
+e.) 'driver_crash': the webdriver connection has been lost (eg, Chrome crashed)--ie, the webdriver is restarted, and the listing is retried.
+If a listing still fails after max_retries retries, it is marked as 'nan' and counted as 'failed_<category>'. Each outcome (and each retry) is counted, so the counts can be reported in the run metrics."""
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+
+import requests
+from lxml import etree, html as lxml_html
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from data_cleaning.configurable_settings import Configurable_Settings
+
+from .listing_page_fields import nan_listing_record
+
+
+# specify the xpath of craigslist's page for expired or deleted listings--NB: the page is served with HTTP 404, which selenium cannot see, so we also look for its text
+expired_listing_xpath = '//*[contains(@class, "removed")]//h2 | //h2[contains(text(), "This posting has expired") or contains(text(), "This posting has been deleted") or contains(text(), "flagged for removal")]'
+
+class Listing_Fetch_Failure(Exception):
+    """A failed fetch of a listing page, classified into one of the failure categories (ie, 'expired', 'transient', 'throttled' or 'driver_crash')."""
+
+    def __init__(self, category: str, message: str = ''):
+        super().__init__(message)
+        self.category = category
+
+
+def listing_page_has_expired(page_source: str) -> bool:
+    """Determine whether a listing page is craigslist's page for expired or deleted listings."""
+    return len(lxml_html.fromstring(page_source).xpath(expired_listing_xpath)) > 0
+
+
+def classify_status_code(status_code: int) -> str:
+    """Classify the HTTP status code of a listing page's response. Return None if the response is successful."""
+    if status_code in (404, 410):
+        return 'expired'
+    if status_code in (429, 403):
+        return 'throttled'
+    if status_code >= 400:
+        return 'transient'
+    return None
+
+
+def classify_exception(exception: Exception) -> str:
+    """Classify an exception raised while fetching a listing page. Return None if the exception is not a known fetch failure (ie, it should be raised as is)."""
+    if isinstance(exception, Listing_Fetch_Failure):
+        return exception.category
+    # NB: check for TimeoutException before WebDriverException, since the former is a subclass of the latter
+    if isinstance(exception, TimeoutException):
+        return 'transient'
+    if isinstance(exception, WebDriverException):
+        return 'driver_crash'
+    if isinstance(exception, requests.RequestException):
+        return 'transient'
+    # NB: an empty or truncated page (ie, a HTTP 200 response whose body could not be parsed) raises lxml's ParserError--e.g., 'Document is empty'--so it is retried like any other transient failure
+    if isinstance(exception, etree.ParserError):
+        return 'transient'
+    return None
+
+
+class Retry_Policy(Configurable_Settings):
+    """Retry the transient failures of each listing fetch with exponential backoff, restart the webdriver on crashes, and count the outcome of every fetch.
+    NB: the retry policy is thread-safe, so it can be shared by several concurrent workers."""
+
+    settings_owner_name = 'retry policy'
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 2, max_delay: float = 60, jitter: float = 0.5):
+        self.max_retries = max_retries  # maximum number of retries of a given listing
+        self.base_delay = base_delay  # number of seconds to wait before the 1st retry--NB: the delay doubles with each retry
+        self.max_delay = max_delay  # the delay never increases beyond this ceiling
+        self.jitter = jitter  # maximum fraction of random delay added to each backoff
+        self.lock = threading.Lock()
+        self.outcome_counts = Counter()
+
+    def reset_after_configure(self, settings: dict):
+        """NB: the outcome counts are reset."""
+        self.outcome_counts = Counter()
+
+    def count_outcome(self, outcome: str):
+        with self.lock:
+            self.outcome_counts[outcome] += 1
+
+    def backoff_delay(self, n_retry: int) -> float:
+        """Return the number of seconds to wait before the given (1-indexed) retry--ie, exponential backoff, plus a random jitter."""
+        delay = min(self.max_delay, self.base_delay * 2 ** (n_retry - 1))
+        return delay * (1 + random.uniform(0, self.jitter))
+
+    def handle_failure(self, list_url: str, exception: Exception, n_retry: int) -> tuple:
+        """Classify, count & print a failed attempt (ie, the given 0-indexed retry) of fetching a listing URL--NB: shared by fetch_with_retries() & fetch_with_retries_async(), so the 2 fetch paths only differ in how they wait.
+        Return a tuple of the failure's category, and either a 'nan' record if the listing should not be retried (ie, it has expired), or None if it should be retried.
+        Any exception that is not a known fetch failure (eg, a KeyError of a parsing bug) is raised as is."""
+        category = classify_exception(exception)
+        if category is None:
+            raise exception
+        if category == 'expired':
+            print(f"\n\nRental listing posting {list_url} has expired or has been deleted.\n\n")
+            self.count_outcome('expired')
+            return category, nan_listing_record()
+        self.count_outcome(category)
+        print(f"\n\nRental listing posting {list_url} could not be scraped ({category} failure, attempt {n_retry + 1} of {self.max_retries + 1}).\n\n")
+        return category, None
+
+    def give_up(self, list_url: str, category: str, raise_on_give_up: bool = False) -> dict:
+        """Count a listing whose retries are exhausted as 'failed_<category>', and return a 'nan' record--or, if raise_on_give_up, raise a Listing_Fetch_Failure of the last failure's category instead."""
+        self.count_outcome(f'failed_{category}')
+        if raise_on_give_up:
+            raise Listing_Fetch_Failure(category, f"Rental listing posting {list_url} still failed after {self.max_retries} retries.")
+        return nan_listing_record()
+
+    def fetch_with_retries(self, list_url: str, fetch_attempt, restart_webdriver=None, raise_on_give_up: bool = False) -> dict:
+        """Fetch a given listing URL via fetch_attempt(list_url), which returns the listing's record or raises an exception.
+        Retry the retryable failures (after restarting the webdriver via restart_webdriver(), for driver crashes), and return the listing's record--or a 'nan' record if the listing has expired or still fails after max_retries retries.
+        NB: If raise_on_give_up, raise a Listing_Fetch_Failure (of the last failure's category) instead of returning a 'nan' record once the retries are exhausted--e.g., so the serial webcrawler can stop once the webdriver can no longer be restarted.
+        Any exception that is not a known fetch failure (eg, a KeyboardInterrupt) is raised as is."""
+        for n_retry in range(self.max_retries + 1):
+            if n_retry > 0:
+                self.count_outcome('retries')
+                time.sleep(self.backoff_delay(n_retry))
+            try:
+                record = fetch_attempt(list_url)
+            except Exception as e:
+                category, record = self.handle_failure(list_url, e, n_retry)
+                if record is not None:
+                    return record
+            else:
+                self.count_outcome('scraped')
+                return record
+            if category == 'driver_crash' and restart_webdriver is not None:
+                restart_webdriver()
+        return self.give_up(list_url, category, raise_on_give_up)
+
+    async def fetch_with_retries_async(self, list_url: str, fetch_attempt, restart_webdriver=None, raise_on_give_up: bool = False) -> dict:
+        """Coroutine version of fetch_with_retries() for the async webcrawler (see async_webcrawler.py): fetch_attempt(list_url) and restart_webdriver() are coroutine functions, and the backoff delays are awaited rather than blocking the event loop.
+        NB: the outcomes are counted the same way (see handle_failure() & give_up()), so the fetch outcomes of the run report do not depend on the webcrawler's fetch path."""
+        for n_retry in range(self.max_retries + 1):
+            if n_retry > 0:
+                self.count_outcome('retries')
+                await asyncio.sleep(self.backoff_delay(n_retry))
+            try:
+                record = await fetch_attempt(list_url)
+            except Exception as e:
+                category, record = self.handle_failure(list_url, e, n_retry)
+                if record is not None:
+                    return record
+            else:
+                self.count_outcome('scraped')
+                return record
+            if category == 'driver_crash' and restart_webdriver is not None:
+                await restart_webdriver()
+        return self.give_up(list_url, category, raise_on_give_up)
+
+    def summary(self) -> dict:
+        """Return the number of fetches of each outcome--ie, 'scraped', 'expired', each failure category, 'retries', and 'failed_<category>' for the listings that were given up on."""
+        with self.lock:
+            return dict(self.outcome_counts)
+
+
+# specify a retry policy shared by every fetch path of the webcrawler within a given process (ie, the same way as the shared rate limiter)
+shared_retry_policy = Retry_Policy()
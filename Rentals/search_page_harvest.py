@@ -0,0 +1,125 @@
+"""Search-page harvest mode: extract the listing fields shown on the search result pages, to avoid accessing most inner listing pages.
+
+Each search result 'card' already shows the listing's price, bedrooms, sqft, neighborhood (ie, city name) and date posted. So, while
+obtain_listing_urls() crawls over the search result pages, the harvest parses these fields from each page's source (via lxml), and
+returns them as the same record (ie, a dict of the fields of listing_field_xpaths) as the inner listing pages--NB: the fields that are only shown on the
+inner listing pages (ie, the listing description, attributes & bathrooms) are 'nan'.
+
+For a daily price-tracking run, the inner listing pages then only need to be accessed for the listings that are new (ie, whose IDs have not been scraped yet),
+rather than for every listing--see the --search-page-harvest argument of main.py."""
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+from .listing_page_fields import nan_listing_record, nan_val
+from .known_listing_ids import parse_listing_id_from_url
+
+
+# specify the xpaths of the search result cards--NB: account for craigslist's current search page (ie, cl-search-result), its static (ie, non-JavaScript) search page, and its older result-row layout
+search_result_card_xpaths = '//*[contains(concat(" ", normalize-space(@class), " "), " cl-search-result ")] | //li[contains(@class, "cl-static-search-result")] | //li[contains(@class, "result-row")]'
+
+# specify the xpaths--relative to each card--of each harvested field: the first xpath that matches is used
+search_result_card_field_xpaths = {
+    'listing_url': ['.//a[contains(@class, "posting-title")]/@href', './/a[contains(@class, "result-title")]/@href', './/a/@href'],
+    'prices': ['.//*[contains(@class, "priceinfo")]', './/*[contains(@class, "result-price")]', './/*[@class="price"]'],
+    'bedrooms': ['.//*[contains(@class, "post-bedrooms")]', './/*[contains(@class, "housing")]'],
+    'sqft': ['.//*[contains(@class, "post-sqft")]', './/*[contains(@class, "housing")]'],
+    'cities': ['.//*[contains(@class, "result-hood")]', './/*[@class="location"]', './/*[contains(@class, "meta")]/text()[last()]'],
+    'date_posted': ['.//time/@datetime', './/*[contains(@class, "meta")]/span[@title]/@title'],
+    }
+
+# specify regex patterns to parse the bedrooms & sqft data from the cards' 'housing' text--e.g., '/ 2br - 900ft2 -'
+bedrooms_regex = re.compile(r"(\d+)\s*br", re.IGNORECASE)
+sqft_regex = re.compile(r"(\d+)\s*ft", re.IGNORECASE)
+
+# specify the date format of the title attribute of craigslist's current search page--e.g., 'Fri Sep 01 2023 10:00:00 GMT-0700'
+card_title_date_format = '%a %b %d %Y %H:%M:%S GMT%z'
+
+
+def first_match_text(card, xpaths: list) -> str:
+    """Return the (stripped) text of the first element or attribute value matched by the given xpaths within a card, or None if none of the xpaths match."""
+    for xpath_arg in xpaths:
+        for match in card.xpath(xpath_arg):
+            text = match if isinstance(match, str) else match.text_content()
+            text = ' '.join(text.split())
+            if text:
+                return text
+    return None
+
+
+def format_card_date_posted(date_posted: str) -> str:
+    """Return the date posted of a card in the same (ie, ISO 8601) format as the datetime attribute of the inner listing pages--NB: only the title attribute of the current search page needs to be reformatted."""
+    try:
+        return datetime.strptime(date_posted.split(' (')[0], card_title_date_format).strftime('%Y-%m-%dT%H:%M:%S%z')
+    except ValueError:
+        return date_posted
+
+
+def parse_search_result_card(card, base_url: str) -> tuple:
+    """Parse a single search result card. Return the listing's (absolute) URL, and its record--ie, formatted the same way as the text of the inner listing pages,
+    so the clean_scraped_data() & dict_to_df_pipeline() methods can be used as is. Return (None, None) if the card has no listing URL."""
+    listing_url = first_match_text(card, search_result_card_field_xpaths['listing_url'])
+    if listing_url is None:
+        return None, None
+    listing_url = urljoin(base_url, listing_url)
+
+    record = nan_listing_record()
+    record['ids'] = card.get('data-pid') or parse_listing_id_from_url(listing_url) or nan_val
+    for field_name in ['prices', 'cities', 'date_posted']:
+        record[field_name] = first_match_text(card, search_result_card_field_xpaths[field_name]) or nan_val
+    record['date_posted'] = format_card_date_posted(record['date_posted'])
+
+    # NB: use the same format as the inner listing pages--ie, '2BR' for bedrooms (as in '2BR / 1Ba'), and '900ft2' for sqft
+    bedrooms = bedrooms_regex.search(first_match_text(card, search_result_card_field_xpaths['bedrooms']) or '')
+    record['bedrooms'] = f"{bedrooms.group(1)}BR" if bedrooms else nan_val
+    sqft = sqft_regex.search(first_match_text(card, search_result_card_field_xpaths['sqft']) or '')
+    record['sqft'] = f"{sqft.group(1)}ft2" if sqft else nan_val
+    return listing_url, record
+
+
+class Search_Page_Harvest(object):
+    """Harvest the listing fields of each search result card, while obtain_listing_urls() crawls over the search result pages."""
+
+    def __init__(self):
+        self.records_by_url = {}  # harvested record of each listing URL
+        self.n_pages = 0
+        self.lock = threading.Lock()  # NB: the search result pages of several price bands can be harvested at the same time (see price_band_sharding.py)
+
+    def harvest_page(self, page_source: str, base_url: str) -> int:
+        """Parse every search result card of a given search result page. Return the number of cards harvested."""
+        tree = lxml_html.fromstring(page_source)
+        harvested_records = {}
+        for card in tree.xpath(search_result_card_xpaths):
+            listing_url, record = parse_search_result_card(card, base_url)
+            if listing_url is not None:
+                harvested_records[listing_url] = record
+        with self.lock:
+            self.records_by_url.update(harvested_records)
+            self.n_pages += 1
+        return len(harvested_records)
+
+    def harvested_record(self, list_url: str) -> dict:
+        """Return the harvested record of the given listing URL, or None if its card could not be harvested (or has no price)."""
+        record = self.records_by_url.get(list_url)
+        if record is None or record['prices'] == nan_val:
+            return None
+        return record
+
+    def journal_harvested_listings(self, crawl_journal, listing_urls: list, known_listing_ids_filter=None) -> int:
+        """Record the harvested records of the given listing URLs to the crawl journal--ie, so these listings' inner pages are not accessed (see Crawl_Journal.remaining_listing_urls()).
+        NB: if a Known_Listing_IDs_Filter is given, only the listings whose IDs have already been scraped are recorded, so the inner pages of new listings are still accessed (ie, for their descriptions & attributes).
+        Return the number of listings recorded to the journal."""
+        harvested_listings = []
+        for list_url in listing_urls:
+            if known_listing_ids_filter is not None and not known_listing_ids_filter.is_known(list_url):
+                continue
+            record = self.harvested_record(list_url)
+            if record is not None:
+                harvested_listings.append((list_url, record))
+        crawl_journal.record_listings(harvested_listings)
+        n_journaled = len(harvested_listings)
+        print(f"\nHarvested {n_journaled} listings from {self.n_pages} search result pages; the inner listing pages of the remaining {len(listing_urls) - n_journaled} listings will be accessed.\n")
+        return n_journaled
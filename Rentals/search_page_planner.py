@@ -0,0 +1,224 @@
+"""Pagination planner: compute the URL of each search result page from the search URL of Craigslist_Rentals, instead of clicking the 'next' page button.
+
+Craigslist's search result pages can be accessed directly via the 's' (ie, offset) query parameter--e.g., &s=120 for the 2nd page, &s=240 for the 3rd page--
+since each page contains up to 120 listings. So, rather than loading each page via the webdriver, waiting until the next page button is clickable and clicking it,
+the planner:
+a.) downloads the 1st search result page via a pooled HTTP session, and parses the total number of listings (ie, the 'cl-page-number' or 'totalcount' element) to plan the URL of every other page.
+b.) downloads the remaining pages concurrently (in waves of n_workers pages, via a thread pool that shares the rate limiter for craigslist), and extracts the listing URLs from each page via lxml.
+c.) removes any duplicate listing URLs--NB: a listing can show up on 2 pages if a new listing is posted in between downloading them.
+If the total number of listings is not shown, the planner keeps downloading successive waves of pages until a page does not contain any new listing URLs.
+
+NB: craigslist's current search page renders its listings via JavaScript, but it also serves a static version of each page (ie, the cl-static-search-result cards) to HTTP clients.
+If the planner cannot find any listing URLs on the 1st page, it returns None, so the webcrawler can fall back to clicking the next page button (see Craigslist_Rentals.obtain_listing_urls())."""
+import re
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, urljoin
+
+import requests
+from lxml import html as lxml_html
+
+from .rate_limiter import throttling_status_codes
+from .http_response_cache import shared_http_response_cache, new_pooled_session
+from .search_page_harvest import search_result_card_xpaths, search_result_card_field_xpaths, first_match_text
+
+
+# specify the number of listings on each search result page, and the query parameter of the offset of each page
+listings_per_search_page = 120
+search_page_offset_param = 's'
+
+# specify craigslist's maximum number of search results per search query--ie, no pages are planned beyond this cap (see also price_band_sharding.py)
+search_result_cap = 3000
+
+# specify the xpaths of the total number of listings--NB: account for the current search page (e.g., '1 - 120 of 2,345') and the older 'totalcount' element (e.g., '2345')
+total_count_xpaths = '//*[contains(@class, "cl-page-number")] | //span[@class="totalcount"]'
+total_count_regex = re.compile(r"(?:of\s+)?([\d,]+)\s*$")
+
+
+def update_search_url_query(search_url: str, query_params: dict) -> str:
+    """Return the search URL with the given query parameters added or replaced--NB: a parameter whose value is None is removed.
+    The rest of the query is left as is (ie, including the '?/' prefix of the URL of Craigslist_Rentals)."""
+    split_url = urlsplit(search_url)
+    kept_params = [param for param in split_url.query.split('&') if param and param.split('=')[0].lstrip('/') not in query_params]
+    kept_params.extend(f"{param_name}={param_value}" for param_name, param_value in query_params.items() if param_value is not None)
+    return urlunsplit(split_url._replace(query='&'.join(kept_params)))
+
+
+def search_page_url(search_url: str, page_index: int, listings_per_page: int = listings_per_search_page) -> str:
+    """Return the URL of the given (0-indexed) search result page, by adding the offset parameter to the query of the search URL (or replacing any existing offset parameter)."""
+    return update_search_url_query(search_url, {search_page_offset_param: page_index * listings_per_page if page_index > 0 else None})
+
+
+def plan_search_page_urls(search_url: str, total_count: int, listings_per_page: int = listings_per_search_page) -> list:
+    """Return the URL of every search result page after the 1st one, given the total number of listings."""
+    n_pages = -(-total_count // listings_per_page)  # ie, round up
+    return [search_page_url(search_url, page_index, listings_per_page) for page_index in range(1, n_pages)]
+
+
+def parse_total_count(tree) -> int:
+    """Parse the total number of listings from the lxml tree of a search result page. Return None if the page does not show the total number of listings."""
+    for element in tree.xpath(total_count_xpaths):
+        total_count = total_count_regex.search(' '.join(element.text_content().split()))
+        if total_count:
+            return int(total_count.group(1).replace(',', ''))
+    return None
+
+
+def parse_listing_urls_from_search_page(tree, base_url: str, xpaths_listing_urls: str) -> list:
+    """Extract the (absolute) listing URLs from the lxml tree of a search result page, via the same xpaths as obtain_listing_urls().
+    NB: fall back to the search result cards (see search_page_harvest.py) for the static search page, whose listing URL anchors have no class."""
+    hrefs = [anchor.get('href') for anchor in tree.xpath(xpaths_listing_urls)]
+    if not hrefs:
+        hrefs = [first_match_text(card, search_result_card_field_xpaths['listing_url']) for card in tree.xpath(search_result_card_xpaths)]
+    return [urljoin(base_url, href) for href in hrefs if href]
+
+
+class Search_Page_Walk(object):
+    """The state of a single walk over the search result pages of a given search URL: ie, the planned page URLs, the listing URLs found so far, and whether the walk should stop.
+    NB: the walk does not download any pages itself, so the same logic is shared by the pagination planner's thread pool and by the async webcrawler (see async_webcrawler.py)."""
+
+    def __init__(self, search_url: str, xpaths_listing_urls: str, listings_per_page: int = listings_per_search_page, result_cap: int = search_result_cap, known_listing_ids_filter=None, search_page_harvest=None):
+        self.search_url = search_url
+        self.xpaths_listing_urls = xpaths_listing_urls
+        self.listings_per_page = listings_per_page
+        self.result_cap = result_cap
+        self.known_listing_ids_filter = known_listing_ids_filter  # optional Known_Listing_IDs_Filter, which lets the walk stop early (see known_listing_ids.py)
+        self.search_page_harvest = search_page_harvest  # optional Search_Page_Harvest, which parses the fields shown on each page's search result cards (see search_page_harvest.py)
+        self.first_page_url = search_page_url(search_url, 0, listings_per_page)
+        self.planned_page_urls = None  # ie, unknown until the 1st page has been parsed--and remains None if the page does not show the total number of listings
+        self.next_page_index = 1
+        self.listing_urls = []
+        self.n_pages = 0
+        self.stopped = False
+
+    def start(self, first_page_source: str) -> bool:
+        """Parse the 1st search result page, and plan the URLs of the remaining pages. Return False if the 1st page does not contain any listing URLs (eg, the page needs JavaScript)."""
+        first_page_tree = lxml_html.fromstring(first_page_source)
+        if not parse_listing_urls_from_search_page(first_page_tree, self.first_page_url, self.xpaths_listing_urls):
+            return False
+
+        total_count = parse_total_count(first_page_tree)
+        if total_count is not None:
+            self.planned_page_urls = plan_search_page_urls(self.search_url, min(total_count, self.result_cap), self.listings_per_page)
+            print(f"\nThe search results contain {total_count} listings, so the webcrawler will download {len(self.planned_page_urls) + 1} search result pages.\n")
+        self.stopped = self.process_page(self.first_page_url, first_page_source, first_page_tree)
+        return True
+
+    def process_page(self, page_url: str, page_source: str, page_tree=None) -> bool:
+        """Append the listing URLs of a downloaded page. Return True if the webcrawler should stop paginating after this page."""
+        if page_source is None:
+            return False
+        page_tree = page_tree if page_tree is not None else lxml_html.fromstring(page_source)
+        page_listing_urls = parse_listing_urls_from_search_page(page_tree, page_url, self.xpaths_listing_urls)
+        n_new_listing_urls = len(set(page_listing_urls).difference(self.listing_urls))
+        self.listing_urls.extend(page_listing_urls)
+        self.n_pages += 1
+
+        # harvest the fields shown on the page's search result cards
+        if self.search_page_harvest is not None:
+            self.search_page_harvest.harvest_page(page_source, page_url)
+
+        # stop if every listing on the given page has already been scraped--ie, since the listings are sorted by date posted, the remaining pages will only contain older listings
+        if self.known_listing_ids_filter is not None and self.known_listing_ids_filter.page_is_entirely_known(page_listing_urls):
+            print("\nEvery listing on this page has already been scraped, so the webcrawler will stop paginating.\n")
+            return True
+        # if the total number of listings is unknown, stop once a page does not contain any new listing URLs (ie, we are past the last page)
+        return self.planned_page_urls is None and n_new_listing_urls == 0
+
+    def next_wave_page_urls(self, n_pages: int) -> list:
+        """Return the URLs of the next wave of (up to) n_pages search result pages to download--or an empty list once every planned page has been downloaded."""
+        if self.stopped:
+            return []
+        if self.planned_page_urls is not None:
+            wave_page_urls = self.planned_page_urls[self.next_page_index - 1:self.next_page_index - 1 + n_pages]
+        else:
+            wave_page_urls = [search_page_url(self.search_url, page_index, self.listings_per_page) for page_index in range(self.next_page_index, self.next_page_index + n_pages)]
+        self.next_page_index += len(wave_page_urls)
+        return wave_page_urls
+
+    def process_wave(self, wave_page_urls: list, wave_page_sources: list):
+        """Process the downloaded pages of a wave (ie, the HTML of each page, or None if the page could not be downloaded).
+        NB: the pages of each wave are processed in order, so the early stop skips the same pages as the serial webcrawler."""
+        for page_url, page_source in zip(wave_page_urls, wave_page_sources):
+            self.stopped = self.process_page(page_url, page_source)
+            if self.stopped:
+                return
+        # NB: stop if none of the pages of a wave could be downloaded, rather than sending more requests to an unresponsive server
+        if all(page_source is None for page_source in wave_page_sources):
+            print("\nNone of the search result pages of the latest wave could be downloaded, so the webcrawler will stop paginating.\n")
+            self.stopped = True
+
+    def unique_listing_urls(self) -> list:
+        """Return the listing URLs found so far, without any duplicates--while retaining the order of the listing urls."""
+        return list(OrderedDict.fromkeys(self.listing_urls))
+
+
+class Search_Page_Planner(object):
+    """Download the search result pages of a given search URL concurrently, via the offset parameter, and return the listing URLs of every page."""
+
+    def __init__(self, search_url: str, xpaths_listing_urls: str, rate_limiter=None, n_workers: int = 4, listings_per_page: int = listings_per_search_page, request_timeout: float = 30, result_cap: int = search_result_cap, telemetry=None,
+                 response_cache=shared_http_response_cache):
+        self.search_url = search_url
+        self.xpaths_listing_urls = xpaths_listing_urls
+        self.rate_limiter = rate_limiter  # rate limiter shared by every fetch path of the webcrawler (see rate_limiter.py)
+        self.n_workers = max(1, n_workers)
+        self.listings_per_page = listings_per_page
+        self.request_timeout = request_timeout
+        self.result_cap = result_cap
+        self.telemetry = telemetry  # optional Crawler_Telemetry, which counts the pages & bytes downloaded (see crawler_telemetry.py)
+        self.response_cache = response_cache  # HTTP response cache, so a search result page downloaded again shortly after is served from disk or revalidated (see http_response_cache.py)
+        self.n_failed_pages = 0
+
+        # initialize a session, whose connection pool is shared by all of the workers--ie, the same way as the HTTP fetch backend (see fetch_backends.py)
+        self.session = new_pooled_session(self.n_workers)
+
+    def fetch_search_page(self, page_url: str) -> str:
+        """Download the given search result page. Return its HTML, or None if the page could not be downloaded."""
+        # NB: the response cache waits for the host's rate limiter (and slows down if the server responds slowly, or is throttling the webcrawler) only if a GET request is actually sent
+        try:
+            response = self.response_cache.get(page_url, self.session, self.rate_limiter, self.request_timeout)
+        except requests.RequestException as e:
+            print(f"\n\nSearch result page {page_url} is not accessible since the HTTP request failed:\n{e}\n\n")
+            self.n_failed_pages += 1
+            return None
+
+        if not response.ok:
+            reason = "craigslist is throttling the webcrawler" if response.status_code in throttling_status_codes else "the server responded with an error"
+            print(f"\n\nSearch result page {page_url} is not accessible since {reason} (HTTP {response.status_code}).\n\n")
+            self.n_failed_pages += 1
+            return None
+        if self.telemetry is not None and not response.from_cache:
+            self.telemetry.record_download(len(response.content))
+        return response.text
+
+    def obtain_listing_urls(self, known_listing_ids_filter=None, search_page_harvest=None, first_page_source: str = None) -> list:
+        """Download every search result page, and return the (deduplicated) listing URLs of all pages--or None if the 1st page does not contain any listing URLs.
+        NB: If the HTML of the 1st page has already been downloaded (e.g., to count the listings of a price band--see price_band_sharding.py), it is not downloaded again.
+        If a Known_Listing_IDs_Filter is given, stop once a page of listings is made up entirely of listing IDs that have already been scraped--ie, the same way as obtain_listing_urls() of Craigslist_Rentals.
+        If a Search_Page_Harvest is given, also parse the fields shown on each page's search result cards."""
+        start_time = time.perf_counter()
+        search_page_walk = Search_Page_Walk(self.search_url, self.xpaths_listing_urls, self.listings_per_page, self.result_cap, known_listing_ids_filter, search_page_harvest)
+
+        ## a.) download the 1st page, and plan the URLs of the remaining pages
+        if first_page_source is None:
+            first_page_source = self.fetch_search_page(search_page_walk.first_page_url)
+        if first_page_source is None or not search_page_walk.start(first_page_source):
+            return None
+
+        ## b.) download the remaining pages in waves of n_workers pages
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            while True:
+                wave_page_urls = search_page_walk.next_wave_page_urls(self.n_workers)
+                if not wave_page_urls:
+                    break
+                search_page_walk.process_wave(wave_page_urls, list(executor.map(self.fetch_search_page, wave_page_urls)))
+
+        ## c.) remove any duplicate listing urls, while retaining the order of the listing urls
+        listing_urls = search_page_walk.unique_listing_urls()
+        print(f"\nDownloaded {search_page_walk.n_pages} search result pages ({self.n_failed_pages} failed) in {round(time.perf_counter() - start_time, 2)} seconds.\n")
+        print(f'The total number of scraped rental listing urls are:{len(listing_urls)}\n')
+        return listing_urls
+
+    def close(self):
+        self.session.close()
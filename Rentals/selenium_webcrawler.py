@@ -3,7 +3,6 @@
 import csv
 import os
 import time
-import random
 from collections import OrderedDict  # use to remove duplicates from rental listing urls list
 import datetime
 
@@ -12,23 +11,29 @@ import pandas as pd
 from pandas.core.frame import DataFrame
 
 #web crawling, web scraping & webdriver libraries and modules
-from selenium import webdriver  # NB: this is the main module we will use to implement the webcrawler and webscraping. A webdriver is an automated browser.
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException, ElementClickInterceptedException
-from selenium.webdriver.chrome.options import Options  # Options enables us to tell Selenium to open WebDriver browsers using maximized mode, and we can also disable any extensions or infobars
 
 # pathlib library to look up whether given path exists and create path if it does not yet exist
 from pathlib import Path
 
-# import functions for cleaning misclassified data or city names data that we need to rename (e.g., for SF and  Santa Cruz counties)
+# import the function for cleaning misclassified data or city names data that we need to rename (e.g., for SF and  Santa Cruz counties)
 # NB: since these scripts are from the same directory, we should use the '.file_name'--ie, dot prefix to specify we are importing from the same directory as this script:
-from .clean_city_names import clean_city_names_for_sf, sf_neighborhoods, clean_given_city_names_data, sj_neighborhoods, oakland_neighborhoods, alameda_neighborhoods, hayward_neighborhoods, richmond_neighborhoods, santa_clara_neighborhoods  # import from same directory (ie,. dot prefix) functions to clean SF city names data and import lists of all neighborhoods for given cities--e.g., SF neighborhoods (including various abbreviations used on craigslist)
-from .clean_santa_cruz_data import clean_mislabelled_santa_cruz_data, san_cruz_cities  # import from same directory (ie,. dot prefix) a function to remove rows that are misclassified as 'scz', and import list of Santa Cruz county cities
+from .city_name_resolver import clean_city_names_for_subregion  # import from same directory (ie,. dot prefix) the function to resolve the neighborhood names of a given subregion to their city names, via a single pass of the cities col
+from .webdriver_setup import shared_webdriver_pool  # import the pool of reusable (headless) Chrome webdrivers shared by every part of the webcrawler
+from .concurrent_webcrawler import Concurrent_Listing_Scraper  # import the concurrent fetch engine for the inner listing pages
+from .rate_limiter import shared_rate_limiter  # import the rate limiter shared by every fetch path of the webcrawler (ie, a token bucket per host, with adaptive backoff)
+from .crawler_telemetry import Crawler_Telemetry, timed_stage  # import the per-run telemetry of the webcrawler (ie, the duration of each stage, and counters such as the number of bytes downloaded)
+from .retry_policy import shared_retry_policy, Listing_Fetch_Failure, listing_page_has_expired  # import the retry policy shared by every fetch path of the webcrawler (ie, classify each failed fetch, and retry the transient failures with exponential backoff)
+from .fetch_backends import initialize_fetch_backend, extract_listing_fields_from_html, page_needs_javascript  # import the pluggable fetch backends (ie, selenium or HTTP + lxml) for the inner listing pages, and the function to resolve every field's xpath from a page's HTML via lxml
+from .price_band_sharding import Price_Band_Sharder  # import the price-band sharder, which splits the search query into price bands that stay under craigslist's cap on the number of search results
+from .search_page_planner import Search_Page_Planner  # import the pagination planner, which downloads the search result pages directly via their offsets (ie, instead of clicking the next page button)
+from .listing_page_fields import Field_Extraction_Timer, Listing_Record, listing_records_to_dict_of_lists, nan_listing_record  # import class to record the time spent extracting each field from the listing pages, and the compact per-listing record of the scraped fields
 
 # import data cleaning script  from the data_cleaning sub-directory
-from data_cleaning.scraper_and_data_cleaning_functions import clean_scraped_sqft_data, clean_scraped_bedroom_data, clean_scraped_bathroom_data, clean_scraped_cities_data, clean_scraped_date_posted_data, parse_kitchen_data, clean_listing_ids, parse_attrs, clean_bedroom_studio_apt_data, clean_listing_ids_and_remove_nan_substr, print_scraped_sanity_checks # various data cleaning and HTML-parser functions via selenium methods:
+from data_cleaning.scraper_and_data_cleaning_functions import clean_scraped_lists, parse_attrs, clean_bedroom_studio_apt_data, clean_listing_ids_and_remove_nan_substr, print_scraped_sanity_checks # various data cleaning and HTML-parser functions via selenium methods:
 
 
 #define the Craigslist web scraper and web crawler, which we will use to scrape Craigslist SF Bay area rental listings data:
@@ -64,25 +69,47 @@ class Craigslist_Rentals(object):
         # sanity check and print the starting craigslist URL for the web crawler (ie, the self.url derived from this __init__() method):
         print(f"The craigslist URL we will use to perform the web crawler is:\n{self.url}")
 
-        # specify various options to reduce the likelihood that selenium's webdriver HTML-parsing functions might miss HTML elements we want the script to scrape and parse
-        options = Options()  # initialize Options() object, so we can customize and specify options for the web driver
-        options.add_argument("--disable-extensions")  # disable any browser extensions
-        options.add_argument("start-maximized")   # maximize webdriver's browser windows
-        options.add_argument("disable-infobars") # disable browser infobars
-
-        self.web_driver  = webdriver.Chrome(
-            # ChromeDriverManager().install(),  # install or update latest Chrome webdriver using using ChromeDriverManager() library
-            options=options  # implement the various options specified above
-            )
+        # borrow a Chrome webdriver from the shared webdriver pool--NB: see webdriver_setup.py for the various options we specify to reduce the likelihood that selenium's webdriver HTML-parsing functions might miss HTML elements we want the script to scrape and parse
+        # NB: the webdriver is only borrowed once it is first used (see the web_driver property), so the offline reparse mode (see reparse_html_archive.py) never launches a browser
+        self.webdriver_pool = shared_webdriver_pool
+        self.borrowed_web_driver = None
 
         self.download_delay = 30   # set maximum download delay of 30 seconds, so the web scraper can wait for the webpage to load and respond to our program's GET request(s) before scraping and downloading data
 
+        self.field_extraction_timer = Field_Extraction_Timer()  # record the time spent extracting each field from the listing pages
+
+        self.rate_limiter = shared_rate_limiter  # every GET request sent by the webcrawler waits for its host's rate limiter--see rate_limiter.py
+
+        self.retry_policy = shared_retry_policy  # classify each failed fetch of a listing page, and retry the transient failures--see retry_policy.py
+
+        self.html_archive = None  # optional Listing_HTML_Archive, to which the HTML of each fetched listing page is saved (see html_archive.py)
+
+        self.telemetry = Crawler_Telemetry()  # record the duration of each stage of the webcrawler, and counters such as the number of bytes downloaded--see crawler_telemetry.py
+
+        self.async_crawler = None  # the async webcrawler, which downloads the search result pages and listing pages as coroutines (see async_webcrawler.py)--NB: only initialized if it is actually used
+
 
+    @property
+    def web_driver(self):
+        """Return the webcrawler's webdriver, and borrow one from the webdriver pool the first time it is used."""
+        if self.borrowed_web_driver is None:
+            self.borrowed_web_driver = self.webdriver_pool.borrow()
+        return self.borrowed_web_driver
+
+    @web_driver.setter
+    def web_driver(self, web_driver):
+        self.borrowed_web_driver = web_driver
+
+
+    @timed_stage('load_craigslist_form_URL')
     def load_craigslist_form_URL(self):
         """ Load the craigslist form URL, as specified in the __init__().
         Use WebDriverWait() function to ensure the web crawler will wait until the Craigslist form object with ID of "searchform" has loaded, and then download and parse the desired data.
         This function will wait up to a maximum number of seconds as designated by download_delay, otherwise a TimeOutException will trigger."""
+        self.rate_limiter.acquire(self.url)  # wait until craigslist's rate limiter allows another GET request
+        start_time = time.perf_counter()
         self.web_driver.get(self.url) # implement a GET request by loading up the customized Craigslist SF Bay Area rental listing pages via a Chrome webdriver
+        self.rate_limiter.record_response(self.url, response_seconds=time.perf_counter() - start_time)
 
         # wait until the webpage's "searchform" form tag has been loaded, or up to a maximum 20 seconds (ie, given the value of self.download_delay)
         try: # wait until the form tag with ID of "searchform"--ie, the Craigslist page given our search results--has been loaded, or up to a maximum of 30 seconds (given download_delay)
@@ -95,49 +122,130 @@ class Craigslist_Rentals(object):
             print(f"\nLoading the webpage's searchform element timed out: ie, it took longer than the maximum number of {self.download_delay} seconds designated by the download_delay argument.\n")
 
 
-    def parse_html_via_xpath(self, xpath_arg: str, list_to_append: list) -> list:
+    def parse_html_via_xpath(self, xpath_arg: str, list_to_append: list, web_driver=None) -> list:
         """ Scrape data from HTML element by looking up xpath (via selenium's find_element("xpath") method), within a try except control flow clause to account for rental listings that are missing a given HTML element.
         a.) Except if a NoSuchElementException, TimeoutException, or if a WebDriverException occurs --indicating a given element does not exist or the WebDriver connection has been lost--add an 'nan' value indicating missing data.
-        b.) If no exceptions are encountered, scrape (return) the HTML element and extract the element's text data."""
+        b.) If no exceptions are encountered, scrape (return) the HTML element and extract the element's text data.
+        NB: web_driver defaults to the class's own webdriver, but the concurrent webcrawler passes in the webdriver of each given worker."""
+        web_driver = web_driver if web_driver is not None else self.web_driver
+        start_time = time.perf_counter()  # record the time spent extracting the given field
         try:
             # a.) wait until given HTML element has loaded
-            wait_until = WebDriverWait(self.web_driver, self.download_delay)  # wait up to x seconds to let HTML element load on given rental listing webpage
+            wait_until = WebDriverWait(web_driver, self.download_delay)  # wait up to x seconds to let HTML element load on given rental listing webpage
             wait_until.until(EC.presence_of_element_located((By.XPATH, xpath_arg))) # a.) wait until given HTML element has loaded, or up to 50 seconds
             # b.) scrape the HTML element, extract text, and append to given list
-            scraped_html = self.web_driver.find_element("xpath", xpath_arg)
+            scraped_html = web_driver.find_element("xpath", xpath_arg)
 
-        except (TimeoutException, NoSuchElementException, WebDriverException) as e:
+        except (TimeoutException, NoSuchElementException, WebDriverException):
             """If the given rental listing page does not contain given element, append 'nan' value to indicate missing value."""
-            return list_to_append.append('nan')  # indicate missing value
+            list_to_append.append('nan')  # indicate missing value
+            self.field_extraction_timer.record(xpath_arg, time.perf_counter() - start_time)
+            return list_to_append  # NB: return the list on both paths, since list.append() returns None
         
         # parse scraped data's text if no exception is encountered:
-        return list_to_append.append(scraped_html.text)  # parse text data from scraped html element, and append to list for given variable of interest
+        list_to_append.append(scraped_html.text)  # parse text data from scraped html element, and append to list for given variable of interest
+        self.field_extraction_timer.record(xpath_arg, time.perf_counter() - start_time)
+        return list_to_append
 
-    def parse_html_via_xpath_get_datetime_attr(self, xpath_arg: str, list_to_append: list) -> list:
+    def parse_html_via_xpath_get_datetime_attr(self, xpath_arg: str, list_to_append: list, web_driver=None) -> list:
         """ Scrape data from HTML element by looking up xpath (via selenium's find_element("xpath") method), within a try except control flow clause to account for rental listings that are missing a given HTML element.
         a.) Except if a NoSuchElementException, TimeoutException, or if a WebDriverException occurs --indicating a given element does not exist or the WebDriver connection has been lost--add an 'nan' value indicating missing data.
-        b.) If no exceptions are encountered, scrape (return) the HTML element and extract the element's datetime attribute, which comprises a listing's date posted data."""
+        b.) If no exceptions are encountered, scrape (return) the HTML element and extract the element's datetime attribute, which comprises a listing's date posted data.
+        NB: web_driver defaults to the class's own webdriver, but the concurrent webcrawler passes in the webdriver of each given worker."""
+        web_driver = web_driver if web_driver is not None else self.web_driver
+        start_time = time.perf_counter()  # record the time spent extracting the given field
         try:
             # a.) wait until given HTML element has loaded
-            wait_until = WebDriverWait(self.web_driver, self.download_delay)  # wait up to 50 seconds to let HTML element load on given rental listing webpage
+            wait_until = WebDriverWait(web_driver, self.download_delay)  # wait up to 50 seconds to let HTML element load on given rental listing webpage
             wait_until.until(EC.presence_of_element_located((By.XPATH, xpath_arg))) # a.) wait until given HTML element has loaded, or up to 50 seconds
             # b.) scrape the HTML element, extract text, and append to given list
-            scraped_html = self.web_driver.find_element("xpath", xpath_arg)
+            scraped_html = web_driver.find_element("xpath", xpath_arg)
 
-        except (TimeoutException, NoSuchElementException, WebDriverException) as e:
+        except (TimeoutException, NoSuchElementException, WebDriverException):
             """If the given rental listing page does not contain given element, append 'nan' value to indicate missing value."""
-            return list_to_append.append('nan')  # indicate missing value
+            list_to_append.append('nan')  # indicate missing value
+            self.field_extraction_timer.record(xpath_arg, time.perf_counter() - start_time)
+            return list_to_append  # NB: return the list on both paths, since list.append() returns None
         
         # parse scraped data's datetime attribute if no exception is encountered:
-        return list_to_append.append(scraped_html.get_attribute('datetime'))  # parse datetime attribute data from scraped html element, and append to list for given variable of interest
+        list_to_append.append(scraped_html.get_attribute('datetime'))  # parse datetime attribute data from scraped html element, and append to list for given variable of interest
+        self.field_extraction_timer.record(xpath_arg, time.perf_counter() - start_time)
+        return list_to_append
 
 
-    def obtain_listing_urls(self, xpaths_listing_urls,  xpaths_next_page_button)-> list:
+    def wait_until_page_is_ready(self, web_driver=None) -> bool:
+        """Wait--once per page--until the webpage's document has finished loading (ie, document.readyState is 'complete'), or up to a maximum number of seconds given by download_delay.
+        Return False if the page timed out before it finished loading, in which case we still parse whatever HTML has loaded so far."""
+        web_driver = web_driver if web_driver is not None else self.web_driver
+        try:
+            WebDriverWait(web_driver, self.download_delay).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            )
+            return True
+        except TimeoutException:
+            print(f"\nLoading the listing page timed out: ie, it took longer than the maximum number of {self.download_delay} seconds designated by the download_delay argument.\n")
+            return False
+
+    def wait_until_page_has_changed(self, old_anchor, old_url: str, web_driver=None) -> bool:
+        """Wait--after clicking the next page button--until the webdriver has navigated away from the old search result page, ie, until the old page's 1st listing URL anchor is stale or the webdriver's URL has changed, or up to a maximum number of seconds given by download_delay.
+        NB: the next page button navigates via JavaScript, so the old page's document.readyState is still 'complete' right after the click--ie, wait_until_page_is_ready() alone would return before the next page has even started loading, and the old page's listing URLs would be scraped again.
+        Return False if the page did not change before timing out."""
+        web_driver = web_driver if web_driver is not None else self.web_driver
+        old_anchor_is_stale = EC.staleness_of(old_anchor) if old_anchor is not None else (lambda driver: False)
+        try:
+            WebDriverWait(web_driver, self.download_delay).until(
+                lambda driver: old_anchor_is_stale(driver) or driver.current_url != old_url
+            )
+            return True
+        except TimeoutException:
+            print(f"\nNavigating to the next page timed out: ie, the search result page did not change within the maximum number of {self.download_delay} seconds designated by the download_delay argument.\n")
+            return False
+
+
+    def parse_listing_page_single_pass(self, web_driver=None, list_url: str = None) -> dict:
+        """ Scrape every field of a rental listing page in a single pass, instead of a WebDriverWait() and find_element() call per field:
+        a.) wait once for the page's document to be ready,
+        b.) grab the page source a single time, and
+        c.) resolve the xpath of each field (see listing_field_xpaths) locally via lxml--ie, any fields that are missing from the listing come back as 'nan' immediately, instead of waiting up to download_delay seconds per missing field.
+        Return the scraped data as a single record (ie, a dict of the field values). NB: the time spent on each step and each field is recorded by the field_extraction_timer.
+        If the webcrawler has an html_archive and the listing's URL is given, the page source is also saved to the archive, so the listing can be re-parsed offline (see reparse_html_archive.py).
+        NB: if none of the key fields could be scraped, raise a Listing_Fetch_Failure--ie, 'expired' for craigslist's expired listing page, or 'transient' if the page timed out--so the retry policy can classify the failure (see retry_policy.py)."""
+        web_driver = web_driver if web_driver is not None else self.web_driver
+        # a.) wait once for the page to be ready
+        start_time = time.perf_counter()
+        page_is_ready = self.wait_until_page_is_ready(web_driver)
+        self.field_extraction_timer.record('wait_until_page_is_ready', time.perf_counter() - start_time)
+
+        # b.) grab the page source once
+        start_time = time.perf_counter()
+        page_source = web_driver.page_source
+        self.field_extraction_timer.record('page_source', time.perf_counter() - start_time)
+        self.telemetry.record_download(len(page_source.encode('utf-8')))
+
+        # c.) resolve every field's xpath locally
+        record = extract_listing_fields_from_html(page_source, self.field_extraction_timer)
+
+        # classify pages without any listing data--NB: expired listings are not archived
+        if page_needs_javascript(record):
+            if listing_page_has_expired(page_source):
+                raise Listing_Fetch_Failure('expired', f"Rental listing posting {list_url} has expired or has been deleted.")
+            if not page_is_ready:
+                raise Listing_Fetch_Failure('transient', f"Rental listing posting {list_url} timed out before any listing data loaded.")
+
+        if self.html_archive is not None and list_url is not None:
+            self.html_archive.archive_page(list_url, page_source)
+        return record
+
+
+    @timed_stage('obtain_listing_urls')
+    def obtain_listing_urls(self, xpaths_listing_urls,  xpaths_next_page_button, known_listing_ids_filter=None, search_page_harvest=None)-> list:
         """Crawl over each page of rental listings, given starting URL from Craigslist_Rentals class. Obtain the URLs from each page's Craigslist rental listings. Then, parse the data of each 'inner' rental listing by accessing each of these URLs, and use xpath or class name selenium methods to scrape and parse various HTML elements (ie, the listing data that we want to scrape). 
         Takes in 2 arguments: 
         a) xpaths_listing_urls: xpaths for inner listing page URLs (hrefs) 
         &
         b) xpaths_next_page_button: xpaths for the next page button widget (ie, we need to click these to nagivate to subsequent pages of listings) .
+        NB: If a Known_Listing_IDs_Filter is given (see known_listing_ids.py), stop paginating early once a page of listings is made up entirely of listing IDs that have already been scraped.
+        If a Search_Page_Harvest is given (see search_page_harvest.py), also parse the fields shown on each page's search result cards--ie, price, bedrooms, sqft, neighborhood & date posted.
         Finally: Return the listing urls as a list."""
         
         #initialize empty lists that will contain the data we will scrape:
@@ -151,8 +259,19 @@ class Craigslist_Rentals(object):
             
 
             # iterate over each rental listing's URL, extract hrefs, and append to list  
-            for url in urls:   
-                listing_urls.append(url.get_attribute('href'))  # extract the href (URL) data for each rental listing on given listings page
+            page_listing_urls = [url.get_attribute('href') for url in urls]  # extract the href (URL) data for each rental listing on given listings page
+            listing_urls.extend(page_listing_urls)
+
+            # harvest the fields shown on the page's search result cards
+            if search_page_harvest is not None:
+                search_page_harvest.harvest_page(self.web_driver.page_source, self.web_driver.current_url)
+
+            # stop paginating early if every listing on the given page has already been scraped--ie, since the listings are sorted by date posted, the remaining pages will only contain older listings
+            if known_listing_ids_filter is not None and known_listing_ids_filter.page_is_entirely_known(page_listing_urls):
+                print("\nEvery listing on this page has already been scraped, so the webcrawler will stop paginating.\n")
+                listing_urls = list(OrderedDict.fromkeys(listing_urls))  # remove any duplicate listing urls
+                print(f'The total number of scraped rental listing urls are:{len(listing_urls)}\n')
+                return listing_urls
 
             ## Navigate to each next page of listings, collecting all rental listings' urls from each given page:
             
@@ -182,7 +301,16 @@ class Craigslist_Rentals(object):
                     
                     # keep clicking until the last page is reached, based on the next_page_element equaling 1 (ie, until it equals 0)
                     if (next_page_element != 0):  # verify the next page element still exists on given page, so next page can still be navigated to...
+                        # wait until craigslist's rate limiter allows another GET request--ie, instead of a fixed delay, in order to mimic more human-like browser activity
+                        current_url = self.web_driver.current_url
+                        old_anchor = urls[0] if urls else None  # NB: the 1st listing URL anchor of the old page, which goes stale once the next page has replaced it
+                        self.rate_limiter.acquire(current_url)
+                        start_time = time.perf_counter()
                         next_page_element.click() # click next page element
+                        # wait until the next page has replaced the old page, and then let the page's various HTML contents load, before we start extracting the various data on the next page
+                        self.wait_until_page_has_changed(old_anchor, current_url)
+                        self.wait_until_page_is_ready()
+                        self.rate_limiter.record_response(current_url, response_seconds=time.perf_counter() - start_time)
 
 
                     # click to proceed to the next page--the execute_script() is a selenium method that enables us to invoke a JavaScript method and tell the webdriver to click the 'next' page button
@@ -193,10 +321,6 @@ class Craigslist_Rentals(object):
 
                     
                     print("\nNavigating to the next page of rental listings\n")
-
-                    # wait n seconds before accessing the next page, but randomize the amount of time delay, in order to mimic more human-like browser activity
-                    rand_sl_time = random.randrange(1, 3) # specify a range of pseudo-random values from 1 to 3 seconds
-                    time.sleep(rand_sl_time) # wait minimum of 1 second to let the page's various HTML contents to load, before we start extracting the various data on each subsequent page.
                     print(f"\nURL of new page:\n{self.web_driver.current_url}\n\n")
 
                 ## account for newer next page button UI (ie, differing xpath) by checking for final page, in which next page button element no longer exists (and is greyed out)
@@ -247,171 +371,219 @@ class Craigslist_Rentals(object):
                 # return list of rental listing urls
                 return listing_urls
 
-                
-
-    def scrape_listing_data(self, listing_urls:list)->dict:
-        """Itereate over each inner listing page and scrape data on various attributes such as city names and rental prices. 
-        Return the various lists as a dictionary of lists."""
-        #initialize empty lists that will contain the data we will scrape:
-        cities = []    # city names
-        prices = []    # rental prices
-        ids = []     # listing IDs
-        listing_descrip=[]   #  poster's text description of rental listing
-        bedrooms = []    # number of bedrooms
-        sqft = []    # size of rental in square feet
-        bathrooms = []   # number of bathrooms
-        kitchen = []   # whether listing contains kitchen
-        attr_vars =[]    # str comprising various rental attributes--electric vehicle charger, etc.
-        date_posted = []   # date on which listing was originally posted
-
-        ## specify amount of time delay in between GET requests--wait a minimum of 2 seconds, but randomize the amount of time delay, in order to mimic a more human-like browser activity
-        rand_sl_time = random.randrange(2, 5) # specify a range of pseudo-random values
-
-
-        ##  Iterate over each of the rental listing href URLs
-        for list_url in listing_urls:
-            """Ie: keep iterating over each url element of rental listings until a duplicate id is iterated on, in which case we should terminate the for loop. """
-            try:
-                # access the individual rental listings via the href URLs we have parsed:
-                self.web_driver.get(list_url)
-
-                ## Attempt to click and scrape data re: date when the listing was posted (ie, date_posted)  
-                try:
-                    # scrape the date posted data
-                    self.parse_html_via_xpath_get_datetime_attr('//time[@class="date timeago"]', date_posted)
-
-
-                ## Account for situations in which specific attributes are missing, or when listings have been deleted or expired while the script has been running: append 'nan' vals to each missing attribute  
-                ## Also, enable user to exit webcrawler program before a given listing's date_posted data has been clicked:
-                except (NoSuchElementException) as e: # remove ElementClickInterceptedException since we are no longer clicking to obtain the date_posted data
-
-                    """If an ElementClickInterceptedException or NoSuchElementException is encountered--e.g., if a rental listing posting has expired or if the user exits the webdriver before date_posted can be clicked, then append 'nan' values for each list (aside from the listing_urls since this has already been populated) for that given listing, and move onto the remaining listing URLs remaining within the for loop. NB: An ElementClickInterceptedException exception occurs when the webdriver attempts to click an element that has the incorrect xpath. """
-                    print(f"\n\nRental listing posting {list_url} has expired or webpage is not accessible since the webcrawler has encountered one of the following exceptions: a TimeoutException, NoSuchElementException, WebDriverException, or ElementClickInterceptedException. \n\n")
-                    # input nan values for each scraped data list if given listing has been deleted or another issue has caused a TimeoutException error
-                    nan_val = 'nan'  # specify nan value, which we will use to append to each of the lists as we attempt to scrape the data:
-                    ids.append(nan_val)  ## listing ids
-                    prices.append(nan_val)  ##  rental price data
-                    cities.append(nan_val)  ##  city names
-                    bedrooms.append(nan_val) ## number of bedrooms data
-                    bathrooms.append(nan_val) ##  number of bathrooms data
-                    sqft.append(nan_val) ##  sqft data
-                    listing_descrip.append(nan_val) ##  listing descriptions
-                    attr_vars.append(nan_val) # attribute data
-                    date_posted.append(nan_val) #date_posted
-                    ## continue iterating (outer for loop) to next rental page from  listing_urls list:
-                    continue
-
-
-            # terminate for loop if the user closes the webdriver browser--at any point of iteration--or if the internet connection is lost:                                    
-            except (WebDriverException, TimeoutException, KeyboardInterrupt) as e:   # ie: if webdriver connection cannot be established or has been lost, or if user interrupts script via Keyboard interrupt
-                print('\n\nNB: The WebDriver connection has been lost:\n')
-
-                print('The WebDriver browser has been closed, the internet connection has been lost, or a keyboard interrupt has occurred\nresulting in a WebDriverException, TimeoutException, or KeyboardInterrupt.')
-                print('\nAll previously scraped listings for this session will be saved and outputted to CSV.')
-                break   #  break for loop, and proceed to data transformation, cleaning and data pipelines
-
-            # scrape data (given none of the above exceptions are encountered)
-            else:
-                """Ie: Run the webcraper functions (based on xpath or class name) *if* the given rental listing URL has not been deleted--ie, if none of the 4 denoted errors are encountered. What this means in practice is that the rental listing should be still be active and not deleted. So, we can proceed with scraping the data for the various variables. The xpath or class-name parsing functions will each implement a try...except to check for a NoSuchElementException in case a given rental listing is missing data for one or more of the attributes we want to scrape. """
-                ## Scrape listing ids
-                self.parse_html_via_xpath('/html/body/section/section/section/div[2]/p[1]', ids)
-
-                ## Scrape rental price data
-                self.parse_html_via_xpath('//span[@class="price"]', prices)
 
+    @timed_stage('obtain_listing_urls_via_offsets')
+    def obtain_listing_urls_via_offsets(self, xpaths_listing_urls, xpaths_next_page_button, n_workers: int = 4, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Obtain the URLs of the rental listings from each page of listings, by downloading the search result pages directly via their offsets--ie, concurrently, and without clicking the next page button (see search_page_planner.py).
+        Takes in the same arguments as obtain_listing_urls(), plus the number of search result pages downloaded at a time (n_workers).
+        NB: if the search result pages do not contain any listing URLs without JavaScript, fall back to obtain_listing_urls()--ie, load the craigslist URL via the webdriver and click the next page button.
+        Finally: Return the listing urls as a list."""
+        search_page_planner = Search_Page_Planner(self.url, xpaths_listing_urls, self.rate_limiter, n_workers, telemetry=self.telemetry)
+        try:
+            listing_urls = search_page_planner.obtain_listing_urls(known_listing_ids_filter, search_page_harvest)
+        finally:
+            search_page_planner.close()
+
+        if listing_urls is None:
+            print("\nThe listing URLs could not be obtained via the offsets of the search result pages, so the webcrawler will click the next page button instead.\n")
+            self.load_craigslist_form_URL()
+            return self.obtain_listing_urls(xpaths_listing_urls, xpaths_next_page_button, known_listing_ids_filter, search_page_harvest)
+        return listing_urls
+
+
+    @timed_stage('obtain_listing_urls_via_price_bands')
+    def obtain_listing_urls_via_price_bands(self, xpaths_listing_urls, xpaths_next_page_button, n_parallel_bands: int = 2, n_workers_per_band: int = 2, split_by_bedrooms: bool = False, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Obtain the URLs of the rental listings by splitting the search query into price bands (and optionally bedroom bands) that each stay under craigslist's cap on the number of search results,
+        and crawling several bands at a time via their offsets (see price_band_sharding.py)--ie, so the oldest listings of large regions are not lost.
+        NB: if the search result pages do not contain any listing URLs without JavaScript, fall back to obtain_listing_urls()--ie, a single search query, via the next page button.
+        Finally: Return the merged (deduplicated) listing urls of every band as a list."""
+        price_band_sharder = Price_Band_Sharder(self.url, xpaths_listing_urls, self.min_price, self.max_price, self.rate_limiter, n_parallel_bands, n_workers_per_band, split_by_bedrooms, telemetry=self.telemetry)
+        listing_urls = price_band_sharder.obtain_listing_urls(known_listing_ids_filter, search_page_harvest)
+
+        if listing_urls is None:
+            print("\nThe listing URLs could not be obtained via the price bands of the search query, so the webcrawler will click the next page button instead.\n")
+            self.load_craigslist_form_URL()
+            return self.obtain_listing_urls(xpaths_listing_urls, xpaths_next_page_button, known_listing_ids_filter, search_page_harvest)
+        return listing_urls
 
-                ## Scrape city names
-                self.parse_html_via_xpath("/html/body/section/section/h1/span/span[4]", cities)
-            
                 
-                ##  Scrape number of bedrooms data-
-                self.parse_html_via_xpath('//span[@class="shared-line-bubble"]', bedrooms)
 
+    def get_async_crawler(self, max_in_flight: int = 100, n_pages_per_wave: int = 4):
+        """Return the webcrawler's Async_Craigslist_Crawler, and initialize one the first time it is used--ie, the search-page walk and the detail fetches share its aiohttp session (see async_webcrawler.py)."""
+        if self.async_crawler is None:
+            from .async_webcrawler import Async_Craigslist_Crawler  # NB: only import aiohttp if the async webcrawler is actually used
+            self.async_crawler = Async_Craigslist_Crawler(self, self.rate_limiter, max_in_flight, n_pages_per_wave)
+        return self.async_crawler
 
-                ##  Scrape number of bathrooms data
-                self.parse_html_via_xpath('//span[@class="shared-line-bubble"]', bathrooms)
-
-
-                ## Scrape sqft data:
-                self.parse_html_via_xpath('//span[@class="housing"]', sqft)
-
-
-                ## Scrape listing descriptions (so we can obtain data on attributes & amenities such as kitchen, dishwasher, and refrigerator (ie, several amenities) data):
-                self.parse_html_via_xpath('//*[@id="postingbody"]', listing_descrip)
-
-                ## Scrape attribute data:
-                self.parse_html_via_xpath('//p[@class="attrgroup"][last()]', attr_vars)  # the attributes are always the *last* p tag with a class name of "attrgroup" (the number of such p tags differs, ranging from 2-3 typically) 
 
+    @timed_stage('obtain_listing_urls_via_async_crawler')
+    def obtain_listing_urls_via_async_crawler(self, xpaths_listing_urls, xpaths_next_page_button, max_in_flight: int = 100, n_pages_per_wave: int = 4, known_listing_ids_filter=None, search_page_harvest=None) -> list:
+        """Async alternative to obtain_listing_urls_via_offsets(): download the search result pages via their offsets as coroutines, over the async webcrawler's shared aiohttp session (see async_webcrawler.py).
+        NB: if the search result pages do not contain any listing URLs without JavaScript, fall back to obtain_listing_urls()--ie, load the craigslist URL via the webdriver and click the next page button.
+        Finally: Return the listing urls as a list."""
+        listing_urls = self.get_async_crawler(max_in_flight, n_pages_per_wave).obtain_listing_urls(xpaths_listing_urls, known_listing_ids_filter, search_page_harvest)
 
-            ## Aside from a WebDriverException or TimeoutException error, move on with for loop until all urls have been iterated over
-            finally: 
+        if listing_urls is None:
+            print("\nThe listing URLs could not be obtained via the async webcrawler, so the webcrawler will click the next page button instead.\n")
+            self.load_craigslist_form_URL()
+            return self.obtain_listing_urls(xpaths_listing_urls, xpaths_next_page_button, known_listing_ids_filter, search_page_harvest)
+        return listing_urls
 
-                ## keep iterating through each URL until the listing_urls list has been crawled over fully (ie, based on the number of listing ids)
-                if len(ids) < len(listing_urls):  # If additional listings in the list have not been crawled on, then move on to the next rental listing in the listing_urls--ie, via pass command
 
-                    ## print some webcrawler progress diagnostics--such as the number of listings accessed--in CLI: 
-                    print(f"\nNumber of listings we have crawled over:\n{len(ids)}\n")
-                    print(f"There are {len(listing_urls)-len(ids)} more listings left.")
+    def iter_listing_records_async(self, listing_urls:list, max_in_flight:int=100, crawl_journal=None):
+        """Async alternative to iter_listing_records_concurrently(): scrape the inner listing pages as coroutines, with up to max_in_flight GET requests in flight (see async_webcrawler.py), and yield each listing as a single Listing_Record, in the same order as the listing URLs.
+        NB: the async webcrawler is closed once every listing has been yielded."""
+        async_crawler = self.get_async_crawler(max_in_flight)
+        self.async_crawler = None
+        return async_crawler.iter_listing_records(listing_urls, crawl_journal)
 
-                    ## provide delay in b/w GET requests to avoid being flagged by server as a bot: ie, before we access each subsequent listing:
-                    time.sleep(rand_sl_time)
-                    ## Access the next rental listing URL (ie, do GET request)
-                    pass 
 
-                #  Once we have iterated through each listing URL, terminate the loop
-                else:  
-                    break
-    
+    def fetch_listing_via_webdriver(self, list_url: str) -> dict:
+        """Access a single rental listing page via the webcrawler's webdriver, and scrape every field in a single pass--ie, a single attempt, which raises an exception if the listing could not be scraped (see retry_policy.py)."""
+        ## wait until craigslist's rate limiter allows another GET request, to avoid being flagged by server as a bot--NB: the rate limiter slows down if the server responds slowly
+        self.rate_limiter.acquire(list_url)
 
-        ## Create column to have data showing the date on which the webcrawler module was executed:
+        # recycle the webdriver once it has loaded max_pages_per_webdriver pages, to cap Chrome's memory leaks during long runs
+        self.web_driver = self.webdriver_pool.renew_if_exhausted(self.web_driver)
 
-        # provide date when webcrawler is run (ie, today's date when webcrawler is run), and impute these date data for *all* scraped records from the latest run of this webcrawler script  *I.e.: reference the len() of any one of the attributes that was scraped
-        date_of_webcrawler = [time.strftime("%Y-%m-%d")] * len(ids)  # impute today's date to all records that we scraped from the latest run of this webcrawler script
+        # access the individual rental listings via the href URLs we have parsed:
+        start_time = time.perf_counter()
+        self.web_driver.get(list_url)
+        self.rate_limiter.record_response(list_url, response_seconds=time.perf_counter() - start_time)
 
+        ## Wait once for the given listing page to load, and then scrape every field (ie, listing ids, prices, city names, bedrooms, bathrooms, sqft, listing descriptions, attributes, and date posted) from the page source in a single pass--see parse_listing_page_single_pass().
+        ## NB: If a given rental listing is missing data for one or more of the fields, then the missing fields are 'nan', without waiting up to download_delay seconds for each missing field.
+        return self.parse_listing_page_single_pass(list_url=list_url)
 
-        ## Transform each list of scraped data to a dictionary of lists:
-        dict_scraped_lists = {
-            'listing_urls':listing_urls, 'ids':ids, 'sqft':sqft, 'cities':cities, 'prices':prices,
-            'bedrooms':bedrooms, 'bathrooms':bathrooms, 'attr_vars':attr_vars, 'listing_descrip':listing_descrip,
-            'date_of_webcrawler':date_of_webcrawler,'kitchen':kitchen, 'date_posted':date_posted
-            }  # dictionary of the lists containing the scraped data
 
-        # return dictionary of the lists containing the scraped data
-        return dict_scraped_lists
+    def restart_webdriver(self):
+        """Quit the webcrawler's webdriver (eg, if its connection has been lost), so a new one is borrowed from the webdriver pool for the next listing."""
+        web_driver, self.borrowed_web_driver = self.borrowed_web_driver, None
+        self.webdriver_pool.discard(web_driver)
 
 
+    def iter_listing_records(self, listing_urls:list, crawl_journal=None):
+        """Itereate over each inner listing page, scrape data on various attributes such as city names and rental prices, and yield each listing as a single Listing_Record--ie, as soon as it has been scraped.
+        If a Crawl_Journal is given (see crawl_journal.py), record each listing to the journal as soon as it has been scraped, so the run can be resumed if the webcrawler crashes.
+        NB: since each listing is yielded as one record, the scraped data of the various fields always remain aligned, and the listings can be written to CSV in batches (see stream_listing_records_to_csv())."""
+        ##  Iterate over each of the rental listing href URLs
+        for n_scraped, list_url in enumerate(listing_urls, start=1):
+            try:
+                ## Access the listing page, and scrape every field in a single pass--see fetch_listing_via_webdriver(). NB: the retry policy retries transient failures (eg, timeouts) with exponential backoff, restarts the webdriver if its connection has been lost, and marks expired listings as 'nan' right away (see retry_policy.py)
+                with self.telemetry.stage('fetch_listing'):
+                    listing_record = self.retry_policy.fetch_with_retries(list_url, self.fetch_listing_via_webdriver, self.restart_webdriver, raise_on_give_up=True)
+
+            # skip listings that still fail after the retries--but terminate for loop if the webdriver cannot be restarted (eg, the internet connection is lost), or if the user interrupts the script:
+            except Listing_Fetch_Failure as e:
+                if e.category != 'driver_crash':
+                    listing_record = nan_listing_record()
+                else:
+                    print('\n\nNB: The WebDriver connection has been lost, and could not be restored by restarting the webdriver.\n')
+                    print('\nAll previously scraped listings for this session will be saved and outputted to CSV.')
+                    break   #  break for loop, and proceed to data transformation, cleaning and data pipelines
+            except KeyboardInterrupt:
+                print('\n\nNB: A keyboard interrupt has occurred.\nAll previously scraped listings for this session will be saved and outputted to CSV.')
+                break
+
+            # checkpoint the scraped listing to the crawl journal
+            if crawl_journal is not None:
+                crawl_journal.record_listing(list_url, listing_record)
+
+            yield Listing_Record(list_url, listing_record)
+
+            ## keep iterating through each URL until the listing_urls list has been crawled over fully
+            if n_scraped < len(listing_urls):
+                ## print some webcrawler progress diagnostics--such as the number of listings accessed--in CLI: 
+                print(f"\nNumber of listings we have crawled over:\n{n_scraped}\n")
+                print(f"There are {len(listing_urls)-n_scraped} more listings left.")
+
+        # print the time spent extracting each field from the listing pages
+        self.field_extraction_timer.print_summary()
+
+
+    @timed_stage('scrape_listing_data')
+    def scrape_listing_data(self, listing_urls:list, crawl_journal=None)->dict:
+        """Itereate over each inner listing page and scrape data on various attributes such as city names and rental prices (see iter_listing_records()). 
+        Return the scraped data as a dictionary of lists--ie, one list per field, along with the URLs of the listings that were scraped."""
+        listing_records = list(self.iter_listing_records(listing_urls, crawl_journal))
+
+        ## Transform the scraped records to a dictionary of lists--NB: the date on which the webcrawler was run is imputed to all records:
+        return listing_records_to_dict_of_lists([listing_record.listing_url for listing_record in listing_records], listing_records)
+
+
+    def stream_listing_records_to_csv(self, listing_records, scraped_data_path: str, batch_size: int = 100) -> list:
+        """Write the scraped listings (ie, any iterable of Listing_Records--such as the iter_listing_records() generator) to CSV in batches of batch_size listings:
+        each batch is cleaned & transformed via the clean_scraped_data(), dict_to_df_pipeline() and df_to_CSV_data_pipeline() methods, and appended to the CSV file.
+        NB: peak memory is thus bounded by the batch size rather than by the number of listings--which matters for the (long) listing descriptions.
+        Return the listing ids of all rows written to the CSV file."""
+        written_listing_ids = []
+        batch = []
+
+        def flush_batch(mode: str):
+            dict_scraped_lists = listing_records_to_dict_of_lists([listing_record.listing_url for listing_record in batch], batch)
+            dict_scraped_lists = self.clean_scraped_data(dict_scraped_lists)
+            df = self.dict_to_df_pipeline(dict_scraped_lists)
+            # NB: record the ids of the rows actually written--ie, after the city name resolver of the subregion has removed any misclassified rows (e.g., for SF or Santa Cruz county)
+            written_df = self.df_to_CSV_data_pipeline(df, scraped_data_path, mode)
+            written_listing_ids.extend(written_df['ids'])
+            batch.clear()
+
+        # overwrite any CSV file from an earlier run of the same day with the 1st batch, and then append each subsequent batch
+        mode = 'w'
+        for listing_record in listing_records:
+            batch.append(listing_record)
+            if len(batch) >= batch_size:
+                flush_batch(mode)
+                mode = 'a'
+
+        # write the last (partial) batch--NB: write the CSV even if no listings were scraped, as the non-streaming pipeline does
+        if batch or mode == 'w':
+            flush_batch(mode)
+
+        print(f"\n{len(written_listing_ids)} listings have been written to CSV, in batches of up to {batch_size} listings.\n")
+        return written_listing_ids
+
+
+    def iter_listing_records_concurrently(self, listing_urls:list, n_workers:int=4, fetch_backend:str='selenium', crawl_journal=None):
+        """Concurrent alternative to iter_listing_records(): scrape the inner listing pages via a pool of n_workers (see scrape_listing_data_concurrently()), and yield each listing as a single Listing_Record, in the same order as the listing URLs."""
+        listing_fetch_backend = initialize_fetch_backend(fetch_backend, self, self.rate_limiter, n_workers)
+        concurrent_scraper = Concurrent_Listing_Scraper(listing_fetch_backend, n_workers, crawl_journal)
+        return concurrent_scraper.iter_listing_records(listing_urls)
+
+
+    @timed_stage('scrape_listing_data_concurrently')
+    def scrape_listing_data_concurrently(self, listing_urls:list, n_workers:int=4, fetch_backend:str='selenium', crawl_journal=None)->dict:
+        """Concurrent alternative to scrape_listing_data(): scrape the inner listing pages via a pool of n_workers (see concurrent_webcrawler.py).
+        The fetch_backend argument specifies whether each worker uses its own webdriver ('selenium'), or downloads each page via a pooled HTTP session and parses it via lxml ('http')--see fetch_backends.py.
+        All of the workers share the webcrawler's rate limiter (see rate_limiter.py), so that the combined rate of GET requests sent to craigslist remains bounded regardless of the number of workers.
+        If a Crawl_Journal is given, each worker records its listings to the journal as soon as they have been scraped.
+        Return the same dictionary of lists as scrape_listing_data(), so the clean_scraped_data() and dict_to_df_pipeline() methods can be used as is."""
+        listing_fetch_backend = initialize_fetch_backend(fetch_backend, self, self.rate_limiter, n_workers)
+        concurrent_scraper = Concurrent_Listing_Scraper(listing_fetch_backend, n_workers, crawl_journal)
+        return concurrent_scraper.scrape_listing_data(listing_urls)
+
+
+    def release_webdriver(self):
+        """Return the webcrawler's webdriver to the shared webdriver pool once we are done crawling, so it can be reused (e.g., by the next region & subregion of a batch crawl) instead of launching a new browser."""
+        self.webdriver_pool.release(self.borrowed_web_driver)
+        self.borrowed_web_driver = None
+
+
+    @timed_stage('clean_scraped_data')
     def clean_scraped_data(self, dict_scraped_lists:dict)->dict:
         """Do some data cleaning and wrangling of specific lists (ie, attributes) within the scraped data dictionary of lists"""
 
 
         ## Clean and parse city names, ids, kitchen, sqft, bedrooms, and other attributes within the dictionary of lists:
-
-        # clean city names data (cities)--clean names to upper-case and remove parantheses markings from each element
-        dict_scraped_lists['cities'] = clean_scraped_cities_data(dict_scraped_lists, 'cities')
-
-        # listing ids-- remove 'post id: ' prefix:
-        dict_scraped_lists['ids'] = clean_listing_ids(dict_scraped_lists, 'ids')
-
-        ## Parse kitchen data from listing descriptions:
-        dict_scraped_lists['kitchen'] = parse_kitchen_data(dict_scraped_lists, 'listing_descrip')
-
-        # clean the sqft data, and ensure it's sqft data by checking if given listing element contains the substring 'ft2'
-        dict_scraped_lists['sqft'] = clean_scraped_sqft_data(dict_scraped_lists)  
-
-        # bedrooms data 
-        dict_scraped_lists['bedrooms'] =  clean_scraped_bedroom_data(dict_scraped_lists)
-
-        # bathrooms data
-        dict_scraped_lists['bathrooms'] = clean_scraped_bathroom_data(dict_scraped_lists)
-
-        # clean the date_posted data to remove and replace the "T" char
-        dict_scraped_lists['date_posted'] = clean_scraped_date_posted_data(dict_scraped_lists)
+        # NB: clean_scraped_lists() returns the same output as calling clean_scraped_cities_data(), clean_listing_ids(), parse_kitchen_data(), clean_scraped_sqft_data(), clean_scraped_bedroom_data(), clean_scraped_bathroom_data() & clean_scraped_date_posted_data() in turn--but cleans each list via a single pass (ie, of only its distinct values, for the repetitive lists such as the bedrooms data)
+        dict_scraped_lists = clean_scraped_lists(dict_scraped_lists)
 
         return dict_scraped_lists
 
 
 
 
+    @timed_stage('dict_to_df_pipeline')
     def dict_to_df_pipeline(self, dict_scraped_lists:dict) -> DataFrame:
         """Transform scraped data from dictionary of lists to a Pandas' DataFrame, and perform additional data cleaning and parsing"""
         ## Transform the dictionary of lists to Pandas' dataframe (by using dictionary comprehension):
@@ -483,10 +655,12 @@ class Craigslist_Rentals(object):
 
 
     # export CSV given directory that exists or has been created via the mk_direc_for_scraped_data() method:
-    def export_to_csv(self, df: DataFrame, scraped_data_path: str) -> csv:
+    @timed_stage('export_to_csv')
+    def export_to_csv(self, df: DataFrame, scraped_data_path: str, mode: str = 'w') -> csv:
         """Save df as CSV in the new path, sans index. Given the mk_direc_for_scraped_data() function,
         we will save the CSV file inside the region and subregion subdirectories.
-        Append today's date and region + subregion names to CSV file name."""
+        Append today's date and region + subregion names to CSV file name.
+        NB: use mode='a' to append the rows of df to the CSV file--ie, for each batch of listings written by stream_listing_records_to_csv()--in which case the header is only written if the file does not exist yet."""
         # specify preface of CSV file name
         csv_preface_name = 'craigslist_rental'
 
@@ -502,7 +676,8 @@ class Craigslist_Rentals(object):
         if self.subregion: # ie, subregion is not None
             csv_file_name = f"{csv_preface_name}{underscore_separator}{self.region}{underscore_separator}{self.subregion}{underscore_separator}{today_dt_str}{csv_suffix}" # append today's date and .csv extension to the file name
             
-            return df.to_csv(os.path.join(scraped_data_path, csv_file_name), index=False)
+            csv_path = os.path.join(scraped_data_path, csv_file_name)
+            return df.to_csv(csv_path, index=False, mode=mode, header=(mode == 'w' or not os.path.exists(csv_path)))
 
 
         #  regions with *no* subregions
@@ -510,40 +685,18 @@ class Craigslist_Rentals(object):
             # do not use subregion in the CSV file name
             csv_file_name = f"{csv_preface_name}{underscore_separator}{self.region}{underscore_separator}{today_dt_str}{csv_suffix}" # append today's date and .csv extension to the file name
         
-            return df.to_csv(os.path.join(scraped_data_path, csv_file_name), index=False)
-
-        
-        return df.to_csv(os.path.join(scraped_data_path, csv_file_name), index=False)
+            csv_path = os.path.join(scraped_data_path, csv_file_name)
+            return df.to_csv(csv_path, index=False, mode=mode, header=(mode == 'w' or not os.path.exists(csv_path)))
 
 
-    def df_to_CSV_data_pipeline(self, df: DataFrame,  scraped_data_path: str) -> csv:
-        """Clean specific subregions' city names data, create directory for given region and subregion, and export DataFrame containing scraped data to CSV within said subregion directory"""
+    def df_to_CSV_data_pipeline(self, df: DataFrame,  scraped_data_path: str, mode: str = 'w') -> DataFrame:
+        """Clean specific subregions' city names data, create directory for given region and subregion, and export DataFrame containing scraped data to CSV within said subregion directory.
+        NB: use mode='a' to append the DataFrame's rows to the CSV file (see export_to_csv()).
+        Return the DataFrame of the rows written to the CSV file--ie, without the rows removed by the city name resolver of the subregion."""
     
         ## clean data for specific subregions, and export scraped data from Dataframe to CSV file:
-        if self.subregion is 'sfc':  # clean San Francisco data
-            """If subregion is 'sfc', transform city names data from neighborhood names to 'San Francisco', and remove any data misclassified as being within this county."""
-            df = clean_city_names_for_sf(sf_neighborhoods, df) 
-            return self.export_to_csv(df, scraped_data_path)
-
-        elif self.subregion is 'scz': # clean Santa Cruz data
-            """If subregion is 'scz', remove any data misclassified as being within this county."""
-            df = clean_mislabelled_santa_cruz_data(san_cruz_cities, df) # clean 'scz' subregion data
-            return self.export_to_csv(df, scraped_data_path)
-            
-        elif self.subregion is 'sby':  # clean South Bay data
-            """If subregion is 'sby', clean city names data for cities such as San Jose & Santa Clara."""
-            df = clean_given_city_names_data('San Jose', sj_neighborhoods, df)    # clean San Jose data
-            df = clean_given_city_names_data('Santa Clara', santa_clara_neighborhoods, df)  # clean Santa Clara data
-            return self.export_to_csv(df, scraped_data_path)
-
-        elif self.subregion is 'eby':  # clean East Bay data
-            """If subregion is 'eby', clean city names data for cities such as Oakland & Hayward."""
-            df = clean_given_city_names_data('Oakland', oakland_neighborhoods, df) # clean Oakland data
-            df = clean_given_city_names_data('Hayward', hayward_neighborhoods, df)  # clean Hayward data
-            df = clean_given_city_names_data('Alameda', alameda_neighborhoods, df)  # clean Alameda data
-            df = clean_given_city_names_data('Richmond', richmond_neighborhoods, df)  # clean Richmond data
-            return self.export_to_csv(df, scraped_data_path)
-            
-        else:
-            """Ie: do not perform any additional data cleaning if subregion is not SF, Santa Cruz, South Bay, or East Bay"""
-            return self.export_to_csv(df, scraped_data_path)
+        # NB: the city name resolver of the subregion (see city_name_resolver.py) transforms the neighborhood names to their city names--e.g., for SF, San Jose, or Oakland--and removes any data misclassified as being within SF or Santa Cruz county, via a single pass of the cities col.
+        # Ie: do not perform any additional data cleaning if subregion is not SF, Santa Cruz, South Bay, or East Bay
+        df = clean_city_names_for_subregion(df, self.subregion)
+        self.export_to_csv(df, scraped_data_path, mode)
+        return df
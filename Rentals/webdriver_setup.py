@@ -0,0 +1,134 @@
+"""Chrome webdriver setup, and a pool of reusable webdrivers shared by every part of the webcrawler.
+
+Launching a Chrome webdriver takes several seconds and hundreds of MB of memory, so instead of launching a new (maximized) browser for each
+craigslist search, subregion lookup, or wikipedia page, each of these borrows a webdriver from shared_webdriver_pool and returns it once done.
+a.) the webdrivers are headless by default, and do not download images or stylesheets (which the webcrawler never parses).
+b.) each webdriver is recycled (ie, quit and replaced by a new one) after max_pages_per_webdriver pages, to cap Chrome's memory leaks during long runs."""
+import atexit
+import threading
+
+#web crawling, web scraping & webdriver libraries and modules
+from selenium import webdriver  # NB: this is the main module we will use to implement the webcrawler and webscraping. A webdriver is an automated browser.
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options  # Options enables us to tell Selenium to open WebDriver browsers using maximized mode, and we can also disable any extensions or infobars
+
+from data_cleaning.configurable_settings import Configurable_Settings
+
+
+def chrome_webdriver_options(headless: bool = True, block_images_and_css: bool = True):
+    """Specify the various Chrome options we use for every webdriver launched by the webcrawler, so as to reduce the likelihood that selenium's webdriver HTML-parsing functions might miss HTML elements we want the script to scrape and parse."""
+    options = Options()  # initialize Options() object, so we can customize and specify options for the web driver
+    options.add_argument("--disable-extensions")  # disable any browser extensions
+    options.add_argument("start-maximized")   # maximize webdriver's browser windows
+    options.add_argument("disable-infobars") # disable browser infobars
+    if headless:
+        options.add_argument("--headless=new")  # do not open a browser window
+        options.add_argument("--window-size=1920,1080")  # NB: headless browsers cannot be maximized, so use the same window size as a maximized browser--ie, so the search pages' layout (and the next page button) remain the same
+    if block_images_and_css:
+        # do not download any images or stylesheets, since the webcrawler only parses the pages' HTML
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            })
+    return options
+
+
+def initialize_chrome_webdriver(headless: bool = True, block_images_and_css: bool = True):
+    """Launch a new Chrome webdriver, given the options specified via chrome_webdriver_options()."""
+    return webdriver.Chrome(
+        # ChromeDriverManager().install(),  # install or update latest Chrome webdriver using using ChromeDriverManager() library
+        options=chrome_webdriver_options(headless, block_images_and_css)  # implement the various options specified above
+        )
+
+
+class Pooled_WebDriver(object):
+    """Chrome webdriver borrowed from a WebDriver_Pool, which keeps track of the number of pages it has loaded.
+    NB: every other attribute or method (e.g., find_element(), page_source) is delegated to the underlying webdriver, so a pooled webdriver can be used in the same way as webdriver.Chrome()."""
+
+    def __init__(self, web_driver):
+        self.web_driver = web_driver
+        self.n_pages = 0  # number of pages loaded via get()
+
+    def get(self, url: str):
+        self.n_pages += 1
+        return self.web_driver.get(url)
+
+    def __getattr__(self, name):
+        return getattr(self.web_driver, name)
+
+
+class WebDriver_Pool(Configurable_Settings):
+    """Thread-safe pool of reusable Chrome webdrivers: borrow() a webdriver, and release() it once done, so the next caller reuses it instead of launching a new browser."""
+
+    settings_owner_name = 'webdriver pool'
+
+    def __init__(self, headless: bool = True, block_images_and_css: bool = True, max_pages_per_webdriver: int = 200, max_idle_webdrivers: int = 4):
+        self.headless = headless
+        self.block_images_and_css = block_images_and_css
+        self.max_pages_per_webdriver = max_pages_per_webdriver  # recycle each webdriver after loading this many pages
+        self.max_idle_webdrivers = max_idle_webdrivers  # quit any released webdrivers beyond this number, rather than keeping them idle in the pool
+        self.lock = threading.Lock()
+        self.idle_web_drivers = []
+        self.n_launched = 0  # number of webdrivers launched so far (for diagnostics)
+        self.n_recycled = 0  # number of webdrivers recycled after max_pages_per_webdriver pages
+
+    def configure(self, **kwargs):
+        """Update the settings of the pool--e.g., from the command-line arguments of main.py. NB: if any settings have changed, the idle webdrivers are quit, so the next webdrivers are launched with the new settings--ie, outside of the lock, since close() acquires it."""
+        if self.update_settings(kwargs):
+            self.close()
+
+    def launch_webdriver(self) -> Pooled_WebDriver:
+        """Launch a new Chrome webdriver, given the pool's settings."""
+        web_driver = Pooled_WebDriver(initialize_chrome_webdriver(self.headless, self.block_images_and_css))
+        with self.lock:
+            self.n_launched += 1
+        return web_driver
+
+    def borrow(self) -> Pooled_WebDriver:
+        """Return an idle webdriver from the pool, or launch a new one if none are idle."""
+        with self.lock:
+            if self.idle_web_drivers:
+                return self.idle_web_drivers.pop()
+        return self.launch_webdriver()
+
+    def release(self, web_driver: Pooled_WebDriver):
+        """Return a borrowed webdriver to the pool--NB: quit it instead if it has reached max_pages_per_webdriver pages, or if the pool already has max_idle_webdrivers idle webdrivers."""
+        if web_driver is None:
+            return
+        with self.lock:
+            if web_driver.n_pages < self.max_pages_per_webdriver and len(self.idle_web_drivers) < self.max_idle_webdrivers:
+                self.idle_web_drivers.append(web_driver)
+                return
+        self.discard(web_driver)
+
+    def discard(self, web_driver: Pooled_WebDriver):
+        """Quit a borrowed webdriver without returning it to the pool--e.g., if its connection has been lost."""
+        if web_driver is None:
+            return
+        try:
+            web_driver.quit()
+        except WebDriverException:
+            pass
+
+    def renew_if_exhausted(self, web_driver: Pooled_WebDriver) -> Pooled_WebDriver:
+        """Return the given webdriver, or--once it has loaded max_pages_per_webdriver pages--quit it and return a newly launched webdriver instead.
+        NB: only call this in between pages that do not depend on the browser's state (e.g., in between the inner listing pages, but not while clicking through the search result pages)."""
+        if web_driver is not None and web_driver.n_pages < self.max_pages_per_webdriver:
+            return web_driver
+        if web_driver is not None:
+            self.discard(web_driver)
+            with self.lock:
+                self.n_recycled += 1
+        return self.launch_webdriver()
+
+    def close(self):
+        """Quit every idle webdriver of the pool."""
+        with self.lock:
+            idle_web_drivers, self.idle_web_drivers = self.idle_web_drivers, []
+        for web_driver in idle_web_drivers:
+            self.discard(web_driver)
+
+
+# specify a webdriver pool shared by every part of the webcrawler within a given process--NB: quit any idle webdrivers when the process exits
+shared_webdriver_pool = WebDriver_Pool()
+atexit.register(shared_webdriver_pool.close)
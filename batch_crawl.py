@@ -0,0 +1,170 @@
+"""Non-interactive batch mode for the webcrawler: crawl several regions & subregions in a single run.
+
+Instead of prompting the user for a single region & subregion (as main.py does), read a json job file listing the regions
+(ie, the keys of clist_region_and_urls) and their subregions to crawl--e.g.:
+
+    {
+        "jobs": [
+            {"region": "SF Bay Area, CA", "subregions": ["eby", "nby", "pen", "sby", "scz", "sfc"]},
+            {"region": "Chicago, IL", "subregions": "all"},
+            {"region": "Reno, NV"}
+        ]
+    }
+
+NB: use "all" to crawl every subregion of a region, and omit "subregions" for regions that do not have any subregions.
+
+Each region & subregion job is run via run_webcrawler_pipeline() within a pool of worker processes. Since the subregions of a given
+region are all hosted by the same craigslist site (e.g., sfbay.craigslist.org), at most --max-jobs-per-host jobs crawl a given host at the same time.
+Once every job has finished, a single consolidated run report--including the throughput of each subregion--is saved as json.
+
+Example usage:
+    python batch_crawl.py --job-file jobs.json --processes 4 --max-jobs-per-host 2 --fetch-backend http"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import zip_longest
+from urllib.parse import urlsplit
+
+from main import clist_region_and_urls, region_names_with_subregions, sfbay_subregion_vals, webcrawler_arg_parser, run_webcrawler_pipeline
+from determine_subregions_for_given_clist_region.determine_subregions_for_given_clist_region import parse_region_code_for_craigslist_URL_main_webcrawler, parse_subregions_via_xpath
+
+
+def parse_batch_command_line_args():
+    """Parse the command-line arguments for the batch crawl--NB: all of the optional webcrawler arguments of main.py (e.g., --workers, --fetch-backend) are applied to every job."""
+    parser = argparse.ArgumentParser(description="Batch crawl of several craigslist regions & subregions", parents=[webcrawler_arg_parser(add_help=False)])
+    parser.add_argument('--job-file', required=True, help="path to the json job file listing the regions & subregions to crawl")
+    parser.add_argument('--processes', type=int, default=2, help="number of worker processes, ie, number of jobs run at the same time (default: 2)")
+    parser.add_argument('--max-jobs-per-host', type=int, default=1, help="maximum number of jobs crawling the same craigslist host at the same time (default: 1)")
+    parser.add_argument('--report-dir', default=os.path.join('scraped_data', 'batch_run_reports'), help="directory in which to save the run report (default: scraped_data/batch_run_reports)")
+    return parser.parse_args()
+
+
+def load_batch_jobs(job_file_path: str) -> list:
+    """Load the json job file, and return one job (ie, a dict of the region name, region code, subregion & host) per region & subregion to crawl."""
+    with open(job_file_path, 'r') as fh:
+        job_file = json.load(fh)
+
+    jobs = []
+    for region_job in job_file['jobs']:
+        region_name = region_job['region']
+        if region_name not in clist_region_and_urls:
+            raise ValueError(f"The region '{region_name}' of the job file is not one of the regions of clist_region_and_urls.")
+
+        region_URL = clist_region_and_urls[region_name]
+        region = parse_region_code_for_craigslist_URL_main_webcrawler(region_URL)  # parse the region code from the region's URL
+        subregions = region_job.get('subregions')
+
+        # parse every subregion of the given region
+        if subregions == 'all':
+            if region_name == 'SF Bay Area, CA':
+                subregions = sfbay_subregion_vals
+            elif region_name in region_names_with_subregions:
+                subregions = parse_subregions_via_xpath(region_URL, '//ul[@class="sublinks"]/li/a')
+            else:
+                subregions = None
+
+        # regions that do not have any subregions
+        if not subregions:
+            subregions = [None]
+
+        for subregion in subregions:
+            jobs.append({
+                'region_name': region_name,
+                'region': region,
+                'subregion': subregion,
+                'host': urlsplit(region_URL).netloc or region_URL,  # NB: account for region URLs without a scheme
+                })
+    return jobs
+
+
+def interleave_jobs_by_host(jobs: list) -> list:
+    """Reorder the jobs so consecutive jobs alternate between hosts--ie, so the worker processes do not all wait on the semaphore of the same host while jobs for other hosts are queued."""
+    jobs_by_host = {}
+    for job in jobs:
+        jobs_by_host.setdefault(job['host'], []).append(job)
+    return [job for jobs_round in zip_longest(*jobs_by_host.values()) for job in jobs_round if job is not None]
+
+
+def run_batch_job(job: dict, args, host_semaphore) -> dict:
+    """Run the webcrawler & data pipeline for a single region & subregion job, once the job's host has a free slot. Return the job's results for the run report."""
+    with host_semaphore:  # wait until fewer than --max-jobs-per-host jobs are crawling the job's host
+        print(f"\nStarting the webcrawler for region {job['region']} & subregion {job['subregion']}\n")
+        started_at = datetime.datetime.now().isoformat(timespec='seconds')
+        start_time = time.perf_counter()
+        try:
+            stats = run_webcrawler_pipeline(job['region'], job['subregion'], args)
+            status, error = 'completed', None
+        except Exception as e:  # record any failed jobs in the run report, instead of stopping the other jobs
+            stats = {}
+            status, error = 'failed', repr(e)
+        seconds = round(time.perf_counter() - start_time, 2)
+
+    n_listings_written = stats.get('n_listings_written', 0)
+    return {
+        **job,
+        'status': status,
+        'error': error,
+        'started_at': started_at,
+        'seconds': seconds,
+        'n_listing_urls': stats.get('n_listing_urls', 0),
+        'n_listings_scraped': stats.get('n_listings_scraped', 0),
+        'n_listings_written': n_listings_written,
+        'listings_per_minute': round(60 * n_listings_written / seconds, 2) if seconds else 0,
+        'fetch_outcomes': stats.get('fetch_outcomes', {}),  # ie, the number of listings scraped, expired, retried, and given up on (see Rentals/retry_policy.py)
+        }
+
+
+def save_run_report(job_results: list, report_dir: str, started_at: datetime.datetime) -> str:
+    """Save a single consolidated run report for every job of the batch crawl as json, and print the throughput of each subregion. Return the report's path."""
+    finished_at = datetime.datetime.now()
+    total_seconds = (finished_at - started_at).total_seconds()
+    total_listings_written = sum(job_result['n_listings_written'] for job_result in job_results)
+    run_report = {
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'finished_at': finished_at.isoformat(timespec='seconds'),
+        'total_seconds': round(total_seconds, 2),
+        'n_jobs': len(job_results),
+        'n_failed_jobs': sum(job_result['status'] == 'failed' for job_result in job_results),
+        'total_listings_written': total_listings_written,
+        'listings_per_minute': round(60 * total_listings_written / total_seconds, 2) if total_seconds else 0,
+        'jobs': sorted(job_results, key=lambda job_result: (job_result['region'], f"{job_result['subregion']}")),
+        }
+
+    os.makedirs(report_dir, exist_ok=True)
+    report_path = os.path.join(report_dir, f"batch_run_report_{started_at.strftime('%m_%d_%Y_%H%M%S')}.json")
+    with open(report_path, 'w') as fh:
+        json.dump(run_report, fh, indent=4)
+
+    # print the throughput of each subregion in the CLI
+    print("\nBatch crawl run report:")
+    for job_result in run_report['jobs']:
+        print(f"{job_result['region']} {job_result['subregion']}: {job_result['status']}, {job_result['n_listings_written']} listings in {job_result['seconds']} seconds ({job_result['listings_per_minute']} listings per minute)")
+    print(f"\nTotal: {total_listings_written} listings in {run_report['total_seconds']} seconds ({run_report['listings_per_minute']} listings per minute)\nRun report saved to:\n{report_path}\n")
+    return report_path
+
+
+def main():
+    args = parse_batch_command_line_args()
+    started_at = datetime.datetime.now()
+    jobs = interleave_jobs_by_host(load_batch_jobs(args.job_file))
+    print(f"\nThe batch crawl comprises {len(jobs)} region & subregion jobs, run by {args.processes} worker processes.\n")
+
+    # initialize a semaphore per host, shared by all of the worker processes, so at most --max-jobs-per-host jobs crawl a given host at the same time
+    with multiprocessing.Manager() as manager:
+        host_semaphores = {job['host']: manager.Semaphore(args.max_jobs_per_host) for job in jobs}
+
+        job_results = []
+        with ProcessPoolExecutor(max_workers=args.processes) as executor:
+            futures = [executor.submit(run_batch_job, job, args, host_semaphores[job['host']]) for job in jobs]
+            for future in as_completed(futures):
+                job_results.append(future.result())
+
+    return save_run_report(job_results, args.report_dir, started_at)
+
+
+if __name__ == "__main__":
+    main()
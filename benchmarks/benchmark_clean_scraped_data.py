@@ -0,0 +1,139 @@
+"""Benchmark of clean_scraped_lists() on a large synthetic dictionary of lists (1 million listings by default)--ie, without accessing craigslist.
+
+The benchmark cleans the city names, ids, sqft, bedrooms, bathrooms & date_posted lists, and parses the kitchen list, of the synthetic listings:
+a.) via each of the clean_scraped...() functions in turn--ie, as Craigslist_Rentals.clean_scraped_data() used to, and
+b.) via clean_scraped_lists()'s single pass per list.
+It then checks that both return identical lists, and reports the number of seconds & listings per second of each, and the seconds spent on each list.
+NB: the synthetic fields have the same format as the fields scraped from the listing pages (e.g., ' 2BR / 1Ba ' for the bedrooms & bathrooms), and are drawn from the replay fixture server's synthetic cities (see replay_server.py).
+
+Example usage:
+    python -m benchmarks.benchmark_clean_scraped_data --listings 1000000 --output benchmark_clean_scraped_data.json"""
+import argparse
+import copy
+import json
+import random
+import time
+
+from data_cleaning.scraper_and_data_cleaning_functions import (
+    clean_scraped_cities_data, clean_listing_ids, parse_kitchen_data, clean_scraped_sqft_data, clean_scraped_bedroom_data, clean_scraped_bathroom_data, clean_scraped_date_posted_data,
+    clean_cities_kernel, clean_listing_ids_kernel, lowercase_descrips_and_parse_kitchen_kernel, clean_sqft_kernel, clean_bedrooms_kernel, clean_bathrooms_kernel, clean_date_posted_kernel,
+    apply_kernel_to_distinct_values, clean_scraped_lists,
+    )
+from benchmarks.replay_server import synthetic_cities
+
+
+# specify the description sentences of the synthetic listings
+synthetic_descrip_sentences = ['Bright unit with a modern Kitchen.', 'Close to shopping and transit.', 'Quiet neighborhood.', 'Recently renovated.', 'Pool and gym on site.', 'No kitchen, but a kitchenette.']
+
+
+def parse_benchmark_command_line_args():
+    parser = argparse.ArgumentParser(description="Benchmark of clean_scraped_lists() on a large synthetic dictionary of lists")
+    parser.add_argument('--listings', type=int, default=1000000, help="number of synthetic listings (default: 1000000)")
+    parser.add_argument('--nan-rate', type=float, default=0.02, help="fraction of the listings whose fields are missing, ie, 'nan' (default: 0.02)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the synthetic listings (default: 0)")
+    parser.add_argument('--output', default=None, help="path to save the benchmark report as json (default: only print the report)")
+    return parser.parse_args()
+
+
+def synthetic_dict_scraped_lists(n_listings: int, nan_rate: float, seed: int) -> dict:
+    """Return a dictionary of lists of synthetic listings, whose fields are randomly drawn (given the seed)--NB: in the same format as listing_records_to_dict_of_lists()."""
+    synthetic_random = random.Random(seed)
+    dict_scraped_lists = {'ids': [], 'sqft': [], 'cities': [], 'bedrooms': [], 'bathrooms': [], 'listing_descrip': [], 'kitchen': [], 'date_posted': []}
+    for i in range(n_listings):
+        if synthetic_random.random() < nan_rate:
+            for field in ('ids', 'sqft', 'cities', 'bedrooms', 'bathrooms', 'listing_descrip', 'date_posted'):
+                dict_scraped_lists[field].append('nan')
+            continue
+        housing = f" {synthetic_random.randint(0, 4)}BR / {synthetic_random.choice([1, 1.5, 2, 2.5])}Ba "
+        dict_scraped_lists['ids'].append(f"post id: {7600000000 + i}")
+        dict_scraped_lists['sqft'].append(f"{synthetic_random.randrange(400, 2500, 10)}ft2")
+        dict_scraped_lists['cities'].append(f"({synthetic_random.choice(synthetic_cities).lower()})")
+        dict_scraped_lists['bedrooms'].append(housing)
+        dict_scraped_lists['bathrooms'].append(housing)
+        dict_scraped_lists['listing_descrip'].append(' '.join(synthetic_random.choice(synthetic_descrip_sentences) for _ in range(synthetic_random.randint(3, 30))))
+        dict_scraped_lists['date_posted'].append(f"2023-09-{synthetic_random.randint(1, 28):02d}T{synthetic_random.randint(0, 23):02d}:{synthetic_random.randint(0, 59):02d}:00-0700")
+    return dict_scraped_lists
+
+
+def clean_scraped_lists_per_function(dict_scraped_lists: dict) -> tuple:
+    """Clean the lists via each of the clean_scraped...() functions in turn--ie, the reference implementation of clean_scraped_lists(). Return the dictionary of lists, and the seconds spent on each list."""
+    seconds_by_list = {}
+    for scraped_list, clean_function in [
+        ('cities', lambda: clean_scraped_cities_data(dict_scraped_lists, 'cities')),
+        ('ids', lambda: clean_listing_ids(dict_scraped_lists, 'ids')),
+        ('kitchen', lambda: parse_kitchen_data(dict_scraped_lists, 'listing_descrip')),
+        ('sqft', lambda: clean_scraped_sqft_data(dict_scraped_lists)),
+        ('bedrooms', lambda: clean_scraped_bedroom_data(dict_scraped_lists)),
+        ('bathrooms', lambda: clean_scraped_bathroom_data(dict_scraped_lists)),
+        ('date_posted', lambda: clean_scraped_date_posted_data(dict_scraped_lists)),
+        ]:
+        start_time = time.perf_counter()
+        dict_scraped_lists[scraped_list] = clean_function()
+        seconds_by_list[scraped_list] = round(time.perf_counter() - start_time, 3)
+    return dict_scraped_lists, seconds_by_list
+
+
+def time_kernels(dict_scraped_lists: dict) -> dict:
+    """Return the seconds spent on each list by clean_scraped_lists()'s kernels--NB: on a copy of the lists, so the kernels can be timed separately."""
+    seconds_by_list = {}
+    for scraped_list, source_list, clean_function in [
+        ('cities', 'cities', lambda values: apply_kernel_to_distinct_values(clean_cities_kernel, values)),
+        ('ids', 'ids', clean_listing_ids_kernel),
+        ('kitchen', 'listing_descrip', lowercase_descrips_and_parse_kitchen_kernel),
+        ('sqft', 'sqft', lambda values: apply_kernel_to_distinct_values(clean_sqft_kernel, values)),
+        ('bedrooms', 'bedrooms', lambda values: apply_kernel_to_distinct_values(clean_bedrooms_kernel, values)),
+        ('bathrooms', 'bathrooms', lambda values: apply_kernel_to_distinct_values(clean_bathrooms_kernel, values)),
+        ('date_posted', 'date_posted', clean_date_posted_kernel),
+        ]:
+        source_values = list(dict_scraped_lists[source_list])
+        start_time = time.perf_counter()
+        clean_function(source_values)
+        seconds_by_list[scraped_list] = round(time.perf_counter() - start_time, 3)
+    return seconds_by_list
+
+
+def run_benchmark(args) -> dict:
+    """Clean the synthetic lists via both implementations, and return the benchmark report."""
+    start_time = time.perf_counter()
+    dict_scraped_lists = synthetic_dict_scraped_lists(args.listings, args.nan_rate, args.seed)
+    synthetic_seconds = time.perf_counter() - start_time
+
+    reference_dict_scraped_lists = copy.deepcopy(dict_scraped_lists)
+    start_time = time.perf_counter()
+    reference_dict_scraped_lists, per_function_seconds_by_list = clean_scraped_lists_per_function(reference_dict_scraped_lists)
+    per_function_seconds = time.perf_counter() - start_time
+
+    kernel_seconds_by_list = time_kernels(dict_scraped_lists)
+    start_time = time.perf_counter()
+    dict_scraped_lists = clean_scraped_lists(dict_scraped_lists)
+    single_pass_seconds = time.perf_counter() - start_time
+
+    mismatched_lists = [scraped_list for scraped_list in reference_dict_scraped_lists if dict_scraped_lists[scraped_list] != reference_dict_scraped_lists[scraped_list]]
+
+    return {
+        'settings': {setting: value for setting, value in vars(args).items() if setting != 'output'},
+        'synthetic_seconds': round(synthetic_seconds, 3),
+        'per_function_seconds': round(per_function_seconds, 3),
+        'single_pass_seconds': round(single_pass_seconds, 3),
+        'per_function_listings_per_second': round(args.listings / per_function_seconds) if per_function_seconds else None,
+        'single_pass_listings_per_second': round(args.listings / single_pass_seconds) if single_pass_seconds else None,
+        'speedup': round(per_function_seconds / single_pass_seconds, 2) if single_pass_seconds else None,
+        'per_function_seconds_by_list': per_function_seconds_by_list,
+        'single_pass_seconds_by_list': kernel_seconds_by_list,
+        'identical_output': not mismatched_lists,
+        'mismatched_lists': mismatched_lists,
+        }
+
+
+def main():
+    args = parse_benchmark_command_line_args()
+    benchmark_report = run_benchmark(args)
+    print(f"\nBenchmark report:\n{json.dumps(benchmark_report, indent=4)}\n")
+    if args.output is not None:
+        with open(args.output, 'w') as fh:
+            json.dump(benchmark_report, fh, indent=4)
+        print(f"Benchmark report saved to:\n{args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Offline benchmark of the webcrawler, against the local replay fixture server (see replay_server.py)--ie, without accessing craigslist.
+
+The benchmark runs the same 2 steps as main.py:
+a.) crawl over each search result page of the replay server--ie, download the pages directly via their offsets (Craigslist_Rentals.obtain_listing_urls_via_offsets()) by default, or click the next page button via a Chrome webdriver (obtain_listing_urls()) given --pagination next-button, and
+b.) scrape each listing page--via scrape_listing_data()'s serial iter_listing_records() by default, via the concurrent fetch engine given --workers and/or --fetch-backend, or via the async webcrawler given --async-crawler (NB: for both steps).
+It then reports the throughput (listings per second), the p50 & p99 latency per listing, and the peak resident memory (RSS), so fetch engine
+changes can be compared reproducibly--NB: the rate limiter is configured with --max-requests-per-second, so the benchmark measures the fetch engine rather than the politeness delays.
+
+Example usage:
+    python -m benchmarks.benchmark_crawler --listings 500 --latency-ms 150 --latency-jitter-ms 50 --workers 4 --fetch-backend http --output benchmark_http_4_workers.json"""
+import argparse
+import json
+import math
+import sys
+import time
+
+from main import xpaths_listing_urls
+from Rentals.selenium_webcrawler import Craigslist_Rentals
+from Rentals.fetch_backends import fetch_backends, initialize_fetch_backend
+from Rentals.concurrent_webcrawler import Concurrent_Listing_Scraper
+from Rentals.rate_limiter import shared_rate_limiter
+from Rentals.webdriver_setup import shared_webdriver_pool
+from Rentals.retry_policy import shared_retry_policy
+from Rentals.http_response_cache import shared_http_response_cache
+from benchmarks.replay_server import next_page_button_variants, replay_server_arg_parser, initialize_replay_server
+
+
+class Timed_Fetch_Backend(object):
+    """Wrap a given fetch backend (see fetch_backends.py), and record the number of seconds spent fetching each listing."""
+
+    def __init__(self, fetch_backend):
+        self.fetch_backend = fetch_backend
+        self.listing_seconds = []  # NB: list.append() is thread-safe, so the workers can share the list
+
+    def fetch_listing(self, list_url: str) -> dict:
+        start_time = time.perf_counter()
+        record = self.fetch_backend.fetch_listing(list_url)
+        self.listing_seconds.append(time.perf_counter() - start_time)
+        return record
+
+    def close(self):
+        self.fetch_backend.close()
+
+
+def parse_benchmark_command_line_args():
+    """Parse the command-line arguments of the benchmark--NB: all of the replay server's arguments (e.g., --latency-ms, --error-rate) are also accepted."""
+    parser = argparse.ArgumentParser(description="Offline benchmark of the craigslist webcrawler, against the local replay fixture server", parents=[replay_server_arg_parser(add_help=False)])
+    parser.add_argument('--workers', type=int, default=1, help="number of concurrent workers used to scrape the listings (default: 1, ie, the serial scrape_listing_data())")
+    parser.add_argument('--fetch-backend', choices=list(fetch_backends), default='selenium', help="backend used to fetch the listing pages (default: selenium)")
+    parser.add_argument('--pagination', choices=['offset', 'next-button'], default='offset', help="how to crawl over the search result pages (default: offset)")
+    parser.add_argument('--search-page-workers', type=int, default=4, help="number of search result pages downloaded at a time via --pagination offset (default: 4)")
+    parser.add_argument('--async-crawler', action='store_true', help="download the search result pages & listing pages as coroutines over a single aiohttp session (NB: ignores --workers & --fetch-backend)")
+    parser.add_argument('--max-in-flight', type=int, default=100, help="maximum number of GET requests in flight at a time via --async-crawler (default: 100)")
+    parser.add_argument('--max-requests-per-second', type=float, default=1000, help="request rate of the rate limiter (default: 1000, ie, effectively no politeness delay)")
+    parser.add_argument('--min-requests-per-second', type=float, default=10, help="floor of the request rate, once the rate limiter backs off after a slow or throttled (ie, HTTP 429 or 403) response (default: 10)")
+    parser.add_argument('--cooldown-seconds', type=float, default=0.5, help="number of seconds the rate limiter pauses the host after a throttled response--NB: main.py pauses craigslist for 60 seconds (default: 0.5)")
+    parser.add_argument('--max-retries', type=int, default=3, help="maximum number of retries of a listing that fails with a transient error (default: 3)")
+    parser.add_argument('--retry-base-delay', type=float, default=0.1, help="number of seconds to wait before the 1st retry of a listing (default: 0.1)")
+    parser.add_argument('--http-cache', action='store_true', help="cache the HTTP responses of the search result pages, as main.py does given --http-cache (default: no cache, so every run downloads every page)")
+    parser.add_argument('--show-browser', action='store_true', help="open the Chrome webdrivers in a visible browser window (default: headless)")
+    parser.add_argument('--output', default=None, help="path to save the benchmark report as json (default: only print the report)")
+    return parser.parse_args()
+
+
+def percentile(values: list, pct: float) -> float:
+    """Return the given percentile (0-100) of a list of values, via the nearest-rank method. Return None if the list is empty."""
+    if not values:
+        return None
+    sorted_values = sorted(values)
+    return sorted_values[max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)]
+
+
+def peak_rss_mb() -> dict:
+    """Return the peak resident memory (in MB) of the benchmark process, and of its terminated child processes (e.g., Chrome webdrivers that have been quit).
+    NB: the resource module is not available on Windows, in which case None is returned."""
+    try:
+        import resource
+    except ImportError:
+        return {'self': None, 'children': None}
+    # NB: ru_maxrss is in kilobytes on Linux, but in bytes on macOS
+    units_per_mb = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {
+        'self': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / units_per_mb, 1),
+        'children': round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / units_per_mb, 1),
+        }
+
+
+def scrape_listings_async(craigslist_crawler: Craigslist_Rentals, listing_urls: list, max_in_flight: int):
+    """Scrape each listing URL via the async webcrawler. Return the scraped Listing_Records, and the number of seconds spent on each listing--ie, the duration of each listing's coroutine, including any retries."""
+    async_crawler = craigslist_crawler.get_async_crawler(max_in_flight)
+    fetch_listing = async_crawler.fetch_listing
+    listing_seconds = []
+
+    async def timed_fetch_listing(list_url: str, crawl_journal=None) -> dict:
+        start_time = time.perf_counter()
+        try:
+            return await fetch_listing(list_url, crawl_journal)
+        finally:
+            listing_seconds.append(time.perf_counter() - start_time)
+
+    async_crawler.fetch_listing = timed_fetch_listing
+    listing_records = list(craigslist_crawler.iter_listing_records_async(listing_urls, max_in_flight))
+    return listing_records, listing_seconds
+
+
+def scrape_listings(craigslist_crawler: Craigslist_Rentals, listing_urls: list, n_workers: int, fetch_backend: str):
+    """Scrape each listing URL--serially via iter_listing_records() (ie, the same generator as scrape_listing_data()), or via the concurrent fetch engine.
+    Return the scraped Listing_Records, and the number of seconds spent on each listing."""
+    if n_workers > 1 or fetch_backend != 'selenium':
+        timed_fetch_backend = Timed_Fetch_Backend(initialize_fetch_backend(fetch_backend, craigslist_crawler, craigslist_crawler.rate_limiter, n_workers))
+        listing_records = list(Concurrent_Listing_Scraper(timed_fetch_backend, n_workers).iter_listing_records(listing_urls))
+        return listing_records, timed_fetch_backend.listing_seconds
+
+    # NB: for the serial webcrawler, the time in between each yielded listing is the time spent on that listing
+    listing_records, listing_seconds = [], []
+    start_time = time.perf_counter()
+    for listing_record in craigslist_crawler.iter_listing_records(listing_urls):
+        listing_records.append(listing_record)
+        listing_seconds.append(time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+    return listing_records, listing_seconds
+
+
+def run_benchmark(args) -> dict:
+    """Run the webcrawler against the replay fixture server, and return the benchmark report."""
+    # configure the rate limiter & webdriver pool, as main.py does
+    # NB: the backoff floor & cooldown default to benchmark-friendly values, so a run with injected HTTP 429 errors (ie, --error-status 429) measures the backoff rather than waiting out craigslist's 60 second cooldown
+    shared_rate_limiter.configure(requests_per_second=args.max_requests_per_second, max_requests_per_second=args.max_requests_per_second, jitter=0,
+                                  min_requests_per_second=min(args.min_requests_per_second, args.max_requests_per_second), cooldown_seconds=args.cooldown_seconds)
+    shared_webdriver_pool.configure(headless=not args.show_browser)
+    shared_retry_policy.configure(max_retries=args.max_retries, base_delay=args.retry_base_delay)
+    shared_http_response_cache.configure(enabled=args.http_cache)
+
+    with initialize_replay_server(args) as replay_server:
+        # point the webcrawler at the replay server instead of craigslist
+        craigslist_crawler = Craigslist_Rentals('replay', replay_server.subregion, 'apa', 50, 12000, 3, "all+dates")
+        craigslist_crawler.url = replay_server.search_url()
+
+        # a.) crawl over each search result page
+        start_time = time.perf_counter()
+        next_page_button_xpaths = next_page_button_variants[args.next_page_variant][2]
+        if args.async_crawler and args.pagination == 'offset':
+            listing_urls = craigslist_crawler.obtain_listing_urls_via_async_crawler(xpaths_listing_urls, next_page_button_xpaths, args.max_in_flight, args.search_page_workers)
+        elif args.pagination == 'offset':
+            listing_urls = craigslist_crawler.obtain_listing_urls_via_offsets(xpaths_listing_urls, next_page_button_xpaths, args.search_page_workers)
+        else:
+            craigslist_crawler.load_craigslist_form_URL()
+            listing_urls = craigslist_crawler.obtain_listing_urls(xpaths_listing_urls, next_page_button_xpaths)
+        search_seconds = time.perf_counter() - start_time
+
+        # b.) scrape each listing page
+        start_time = time.perf_counter()
+        if args.async_crawler:
+            listing_records, listing_seconds = scrape_listings_async(craigslist_crawler, listing_urls, args.max_in_flight)
+        else:
+            listing_records, listing_seconds = scrape_listings(craigslist_crawler, listing_urls, args.workers, args.fetch_backend)
+        scrape_seconds = time.perf_counter() - start_time
+
+        craigslist_crawler.release_webdriver()
+        shared_webdriver_pool.close()
+
+        n_requests, n_injected_errors = replay_server.n_requests, replay_server.n_injected_errors
+        telemetry = craigslist_crawler.telemetry.summary()
+        n_expected_listings = len(replay_server.listing_ids)
+
+    return {
+        'settings': {setting: value for setting, value in vars(args).items() if setting != 'output'},
+        'n_listings_served': n_expected_listings,
+        'n_listing_urls': len(listing_urls),
+        'n_listings_scraped': len(listing_records),
+        'n_listings_with_data': sum(listing_record['ids'] != 'nan' for listing_record in listing_records),
+        'n_requests': n_requests,
+        'n_injected_errors': n_injected_errors,
+        'search_seconds': round(search_seconds, 3),
+        'scrape_seconds': round(scrape_seconds, 3),
+        'listings_per_second': round(len(listing_records) / scrape_seconds, 3) if scrape_seconds else None,
+        'p50_listing_seconds': round(percentile(listing_seconds, 50), 4) if listing_seconds else None,
+        'p99_listing_seconds': round(percentile(listing_seconds, 99), 4) if listing_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'rate_limiter': shared_rate_limiter.summary(),
+        'fetch_outcomes': shared_retry_policy.summary(),
+        'http_cache': shared_http_response_cache.summary(),
+        'telemetry': telemetry,
+        }
+
+
+def main():
+    args = parse_benchmark_command_line_args()
+    benchmark_report = run_benchmark(args)
+    print(f"\nBenchmark report:\n{json.dumps(benchmark_report, indent=4)}\n")
+    if args.output is not None:
+        with open(args.output, 'w') as fh:
+            json.dump(benchmark_report, fh, indent=4)
+        print(f"Benchmark report saved to:\n{args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
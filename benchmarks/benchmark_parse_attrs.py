@@ -0,0 +1,115 @@
+"""Benchmark of parse_attrs() on a large synthetic dataframe (1 million rows by default)--ie, without accessing craigslist.
+
+The benchmark parses the indicator variables of the registry (see attr_indicator_registry.py--e.g., 'cats_OK', 'single_fam') from the attr_vars and listing_descrip cols of the synthetic rows:
+a.) via a separate Pandas' str.contains() scan per indicator variable--ie, a call of indicator_vars_from_scraped_data() (or indicator_vars_compound_str_contains()) per rule, as parse_attrs() used to, and
+b.) via parse_attrs()'s single scan of each row (see Multi_Substring_Matcher).
+It then checks that both return identical indicator variables, and reports the number of seconds & rows per second of each.
+NB: the synthetic attr_vars are drawn from craigslist's attributes (plus a given fraction of missing values), so the benchmark also covers the overlapping substrings--e.g., 'house' & 'townhouse', or 'laundry on site' & 'no laundry on site'.
+
+Example usage:
+    python -m benchmarks.benchmark_parse_attrs --rows 1000000 --output benchmark_parse_attrs.json"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning.attr_indicator_registry import attr_indicator_rules, attr_indicator_vars
+from data_cleaning.scraper_and_data_cleaning_functions import indicator_vars_from_scraped_data, indicator_vars_compound_str_contains, parse_attrs
+from data_cleaning.distinct_value_execution import shared_distinct_value_execution
+
+
+# specify the attributes & description sentences of the synthetic rows
+synthetic_attributes = [
+    'cats are OK - purrr', 'dogs are OK - wooof', 'wheelchair accessible', 'laundry in bldg', 'no laundry on site', 'w/d in unit', 'w/d hookups', 'laundry on site',
+    'flooring: carpet', 'flooring: wood', 'flooring: tile', 'flooring: hardwood', 'flooring: other',
+    'apartment', 'in-law', 'condo', 'townhouse', 'cottage/cabin', 'house', 'duplex', 'flat', 'land', 'furnished',
+    'attached garage', 'detached garage', 'carport', 'off-street parking', 'no parking', 'street parking', 'EV charging', 'air conditioning', 'no smoking',
+    'monthly', 'available now', 'application fee details',
+    ]
+synthetic_descrip_sentences = [
+    'Bright unit with a full kitchen.', 'Close to shopping and transit.', 'Quiet neighborhood.', 'Recently renovated.', 'New dishwasher and refrigerator.',
+    'Gas oven and stove.', 'Pool and gym on site.', 'Walk to the park.', 'Covered parking available.', 'Contact us to schedule a tour.',
+    ]
+
+
+def parse_benchmark_command_line_args():
+    parser = argparse.ArgumentParser(description="Benchmark of parse_attrs() on a large synthetic dataframe")
+    parser.add_argument('--rows', type=int, default=1000000, help="number of synthetic rows (default: 1000000)")
+    parser.add_argument('--nan-rate', type=float, default=0.02, help="fraction of the rows whose attr_vars & listing_descrip are missing, ie, NaN (default: 0.02)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the synthetic rows (default: 0)")
+    parser.add_argument('--output', default=None, help="path to save the benchmark report as json (default: only print the report)")
+    return parser.parse_args()
+
+
+def synthetic_scraped_df(n_rows: int, nan_rate: float, seed: int) -> pd.DataFrame:
+    """Return a dataframe of synthetic attr_vars & listing_descrip cols, which are randomly drawn (given the seed)."""
+    synthetic_random = random.Random(seed)
+    attr_vars, listing_descrips = [], []
+    for _ in range(n_rows):
+        if synthetic_random.random() < nan_rate:
+            attr_vars.append(np.nan)
+            listing_descrips.append(np.nan)
+            continue
+        attr_vars.append('\n'.join(synthetic_random.sample(synthetic_attributes, synthetic_random.randint(1, 8))))
+        listing_descrips.append(' '.join(synthetic_random.choice(synthetic_descrip_sentences) for _ in range(synthetic_random.randint(3, 30))))
+    return pd.DataFrame({'attr_vars': attr_vars, 'listing_descrip': listing_descrips})
+
+
+def parse_attrs_per_indicator_var(df: pd.DataFrame):
+    """Parse each indicator variable via a separate Pandas' str.contains() scan--ie, the reference implementation of parse_attrs()."""
+    for attr_indicator_rule in attr_indicator_rules:
+        # NB: each rule of the registry has a single substring (and at most a single excluded substring)
+        if not attr_indicator_rule.excluded_substrs:
+            df[attr_indicator_rule.indicator_var] = indicator_vars_from_scraped_data(df, attr_indicator_rule.source_col, attr_indicator_rule.substrs[0])
+        else:
+            df[attr_indicator_rule.indicator_var] = indicator_vars_compound_str_contains(df, attr_indicator_rule.source_col, attr_indicator_rule.substrs[0], attr_indicator_rule.excluded_substrs[0])
+
+
+def run_benchmark(args) -> dict:
+    """Parse the indicator variables of the synthetic rows via both implementations, and return the benchmark report."""
+    start_time = time.perf_counter()
+    df = synthetic_scraped_df(args.rows, args.nan_rate, args.seed)
+    synthetic_seconds = time.perf_counter() - start_time
+
+    reference_df = df.copy()
+    start_time = time.perf_counter()
+    parse_attrs_per_indicator_var(reference_df)
+    per_indicator_var_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    parse_attrs(df)
+    single_scan_seconds = time.perf_counter() - start_time
+
+    # NB: the indicator variables are compared by value, since parse_attrs() returns uint8 cols rather than int64 cols
+    mismatched_indicator_vars = [indicator_var for indicator_var in attr_indicator_vars if not np.array_equal(df[indicator_var].to_numpy(), reference_df[indicator_var].to_numpy())]
+
+    return {
+        'settings': {setting: value for setting, value in vars(args).items() if setting != 'output'},
+        'n_indicator_vars': len(attr_indicator_vars),
+        'synthetic_seconds': round(synthetic_seconds, 3),
+        'per_indicator_var_seconds': round(per_indicator_var_seconds, 3),
+        'single_scan_seconds': round(single_scan_seconds, 3),
+        'per_indicator_var_rows_per_second': round(args.rows / per_indicator_var_seconds) if per_indicator_var_seconds else None,
+        'single_scan_rows_per_second': round(args.rows / single_scan_seconds) if single_scan_seconds else None,
+        'speedup': round(per_indicator_var_seconds / single_scan_seconds, 2) if single_scan_seconds else None,
+        'identical_output': not mismatched_indicator_vars and list(df.columns) == list(reference_df.columns),
+        'mismatched_indicator_vars': mismatched_indicator_vars,
+        'distinct_value_report': shared_distinct_value_execution.report(),  # ie, the hit rate of the distinct texts of each col scanned by parse_attrs()
+        }
+
+
+def main():
+    args = parse_benchmark_command_line_args()
+    benchmark_report = run_benchmark(args)
+    print(f"\nBenchmark report:\n{json.dumps(benchmark_report, indent=4)}\n")
+    if args.output is not None:
+        with open(args.output, 'w') as fh:
+            json.dump(benchmark_report, fh, indent=4)
+        print(f"Benchmark report saved to:\n{args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Local replay fixture server: a stand-in for a craigslist site, so the webcrawler's throughput can be measured without accessing craigslist.
+
+The server serves:
+a.) search result pages--ie, the 'searchform' form, listings_per_page listing cards per page (ie, the listing URL, plus the price, housing, location & date posted of synthetic listings), the total number of listings (ie, 'cl-page-number'), and one of the known next page button variants (see next_page_button_variants), whose last page only has a disabled next page button.
+    NB: the pages can also be accessed directly via craigslist's offset parameter (ie, 's'--see Rentals/search_page_planner.py), the synthetic listings are filtered by the min/max price & bedrooms parameters,
+    and only the first result_cap matching listings are served--ie, the same as craigslist's cap on the number of search results (see Rentals/price_band_sharding.py).
+b.) listing pages--either synthetic listings (whose fields match the xpaths of Rentals/listing_page_fields.py), or the pages recorded in the html archive of a given scraped data directory (see Rentals/html_archive.py).
+c.) expired listings--ie, an HTTP 404 page without any listing data, for a given fraction of the listings.
+
+Each response is delayed by a configurable latency (plus random jitter), and a given fraction of the requests for listing pages respond with an injected HTTP error instead.
+NB: the errors are drawn per request--ie, per attempt of each listing--so a retried listing can recover, the same as a transient failure of craigslist.
+NB: the random draws are seeded, so a given configuration always serves the same pages, expired listings & errors (ie, the nth attempt of a given listing always gets the same response, regardless of the order of the requests)--ie, benchmark runs can be compared reproducibly.
+
+Example usage (ie, run the server on its own, and access it via a browser at http://127.0.0.1:8000/search/sby/apa):
+    python -m benchmarks.replay_server --listings 500 --latency-ms 200 --error-rate 0.02 --port 8000"""
+import argparse
+import gzip
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+from Rentals.html_archive import Listing_HTML_Archive
+
+
+# specify the known variants of the next page button--ie, (HTML of the enabled button, HTML of the disabled button on the last page, xpath of the enabled button)
+# NB: the buttons navigate to the next page via JavaScript, the same way as craigslist's search pages
+next_page_button_variants = {
+    'bd-button': (
+        '<button class="bd-button cl-next-page icon-only" onclick="window.location.href=\'{next_page_url}\'">next</button>',
+        '<button class="bd-button cl-next-page icon-only bd-disabled" disabled>next</button>',
+        '//*[@class="bd-button cl-next-page icon-only"]',
+        ),
+    'search-toolbars': (
+        '<div id="search-toolbars-1"><div></div><div><button>first</button><button>previous</button><button onclick="window.location.href=\'{next_page_url}\'">next</button></div></div>',
+        '<div id="search-toolbars-1"><div></div><div><button>first</button><button>previous</button></div></div>',
+        '//*[@id="search-toolbars-1"]/div[2]/button[3]',
+        ),
+    'button-next': (
+        '<a class="button next" href="{next_page_url}">next &gt;</a>',
+        '<span class="button next-disabled">next &gt;</span>',
+        '//*[@class="button next"]',
+        ),
+    }
+
+# specify the known class names of the listing URL anchors (see list_of_xpaths_listing_urls in main.py)
+listing_url_anchor_classes = ['cl-app-anchor text-only posting-title', 'result-title hdrlnk', 'post-title', 'titlestring']
+
+# specify the city names & attributes of the synthetic listings
+synthetic_cities = ['san jose', 'santa clara', 'sunnyvale', 'mountain view', 'cupertino', 'campbell', 'milpitas', 'los gatos']
+synthetic_attributes = ['cats are OK - purrr', 'dogs are OK - wooof', 'w/d in unit', 'laundry in bldg', 'attached garage', 'off-street parking', 'EV charging', 'furnished', 'no smoking', 'wheelchair accessible']
+
+# specify the HTML of the search result cards of synthetic listings--NB: the same layout as craigslist's static search page (see Rentals/search_page_harvest.py)
+synthetic_search_result_card_template = """<li class="cl-static-search-result" title="{title}"><a class="{anchor_class}" href="{listing_url}"><div class="title">{title}</div><div class="details"><div class="price">${price:,}</div><div class="housing">/ {bedrooms}br - {sqft}ft2 -</div><div class="location">{city}</div></div></a><time datetime="{date_posted}"></time></li>"""
+
+# specify the HTML of the synthetic listing pages--NB: the fields are located via the same xpaths as listing_field_xpaths
+synthetic_listing_page_template = """<html><head><title>{title}</title></head><body>
+<section><section><h1><span><span>{title}</span><span class="price">${price:,}</span><span class="housing">/ {bedrooms}br - {sqft}ft2 - </span><span>({city})</span></span></h1>
+<section><div><p><span class="shared-line-bubble"><b>{bedrooms}BR</b> / <b>{bathrooms}Ba</b></span></p></div><div><p>post id: {listing_id}</p><p>posted: <time class="date timeago" datetime="{date_posted}">{date_posted}</time></p></div></section>
+<section id="postingbody">{listing_descrip}</section>
+<p class="attrgroup">{attributes}</p>
+</section></section></body></html>"""
+
+expired_listing_page = """<html><head><title>craigslist | Page Not Found</title></head><body><section><h2>This posting has expired.</h2><p>(The title on the listings page will be removed in just a few minutes.)</p></section></body></html>"""
+
+
+class Replay_Fixture_Server(object):
+    """Local stand-in for a craigslist site, which serves search result pages & listing pages with a configurable latency, expired listings, and injected HTTP errors."""
+
+    def __init__(self, n_listings: int = 300, listings_per_page: int = 120, subregion: str = 'sby', next_page_variant: str = 'bd-button', listing_url_variant: int = 0,
+                 expired_rate: float = 0.05, latency_ms: float = 0, latency_jitter_ms: float = 0, error_rate: float = 0, error_status: int = 503,
+                 scraped_data_path: str = None, result_cap: int = None, seed: int = 0, host: str = '127.0.0.1', port: int = 0):
+        if next_page_variant not in next_page_button_variants:
+            raise ValueError(f"The next page button variant '{next_page_variant}' is not one of {list(next_page_button_variants)}.")
+        self.listings_per_page = listings_per_page
+        self.result_cap = result_cap  # maximum number of listings served for any search query (default: None, ie, no cap)
+        self.subregion = subregion
+        self.next_page_variant = next_page_variant
+        self.listing_url_anchor_class = listing_url_anchor_classes[listing_url_variant]
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.seed = seed
+        self.random = random.Random(seed)  # NB: only used (under the lock) for the latency jitter, so the pages themselves do not depend on the order of the requests
+        self.lock = threading.Lock()
+        self.n_requests = 0
+        self.n_injected_errors = 0
+        self.n_listing_attempts = {}  # number of requests of each listing page so far, so each attempt gets its own (seeded) error draw
+
+        # specify the listing pages to serve, keyed by listing ID--ie, the recorded pages of a given html archive, or synthetic listings
+        fixture_random = random.Random(seed)
+        self.synthetic_listing_fields = {}  # fields of each synthetic listing, which are also shown on its search result card
+        if scraped_data_path is not None:
+            html_archive = Listing_HTML_Archive(scraped_data_path)
+            index_entries = [index_entry for index_entry in html_archive.load_index() if index_entry['listing_id']]
+            self.listing_pages = {index_entry['listing_id']: html_archive.load_page(index_entry['content_hash']) for index_entry in index_entries}
+        else:
+            self.synthetic_listing_fields = {str(7600000000 + i): self.draw_synthetic_listing_fields(str(7600000000 + i), fixture_random) for i in range(n_listings)}
+            self.listing_pages = {listing_id: synthetic_listing_page_template.format(**listing_fields) for listing_id, listing_fields in self.synthetic_listing_fields.items()}
+        self.listing_ids = list(self.listing_pages)
+
+        # draw the expired listings once, so every run serves the same pages--NB: the injected errors are drawn per request instead (see injects_error())
+        self.expired_listing_ids = {listing_id for listing_id in self.listing_ids if fixture_random.random() < expired_rate}
+
+        server = self
+
+        class Replay_Request_Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle_request(self)
+
+            def log_message(self, format, *args):
+                pass  # do not print each request in the CLI
+
+        self.http_server = ThreadingHTTPServer((host, port), Replay_Request_Handler)
+        self.http_server.daemon_threads = True
+        self.server_thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.http_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search_url(self) -> str:
+        """Return the URL of the 1st search result page--ie, the stand-in for the craigslist URL of Craigslist_Rentals."""
+        return f"{self.base_url}/search/{self.subregion}/apa?min_price=50&max_price=12000&availabilityMode=0&rent_period=3&sale_date=all+dates"
+
+    def listing_url(self, listing_id: str) -> str:
+        return f"{self.base_url}/{self.subregion}/apa/d/replay-listing/{listing_id}.html"
+
+    def draw_synthetic_listing_fields(self, listing_id: str, fixture_random: random.Random) -> dict:
+        """Return the fields of a synthetic listing, which are randomly drawn (given the seeded fixture_random)."""
+        bedrooms = fixture_random.randint(0, 4)
+        city = fixture_random.choice(synthetic_cities)
+        return dict(
+            title=f"{bedrooms}br apartment in {city}",
+            listing_id=listing_id,
+            price=fixture_random.randrange(1200, 6000, 25),
+            bedrooms=bedrooms,
+            bathrooms=fixture_random.choice([1, 1.5, 2, 2.5]),
+            sqft=fixture_random.randrange(400, 2500, 10),
+            city=city,
+            date_posted=f"2023-09-{fixture_random.randint(1, 28):02d}T{fixture_random.randint(0, 23):02d}:00:00-0700",
+            listing_descrip=' '.join(fixture_random.choice(['Bright unit with a modern kitchen.', 'Close to shopping and transit.', 'Quiet neighborhood.', 'Recently renovated.', 'Pool and gym on site.']) for _ in range(fixture_random.randint(3, 30))),
+            attributes='<br>'.join(fixture_random.sample(synthetic_attributes, fixture_random.randint(1, 5))),
+            )
+
+    def injects_error(self, listing_id: str) -> bool:
+        """Count a request of the given listing page, and return whether it responds with an injected HTTP error--ie, a draw of a random number seeded by the seed, the listing ID & the attempt number, so each attempt of a listing fails independently."""
+        if not self.error_rate:
+            return False
+        with self.lock:
+            n_attempt = self.n_listing_attempts[listing_id] = self.n_listing_attempts.get(listing_id, 0) + 1
+        return random.Random(f"{self.seed}-{listing_id}-{n_attempt}").random() < self.error_rate
+
+    def matching_listing_ids(self, query: dict) -> list:
+        """Return the IDs of the listings that match the min/max price & bedrooms parameters of a given (parsed) search query--NB: the recorded pages of an html archive always match, since their fields are unknown."""
+        def query_bound(param_name: str, default: float) -> float:
+            param_values = [param_value for param_name_, param_values in query.items() if param_name_.lstrip('/') == param_name for param_value in param_values]
+            return float(param_values[0]) if param_values else default
+
+        min_price, max_price = query_bound('min_price', float('-inf')), query_bound('max_price', float('inf'))
+        min_bedrooms, max_bedrooms = query_bound('min_bedrooms', float('-inf')), query_bound('max_bedrooms', float('inf'))
+        return [
+            listing_id for listing_id in self.listing_ids
+            if listing_id not in self.synthetic_listing_fields
+            or (min_price <= self.synthetic_listing_fields[listing_id]['price'] <= max_price and min_bedrooms <= self.synthetic_listing_fields[listing_id]['bedrooms'] <= max_bedrooms)
+            ]
+
+    def search_page(self, page: int, query: dict = None) -> str:
+        """Return the HTML of the given (0-indexed) search result page of a given (parsed) search query."""
+        query = query if query is not None else {}
+        matching_listing_ids = self.matching_listing_ids(query)
+        served_listing_ids = matching_listing_ids[:self.result_cap] if self.result_cap is not None else matching_listing_ids
+        page_listing_ids = served_listing_ids[page * self.listings_per_page:(page + 1) * self.listings_per_page]
+        anchors = '\n'.join(
+            synthetic_search_result_card_template.format(anchor_class=self.listing_url_anchor_class, listing_url=self.listing_url(listing_id), **self.synthetic_listing_fields[listing_id])
+            if listing_id in self.synthetic_listing_fields else f'<li><a class="{self.listing_url_anchor_class}" href="{self.listing_url(listing_id)}">listing {listing_id}</a></li>'
+            for listing_id in page_listing_ids
+            )
+        enabled_button, disabled_button, _ = next_page_button_variants[self.next_page_variant]
+        is_last_page = (page + 1) * self.listings_per_page >= len(served_listing_ids)
+        next_page_query = {param_name: param_values[0] for param_name, param_values in query.items() if param_name != 's'}
+        next_page_query['page'] = page + 1
+        next_page_button = disabled_button if is_last_page else enabled_button.format(next_page_url=f"/search/{self.subregion}/apa?{urlencode(next_page_query)}")
+        # NB: show the total number of matching listings, even if only the first result_cap listings are served
+        page_number = f'<span class="cl-page-number">{page * self.listings_per_page + 1} - {page * self.listings_per_page + len(page_listing_ids)} of {len(matching_listing_ids):,}</span>'
+        return f'<html><head><title>replay search</title></head><body><form id="searchform"></form>{page_number}{next_page_button}<ol>{anchors}</ol></body></html>'
+
+    def handle_request(self, request_handler: BaseHTTPRequestHandler):
+        """Serve a given GET request, after the configured latency."""
+        with self.lock:
+            self.n_requests += 1
+            latency_seconds = max(0, self.latency_ms + self.random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)) / 1000
+        time.sleep(latency_seconds)
+
+        url = urlsplit(request_handler.path)
+        if url.path.startswith('/search/'):
+            # NB: account for both the page parameter of the next page button, and craigslist's offset parameter (ie, 's'--see Rentals/search_page_planner.py)
+            query = parse_qs(url.query)
+            page = int(query['s'][0]) // self.listings_per_page if 's' in query else int(query.get('page', ['0'])[0])
+            status, body = 200, self.search_page(page, query)
+        else:
+            listing_id = url.path.rsplit('/', 1)[-1].split('.')[0]
+            if self.injects_error(listing_id):
+                with self.lock:
+                    self.n_injected_errors += 1
+                status, body = self.error_status, f"<html><body><h1>HTTP {self.error_status}</h1></body></html>"
+            elif listing_id in self.expired_listing_ids or listing_id not in self.listing_pages:
+                status, body = 404, expired_listing_page
+            else:
+                status, body = 200, self.listing_pages[listing_id]
+
+        body = body.encode('utf-8')
+        # NB: serve an ETag & gzip transfer encoding the same way as craigslist, so the HTTP response cache's revalidation & compressed transfer can be benchmarked (see Rentals/http_response_cache.py)
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if status == 200 and request_handler.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        content_encoding = 'gzip' if body and 'gzip' in (request_handler.headers.get('Accept-Encoding') or '') else None
+        if content_encoding is not None:
+            body = gzip.compress(body)
+
+        request_handler.send_response(status)
+        request_handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        request_handler.send_header('Content-Length', str(len(body)))
+        if status in (200, 304):
+            request_handler.send_header('ETag', etag)
+        if content_encoding is not None:
+            request_handler.send_header('Content-Encoding', content_encoding)
+        request_handler.end_headers()
+        request_handler.wfile.write(body)
+
+    def start(self):
+        """Serve the fixture pages within a background thread."""
+        self.server_thread = threading.Thread(target=self.http_server.serve_forever, daemon=True)
+        self.server_thread.start()
+        return self
+
+    def stop(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def replay_server_arg_parser(add_help: bool = True):
+    """Specify the command-line arguments of the replay fixture server--NB: the benchmark harness (see benchmark_crawler.py) reuses these arguments, so set add_help=False to use this parser as a parent parser."""
+    parser = argparse.ArgumentParser(description="Local replay fixture server for the craigslist webcrawler", add_help=add_help)
+    parser.add_argument('--listings', type=int, default=300, help="number of synthetic listings to serve (default: 300)")
+    parser.add_argument('--listings-per-page', type=int, default=120, help="number of listing URLs per search result page (default: 120, as craigslist)")
+    parser.add_argument('--next-page-variant', choices=list(next_page_button_variants), default='bd-button', help="variant of the next page button (default: bd-button)")
+    parser.add_argument('--listing-url-variant', type=int, choices=range(len(listing_url_anchor_classes)), default=0, help="index of the class name of the listing URL anchors (default: 0)")
+    parser.add_argument('--expired-rate', type=float, default=0.05, help="fraction of the listings that have expired, ie, respond with HTTP 404 (default: 0.05)")
+    parser.add_argument('--latency-ms', type=float, default=0, help="latency added to each response, in milliseconds (default: 0)")
+    parser.add_argument('--latency-jitter-ms', type=float, default=0, help="random jitter of the latency, in milliseconds (default: 0)")
+    parser.add_argument('--error-rate', type=float, default=0, help="fraction of the requests for listing pages that respond with an injected HTTP error--NB: drawn per request, so a retried listing can recover (default: 0)")
+    parser.add_argument('--error-status', type=int, default=503, help="HTTP status of the injected errors--e.g., 429 to test the rate limiter's backoff, whose cooldown is set via benchmark_crawler.py's --cooldown-seconds (default: 503)")
+    parser.add_argument('--scraped-data-path', default=None, help="serve the recorded listing pages of the html archive within the given scraped data directory, instead of synthetic listings")
+    parser.add_argument('--result-cap', type=int, default=None, help="maximum number of listings served for any search query--e.g., 3000, as craigslist (default: no cap)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the fixture pages, expired listings & errors (default: 0)")
+    return parser
+
+
+def initialize_replay_server(args, port: int = 0) -> Replay_Fixture_Server:
+    """Initialize the replay fixture server, given the parsed command-line arguments (see replay_server_arg_parser())."""
+    return Replay_Fixture_Server(
+        n_listings=args.listings, listings_per_page=args.listings_per_page, next_page_variant=args.next_page_variant, listing_url_variant=args.listing_url_variant,
+        expired_rate=args.expired_rate, latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms, error_rate=args.error_rate, error_status=args.error_status,
+        scraped_data_path=args.scraped_data_path, result_cap=args.result_cap, seed=args.seed, port=port,
+        )
+
+
+def main():
+    parser = replay_server_arg_parser()
+    parser.add_argument('--port', type=int, default=8000, help="port of the server (default: 8000)")
+    args = parser.parse_args()
+    replay_server = initialize_replay_server(args, args.port)
+    print(f"\nServing {len(replay_server.listing_ids)} listings at:\n{replay_server.search_url()}\n")
+    try:
+        replay_server.http_server.serve_forever()
+    except KeyboardInterrupt:
+        replay_server.http_server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Registry of the indicator variables (e.g., 'cats_OK', 'single_fam') parsed from the scraped rental listings, and of the columns of the SQL Server rental table.
+
+The registry is the only place the indicator variables are defined:
+a.) parse_attrs() (see scraper_and_data_cleaning_functions.py) compiles the rules of each source column into a single matcher, so each text is scanned once, regardless of the number of rules,
+b.) SQL_create_table_rental.py generates the CREATE TABLE statement of the rental table via rental_table_create_statement(), and
+c.) the ETL data pipeline (see Pandas_and_SQL_ETL_and_data_cleaning.py) generates the INSERT INTO statement (and the order of the dataframe's cols to insert) via rental_table_insert_statement() & rental_table_df_cols.
+So, adding an amenity only needs a new Attr_Indicator_Rule--NB: plus an ALTER TABLE ... ADD of the new col, for any existing rental table."""
+
+
+class Attr_Indicator_Rule(object):
+    """An indicator variable parsed from a given column of the scraped data: 1 if the column contains any of the substrings, and none of the excluded substrings--else 0.
+    NB: the excluded substrings account for home types that have substrings that overlap with other ones--e.g., single family homes are denoted on listings merely as 'house', which is also a substring of 'townhouse'."""
+    __slots__ = ('indicator_var', 'source_col', 'substrs', 'excluded_substrs')
+
+    def __init__(self, indicator_var: str, source_col: str, substrs: list, excluded_substrs: list = ()):
+        self.indicator_var = indicator_var
+        self.source_col = source_col
+        self.substrs = tuple(substrs)
+        self.excluded_substrs = tuple(excluded_substrs)
+
+    def __repr__(self):
+        excluded_substrs = f", excluding {list(self.excluded_substrs)}" if self.excluded_substrs else ''
+        return f"{self.indicator_var}: {self.source_col} contains any of {list(self.substrs)}{excluded_substrs}"
+
+
+# specify the indicator variables, in the order they are added to the dataframe of scraped data (and stored in the rental table)
+attr_indicator_rules = [
+    ## cats_OK & dogs_OK--ie, are cats or dogs allowed on given rental property:
+    Attr_Indicator_Rule('cats_OK', 'attr_vars', ['cats are OK']),
+    Attr_Indicator_Rule('dogs_OK', 'attr_vars', ['dogs are OK']),
+    ## wheelchair accessible
+    Attr_Indicator_Rule('wheelchair_accessible', 'attr_vars', ['wheelchair accessible']),
+    ## Parse laundry and washer+dryer data:
+    Attr_Indicator_Rule('laundry_in_bldg', 'attr_vars', ['laundry in bldg']),  # laundry in building
+    Attr_Indicator_Rule('no_laundry', 'attr_vars', ['no laundry on site']),  # no laundry on site
+    Attr_Indicator_Rule('washer_and_dryer', 'attr_vars', ['w/d in unit']),  # parse w_d data-- ie, washer and dryer included
+    Attr_Indicator_Rule('washer_and_dryer_hookup', 'attr_vars', ['w/d hookups']),  # washer and dryer hookup (but no appliances)
+    Attr_Indicator_Rule('laundry_on_site', 'attr_vars', ['laundry on site']),  # laundry services available
+    ## Kitchen and household appliances data:
+    Attr_Indicator_Rule('full_kitchen', 'listing_descrip', ['full kitchen']),
+    Attr_Indicator_Rule('dishwasher', 'listing_descrip', ['dishwasher']),
+    Attr_Indicator_Rule('refrigerator', 'listing_descrip', ['refrigerator']),
+    Attr_Indicator_Rule('oven', 'listing_descrip', ['oven']),
+    ## Flooring attributes:
+    Attr_Indicator_Rule('flooring_carpet', 'attr_vars', ['flooring: carpet']),
+    Attr_Indicator_Rule('flooring_wood', 'attr_vars', ['flooring: wood']),
+    Attr_Indicator_Rule('flooring_tile', 'attr_vars', ['flooring: tile']),
+    Attr_Indicator_Rule('flooring_hardwood', 'attr_vars', ['flooring: hardwood']),
+    Attr_Indicator_Rule('flooring_other', 'attr_vars', ['flooring: other']),  # other/unclassified flooring
+    ## Parse rental type data-- NB: At least for the most part, each rental listing on craigslist will always explicitly state what type of home is up for rent.
+    Attr_Indicator_Rule('apt', 'attr_vars', ['apartment']),
+    Attr_Indicator_Rule('in_law_apt', 'attr_vars', ['in-law']),  # in-law apt--NB: in-law apartments are formally called "Accessory Dwelling Units (ADUs)"". A more detailed description  is available at CA's HCD department: <https://www.hcd.ca.gov/policy-research/accessorydwellingunits.shtml>
+    Attr_Indicator_Rule('condo', 'attr_vars', ['condo']),
+    Attr_Indicator_Rule('townhouse', 'attr_vars', ['townhouse']),
+    Attr_Indicator_Rule('cottage_or_cabin', 'attr_vars', ['cottage/cabin']),
+    Attr_Indicator_Rule('single_fam', 'attr_vars', ['house'], excluded_substrs=['townhouse']),  # parse single-family home type listings while also ensuring we also filter out any townhouse listings!
+    Attr_Indicator_Rule('duplex', 'attr_vars', ['duplex']),
+    Attr_Indicator_Rule('flat', 'attr_vars', ['flat']),  # flat (ie, large apartment-like) rental type
+    Attr_Indicator_Rule('land', 'attr_vars', ['land']),  # land rental type--e.g., RV parking
+    ## furnished rental unit
+    Attr_Indicator_Rule('is_furnished', 'attr_vars', ['furnished']),
+    ## Parse garage & parking data:
+    Attr_Indicator_Rule('attached_garage', 'attr_vars', ['attached garage']),
+    Attr_Indicator_Rule('detached_garage', 'attr_vars', ['detached garage']),
+    Attr_Indicator_Rule('carport', 'attr_vars', ['carport']),
+    Attr_Indicator_Rule('off_street_parking', 'attr_vars', ['off-street parking']),
+    Attr_Indicator_Rule('no_parking', 'attr_vars', ['no parking']),  # no parking options available on site
+    ## Electrical vehicle charging
+    Attr_Indicator_Rule('EV_charging', 'attr_vars', ['EV charging']),
+    ## air conditioning amenity data
+    Attr_Indicator_Rule('air_condition', 'attr_vars', ['air conditioning']),
+    ## Parse no smoking allowed data
+    Attr_Indicator_Rule('no_smoking', 'attr_vars', ['no smoking']),
+    ]
+
+# names of the indicator variables, in order
+attr_indicator_vars = [attr_indicator_rule.indicator_var for attr_indicator_rule in attr_indicator_rules]
+
+
+## Columns of the SQL Server rental table:
+
+# specify the SQL data type of the indicator variables
+indicator_var_sql_type = 'tinyint'
+
+# specify the cols of the rental table that precede the indicator variables--ie, a tuple of (name of the SQL col, name of the dataframe col, SQL data type & constraints) for each, in order
+rental_table_base_cols = [
+    ('listing_id', 'ids', 'bigint PRIMARY KEY'),
+    ('sqft', 'sqft', 'int'),
+    ('city', 'cities', 'varchar(40) NOT NULL'),
+    ('price', 'prices', 'int NOT NULL'),
+    ('bedrooms', 'bedrooms', 'int'),
+    ('bathrooms', 'bathrooms', 'decimal(6,1)'),
+    ('attr_vars', 'attr_vars', 'varchar(2000)'),
+    ('date_of_webcrawler', 'date_of_webcrawler', 'datetime'),
+    ('kitchen', 'kitchen', 'tinyint'),
+    ('date_posted', 'date_posted', 'datetime'),
+    ('region', 'region', 'varchar(13)'),
+    ('sub_region', 'sub_region', 'varchar(8)'),
+    ]
+
+# every col of the rental table--NB: the SQL col of each indicator variable has the same name as its dataframe col
+rental_table_cols = rental_table_base_cols + [(indicator_var, indicator_var, indicator_var_sql_type) for indicator_var in attr_indicator_vars]
+
+# names of the dataframe cols to insert into the rental table, in the order of the table's cols
+rental_table_df_cols = [df_col for _, df_col, _ in rental_table_cols]
+
+
+def rental_table_create_statement(table_name: str = 'rental') -> str:
+    """Return the CREATE TABLE statement of the rental table."""
+    sql_cols = ',\n    '.join(f"{sql_col} {sql_type}" for sql_col, _, sql_type in rental_table_cols)
+    return f"CREATE TABLE {table_name} (\n    {sql_cols}\n    );"
+
+
+def rental_table_insert_statement(table_name: str = 'rental') -> str:
+    """Return the INSERT INTO statement of a single row of the rental table--NB: with a '?' placeholder per col (ie, best practice to help prevent SQL injections), in the order of rental_table_df_cols."""
+    sql_cols = ', '.join(sql_col for sql_col, _, _ in rental_table_cols)
+    q_mark_str = ','.join('?' * len(rental_table_cols))
+    return f"INSERT INTO {table_name} ({sql_cols}) VALUES ({q_mark_str})"
@@ -0,0 +1,135 @@
+"""Versioned local store of the city names of each region (e.g., every SF Bay Area & Santa Cruz county city for 'sfbay'), which the ETL uses to parse the city names from the listing URLs (see parse_city_names_from_listing_URL()).
+
+The ETL used to scrape the city names tables from wikipedia on every run--ie, via a webdriver, whenever the raw HTML of the wiki page could not be parsed--although the lists of cities almost never change.
+Instead, the ETL loads the latest version of the region's city names from the store, which only reads a small json file (or the in-memory copy of it), so no browser or network access is needed:
+a.) each refresh (see refresh_city_reference_store.py) scrapes the wiki tables once, and saves the city names as a new version--ie, <store_path>/<region>/v<version>.json--so the previous versions are kept, e.g., to compare the city names of 2 versions.
+b.) a version is stale once it is older than the TTL (ie, ttl_days). NB: the ETL never refreshes a stale version itself--it only prints a reminder to run the refresh command.
+c.) if the store has no version of a region yet, the city names are loaded from the snapshot bundled with the repo (see the city_reference_snapshots directory)."""
+import datetime
+import glob
+import json
+import os
+import re
+import threading
+
+from .configurable_settings import Configurable_Settings
+
+
+# specify the default directory of the store--ie, scraped_data/city_reference within the project's root directory, so the webcrawler, the data pipelines & the refresh command share the same store regardless of the current working directory
+default_city_reference_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scraped_data', 'city_reference')
+
+# specify the directory of the snapshots bundled with the repo--ie, a <region>.json file per region
+bundled_city_reference_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'city_reference_snapshots')
+
+# specify the format of the refreshed_at timestamp of each version
+refreshed_at_format = '%Y-%m-%d %H:%M:%S'
+
+
+class City_Reference(object):
+    """A version of the city names of a given region, and where it was loaded from--ie, the local store ('store') or the bundled snapshot ('snapshot')."""
+    __slots__ = ('region', 'version', 'refreshed_at', 'source_urls', 'city_names', 'origin')
+
+    def __init__(self, region: str, version: int, refreshed_at: str, source_urls: list, city_names: list, origin: str = 'store'):
+        self.region = region
+        self.version = version
+        self.refreshed_at = refreshed_at
+        self.source_urls = list(source_urls)
+        self.city_names = list(city_names)
+        self.origin = origin
+
+    @classmethod
+    def from_json(cls, path: str, origin: str = 'store'):
+        with open(path, encoding='utf-8') as fh:
+            version_record = json.load(fh)
+        return cls(version_record['region'], version_record['version'], version_record['refreshed_at'], version_record.get('source_urls', []), version_record['city_names'], origin)
+
+    def to_json(self, path: str):
+        version_record = {'region': self.region, 'version': self.version, 'refreshed_at': self.refreshed_at, 'source_urls': self.source_urls, 'city_names': self.city_names}
+        # NB: write to a temporary file first, so a refresh that is interrupted never leaves a partially written version behind
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            json.dump(version_record, fh, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def age_days(self, now: datetime.datetime = None) -> float:
+        """Return the number of days since the version was refreshed."""
+        now = now if now is not None else datetime.datetime.now()
+        return (now - datetime.datetime.strptime(self.refreshed_at, refreshed_at_format)).total_seconds() / 86400
+
+    def __repr__(self):
+        return f"{self.region} city names, version {self.version} ({self.origin}, refreshed at {self.refreshed_at}): {len(self.city_names)} city names"
+
+
+class City_Reference_Store(Configurable_Settings):
+    """Local store of the versions of the city names of each region, with a TTL and a fallback to the bundled snapshots."""
+
+    settings_owner_name = 'city reference store'
+
+    def __init__(self, store_path: str = default_city_reference_path, snapshot_path: str = bundled_city_reference_path, ttl_days: float = 180):
+        self.store_path = store_path
+        self.snapshot_path = snapshot_path
+        self.ttl_days = ttl_days
+        self.loaded_references = {}  # NB: the latest version of each region is only read from disk once per process
+        self.lock = threading.Lock()
+
+    def reset_after_configure(self, settings: dict):
+        """NB: the in-memory copies of the loaded versions are cleared."""
+        self.loaded_references = {}
+
+    def region_path(self, region: str) -> str:
+        return os.path.join(self.store_path, region)
+
+    def versions(self, region: str) -> list:
+        """Return the version numbers of the given region within the local store, in ascending order."""
+        version_numbers = []
+        for path in glob.glob(os.path.join(self.region_path(region), 'v*.json')):
+            match = re.fullmatch(r'v(\d+)\.json', os.path.basename(path))
+            if match is not None:
+                version_numbers.append(int(match.group(1)))
+        return sorted(version_numbers)
+
+    def load(self, region: str, version: int = None) -> City_Reference:
+        """Return the given version (by default, the latest version) of the city names of a region--NB: from the bundled snapshot, if the store has no version of the region yet.
+        Raise a KeyError if neither the store nor the bundled snapshots have the city names of the region."""
+        if version is not None:
+            return City_Reference.from_json(os.path.join(self.region_path(region), f"v{version}.json"))
+        with self.lock:
+            city_reference = self.loaded_references.get(region)
+            if city_reference is not None:
+                return city_reference
+        version_numbers = self.versions(region)
+        if version_numbers:
+            city_reference = City_Reference.from_json(os.path.join(self.region_path(region), f"v{version_numbers[-1]}.json"))
+        else:
+            snapshot_path = os.path.join(self.snapshot_path, f"{region}.json")
+            if not os.path.exists(snapshot_path):
+                raise KeyError(f"There are no city names for the '{region}' region--ie, neither within the city reference store ({self.store_path}) nor the bundled snapshots.")
+            city_reference = City_Reference.from_json(snapshot_path, origin='snapshot')
+        with self.lock:
+            self.loaded_references[region] = city_reference
+        return city_reference
+
+    def is_stale(self, city_reference: City_Reference) -> bool:
+        """Return whether a version of the city names is older than the TTL."""
+        return self.ttl_days is not None and city_reference.age_days() > self.ttl_days
+
+    def load_city_names(self, region: str) -> list:
+        """Return the latest city names of a region, and print a reminder to run the refresh command if they are stale."""
+        city_reference = self.load(region)
+        if self.is_stale(city_reference):
+            print(f"\nNB: the {region} city names are {city_reference.age_days():.0f} days old (ie, older than the TTL of {self.ttl_days} days). To refresh them, run:\npython refresh_city_reference_store.py --region {region}\n")
+        return list(city_reference.city_names)
+
+    def save(self, region: str, city_names: list, source_urls: list = ()) -> City_Reference:
+        """Save the given city names as a new version of the region, and return it."""
+        os.makedirs(self.region_path(region), exist_ok=True)
+        with self.lock:
+            version_numbers = self.versions(region)
+            city_reference = City_Reference(region, version_numbers[-1] + 1 if version_numbers else 1, datetime.datetime.now().strftime(refreshed_at_format), source_urls, city_names)
+            city_reference.to_json(os.path.join(self.region_path(region), f"v{city_reference.version}.json"))
+            self.loaded_references[region] = city_reference
+        return city_reference
+
+
+# city reference store shared by the ETL & the refresh command
+shared_city_reference_store = City_Reference_Store()
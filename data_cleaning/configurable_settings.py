@@ -0,0 +1,31 @@
+"""Mixin for the shared singletons (e.g., shared_rate_limiter, shared_retry_policy, shared_pattern_registry) whose settings are updated after they are instantiated--ie, from the command-line arguments of main.py, the benchmarks, or the refresh command.
+
+Each singleton used to validate & set its settings in its own copy of configure(). Instead, the mixin:
+a.) checks that every given setting is an existing attribute, and raises an AttributeError naming the class (via settings_owner_name) otherwise--NB: before any setting is changed, so a typo does not leave the settings half-updated, and
+b.) sets the settings & then calls reset_after_configure() under the class' lock, so each class only resets the state that depends on its settings (e.g., counts, or in-memory caches)."""
+
+
+class Configurable_Settings(object):
+    """Validate & update the settings of a shared singleton. NB: the class must define a lock (ie, self.lock) that guards its settings."""
+
+    settings_owner_name = 'object'  # ie, the name used in the error message--e.g., 'rate limiter'
+
+    def update_settings(self, settings: dict) -> dict:
+        """Set the given settings, and return the settings whose value has changed. NB: does not acquire the lock, nor reset any state."""
+        for setting in settings:
+            if not hasattr(self, setting):
+                raise AttributeError(f"The {self.settings_owner_name} has no setting named '{setting}'.")
+        changed_settings = {setting: value for setting, value in settings.items() if getattr(self, setting) != value}
+        for setting, value in settings.items():
+            setattr(self, setting, value)
+        return changed_settings
+
+    def configure(self, **kwargs):
+        """Update the settings--e.g., from the command-line arguments of main.py. NB: the state that depends on the settings is reset via reset_after_configure()."""
+        with self.lock:
+            self.update_settings(kwargs)
+            self.reset_after_configure(kwargs)
+
+    def reset_after_configure(self, settings: dict):
+        """Reset the state that depends on the settings--ie, called under the lock after the given settings are set."""
+        pass
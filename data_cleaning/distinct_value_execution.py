@@ -0,0 +1,126 @@
+"""Distinct-value execution mode of the column transforms: ie, factorize a column, apply the transform to each distinct value only once, and take the transformed value of each row back from its distinct value.
+
+The scraped city names, attr_vars, bedrooms & bathrooms (e.g., 'shared'), and sqft data are highly repetitive--e.g., a few thousand distinct city names across millions of rows--yet the column transforms (e.g., clean_split_city_names(), transform_shared_and_split_to_ones(), transform_cols_to_int(), or the indicator variables of parse_attrs()) used to run their regex work on every row.
+So, the transforms run via shared_distinct_value_execution instead, which turns the O(rows) regex work into O(distinct values) work, and records the hit rate of each transform--ie, the share of rows whose transformed value was taken from an already transformed distinct value--for the report printed by the ETL.
+NB: the transformed values are identical to those of the transform applied to the whole column, since each distinct value is transformed by the same (row-wise) transform--and the missing values of different types (e.g., None & NaN), as well as the equal values of different types (e.g., 3 & 3.0), are kept as separate distinct values, since a transform may treat them differently (e.g., the Pandas' str methods)."""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .configurable_settings import Configurable_Settings
+
+
+class Distinct_Value_Stats(object):
+    """Counts of the rows & distinct values processed by a given column transform, over every call."""
+    __slots__ = ('calls', 'rows', 'distinct_values', 'seconds')
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.distinct_values = 0
+        self.seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the rows whose transformed value was taken from an already transformed distinct value."""
+        return 1 - self.distinct_values / self.rows if self.rows else 0.0
+
+
+class Distinct_Value_Execution(Configurable_Settings):
+    """Apply the column transforms to the distinct values of each column, and record the hit rate of each transform.
+    NB: if disabled, each transform is applied to the whole column as is (ie, the row-wise execution mode), but the rows of each call are still recorded."""
+
+    settings_owner_name = 'distinct-value execution mode'
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def reset_after_configure(self, settings: dict):
+        """NB: the recorded stats are reset--e.g., after enabled=False, to compare against the row-wise execution mode."""
+        self.stats = {}
+
+    @staticmethod
+    def distinct_value_positions(values) -> tuple:
+        """Factorize the values. Return a tuple of:
+        a.) the position of the 1st row of each distinct value, and
+        b.) the position (within a.) of the distinct value of each row.
+        NB: the values of an object column are assigned a distinct value per type--ie, the missing values (e.g., None, NaN, or NaT), since Pandas' factorize() assigns every missing value the same code (ie, -1), and the equal values of different types (e.g., 3 & 3.0, or True & 1), which factorize() treats as the same value."""
+        codes, uniques = pd.factorize(values)
+        codes[codes == -1] = len(uniques)
+        values_array = np.asarray(values)
+        if values_array.dtype == object:
+            # NB: if every distinct value is a str (ie, the usual scraped text column), only the types of the missing values need to be looked up
+            typed_rows = np.flatnonzero(codes == len(uniques)) if pd.api.types.infer_dtype(uniques, skipna=True) in ('string', 'empty') else np.arange(len(codes))
+            type_codes, types = pd.factorize(pd.Series(values_array[typed_rows], dtype=object).map(type))
+            if len(types) > 1:
+                codes[typed_rows] = codes[typed_rows] * len(types) + type_codes
+                codes, _ = pd.factorize(codes)
+        _, first_positions = np.unique(codes, return_index=True)
+        # NB: the codes are contiguous (0 to the number of distinct values - 1), so each row's code is the position of its distinct value
+        return first_positions, codes
+
+    def record(self, transform_name: str, rows: int, distinct_values: int, seconds: float):
+        """Record the rows & distinct values processed by a call of the given transform."""
+        with self.lock:
+            transform_stats = self.stats.setdefault(transform_name, Distinct_Value_Stats())
+            transform_stats.calls += 1
+            transform_stats.rows += rows
+            transform_stats.distinct_values += distinct_values
+            transform_stats.seconds += seconds
+
+    def apply(self, series: pd.Series, transform, transform_name: str) -> pd.Series:
+        """Apply a given (row-wise) transform of a Pandas' Series to the distinct values of the series only, and return the transformed series--ie, with the same index as the series."""
+        start_time = time.perf_counter()
+        if not self.enabled:
+            transformed_series = transform(series)
+            self.record(transform_name, len(series), len(series), time.perf_counter() - start_time)
+            return transformed_series
+        first_positions, row_positions = self.distinct_value_positions(series)
+        transformed_distinct_values = transform(series.iloc[first_positions])
+        transformed_series = pd.Series(transformed_distinct_values.to_numpy()[row_positions], index=series.index, name=series.name)
+        self.record(transform_name, len(series), len(first_positions), time.perf_counter() - start_time)
+        return transformed_series
+
+    def apply_to_array(self, values: np.ndarray, transform, transform_name: str):
+        """Apply a given (row-wise) transform of a numpy array--returning an array, or a tuple of arrays, with 1 row per value--to the distinct values only, and take the rows of the transformed array(s) back for each value."""
+        start_time = time.perf_counter()
+        if not self.enabled:
+            transformed = transform(values)
+            self.record(transform_name, len(values), len(values), time.perf_counter() - start_time)
+            return transformed
+        first_positions, row_positions = self.distinct_value_positions(values)
+        transformed = transform(values[first_positions])
+        if isinstance(transformed, tuple):
+            transformed = tuple(transformed_array[row_positions] for transformed_array in transformed)
+        else:
+            transformed = transformed[row_positions]
+        self.record(transform_name, len(values), len(first_positions), time.perf_counter() - start_time)
+        return transformed
+
+    def report(self) -> dict:
+        """Return the calls, rows, distinct values, hit rate & seconds of each transform."""
+        with self.lock:
+            return {
+                transform_name: {
+                    'calls': transform_stats.calls,
+                    'rows': transform_stats.rows,
+                    'distinct_values': transform_stats.distinct_values,
+                    'hit_rate': round(transform_stats.hit_rate, 4),
+                    'seconds': round(transform_stats.seconds, 3),
+                    }
+                for transform_name, transform_stats in self.stats.items()
+                }
+
+    def print_report(self):
+        """Print the hit rate of each transform--ie, a sanity check of the ETL."""
+        print("\nDistinct-value execution report (ie, the rows & distinct values of each column transform):")
+        for transform_name, transform_report in self.report().items():
+            print(f"{transform_name}: {transform_report['rows']} rows, {transform_report['distinct_values']} distinct values, hit rate of {transform_report['hit_rate']:.1%}, {transform_report['seconds']}s")
+
+
+# distinct-value execution mode shared by every column transform of the webcrawler & the ETL
+shared_distinct_value_execution = Distinct_Value_Execution()
@@ -1,7 +1,11 @@
+import re
 import numpy as np
 import pandas as pd
 import os
 
+from .attr_indicator_registry import attr_indicator_rules  # import the registry of the indicator variables (ie, the substrings each indicator variable is parsed from)
+from .distinct_value_execution import shared_distinct_value_execution  # import the distinct-value execution mode of the column transforms (ie, scan each distinct text of a col only once)
+
 ## Perform data cleaning directly on specific lists before transforming the lists into a dictionary of lists:
 
 # cities (ie, city names) data cleaning:
@@ -54,6 +58,71 @@ def clean_scraped_date_posted_data(dict_scraped_lists):
     return [val.replace('T', ' ') for val in dict_scraped_lists['date_posted']]
 
 
+## Clean every scraped list via a single pass per list--ie, the same output as the above functions, but fused into one list comprehension per list (see clean_scraped_lists()):
+
+def clean_cities_kernel(cities: list) -> list:
+    """Transform the 1st char of each word of each city name to upper-case, and remove any parantheses markings--ie, the same as clean_scraped_cities_data(), without rebuilding the list twice."""
+    return [name_str.title().replace('(', '').replace(')', '') for name_str in cities]
+
+
+def clean_listing_ids_kernel(ids: list) -> list:
+    """Remove the 'post id: ' prefix of each listing id--ie, the same as clean_listing_ids()."""
+    ids_prefix = 'post id: '
+    return [i.lstrip(ids_prefix) if ids_prefix in i else i for i in ids]  # NB: .lstrip() removes any of the prefix's chars, not the prefix itself--which is kept as is, since the listing ids themselves are only digits
+
+
+def lowercase_descrips_and_parse_kitchen_kernel(listing_descrips: list) -> tuple:
+    """Transform each listing description to lowercase, and parse whether each listing mentions a kitchen--ie, the same as parse_kitchen_data(), without lowercasing the list in place. Return the lowercase descriptions and the kitchen data.
+    NB: a listing that explicitly specifies 'no kitchen' still contains the substring 'kitchen', so (the same as parse_kitchen_data()) its kitchen data is 1."""
+    lowercase_descrips = [el.lower() for el in listing_descrips]
+    return lowercase_descrips, [1 if 'kitchen' in el else 0 for el in lowercase_descrips]
+
+
+def clean_sqft_kernel(sqft: list) -> list:
+    """Parse the sqft data--ie, the same as clean_scraped_sqft_data(), via str.partition() & str.rpartition() instead of splitting each element into a list of every substring."""
+    sqf_substr = 'ft'
+    return [val.partition(sqf_substr)[0].rpartition(' ')[2] if sqf_substr in val else 'nan' for val in sqft]
+
+
+def clean_bedrooms_kernel(bedrooms: list) -> list:
+    """Parse the bedrooms data--ie, the same as clean_scraped_bedroom_data(), via str.partition() instead of splitting each element into a list of every substring."""
+    bed_substr = 'BR'
+    return [val.strip().partition('/')[0].strip().rsplit(bed_substr, 1)[0] if bed_substr in val else 'nan' for val in bedrooms]
+
+
+def clean_bathrooms_kernel(bathrooms: list) -> list:
+    """Parse the bathrooms data--ie, the same as clean_scraped_bathroom_data(), but only splitting each element up to its 2nd delimiter.
+    NB: (the same as clean_scraped_bathroom_data()) an element containing the bath_substr, but no delimiter, raises an IndexError."""
+    bath_substr = 'Ba'
+    return [val.strip().split('/', 2)[1].strip().rsplit(bath_substr, 1)[0] if bath_substr in val else 'nan' for val in bathrooms]
+
+
+def clean_date_posted_kernel(dates_posted: list) -> list:
+    """Replace the "T" char of each datetime with an empty space--ie, the same as clean_scraped_date_posted_data()."""
+    return [val.replace('T', ' ') for val in dates_posted]
+
+
+def apply_kernel_to_distinct_values(kernel, values: list) -> list:
+    """Apply a given kernel (ie, one of the above ..._kernel() functions) to each distinct value of a list only once, and take the cleaned value of each element of the list from its distinct value. Return the cleaned list.
+    NB: this is only faster for lists with many repeated values (e.g., the bedrooms & bathrooms data, of which there are only a few dozen distinct values)--for lists of mostly distinct values (e.g., the listing ids), hashing each value costs more than cleaning it."""
+    distinct_values = list(dict.fromkeys(values))
+    cleaned_values = dict(zip(distinct_values, kernel(distinct_values)))
+    return list(map(cleaned_values.__getitem__, values))
+
+
+def clean_scraped_lists(dict_scraped_lists: dict) -> dict:
+    """Clean the city names, ids, sqft, bedrooms, bathrooms & date_posted lists, and parse the kitchen list (from the listing descriptions, which are transformed to lowercase) of the dictionary of lists--ie, the same output as calling each of the above clean_scraped...() functions in turn.
+    NB: each list is cleaned via a single pass--ie, of only its distinct values, for the city names, sqft, bedrooms & bathrooms lists--and replaced within the dictionary of lists only once. Return the dictionary of lists."""
+    dict_scraped_lists['cities'] = apply_kernel_to_distinct_values(clean_cities_kernel, dict_scraped_lists['cities'])
+    dict_scraped_lists['ids'] = clean_listing_ids_kernel(dict_scraped_lists['ids'])
+    dict_scraped_lists['listing_descrip'], dict_scraped_lists['kitchen'] = lowercase_descrips_and_parse_kitchen_kernel(dict_scraped_lists['listing_descrip'])
+    dict_scraped_lists['sqft'] = apply_kernel_to_distinct_values(clean_sqft_kernel, dict_scraped_lists['sqft'])
+    dict_scraped_lists['bedrooms'] = apply_kernel_to_distinct_values(clean_bedrooms_kernel, dict_scraped_lists['bedrooms'])
+    dict_scraped_lists['bathrooms'] = apply_kernel_to_distinct_values(clean_bathrooms_kernel, dict_scraped_lists['bathrooms'])
+    dict_scraped_lists['date_posted'] = clean_date_posted_kernel(dict_scraped_lists['date_posted'])
+    return dict_scraped_lists
+
+
 ## Create indicator variables using numpy and Pandas' str.contains() based on scraped rental listing attributes and descriptions  
 def indicator_vars_from_scraped_data(df, col_to_parse, attr_substr):
     """ Parse scraped attribute data by parsing to indicator variable."""
@@ -67,94 +136,130 @@ def indicator_vars_compound_str_contains(df, col_to_parse, attr_substr, attr_doe
     return np.where((df[col_to_parse].str.contains(attr_substr)==True) & ~(df[col_to_parse].str.contains(attr_does_not_contain)==True), 1, 0)
 
 
-# Parse the specific attributes and add to dataframe of scraped data--ie, use the create_indicator...() function above
+## Parse every indicator variable of a given column in a single scan of each text--ie, instead of a separate Pandas' str.contains() scan per indicator variable:
+
+def substrs_to_trie_regex(substrs: list) -> str:
+    """Compile a list of (literal) substrings into a single regex pattern, whose alternatives are nested as a trie--e.g., ['w/d in unit', 'w/d hookups'] becomes 'w/d\\ (?:hookups|in\\ unit)'.
+    NB: the trie lets the regex engine try a single branch per character, rather than each substring in turn, and (at any given position) the longest matching substring is matched, since each optional ending of a shorter substring is greedy."""
+    trie = {}
+    for substr in substrs:
+        node = trie
+        for char in substr:
+            node = node.setdefault(char, {})
+        node[''] = True  # NB: the empty key marks the end of a substring
+
+    def node_to_regex(node: dict) -> str:
+        branches = [re.escape(char) + node_to_regex(child_node) for char, child_node in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        regex = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{regex})?" if '' in node else regex
+
+    return node_to_regex(trie)
+
+
+class Multi_Substring_Matcher(object):
+    """Find which of a list of substrings each text contains, via a single scan of each text (ie, a single regex pattern compiled from all of the substrings--see substrs_to_trie_regex()).
+    NB: the regex engine does not return overlapping matches--e.g., 'townhouse' is matched, but not the 'house' contained within it. So, to find exactly the same substrings as a separate str.contains() of each substring:
+    a.) each matched substring also counts every other substring that it contains (e.g., 'no laundry on site' also counts 'laundry on site'), and
+    b.) any substring whose start overlaps the end of a matched substring (e.g., 'furnished' & 'duplex', which share the 'd') is checked separately--ie, only if the overlapping substring has been matched.
+    NB: given only a few substrings (ie, fewer than min_substrs_per_pattern), each substring is instead looked up directly within each text, since a few of Python's (C-level) substring lookups are faster than a scan via the regex engine--eg, for the 4 appliances parsed from the long listing descriptions."""
+    min_substrs_per_pattern = 8
+
+    def __init__(self, substrs: list):
+        self.substrs = list(dict.fromkeys(substrs))  # remove any duplicates, while keeping the order of the substrings
+        self.substr_index = {substr: j for j, substr in enumerate(self.substrs)}
+        self.pattern = re.compile(substrs_to_trie_regex(self.substrs)) if len(self.substrs) >= self.min_substrs_per_pattern else None
+        # whether each substring (row) contains each other substring (col), including itself
+        self.contains_matrix = np.array([[other_substr in substr for other_substr in self.substrs] for substr in self.substrs], dtype=bool).reshape(len(self.substrs), len(self.substrs))
+        # whether the start of each other substring (col) overlaps the end of each substring (row)
+        self.overlaps_matrix = np.array([
+            [other_substr not in substr and any(substr.endswith(other_substr[:k]) for k in range(1, min(len(substr), len(other_substr)))) for other_substr in self.substrs]
+            for substr in self.substrs
+            ], dtype=bool).reshape(len(self.substrs), len(self.substrs))
+
+    def scan(self, texts) -> tuple:
+        """Scan each of the given texts once. Return a uint8 matrix (1 row per text, and 1 column per substring) of whether each text contains each substring, and a boolean array of which of the texts are strings.
+        NB: any value that is not a string (e.g., NaN for a missing description) contains none of the substrings."""
+        is_text = np.fromiter((isinstance(text, str) for text in texts), dtype=bool, count=len(texts))
+        texts = [text if is_text_row else '' for text, is_text_row in zip(texts, is_text.tolist())]
+        if self.pattern is None:
+            matrix = np.empty((len(texts), len(self.substrs)), dtype=np.uint8)
+            for j, substr in enumerate(self.substrs):
+                matrix[:, j] = np.fromiter((substr in text for text in texts), dtype=bool, count=len(texts))
+            return matrix, is_text
+
+        # a.) find the (non-overlapping) substrings matched within each text, and number each distinct combination of matched substrings--NB: many texts share the same combination
+        findall = self.pattern.findall
+        combination_ids = {}
+        row_combination_ids = np.fromiter((combination_ids.setdefault(frozenset(findall(text)), len(combination_ids)) for text in texts), dtype=np.int64, count=len(texts))
+        n_matched_per_combination = np.fromiter(map(len, combination_ids), dtype=np.int64, count=len(combination_ids))
+        matched_matrix = np.zeros((len(combination_ids), len(self.substrs)), dtype=bool)
+        matched_matrix[
+            np.repeat(np.arange(len(combination_ids)), n_matched_per_combination),
+            np.fromiter((self.substr_index[matched_substr] for matched_substrs in combination_ids for matched_substr in matched_substrs), dtype=np.int64, count=int(n_matched_per_combination.sum()))
+            ] = True
+        # b.) count every substring contained within the matched substrings of each combination, and take each row of the matrix from its combination
+        combinations_matrix = matched_matrix @ self.contains_matrix
+        matrix = combinations_matrix[row_combination_ids].astype(np.uint8)
+        # c.) check any (uncounted) substring that overlaps the end of a matched substring, within only the texts that contain such a matched substring
+        combinations_overlapping_matrix = (matched_matrix @ self.overlaps_matrix) & ~combinations_matrix
+        for i, j in zip(*(indices.tolist() for indices in np.nonzero(combinations_overlapping_matrix[row_combination_ids]))):
+            if self.substrs[j] in texts[i]:
+                matrix[i, j] = 1
+        return matrix, is_text
+
+
+# compile a single matcher per column to parse--ie, once, when the module is imported--from every substring (and excluded substring) of the registry's rules for that column
+attr_indicator_matchers = {
+    col_to_parse: Multi_Substring_Matcher([
+        substr for attr_indicator_rule in attr_indicator_rules if attr_indicator_rule.source_col == col_to_parse for substr in attr_indicator_rule.substrs + attr_indicator_rule.excluded_substrs
+        ])
+    for col_to_parse in dict.fromkeys(attr_indicator_rule.source_col for attr_indicator_rule in attr_indicator_rules)
+    }
+
+
+def indicator_matrix_from_scraped_data(df, col_to_parse: str, indicator_rules: list) -> np.ndarray:
+    """Parse each of the given indicator rules (see attr_indicator_registry.py) from a given column via a single scan of each row. Return a uint8 matrix, with 1 column per indicator rule.
+    NB: the matrix is identical to a separate call of indicator_vars_from_scraped_data() (or indicator_vars_compound_str_contains(), given a substring the column must not contain) per rule--including for missing values:
+    the str.contains() of a missing value is the missing value itself (and of any other non-string value is NaN), which np.where() treats as True (ie, 1)--except for None--while the compound str.contains() compares each str.contains() to True, so any non-string value is 0."""
+    matcher = attr_indicator_matchers[col_to_parse]
+    texts = df[col_to_parse].to_numpy(dtype=object)
+    # NB: the attr_vars are highly repetitive, so each distinct text is scanned only once (see distinct_value_execution.py)
+    substrs_matrix, is_text = shared_distinct_value_execution.apply_to_array(texts, matcher.scan, f"parse_attrs: {col_to_parse}")
+    non_text_is_true = (~is_text & np.fromiter((text is not None for text in texts), dtype=bool, count=len(texts))).astype(np.uint8)
+    indicator_matrix = np.empty((len(df), len(indicator_rules)), dtype=np.uint8)
+    for j, indicator_rule in enumerate(indicator_rules):
+        contains_substr = substrs_matrix[:, [matcher.substr_index[substr] for substr in indicator_rule.substrs]].max(axis=1)
+        if not indicator_rule.excluded_substrs:
+            indicator_matrix[:, j] = contains_substr | non_text_is_true
+        else:
+            indicator_matrix[:, j] = contains_substr & (1 - substrs_matrix[:, [matcher.substr_index[substr] for substr in indicator_rule.excluded_substrs]].max(axis=1))
+    return indicator_matrix
+
+
+def parse_attr_indicator_vars(df, indicator_vars: list = None):
+    """Parse the given indicator variables (or, by default, every indicator variable of the registry) from the dataframe's attr_vars and listing_descrip cols, and add them to the dataframe as uint8 cols, in the order of the registry.
+    NB: each col to parse is scanned once, regardless of the number of indicator variables."""
+    indicator_rules = [attr_indicator_rule for attr_indicator_rule in attr_indicator_rules if indicator_vars is None or attr_indicator_rule.indicator_var in indicator_vars]
+    indicator_cols = {}
+    for col_to_parse in dict.fromkeys(indicator_rule.source_col for indicator_rule in indicator_rules):
+        col_indicator_rules = [indicator_rule for indicator_rule in indicator_rules if indicator_rule.source_col == col_to_parse]
+        indicator_matrix = indicator_matrix_from_scraped_data(df, col_to_parse, col_indicator_rules)
+        for j, indicator_rule in enumerate(col_indicator_rules):
+            indicator_cols[indicator_rule.indicator_var] = indicator_matrix[:, j]
+
+    for indicator_rule in indicator_rules:
+        df[indicator_rule.indicator_var] = indicator_cols[indicator_rule.indicator_var]
+
+
+# Parse the specific attributes and add to dataframe of scraped data--ie, use the parse_attr_indicator_vars() function above
 def parse_attrs(df_from_dict):
-    """Parse specific attributes from the rental listings' descriptions, and create indicator variables that we will add to the dataframe containing the scraped rental listings data. To do this, we will make calls to the above indicator_vars_from_scraped_data() function. """
+    """Parse specific attributes from the rental listings' descriptions, and create indicator variables that we will add to the dataframe containing the scraped rental listings data. The indicator variables are specified by the registry (see attr_indicator_registry.py), and we scan each row of the attr_vars and listing_descrip cols only once (see indicator_matrix_from_scraped_data()), rather than once per indicator variable.
+    NB: the indicator variables are added as uint8 cols, in the order of the registry."""
     ## data wrangling-- parse specific attributes (e.g., 'cats_OK') from the attr_vars and listing_descrip cols:
+    parse_attr_indicator_vars(df_from_dict)
 
-    ## cats_OK & dogs_OK--ie, are cats or dogs allowed on given rental property:
-    df_from_dict['cats_OK'], df_from_dict['dogs_OK'] = indicator_vars_from_scraped_data(df_from_dict,'attr_vars', 'cats are OK'), indicator_vars_from_scraped_data(df_from_dict,'attr_vars', 'dogs are OK')
-    
-    ## wheelchair accessible
-    df_from_dict['wheelchair_accessible'] = indicator_vars_from_scraped_data(df_from_dict,'attr_vars', 'wheelchair accessible')
-    
-    ## Parse laundry and washer+dryer data:
-    # laundry in building
-    df_from_dict['laundry_in_bldg'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'laundry in bldg')
-    # no laundry available on site
-    df_from_dict['no_laundry'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'no laundry on site' )  # no laundry on site
-    # washer and dryer appliances included
-    df_from_dict['washer_and_dryer'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'w/d in unit' ) # parse w_d data-- ie, washer and dryer included
-    # washer and dryer hookup (but no appliances)
-    df_from_dict['washer_and_dryer_hookup'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'w/d hookups' ) # washer and dryer hookup  
-    # laundry services available
-    df_from_dict['laundry_on_site'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'laundry on site' ) # laundry_on_site
-
-    ## Kitchen and household appliances data:
-    # full kitchen data
-    df_from_dict['full_kitchen'] = indicator_vars_from_scraped_data(df_from_dict, 'listing_descrip', 'full kitchen') 
-    # dishwasher included
-    df_from_dict['dishwasher'] = indicator_vars_from_scraped_data(df_from_dict, 'listing_descrip', 'dishwasher') 
-    # refrigerator included
-    df_from_dict['refrigerator'] = indicator_vars_from_scraped_data(df_from_dict, 'listing_descrip', 'refrigerator') 
-    # oven included
-    df_from_dict['oven'] = indicator_vars_from_scraped_data(df_from_dict, 'listing_descrip', 'oven') 
-    
-    ## Flooring attributes: 
-    # carpet flooring
-    df_from_dict['flooring_carpet'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'flooring: carpet')
-    # wood flooring
-    df_from_dict['flooring_wood'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'flooring: wood')
-    # tile flooring
-    df_from_dict['flooring_tile'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'flooring: tile')
-    # hardwood flooring
-    df_from_dict['flooring_hardwood'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'flooring: hardwood')
-    # other/unclassified flooring
-    df_from_dict['flooring_other'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'flooring: other')
-
-    ## Parse rental type data-- NB: At least for the most part, each rental listing on craigslist will always explicitly state what type of home is up for rent.
-    # apartments
-    df_from_dict['apt'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'apartment')  # apt data:
-    # in law 
-    df_from_dict['in_law_apt'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'in-law') # in-law apt--NB: in-law apartments are formally called "Accessory Dwelling Units (ADUs)"". A more detailed description  is available at CA's HCD department: <https://www.hcd.ca.gov/policy-research/accessorydwellingunits.shtml>
-    # condo properties
-    df_from_dict['condo'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'condo') # condo rental type
-    # townhouses
-    df_from_dict['townhouse'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'townhouse')  # townhouse rental type
-    # cottage or cabin
-    df_from_dict['cottage_or_cabin'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'cottage/cabin')  # cottage or cabin
-    # single family homes
-    df_from_dict['single_fam'] = indicator_vars_compound_str_contains(df_from_dict, 'attr_vars', 'house', 'townhouse')  # parse single-family home type listings while also ensuring we also filter out any townhouse listings!    df_from_dict['duplex'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'duplex')  # duplex rental type
-    # duplex
-    df_from_dict['duplex'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'duplex')  # duplex rental type
-    # flat property type
-    df_from_dict['flat'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'flat') # flat (ie, large apartment-like) rental type
-    # land-- e.g., RV lot
-    df_from_dict['land'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'land') # land rental type--e.g., RV parking
-
-    ## furnished rental unit
-    df_from_dict['is_furnished'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'furnished')
-
-    ## Parse garage & parking data: 
-    # attahced garage
-    df_from_dict['attached_garage'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'attached garage') #attached_garage 
-    # detached garage
-    df_from_dict['detached_garage'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'detached garage') # detached_garage
-    # carport
-    df_from_dict['carport'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'carport')  # carport
-    # off street parking
-    df_from_dict['off_street_parking'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'off-street parking') # off_street_parking
-    # no parking options available on site
-    df_from_dict['no_parking'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'no parking')  # no parking 
-
-    # Electrical vehicle charging
-    df_from_dict['EV_charging'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'EV charging') 
-
-    ## air conditioning amenity data
-    df_from_dict['air_condition'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'air conditioning') 
-
-    ## Parse no smoking allowed data
-    df_from_dict['no_smoking'] = indicator_vars_from_scraped_data(df_from_dict, 'attr_vars', 'no smoking') 
 
 def clean_bedroom_studio_apt_data(df, col_to_parse, col_to_assign):
     """Clean bedrooms data for rental listings that comprise studio apartments and have 'nan' values, indicating ."""
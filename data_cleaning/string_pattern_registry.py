@@ -0,0 +1,123 @@
+"""Registry of the compiled regex patterns used by the string cleaning helpers (e.g., clean_split_city_names(), parse_city_names_from_listing_URL(), transform_shared_and_split_to_ones()).
+
+The helpers used to rebuild a pattern string on every call--e.g., '|'.join(neighborhood_criteria)--which Pandas then compiled again, and without escaping the substrings, so 'Ca.' also matched 'Cal' or 'Cat', and a '.' removed every character of a city name.
+Instead, the registry:
+a.) compiles each pattern once, and memoizes it by its input--ie, the list of substrings (or the regex), the case sensitivity, and whether it captures a group,
+b.) escapes the substrings of a list of substrings, so they are matched literally--NB: only a regex given as a single str (e.g., r'\D+') is compiled as is, and
+c.) exposes the contains / extract / replace / split operations used by the helpers, which apply the compiled pattern to each row of a Pandas' Series in a single pass.
+NB: the operations return the same values as the equivalent Pandas' str methods--ie, missing (or non-str) values are returned as NaN, or as the given na value for contains()."""
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .configurable_settings import Configurable_Settings
+
+
+class String_Pattern_Registry(Configurable_Settings):
+    """LRU cache of compiled regex patterns, memoized by the substrings (or regex) they were compiled from."""
+
+    settings_owner_name = 'string pattern registry'
+
+    def __init__(self, max_patterns: int = 512):
+        self.max_patterns = max_patterns
+        self.patterns = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # NB: the registry is shared by the (threaded) webcrawler & the ETL, so the LRU order is updated under a lock
+
+    def reset_after_configure(self, settings: dict):
+        """NB: the compiled patterns, and the cache hit & miss counts, are cleared."""
+        self.patterns.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def pattern(self, substrs_or_regex, case: bool = True, capture: bool = False, whole_value: bool = False) -> re.Pattern:
+        """Return the compiled pattern of either:
+        a.) a list (or tuple) of substrings--ie, an 'OR' alternation of the escaped substrings, in the given order (NB: as with a regex alternation, the first matching substring wins at a given position), or
+        b.) a regex, given as a single str--ie, compiled as is.
+        Optionally, the pattern is case insensitive, wraps the alternation within a capture group (ie, for extract()), or only matches a whole value (ie, '^...$')."""
+        if isinstance(substrs_or_regex, str):
+            cache_key = (substrs_or_regex, case, capture, whole_value)
+        else:
+            cache_key = (tuple(substrs_or_regex), case, capture, whole_value)
+        with self.lock:
+            compiled_pattern = self.patterns.get(cache_key)
+            if compiled_pattern is not None:
+                self.patterns.move_to_end(cache_key)
+                self.hits += 1
+                return compiled_pattern
+            self.misses += 1
+        regex = substrs_or_regex if isinstance(substrs_or_regex, str) else '|'.join(re.escape(substr) for substr in substrs_or_regex)
+        if capture:
+            regex = f"({regex})"
+        if whole_value:
+            regex = f"^(?:{regex})$"
+        compiled_pattern = re.compile(regex, 0 if case else re.IGNORECASE)
+        with self.lock:
+            self.patterns[cache_key] = compiled_pattern
+            while len(self.patterns) > self.max_patterns:
+                self.patterns.popitem(last=False)
+        return compiled_pattern
+
+    def cache_info(self) -> dict:
+        """Return the number of compiled patterns, and the cache hits & misses--e.g., for a sanity check of the ETL."""
+        with self.lock:
+            return {'patterns': len(self.patterns), 'hits': self.hits, 'misses': self.misses}
+
+    ## Operations on each row of a Pandas' Series:
+
+    def contains(self, series: pd.Series, substrs_or_regex, case: bool = True, na=np.nan) -> pd.Series:
+        """Return whether each row contains any of the substrings (or the regex)--ie, the same as Series.str.contains(), but via the compiled pattern."""
+        search = self.pattern(substrs_or_regex, case=case).search
+        return pd.Series([search(text) is not None if isinstance(text, str) else na for text in series], index=series.index, name=series.name)
+
+    def extract(self, series: pd.Series, substrs_or_regex, case: bool = True) -> pd.Series:
+        """Return the first matching substring of each row (ie, the 1st capture group of a regex), else NaN--ie, the same as Series.str.extract(..., expand=False)."""
+        if isinstance(substrs_or_regex, str):
+            compiled_pattern = self.pattern(substrs_or_regex, case=case)
+        else:
+            compiled_pattern = self.pattern(substrs_or_regex, case=case, capture=True)
+        group = 1 if compiled_pattern.groups else 0
+        extracted_vals = []
+        for text in series:
+            match = compiled_pattern.search(text) if isinstance(text, str) else None
+            extracted_vals.append(match.group(group) if match is not None else np.nan)
+        return pd.Series(extracted_vals, index=series.index, name=series.name, dtype=object)
+
+    def replace(self, series: pd.Series, substrs_or_regex, repl: str, case: bool = True, whole_value: bool = False) -> pd.Series:
+        """Replace each occurrence of any of the substrings (or the regex) with repl--ie, the same as Series.str.replace(..., regex=True), but via the compiled pattern."""
+        sub = self.pattern(substrs_or_regex, case=case, whole_value=whole_value).sub
+        return pd.Series([sub(repl, text) if isinstance(text, str) else np.nan for text in series], index=series.index, name=series.name, dtype=object)
+
+    def replace_from_dict(self, series: pd.Series, replacements: dict, case: bool = True) -> pd.Series:
+        """Replace each occurrence of the keys (ie, substrings) of the replacements dictionary with their values, via a single pass of each row.
+        NB: the keys are matched longest first, so a key that contains another key (e.g., 'Westgate On Saratoga .' & '.') is replaced as a whole."""
+        if not replacements:
+            return series
+        substrs = sorted(replacements, key=len, reverse=True)
+        sub = self.pattern(substrs, case=case).sub
+        if case:
+            replace_match = lambda match: replacements[match.group(0)]
+        else:
+            lowercase_replacements = {substr.lower(): repl for substr, repl in replacements.items()}
+            replace_match = lambda match: lowercase_replacements[match.group(0).lower()]
+        return pd.Series([sub(replace_match, text) if isinstance(text, str) else np.nan for text in series], index=series.index, name=series.name, dtype=object)
+
+    def split_part(self, series: pd.Series, substrs_or_regex, part: int) -> pd.Series:
+        """Split each row on any of the substrings (or the regex), and return the given part (e.g., 0 for the first, -1 for the last)--ie, the same as Series.str.split(...).str[part]."""
+        split = self.pattern(substrs_or_regex).split
+        split_vals = []
+        for text in series:
+            if not isinstance(text, str):
+                split_vals.append(np.nan)
+                continue
+            parts = split(text)
+            split_vals.append(parts[part] if -len(parts) <= part < len(parts) else np.nan)
+        return pd.Series(split_vals, index=series.index, name=series.name, dtype=object)
+
+
+# registry of compiled patterns shared by every string cleaning helper
+shared_pattern_registry = String_Pattern_Registry()
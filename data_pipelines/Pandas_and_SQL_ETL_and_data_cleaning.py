@@ -26,6 +26,23 @@ from selenium.webdriver.chrome.options import Options  # Options enables us to t
 
 import requests
 
+# import the rate limiter shared by every GET request of the webcrawler--NB: run the ETL as a module from the project's root directory (ie, python -m data_pipelines.Pandas_and_SQL_ETL_and_data_cleaning), so the Rentals & data_cleaning packages can be imported
+from Rentals.rate_limiter import shared_rate_limiter
+# import the pool of reusable (headless) Chrome webdrivers shared by every part of the webcrawler
+from Rentals.webdriver_setup import shared_webdriver_pool
+# import the HTTP response cache shared by every non-browser GET request, so--once the cache is enabled--the wikipedia city names tables are not downloaded again on every refresh
+from Rentals.http_response_cache import shared_http_response_cache
+# import the registry of the indicator variables, and the cols of the rental table (ie, the INSERT INTO statement) generated from it
+from data_cleaning.attr_indicator_registry import attr_indicator_vars, rental_table_df_cols, rental_table_insert_statement
+# import the registry of compiled (and escaped) regex patterns shared by the string cleaning helpers
+from data_cleaning.string_pattern_registry import shared_pattern_registry
+# import the distinct-value execution mode of the column transforms--ie, clean each distinct value of a col only once--and its hit rate report
+from data_cleaning.distinct_value_execution import shared_distinct_value_execution
+# import the versioned local store of the city names of each region, so the ETL does not scrape the wikipedia tables on every run
+from data_cleaning.city_reference_store import shared_city_reference_store
+# lxml library to parse the city names tables from the raw HTML of the wikipedia pages
+from lxml import html as lxml_html
+
 ## Data pipeline of Pandas' df to SQL Server -- import scraped craigslist rental listings data from CSV files to single Pandas' df: 
 
 # 1) Prompt user to select region in which update database via newest scraped data , and then import all scraped data for given region
@@ -104,6 +121,8 @@ def import_all_CSV_since_latest_date_and_concat_to_df(parent_direc:str, region_c
     # recursively iterate over parent directory and all of its subdirectories, to get paths to all CSV files
     for dirs, subdirs, files in os.walk(path):
 
+        # skip the CSV files written by the offline reparse mode (see reparse_html_archive.py), since they re-parse listings that have already been scraped
+        subdirs[:] = [subdir for subdir in subdirs if subdir != 'reparsed']
 
         # iterate over each file within parent directory and all subdirectories
         for file in files:
@@ -120,7 +139,7 @@ def import_all_CSV_since_latest_date_and_concat_to_df(parent_direc:str, region_c
     print(f"\n\nSome scraped data CSV file paths:\n{df['files'].head()}\n")
     
     # # Parse the dates from each CSV file, and keep the same 'MM_DD_YYY' format (**including the underscore delimiters!!), as the webcrawler CSV file naming convention:
-    df['date_of_file'] = df['files'].str.extract(r'(\d{2}_\d{2}_\d{4})')
+    df['date_of_file'] = shared_pattern_registry.extract(df['files'], r'(\d{2}_\d{2}_\d{4})')
 
     # convert col to datetime
     df['date_of_file'] = pd.to_datetime(df['date_of_file'], format='%m_%d_%Y')
@@ -306,20 +325,13 @@ class SQL_Database:
         # ## get a subset of the df columns
         # df = df[['ids', 'sqft', 'cities', 'prices', 'bedrooms', 'date_posted']]
 
-        # Get the number of needed '?' placeholders (ie, best practice to help prevent SQL injections) by looking up the # of cols (ie, len()) of the dataframe), and use .join() to have each question mark seprated by commas:
-        q_mark_str = ','.join('?'*len(df.columns))    # get '?' placeholders for each col of df
+        # Get the INSERT INTO statement--with a '?' placeholder per col (ie, best practice to help prevent SQL injections)--and the order of the df's cols to insert, from the registry of the indicator variables (see attr_indicator_registry.py):
+        insert_statement = rental_table_insert_statement('rental')
 
         try:  # try to make data inserts into SQL table
             # specify INSERT INTO SQL statement--iterate over each row in df, and insert into SQL database:
-            for row in df.itertuples():  # iterate over each row from df
-                cursor.execute(f"""INSERT INTO rental (listing_id, sqft, city, price, bedrooms, bathrooms, attr_vars,
-                date_of_webcrawler, kitchen, date_posted, region, sub_region, cats_OK, dogs_OK, wheelchair_accessible,laundry_in_bldg, no_laundry, 
-                washer_and_dryer, washer_and_dryer_hookup, laundry_on_site, full_kitchen, dishwasher, refrigerator,
-                oven,flooring_carpet, flooring_wood, flooring_tile, flooring_hardwood, flooring_other, 
-                apt, in_law_apt, condo, townhouse, cottage_or_cabin, single_fam, duplex, flat, land,
-                is_furnished, attached_garage, detached_garage, carport, off_street_parking, no_parking, EV_charging, air_condition, no_smoking) 
-                VALUES ({q_mark_str})""",
-
+            for row in df[rental_table_df_cols].itertuples(index=False, name=None):  # iterate over each row from df, as a tuple of the cols in the order of the rental table's cols
+                cursor.execute(insert_statement, row)
 
                 # # NB!: try the following query to help ensure
                 # # create temp table to insert all data from the pipeline, which we will then use for a MERGE statement to provide a WHEN NOT MATCHED clause to ensure no duplicate ids will be spring up when actually inserting the data into the actual, long-term table
@@ -336,55 +348,6 @@ class SQL_Database:
                 #     INSERT(col1, col2, col3, col4)
                 #     VALUES(source.col1, source.col2, source.col3, source.col4);
 
-                (row.ids,
-                row.sqft,
-                row.cities,
-                row.prices, 
-                row.bedrooms,
-                row.bathrooms,
-                row.attr_vars, 
-                row.date_of_webcrawler,
-                row.kitchen,
-                row.date_posted,
-                row.region,
-                row.sub_region,
-                row.cats_OK,
-                row.dogs_OK,
-                row.wheelchair_accessible,
-                row.laundry_in_bldg, 
-                row.no_laundry,
-                row.washer_and_dryer,
-                row.washer_and_dryer_hookup,
-                row.laundry_on_site,
-                row.full_kitchen,
-                row.dishwasher,
-                row.refrigerator,
-                row.oven,
-                row.flooring_carpet,
-                row.flooring_wood,
-                row.flooring_tile,
-                row.flooring_hardwood,
-                row.flooring_other,
-                row.apt, 
-                row.in_law_apt,
-                row.condo,
-                row.townhouse,
-                row.cottage_or_cabin,
-                row.single_fam, 
-                row.duplex,
-                row.flat,
-                row.land,
-                row.is_furnished,
-                row.attached_garage,
-                row.detached_garage,
-                row.carport,
-                row.off_street_parking,
-                row.no_parking,
-                row.EV_charging,
-                row.air_condition,
-                row.no_smoking)
-                )
-
             # save and commit changes to database
             conn.commit()
 
@@ -483,12 +446,28 @@ def remove_nulls_list(df, list_of_cols):
 
 # access page, and grab city names, append to list
 
+def obtain_wiki_page_tree(webpage_url):
+    """Download the given wikipedia page via the HTTP response cache (see Rentals/http_response_cache.py)--ie, the city names tables are only downloaded again once their cached copy expires--and return the page's lxml tree, or None if the page could not be downloaded.
+    NB: the raw HTML does not contain the 'jquery-tablesorter' class of the wiki tables, which is only added via JavaScript."""
+    page_source = shared_http_response_cache.get_text(webpage_url, shared_rate_limiter)
+    return lxml_html.fromstring(page_source) if page_source is not None else None
+
 def obtain_cities_from_wiki_sfbay(webpage_url,list_of_cities):
+    # look up the city names from the (cached) raw HTML of the wiki page first, and only fall back to the webdriver if the wiki table cannot be found
+    wiki_page_tree = obtain_wiki_page_tree(webpage_url)
+    raw_html_tables = wiki_page_tree.xpath('//table[@class="wikitable plainrowheaders sortable"]') if wiki_page_tree is not None else []
+    if raw_html_tables:
+        for row in raw_html_tables[0].xpath('.//tr'): # iterate over each row in the table
+            for city_name in row.xpath('.//th')[:2]: # skip first 2 rows
+                list_of_cities.append(' '.join(city_name.text_content().split()))
+        return list_of_cities
+
     # initialize web driver
             
-    driver = webdriver.Chrome()  # install or update latest Chrome webdriver using using ChromeDriverManager() library
+    driver = shared_webdriver_pool.borrow()  # borrow a webdriver from the shared webdriver pool, rather than launching a new browser
     
-    # access webpage
+    # access webpage--NB: wait until wikipedia's rate limiter allows another GET request
+    shared_rate_limiter.acquire(webpage_url)
     driver.get(webpage_url)
 
     # specify xpath to wiki table containing the city names data:
@@ -527,19 +506,27 @@ def obtain_cities_from_wiki_sfbay(webpage_url,list_of_cities):
             list_of_cities.append(city_name.text)
 
 
-    # exit webpage 
-    driver.close()
+    # exit webpage--ie, return the webdriver to the webdriver pool
+    shared_webdriver_pool.release(driver)
 
 
     return list_of_cities
 
 # Santa Cruz data from wiki
 def obtain_cities_from_wiki_sc(webpage_url,list_of_cities):
+    # look up the city names from the (cached) raw HTML of the wiki page first, and only fall back to the webdriver if the wiki table cannot be found--NB: select the 2nd table, the same way as the webdriver's xpath
+    wiki_page_tree = obtain_wiki_page_tree(webpage_url)
+    raw_html_city_names = wiki_page_tree.xpath('//table[@class="wikitable sortable"][2]//tr//td[2]') if wiki_page_tree is not None else []
+    if raw_html_city_names:
+        list_of_cities.extend(' '.join(city_name.text_content().split()) for city_name in raw_html_city_names)
+        return list_of_cities
+
     # initialize web driver
             
-    driver = webdriver.Chrome()  # install or update latest Chrome webdriver using using ChromeDriverManager() library
+    driver = shared_webdriver_pool.borrow()  # borrow a webdriver from the shared webdriver pool, rather than launching a new browser
     
-    # access webpage
+    # access webpage--NB: wait until wikipedia's rate limiter allows another GET request
+    shared_rate_limiter.acquire(webpage_url)
     driver.get(webpage_url)
 
     # specify xpath for the corresponding wiki data tables--NB!: there are 2 tables with the same class name; only select data from the 2nd one
@@ -575,8 +562,8 @@ def obtain_cities_from_wiki_sc(webpage_url,list_of_cities):
 
 
 
-    # exit webpage 
-    driver.close()
+    # exit webpage--ie, return the webdriver to the webdriver pool
+    shared_webdriver_pool.release(driver)
 
     # # sanity check
     # print(f'List of city names:\n{list_of_cities}')
@@ -585,11 +572,20 @@ def obtain_cities_from_wiki_sc(webpage_url,list_of_cities):
 
 
 def obtain_cities_from_wiki_maricopa_AZ(webpage_url,list_of_cities):
-    driver = webdriver.Chrome()  # install or update latest Chrome webdriver using using ChromeDriverManager() library
-    
     webpage_url = 'https://en.wikipedia.org/wiki/Category:Cities_in_Maricopa_County,_Arizona'
 
-    # access webpage
+    # look up the city names from the (cached) raw HTML of the wiki page first, and only fall back to the webdriver if the city names cannot be found
+    wiki_page_tree = obtain_wiki_page_tree(webpage_url)
+    raw_html_tables = wiki_page_tree.xpath('//*[@id="mw-subcategories"]/div') if wiki_page_tree is not None else []
+    raw_html_city_names = [city_name for row in raw_html_tables[:1] for table_row in row.xpath('.//tr') for city_name in table_row.xpath('.//th')[:2]]
+    if raw_html_city_names:
+        list_of_cities.extend(' '.join(city_name.text_content().split()) for city_name in raw_html_city_names)
+        return list_of_cities
+
+    driver = shared_webdriver_pool.borrow()  # borrow a webdriver from the shared webdriver pool, rather than launching a new browser
+
+    # access webpage--NB: wait until wikipedia's rate limiter allows another GET request
+    shared_rate_limiter.acquire(webpage_url)
     driver.get(webpage_url)
 
     # specify xpath to wiki table containing the city names data:
@@ -628,8 +624,8 @@ def obtain_cities_from_wiki_maricopa_AZ(webpage_url,list_of_cities):
             list_of_cities.append(city_name.text)
 
 
-    # exit webpage 
-    driver.close()
+    # exit webpage--ie, return the webdriver to the webdriver pool
+    shared_webdriver_pool.release(driver)
 
 
     return list_of_cities
@@ -644,14 +640,52 @@ def add_dash_delimiter_in_bw_each_word_of_city_names(city_names:list):
     return [word.replace(' ', '-') for word in city_names]  # use str.replace() method to replace whitespaces with dashes
 
 
+# specify the wiki pages of the city names of each region
+city_names_wiki_urls = {
+    'sfbay': ['https://en.wikipedia.org/wiki/List_of_cities_and_towns_in_the_San_Francisco_Bay_Area', 'https://en.wikipedia.org/wiki/Santa_Cruz_County,_California#Population_ranking'],  # SF Bay Area & Santa Cruz county city names
+    'phoenix': ['https://en.wikipedia.org/wiki/Category:Cities_in_Maricopa_County,_Arizona'],
+    }
+
+def obtain_city_names_from_wiki(region_code: str) -> list:
+    """Scrape the list of all city names of a given region from the wikipedia tables, and clean the list--NB: only run by the refresh command of the city reference store (see refresh_city_reference_store.py), since the ETL loads the city names from the store instead."""
+    if region_code == 'sfbay':
+        sfbay_cities_wiki_url, sc_county_cities_wiki_url = city_names_wiki_urls['sfbay']
+        #sfbay data
+        sfbay_city_names = obtain_cities_from_wiki_sfbay(sfbay_cities_wiki_url, [])
+        # remove remaining col names:
+        sfbay_city_names = sfbay_city_names[4:]
+        print(f'There are {len(sfbay_city_names)} city names\nNB: There should be 101.')
+        # Santa Cruz data from wiki
+        sc_county_city_names = obtain_cities_from_wiki_sc(sc_county_cities_wiki_url, [])
+        #  # clean data by removing extraneous '†' char from city names lists
+        sc_county_city_names = list(map(lambda x: x.replace('†',''), sc_county_city_names))
+        sfbay_city_names = list(map(lambda x: x.replace('†',''), sfbay_city_names))
+        ## finally, remove any whitespace from lists-- use list comprehension
+        sc_county_city_names = [s for s in sc_county_city_names if s.strip()]
+        sfbay_city_names = [s for s in sfbay_city_names if s.strip()]
+        print(f'There are {len(sc_county_city_names)} city names for SC county.')
+        combine_lists(sfbay_city_names, sc_county_city_names)
+        return sfbay_city_names
+
+    elif region_code == 'phoenix':
+        #AZ data
+        AZ_phx_city_names = obtain_cities_from_wiki_maricopa_AZ(city_names_wiki_urls['phoenix'][0], [])
+        # remove remaining col names:
+        AZ_phx_city_names = AZ_phx_city_names[4:]
+        print(f'There are {len(AZ_phx_city_names)} city names\nNB: There should be ?.')
+        return AZ_phx_city_names
+
+    else:
+        raise KeyError(f"There are no wikipedia pages of city names for the '{region_code}' region.")
+
+
 # clean city names by matching scraped craigslist data to that of the wikipedia table data:
 def parse_city_names_from_listing_URL(df, unique_city_names_dash_delim:list):
     """ First, check whether a given listing is of the newer variety--since January 
     2023--and if so, perform the following data cleaning steps:
     
-    1) Use str.contains() method chained to a .join() method in which we perform an 'OR' boolean via
-    the pipe (ie, '|' operator--ie, so we can search for multiple substrings (ie, each element 
-    from the list arg) to look up any matching instances of city names
+    1) Use the compiled 'OR' pattern of the city names (ie, each element 
+    from the list arg, escaped and joined via pipes--see string_pattern_registry.py) to look up any matching instances of city names
     from the unique_city_names... list 
     relative to the rental listing URLs (ie, listing_urls).
 
@@ -669,14 +703,10 @@ def parse_city_names_from_listing_URL(df, unique_city_names_dash_delim:list):
     # city names col
     df['cities'] = df['cities'].str.lower()  # apply lowercase to all characters of each row's string vals 
 
-    # specify pipe operator, which we can use as a Boolean "OR" operator for the str.contains() method
-    pipe_operator = '|'
-
     # URL substring path to look up whether the URL contains the listing's city name
     url_path_with_city_names = '/apa/d'
 
-    # specify a regex pattern for a str.extract() method--NB: we need to wrap the pattern within a sort of tuple by using parentheses in strings--ie, '( )', so like the following format: '( regex_pattern...)'
-    unique_city_names_dash_delim_pattern = '(' + pipe_operator.join(unique_city_names_dash_delim)+')'  # wrap the city names regex pattern within a 'string' tuple: ie, '(...)'
+    # NB: the registry compiles the 'OR' pattern of the city names--wrapped within a capture group for extract()--once per list of city names, and escapes each city name (e.g., the '.' of 'st.-helena')
 
 
 
@@ -699,7 +729,7 @@ def parse_city_names_from_listing_URL(df, unique_city_names_dash_delim:list):
 
     
             # replace cities with matching city names wrt listing_urls_for_str_match col from regex pattern (ie, derived from list of names), using str.extract() 
-            df['cities'] = df['listing_urls'].str.extract(unique_city_names_dash_delim_pattern, expand=False)
+            df['cities'] = shared_pattern_registry.extract(df['listing_urls'], unique_city_names_dash_delim)
             # sanity check
             print(df['cities'])
 
@@ -707,16 +737,16 @@ def parse_city_names_from_listing_URL(df, unique_city_names_dash_delim:list):
 
 
             # replace cities with matching city names wrt listing_urls_for_str_match col from regex pattern (ie, derived from list of names), using str.extract() 
-            df['cities'] = df['cities'].str.extract(unique_city_names_dash_delim_pattern, expand=False, regex=True)
+            df['cities'] = shared_pattern_registry.extract(df['cities'], unique_city_names_dash_delim)
 
         return df
 
 def clean_city_names(df, col):
     """REmove literal 'Nan' from cities col"""
-    return df[col].str.replace('Nan', ' ', regex=True)
+    return shared_pattern_registry.replace(df[col], ['Nan'], ' ')
 
 def remove_dashes_from_words_in_col(df, col):
-    return df[col].str.replace('-', ' ', regex=True)
+    return shared_pattern_registry.replace(df[col], ['-'], ' ')
 
 
 def capitalize_each_word_in_row_for_col(df, col):
@@ -746,39 +776,35 @@ def clean_split_city_names(df, address_critera: list, neighborhood_criteria:list
     h.) Use str.capwords() to capitalize words (ie, excluding apostrophes).
     i.) Replace city names that are mispelled after having removed various street and neighborhood substrings such as 'St' or 'Ca'--e.g., '. Helena' should be 'St. Helena'. 
     j) Remove any remaining empty strings, null records, or rows with literal 'nan' values (ie, resulting from previous data cleaning steps)"""
-    # specify extraneous street & address data (e.g., 'Rd') that we want to remove from the city names column:
-    addr_criteria = '|'.join(address_critera) # Join pipe ('|') symbols to address list so we can str.split() on any one of these criteria (ie, 'or' condition splitting on each element separated by pipes):
-    # specify extraneous neighborhood criteria that we should also remove from the column
-    nbhood_criteria = '|'.join(neighborhood_criteria) # specify neighborhood names as well as state abbreviation (shown on website as ' Ca') that is shown without the usual comma delimiter, which we should remove from the rows of cities col
-    # b.) specify delimiters we need to refer to un-split city names:
-    split_city_delimiters = '|'.join(split_city_delimiters) # join pipes to delimiters so we can use str.split() based on multiple 'or' criteria simultaneously
-    # clean city names data by removing extraneous address & neighborhood data, and unsplitting city names based on ',' & '\' delimiters
-    df['cities'] =  df['cities'].str.split(addr_criteria).str[-1].str.replace(nbhood_criteria, '', case=True).str.lstrip()
-    df['cities'] = df['cities'].str.split(split_city_delimiters).str[0] #unsplit city names based on comma or forward-slash delimiters
-    # c.) replace specific abbreviated or mispelled city names
-    df = df.replace({'cities':incorrect_city_names}, regex=True) # replace mispelled & abbreviated city names
-    # ci) Set all city names data to lower-case temporarily, to ease the data cleaning & wrangling:
-    df['cities'] = df['cities'].str.lower()
-    
-    # d) remove data in which the cities are not actually located in the sfbay region:
-    df['cities'] = df['cities'].replace(cities_not_in_region, '', regex=True )  # remove (via empty string) cities that are not actually located in the sfbay region
-    # e.) Remove digits & integer-like data from cities column:
-    df['cities'] = df['cities'].str.replace('\d+', '')  # remove any digits by using '/d+' regex to look up digits, and then replace with empty string
-    # f.) Remove any rows that have empty strings or null values for cities col (having performed the various data filtering and cleaning above)
-    df = df[df['cities'].str.strip().astype(bool)] # remove rows with empty strings (ie, '') for cities col 
-    df = df.dropna(subset=['cities']) # remove any remaining 'cities' null records
-    # g.) Remove whitespace
-    df['cities'] = df['cities'].str.strip() 
-    # h.) capitalize the city names using str.capwords() 
-    df['cities'] = df['cities'].str.split().apply(lambda x: [val.capitalize() for val in x]).str.join(' ')
-    # i) Replace city names that are mispelled after having removed various street and neighborhood substrings such as 'St' or 'Ca'--e.g., '. Helena' should be 'St. Helena' & 'San los' should be 'San Carlos'. Also, remove any non-Bay Area cities such as Redding:
-    df = df.replace({'cities':cities_that_need_extra_cleaning})
-    # j) Remove any remaining empty strings, null records, or rows with literal 'nan' values (ie, resulting from previous data cleaning steps)
-    # remove rows with literal 'nan' values
-    df['cities'] = df['cities'].replace('nan', '', regex=True)
-
+    def clean_split_city_names_values(cities: pd.Series) -> pd.Series:
+        """Row-wise steps of the city names cleaning (ie, excluding the removal of rows), so they can be applied to the distinct city names only."""
+        # NB: each list of criteria (ie, extraneous street & address data such as 'Rd', neighborhood names such as 'Downtown' or the state abbreviation shown on website as ' Ca', and the delimiters of split city names) is compiled by the pattern registry into a single 'OR' pattern--ie, escaped, so 'Ca.' only matches a literal 'Ca.'--once per list, rather than on every call
+        # clean city names data by removing extraneous address & neighborhood data, and unsplitting city names based on ',' & '\' delimiters
+        cities = shared_pattern_registry.split_part(cities, address_critera, -1)
+        cities = shared_pattern_registry.replace(cities, neighborhood_criteria, '').str.lstrip()
+        cities = shared_pattern_registry.split_part(cities, split_city_delimiters, 0) #unsplit city names based on comma or forward-slash delimiters
+        # c.) replace specific abbreviated or mispelled city names--NB: a single pass of each row, in which the (escaped) substrings are matched longest first
+        cities = shared_pattern_registry.replace_from_dict(cities, incorrect_city_names) # replace mispelled & abbreviated city names
+        # ci) Set all city names data to lower-case temporarily, to ease the data cleaning & wrangling:
+        cities = cities.str.lower()
+
+        # d) remove data in which the cities are not actually located in the sfbay region:
+        cities = shared_pattern_registry.replace(cities, list(cities_not_in_region), '', case=False)  # remove (via empty string) cities that are not actually located in the sfbay region--NB: case insensitive, since the city names are now lower-case
+        # e.) Remove digits & integer-like data from cities column:
+        cities = shared_pattern_registry.replace(cities, r'\d+', '')  # remove any digits by using '/d+' regex to look up digits, and then replace with empty string
+        # g.) Remove whitespace
+        cities = cities.str.strip()
+        # h.) capitalize the city names using str.capwords()--NB: the null city names are left as is, and removed below
+        cities = cities.map(lambda city: ' '.join(val.capitalize() for val in city.split()), na_action='ignore')
+        # i) Replace city names that are mispelled after having removed various street and neighborhood substrings such as 'St' or 'Ca'--e.g., '. Helena' should be 'St. Helena' & 'San los' should be 'San Carlos'. Also, remove any non-Bay Area cities such as Redding:
+        cities = cities.replace(cities_that_need_extra_cleaning)
+        # j) remove rows with literal 'nan' values (ie, resulting from previous data cleaning steps)
+        return shared_pattern_registry.replace(cities, ['nan'], '', case=False, whole_value=True)  # NB: only a whole 'nan' value, so city names such as 'san fernando' are left as is--and case insensitive, since step h.) has already capitalized it as 'Nan'
+
+    # clean each distinct city name only once, and take the cleaned city name of each row from its distinct city name (see distinct_value_execution.py)
+    df['cities'] = shared_distinct_value_execution.apply(df['cities'], clean_split_city_names_values, 'clean_split_city_names')
+    # f.) & j) Remove any rows that have empty strings or null values for cities col (having performed the various data filtering and cleaning above)--NB: a row whose city name is emptied by any of the steps above is left empty by the later steps
     df = df[df['cities'].str.strip().astype(bool)] # remove rows with empty strings (ie, '') for cities col 
-     
     df = df.dropna(subset=['cities']) # remove any remaining 'cities' null records
     return df
 
@@ -792,15 +818,21 @@ def transform_cols_to_indicators(df, list_of_cols):
     return df
 
 
+def clean_sqft_values(sqft: pd.Series) -> pd.Series:
+    """Remove all non-numeric data from the sqft values, and replace the empty str sqft values with null ('NaN') values."""
+    sqft = shared_pattern_registry.replace(sqft.astype(str), r'\D+', '')
+    return sqft.replace(r'^\s*$', np.nan, regex=True)
+
+
 def transform_cols_to_int(df, list_of_cols_to_num):
     """ Transform relevant attribute columns to numeric.
     NB: Since the scraped 'prices' data can contain commas, we need to use str.replace(',','') to remove them before converting to numeric."""
-    df['prices'] = df['prices'].str.replace(",","") # remove commas from prices data (e.g.: '2500' vs '2,500')
+    # NB: the prices & sqft data are highly repetitive, so each transform is applied to the distinct values of the col only (see distinct_value_execution.py)
+    df['prices'] = shared_distinct_value_execution.apply(df['prices'], lambda prices: shared_pattern_registry.replace(prices, [','], ''), 'transform_cols_to_int: prices') # remove commas from prices data (e.g.: '2500' vs '2,500')
     # clean sqft data --remove all non-numeric data
-    df['sqft'] = df['sqft'].astype(str).str.replace(r'\D+', '', regex=True) # remove all non-numeric data from 'sqft' col by using regex to replace any non-numeric data from col to null ('NaN') values via the str.replace() Pandas method
-    df['sqft'] = df['sqft'].replace(r'^\s*$', np.nan, regex=True)  # replace all empty str sqft values with  null ('NaN') values 
+    df['sqft'] = shared_distinct_value_execution.apply(df['sqft'], clean_sqft_values, 'transform_cols_to_int: sqft') # remove all non-numeric data from 'sqft' col by using regex to replace any non-numeric data from col to null ('NaN') values, including the empty str sqft values
     # clean prices data-- remove any records posted with sqft instead of price data
-    df = df[~df.prices.str.contains("ft2", na=False)] # remove listings records with incorrectly posted prices data 
+    df = df[~shared_distinct_value_execution.apply(df['prices'], lambda prices: shared_pattern_registry.contains(prices, ['ft2'], na=False), 'transform_cols_to_int: prices with ft2').astype(bool)] # remove listings records with incorrectly posted prices data 
     # remove rows with any remaining null rows wrt list of cols (ie, sqft, prices, etc.) (so we can readily convert to int):
     df = df.dropna(subset=list_of_cols_to_num) # remove rows with null data 
     # finally, convert all cols from list to 'int64' integer data type:
@@ -815,17 +847,16 @@ def transform_shared_and_split_to_ones(df: DataFrame, col_to_transform: str):
     # transform col to object, so we can use Python str methods to transform the data
     # df[col_to_transform] = df[col_to_transform].astype('object') 
 
-    df[col_to_transform] = df[col_to_transform].astype(str)
-    bedroom_replace_criteria = ['shared', 'split']
-    bedroom_replace_criteria = '|'.join(bedroom_replace_criteria) # join pipe symbols so we can use str.replace() on multiple 'or' conditions simultaneously 
-    return df[col_to_transform].str.replace(bedroom_replace_criteria,'1')
+    bedroom_replace_criteria = ['shared', 'split']  # NB: compiled by the pattern registry into a single 'OR' pattern, so both are replaced simultaneously
+    # NB: the col has only a few dozen distinct values, so the col is transformed to str, and the replacement is applied, for each distinct value only once (see distinct_value_execution.py)
+    return shared_distinct_value_execution.apply(df[col_to_transform], lambda col: shared_pattern_registry.replace(col.astype(str), bedroom_replace_criteria, '1'), 'transform_shared_and_split_to_ones')
     # return df[col_to_transform].str.replace(bedroom_replace_criteria,'')
 
 
 # replace any ambiguous values for bathrooms data--such as '9+' with empty strings (ie, essentially nulls) 
 def replace_ambiguous_data_with_empty_str(df: DataFrame, col_to_transform: str):
     """Replace ambiguous rows of data (ie, any containing a plus sign) for bathrooms col with empty strings"""
-    return df[col_to_transform].str.replace(r'\+', '')  # use str.replace() to use a regex to search for plus signs, and in effect remove these by replacing them with empty strings 
+    return shared_distinct_value_execution.apply(df[col_to_transform], lambda col: shared_pattern_registry.replace(col, ['+'], ''), 'replace_ambiguous_data_with_empty_str')  # search for (literal) plus signs, and in effect remove these by replacing them with empty strings 
 
 # def remove_bedroom_and_br_nulls(df: DataFrame):
 #     df[['bedrooms', 'bathrooms']] = df.dropna(subset=['bedrooms', 'bathrooms'])
@@ -943,8 +974,8 @@ def main():
     # # 1) a) Import all scraped rental listings data from given region:
 
     # specify path to scraped data
-    # get root directory of project by getting parent directory (ie, using os's .pardir method) 
-    parent_directory = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    # get root directory of project by getting the parent directory of this script's directory (ie, using os's .pardir method)--NB: so the path does not depend on the current working directory
+    parent_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 
     print(f"\nParent (root) directory:\n{parent_directory}\n")
 
@@ -1116,106 +1147,20 @@ def main():
     ## Clean city names data
 
     # clean city names data:
-    # NB: run a wikipedia table webcrawler to get a list of all possible city names SF Bay city names:
-
-    if region_code == 'sfbay':
-        # initialize lists:
-        sfbay_city_names = []
-
-        # sf bay area city names wiki page:
-        sfbay_cities_wiki_url = 'https://en.wikipedia.org/wiki/List_of_cities_and_towns_in_the_San_Francisco_Bay_Area'
-
-
-        #sfbay data
-        obtain_cities_from_wiki_sfbay(sfbay_cities_wiki_url, sfbay_city_names)
-        
-
-        # remove remaining col names:
-        sfbay_city_names = sfbay_city_names[4:]
+    # NB: load the list of all possible city names of the region (e.g., every SF Bay Area & Santa Cruz county city) from the city reference store--ie, a local json file, so no browser or network access is needed. To scrape the wikipedia tables again, run refresh_city_reference_store.py
+    if region_code in city_names_wiki_urls:
+        region_city_names = shared_city_reference_store.load_city_names(region_code)
 
         # sanity check
-        print(f'sfbay city names:{sfbay_city_names}')
+        print(f"{shared_city_reference_store.load(region_code)}")
 
-        print(f'There are {len(sfbay_city_names)} city names\nNB: There should be 101.')
-
-        # Sc county city names data:
-        # sc county wiki page url
-        sc_county_cities_wiki_url = 'https://en.wikipedia.org/wiki/Santa_Cruz_County,_California#Population_ranking'
-        # initialize list
-        sc_county_city_names = []
-
-        # Santa Cruz data from wiki
-        obtain_cities_from_wiki_sc(sc_county_cities_wiki_url, sc_county_city_names)
-
-
-        #  # clean data by removing extraneous '†' char from city names lists
-        sc_county_city_names = list(map(lambda x: x.replace('†',''), sc_county_city_names))
-        sfbay_city_names = list(map(lambda x: x.replace('†',''), sfbay_city_names))
-
-
-        ## finally, remove any whitespace from lists-- use list comprehension
-        sc_county_city_names = [s for s in sc_county_city_names if s.strip()]
-        sfbay_city_names = [s for s in sfbay_city_names if s.strip()]
-
-
-        # sanity check
-        print(f'\n\nsc county city names:{sc_county_city_names}')
-        print(f'There are {len(sc_county_city_names)} city names for SC county.')
-
-        combine_lists(sfbay_city_names, sc_county_city_names)
-
-        # sanity check
-        print(f'sanity check on sfbay & sc county city names data:\n\n{sfbay_city_names}')
-
-        print(f'\nThere are {len(sfbay_city_names)} cities')
-
-
-        sfbay_city_names = add_dash_delimiter_in_bw_each_word_of_city_names(sfbay_city_names)
-        
-        # sanity check
-        print(f"List of SF Bay city names parsed from wiki tables:{sfbay_city_names}")
-
-        # parse city names data based on the full list of cities from the wikipedia pages
-        df = parse_city_names_from_listing_URL(df, sfbay_city_names)
-
-
-
-    elif region_code == 'phoenix':
-
-        # initialize lists:
-        AZ_phx_city_names = []
-
-        # sf bay area city names wiki page:
-        AZ_phx_city_names_url = 'https://en.wikipedia.org/wiki/Category:Cities_in_Maricopa_County,_Arizona'
-
-
-        #sfbay data
-        obtain_cities_from_wiki_maricopa_AZ(AZ_phx_city_names_url, AZ_phx_city_names)
-        
-
-        # remove remaining col names:
-        AZ_phx_city_names = AZ_phx_city_names[4:]
+        region_city_names = add_dash_delimiter_in_bw_each_word_of_city_names(region_city_names)
 
         # sanity check
-        print(f'AZ city names:{AZ_phx_city_names}')
-
-        print(f'There are {len(AZ_phx_city_names)} city names\nNB: There should be ?.')
-
-
-        # sanity check
-        print(f'sanity check on AZ city names data:\n\n{AZ_phx_city_names}')
-
-
-        AZ_phx_city_names = add_dash_delimiter_in_bw_each_word_of_city_names(AZ_phx_city_names)
-        
-        # sanity check
-        print(f"List of AZ_phx_city_names city names parsed from wiki tables:{AZ_phx_city_names}")
+        print(f"List of {region_code} city names from the city reference store:{region_city_names}")
 
         # parse city names data based on the full list of cities from the wikipedia pages
-        df = parse_city_names_from_listing_URL(df, AZ_phx_city_names)
-    
-    else:
-        pass
+        df = parse_city_names_from_listing_URL(df, region_city_names)
 
 
     # # parse city names data based on the full list of cities from the wikipedia pages
@@ -1250,13 +1195,10 @@ def main():
     df = remove_col_with_given_starting_name(df, 'listing_descrip')
 
     
-    ## convert specific cols to indicator variables -- # since there are many cols we want to transform to indicator variables, it's easier to simply drop the few cols that comprise str (aka, object) data 
-    cols_to_indicators = df.drop(columns =['ids', 'cities', 'attr_vars', 'sqft', 'prices', 'bedrooms', 'bathrooms', 'date_posted', 'date_of_webcrawler']) 
-    cols_to_indicators_lis = list(cols_to_indicators.columns)   # convert col names to list
+    ## convert specific cols to indicator variables -- # ie, the kitchen col, and each indicator variable of the registry (see attr_indicator_registry.py)
+    cols_to_indicators_lis = ['kitchen'] + attr_indicator_vars
     df = transform_cols_to_indicators(df, cols_to_indicators_lis) # transform the cols to uint8 
 
-    cols_to_indicators = [] # free memory
-
     # also, transform kitchen, flat and land  cols separately, since they tend to otherwise convert to float after importing from csv files:
     cols_to_indicators2 = list(df[['kitchen', 'flat', 'land']].columns)   # get list of these 3 cols
     df = transform_cols_to_indicators(df, cols_to_indicators2)   # transform the cols to uint8 
@@ -1340,6 +1282,9 @@ def main():
     # sanity check on data by exporting alleged cleaned data to CSV
     df.to_csv(f'slc_cleaned_data{str(datetime.datetime.now())[0:10]}.csv')
     
+    # sanity check on the hit rate of each column transform--ie, the share of rows cleaned via an already cleaned distinct value
+    shared_distinct_value_execution.print_report()
+
     #  Execute data pipeline--Ingest data from date-filtered pandas' dataframe to SQL server--data pipeline: 
     SQL_db.insert_df_to_SQL_ETL(df, region_code)
 
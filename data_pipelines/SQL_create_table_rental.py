@@ -4,6 +4,8 @@ import pyodbc
 import json  
 # os library to deal with directories
 import os
+# import the CREATE TABLE statement of the rental table, generated from the registry of the indicator variables--NB: run this script as a module from the project's root directory (ie, python -m data_pipelines.SQL_create_table_rental), so the data_cleaning package can be imported
+from data_cleaning.attr_indicator_registry import rental_table_create_statement
 """
 NB: This is intended to be a one-off script. 
 It will create a table called rentals,
@@ -37,56 +39,7 @@ class SQL_Database():
         # initialize cursor so we can execute SQL code:
         cursor = conn.cursor() 
 
-        cursor.execute("""CREATE TABLE rental (
-            listing_id bigint PRIMARY KEY,
-            sqft int,  
-            city varchar(40) NOT NULL,
-            price int NOT NULL,
-            bedrooms int,
-            bathrooms decimal(6,1),
-            attr_vars varchar(2000),
-            date_of_webcrawler datetime,
-            kitchen tinyint,
-            date_posted datetime,
-            region varchar(13),
-            sub_region varchar(8),
-            cats_OK tinyint,
-            dogs_OK tinyint,
-            wheelchair_accessible tinyint,
-            laundry_in_bldg tinyint,
-            no_laundry tinyint, 
-            washer_and_dryer tinyint,
-            washer_and_dryer_hookup tinyint,
-            laundry_on_site tinyint,
-            full_kitchen tinyint,
-            dishwasher tinyint,
-            refrigerator tinyint,
-            oven tinyint,
-            flooring_carpet tinyint,
-            flooring_wood tinyint,
-            flooring_tile tinyint,
-            flooring_hardwood tinyint,
-            flooring_other tinyint,
-            apt tinyint,
-            in_law_apt tinyint,
-            condo tinyint,
-            townhouse tinyint,
-            cottage_or_cabin tinyint,
-            single_fam tinyint,
-            duplex tinyint,
-            flat tinyint,
-            land tinyint,
-            is_furnished tinyint,
-            attached_garage tinyint,
-            detached_garage tinyint,
-            carport tinyint,
-            off_street_parking tinyint,
-            no_parking tinyint,
-            EV_charging tinyint,
-            air_condition tinyint,
-            no_smoking tinyint
-            );"""
-            )  # create table with the many numerous indicator variables stored as tinyint data type
+        cursor.execute(rental_table_create_statement('rental'))  # create table with the many numerous indicator variables stored as tinyint data type--NB: the cols are generated from the registry (see attr_indicator_registry.py)
 
         # save and commit changes to database
         conn.commit()
@@ -96,8 +49,8 @@ class SQL_Database():
 
 
 def main():
-    # get root directory of project by getting parent directory (ie, using os's .pardir method) 
-    parent_directory = os.path.abspath(os.path.join(os.getcwd(), os.pardir))
+    # get root directory of project by getting the parent directory of this script's directory (ie, using os's .pardir method)--NB: so the path does not depend on the current working directory
+    parent_directory = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 
 
     # SQL config json file: specify folder (relative to root directory) & file name of json file containing SQL configuration & login data 
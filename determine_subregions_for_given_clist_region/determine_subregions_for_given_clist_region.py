@@ -24,38 +24,36 @@ from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException, ElementClickInterceptedException
 from selenium.webdriver.chrome.options import Options  # Options enables us to tell Selenium to open WebDriver browsers using maximized mode, and we can also disable any extensions or infobars
 
+# lxml library to parse the subregion links from the raw HTML of each region's homepage
+from lxml import html as lxml_html
+
 # inquirer library to add dropdowns and parse user input in terminal/command-line
 import inquirer
 
 # # import functions to delineate & parse SF Bay subregions:
 from .sfbay_craigslist_subregion_definitions import print_sfbay_subregion_names, inquirer_prompt_user_at_terminal
 
-def parse_subregions_via_xpath(craigslist_url_homepage: str, xpath_arg: str)->list:
+# import the rate limiter shared by every GET request of the webcrawler
+from Rentals.rate_limiter import shared_rate_limiter
+# import the pool of reusable (headless) Chrome webdrivers shared by every part of the webcrawler
+from Rentals.webdriver_setup import shared_webdriver_pool
+# import the HTTP response cache shared by every non-browser GET request, so the subregion lists are not downloaded again on every run
+from Rentals.http_response_cache import shared_http_response_cache
+
+def parse_subregions_via_webdriver(craigslist_url_homepage: str, xpath_arg: str, rate_limiter=shared_rate_limiter, webdriver_pool=shared_webdriver_pool)->list:
     """ Scrape data from HTML element by looking up xpath (via selenium find_elements_by_xpath() method).
-    a.) Initialize selenium WebDriver, and make get request to access given webpage
+    a.) Borrow a selenium WebDriver from the webdriver pool, and make get request to access given webpage
     b.) Wait until given HTML element has loaded on page using WebDriverWait() method.
     c.) Then, nitialize an empty list, and scrape the HTML element and extract the element's text data, and append to list."""   
-    ## Initialize a Webdriver for selenium to implement the webcrawler:
-
-    # specify various options to reduce the likelihood that selenium's webdriver HTML-parsing functions might miss HTML elements we want the script to scrape and parse
-    options = Options()  # initialize Options() object, so we can customize and specify options for the web driver
-    options.add_argument("--disable-extensions")  # disable any browser extensions
-    options.add_argument("start-maximized")   # maximize webdriver's browser windows
-    options.add_argument("disable-infobars") # disable browser infobars
-
-    # install and/or update to latest Chrome Webdriver, and implement the options specified above:
-    # web_driver  = webdriver.Chrome(
-    #     ChromeDriverManager().install(),  # install or update latest Chrome webdriver using using ChromeDriverManager() library
-    #     options=options  # implement the various options specified above
-    #     )
-    web_driver  = webdriver.Chrome(
-        # ChromeDriverManager().install(),  # install or update latest Chrome webdriver using using ChromeDriverManager() library
-        options=options  # implement the various options specified above
-        )
-
-
-    # access craigslist homepage for given region:
+    ## Borrow a Webdriver for selenium to implement the webcrawler--NB: see Rentals/webdriver_setup.py for the various options we specify to reduce the likelihood that selenium's webdriver HTML-parsing functions might miss HTML elements we want the script to scrape and parse
+    web_driver  = webdriver_pool.borrow()
+
+
+    # access craigslist homepage for given region--NB: wait until the region's rate limiter allows another GET request:
+    rate_limiter.acquire(craigslist_url_homepage)
+    start_time = time.perf_counter()
     web_driver.get(craigslist_url_homepage) # do get request to access the homepage of the given craiglist region
+    rate_limiter.record_response(craigslist_url_homepage, response_seconds=time.perf_counter() - start_time)
 
     # specify acceptable download delay (in seconds)
     download_delay = 15
@@ -81,8 +79,23 @@ def parse_subregions_via_xpath(craigslist_url_homepage: str, xpath_arg: str)->li
         craigslist_subregions.append(scraped_html.text)  # parse text data from scraped html element
 
     
-    # close the WebDriver browser, since we are done using it
-    web_driver.close()
+    # return the WebDriver browser to the webdriver pool, since we are done using it
+    webdriver_pool.release(web_driver)
+
+    return craigslist_subregions
+
+
+def parse_subregions_via_xpath(craigslist_url_homepage: str, xpath_arg: str, rate_limiter=shared_rate_limiter, webdriver_pool=shared_webdriver_pool, response_cache=shared_http_response_cache)->list:
+    """ Parse the subregion codes of the given craigslist region's homepage via the given xpath.
+    a.) Download the homepage via the HTTP response cache (see Rentals/http_response_cache.py)--ie, the subregion list is only downloaded again once its cached copy expires--and parse the xpath from the raw HTML via lxml.
+    b.) If the raw HTML does not contain the subregion links (eg, the page could not be downloaded), scrape them via a selenium WebDriver instead--see parse_subregions_via_webdriver().
+    c.) Then, split & flatten the text of each HTML element, and return the list of subregion codes."""
+    craigslist_subregions = []
+    page_source = response_cache.get_text(craigslist_url_homepage, rate_limiter)
+    if page_source is not None:
+        craigslist_subregions = [html_element.text_content() for html_element in lxml_html.fromstring(page_source).xpath(xpath_arg)]
+    if not craigslist_subregions:
+        craigslist_subregions = parse_subregions_via_webdriver(craigslist_url_homepage, xpath_arg, rate_limiter, webdriver_pool)
 
     # separate each subregion code by separating each backslash 'delimiter', using .split() via list comp:
     craigslist_subregions = [val.split() for val in craigslist_subregions]  # separate each str element by backslash delimiter using .split() method
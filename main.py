@@ -1,8 +1,24 @@
 # import Craigslist_Rentals class, which implements the webcrawler and web scraping functions
 from Rentals.selenium_webcrawler import Craigslist_Rentals
+# import the names of the pluggable fetch backends for the inner listing pages (ie, selenium or HTTP + lxml)
+from Rentals.fetch_backends import fetch_backends
+# import the known listing ID filter, so incremental crawls can skip the listings that have already been scraped
+from Rentals.known_listing_ids import Known_Listing_IDs_Filter, load_known_listing_ids_from_SQL, load_known_listing_ids_from_index_file, update_known_listing_ids_index_file
+# import the checkpoint journal, so long webcrawler runs can be resumed after a crash
+from Rentals.crawl_journal import Crawl_Journal
+# import the raw HTML archive of the fetched listing pages, so the listings can be re-parsed offline (see reparse_html_archive.py)
+from Rentals.html_archive import Listing_HTML_Archive
+# import the search-page harvest, which parses the listing fields shown on the search result pages (ie, to avoid accessing most inner listing pages)
+from Rentals.search_page_harvest import Search_Page_Harvest
+# import the rate limiter shared by every GET request of the webcrawler
+from Rentals.rate_limiter import Adaptive_Rate_Limiter, shared_rate_limiter
+# import the pool of reusable (headless) Chrome webdrivers shared by every part of the webcrawler
+from Rentals.webdriver_setup import shared_webdriver_pool
+# import the HTTP response cache shared by every non-browser GET request (ie, the subregion lists & search result pages are served from disk or revalidated, rather than downloaded in full on every run)
+from Rentals.http_response_cache import shared_http_response_cache
+# import the retry policy shared by every fetch path of the webcrawler (ie, classify each failed listing fetch, and retry the transient failures with exponential backoff)
+from Rentals.retry_policy import shared_retry_policy
 
-from Rentals.clean_city_names import clean_city_names_for_sf, sf_neighborhoods, clean_given_city_names_data, sj_neighborhoods, oakland_neighborhoods, alameda_neighborhoods, hayward_neighborhoods, richmond_neighborhoods, santa_clara_neighborhoods  # import functions to clean SF city names data and import lists of all neighborhoods for given cities--e.g., SF neighborhoods (including various abbreviations used on craigslist)  
-from Rentals.clean_santa_cruz_data import clean_mislabelled_santa_cruz_data, san_cruz_cities
 
 # import inquirer library so we can prompt user in command line to select from a dropdown of values to select the desired subregion on which we will implement the webcrawler.
 import inquirer
@@ -10,6 +26,15 @@ import inquirer
 #import os library so we can reference thw current working directory
 import os
 
+# import argparse library so we can specify optional command-line arguments--e.g., the number of concurrent workers for the webcrawler
+import argparse
+
+# import time library so we can measure the runtime of the webcrawler
+import time
+
+# import chain so we can stream the previously journaled listings and the newly scraped listings to CSV as a single iterable
+from itertools import chain
+
 
 # import functions for selecting SF Bay Area region & subregion names and codes:
 from determine_subregions_for_given_clist_region.sfbay_craigslist_subregion_definitions import print_sfbay_subregion_names, inquirer_prompt_user_at_terminal
@@ -18,101 +43,194 @@ from determine_subregions_for_given_clist_region.sfbay_craigslist_subregion_defi
 from determine_subregions_for_given_clist_region.determine_subregions_for_given_clist_region import prompt_user_for_region_and_return_region_name, return_hompeage_URL_for_given_region, parse_region_code_for_craigslist_URL_main_webcrawler, parse_subregions_via_xpath,  prompt_user_for_subregion 
 
 
-def main():
-    ## Specify the arguments we will use for each component of the Craigslist_Rentals class, so that we will scrape rental data for the given region, subregion, etc.
+#specify names of regions and their corresponding craigslist urls, store in dict
+clist_region_and_urls = {
+    'SF Bay Area, CA':'https://sfbay.craigslist.org/',
+    'San Diego, CA':'https://sandiego.craigslist.org/',
+    'Chicago, IL':'https://chicago.craigslist.org/',
+    'Seattle, WA':'https://seattle.craigslist.org/',
+    'Los Angeles, CA':'https://losangeles.craigslist.org/',
+    'Phoenix, AZ':'https://phoenix.craigslist.org/',
+    'Portland, OR':'https://portland.craigslist.org/',
+    'Dallas/Fort Worth, TX':'https://dallas.craigslist.org/',
+    'Minneapolis/St. Paul, MN':'https://minneapolis.craigslist.org/',
+    'Boston, MA':'https://boston.craigslist.org/',
+    'Washington, D.C.':'https://washingtondc.craigslist.org/',
+    'Atlanta, GA':'https://atlanta.craigslist.org/',
+    'Miami, FL':'https://miami.craigslist.org/',
+    'Hawaii (subregions by island)':'https://honolulu.craigslist.org/',
+    'Detroit, MI':'https://detroit.craigslist.org/',
+    'New York City, NY':'https://newyork.craigslist.org/',
+    'Vancouver, Canada':'https://vancouver.craigslist.org/',
+    'Toronto, Canada':'https://toronto.craigslist.org/',
+    'Salt Lake City, UT':'https://saltlakecity.craigslist.org/',
+    'St. George, UT':'https://stgeorge.craigslist.org/',
+    'Las Vegas, NV': 'https://lasvegas.craigslist.org/',
+    'Provo/Orem, UT': 'https://provo.craigslist.org/',
+    'Logan, UT':'https://logan.craigslist.org/',
+    'Ogden, UT':'https://ogden.craigslist.org/',
+    'Santa Fe, NM': 'https://santafe.craigslist.org/',
+    'Maine': 'https://maine.craigslist.org/',
+    'Indianapolis, IN': 'https://indianapolis.craigslist.org/',
+    'Elko, NV': 'https://elko.craigslist.org/',
+    'Anchorage, AK':'https://anchorage.craigslist.org/',
+    'New Hampshire (entire state)':'https://nh.craigslist.org/',
+    'Albuquerque, NM':'https://albuquerque.craigslist.org/',
+    'Las Cruces, NM':'https://lascruces.craigslist.org/',
 
-    #specify names of regions and their corresponding craigslist urls, store in dict
-    clist_region_and_urls = {
-        'SF Bay Area, CA':'https://sfbay.craigslist.org/',
-        'San Diego, CA':'https://sandiego.craigslist.org/',
-        'Chicago, IL':'https://chicago.craigslist.org/',
-        'Seattle, WA':'https://seattle.craigslist.org/',
-        'Los Angeles, CA':'https://losangeles.craigslist.org/',
-        'Phoenix, AZ':'https://phoenix.craigslist.org/',
-        'Portland, OR':'https://portland.craigslist.org/',
-        'Dallas/Fort Worth, TX':'https://dallas.craigslist.org/',
-        'Minneapolis/St. Paul, MN':'https://minneapolis.craigslist.org/',
-        'Boston, MA':'https://boston.craigslist.org/',
-        'Washington, D.C.':'https://washingtondc.craigslist.org/',
-        'Atlanta, GA':'https://atlanta.craigslist.org/',
-        'Miami, FL':'https://miami.craigslist.org/',
-        'Hawaii (subregions by island)':'https://honolulu.craigslist.org/',
-        'Detroit, MI':'https://detroit.craigslist.org/',
-        'New York City, NY':'https://newyork.craigslist.org/',
-        'Vancouver, Canada':'https://vancouver.craigslist.org/',
-        'Toronto, Canada':'https://toronto.craigslist.org/',
-        'Salt Lake City, UT':'https://saltlakecity.craigslist.org/',
-        'St. George, UT':'https://stgeorge.craigslist.org/',
-        'Las Vegas, NV': 'https://lasvegas.craigslist.org/',
-        'Provo/Orem, UT': 'https://provo.craigslist.org/',
-        'Logan, UT':'https://logan.craigslist.org/',
-        'Ogden, UT':'https://ogden.craigslist.org/',
-        'Santa Fe, NM': 'https://santafe.craigslist.org/',
-        'Maine': 'https://maine.craigslist.org/',
-        'Indianapolis, IN': 'https://indianapolis.craigslist.org/',
-        'Elko, NV': 'https://elko.craigslist.org/',
-        'Anchorage, AK':'https://anchorage.craigslist.org/',
-        'New Hampshire (entire state)':'https://nh.craigslist.org/',
-        'Albuquerque, NM':'https://albuquerque.craigslist.org/',
-        'Las Cruces, NM':'https://lascruces.craigslist.org/',
 
+    
+    'Reno, NV': 'https://reno.craigslist.org/',
+
+    'Salem, OR': 'https://salem.craigslist.org/',
+    'Bend, OR': 'bend.craigslist.org',
+    'Eugene, OR':'https://eugene.craigslist.org/',
+    'Wenatchee, WA': 'https://wenatchee.craigslist.org/',
+    'San Luis Obispo, CA': 'https://slo.craigslist.org/',
+    'Orange County, CA': 'https://orangecounty.craigslist.org/',
+    'Bakersfield, CA': 'https://bakersfield.craigslist.org/',
+    'Inland Empire, CA': 'https://inlandempire.craigslist.org/',
+    'Bloomington, IL': 'https://bloomington.craigslist.org/',
+    'Western MAssachusetts':'https://westernmass.craigslist.org/',
+    'Buffalo, NY':'https://buffalo.craigslist.org/',
+    'Baltimore, MD':'https://baltimore.craigslist.org/',
+    'Annapolis, MD':'https://annapolis.craigslist.org/',
+
+    'Nashville, TN':'https://nashville.craigslist.org/',
+    'Charleston, SC':'https://charleston.craigslist.org/',
+    'Ames, IA': 'https://ames.craigslist.org/',
+    'Spokane, WA':'https://spokane.craigslist.org/',
+    'Bellingham, WA':'https://bellingham.craigslist.org/',
+    'Grand Rapids, MI':'https://grandrapids.craigslist.org/',
+    'Ann Arbor, MI':'https://annarbor.craigslist.org/',
+    'Cleveland, OH':'https://cleveland.craigslist.org/',
+    'Columbus, OH':'https://columbus.craigslist.org/',
+    'Akron-Canton, OH': 'https://akroncanton.craigslist.org/',
+    'Orlando, FL':'https://orlando.craigslist.org/',
+    'Twin Falls, ID':'https://twinfalls.craigslist.org/',
+    'Boise, ID':'https://boise.craigslist.org/',
+    'La Crosse, WI':'https://lacrosse.craigslist.org/',
+    'Madison, WI':'https://madison.craigslist.org/',
+    'Milwaukee, WI':'https://milwaukee.craigslist.org/',
+    'Kenohsa/Racine, WI':'https://racine.craigslist.org/',
+    'Kansas City, MO':'https://kansascity.craigslist.org/',
+    'Saint Louis, MO':'https://stlouis.craigslist.org/',
+    'Savannah, GA':'https://savannah.craigslist.org/',
+    'Philadelphia, PA':'https://philadelphia.craigslist.org/',
+    'Scranton, PA':'https://scranton.craigslist.org/',
+    'Erie, PA':'https://erie.craigslist.org/',
+    'Charleston, WV':'https://charlestonwv.craigslist.org/',
+
+
+    'Pittsburgh, PA':'https://pittsburgh.craigslist.org/',
+    'Fargo, ND':'https://fargo.craigslist.org/',
+    'Bismarck, ND':'https://bismarck.craigslist.org/',
+
+
+
+    'Mexico City, Mexico': 'https://mexicocity.craigslist.org/',
+
+    'Montreal, Quebec, Canada':'https://montreal.craigslist.org/',
+    'Ottawa, Canada': 'https://ottawa.craigslist.org/',
+    'Tokyo, Japan': 'https://tokyo.craigslist.org/?lang=en&cc=us',
+
+    }
+
+# NB: note the following craigslist regions actually *have* subregions. which we will use as an elif condition
+region_names_with_subregions = ['San Diego, CA', 'Chicago, IL', 'Seattle, WA', 'Los Angeles, CA', 'Phoenix, AZ', 'Portland, OR', 'Dallas/Fort Worth, TX', 'Minneapolis/St. Paul, MN', 'Boston, MA', 'Washington, D.C.', 'Atlanta, GA', 'Miami, FL', 'Hawaii (subregions by island)', 'Detroit, MI', 'New York City, NY', 'Vancouver, Canada', 'Toronto, Canada']
+
+## specify each Sf Bay subregion:
+sfbay_subregion_vals = ['eby', 'nby', 'pen', 'sby', 'scz', 'sfc'] # specify a list of all Bay Area subregions for craigslist site-- NB: craigslist lumps Santa Cruz ('scz') within their sfbay site.  
+
+## Specify the xpaths for the obtain_listing_urls() method (NB: the benchmark harness--see benchmarks/benchmark_crawler.py--reuses these xpaths):
+# 1st argument of obtain_listing_urls() method: specify xpaths pertaining to rental listing URLs:
+# pipe operator will be used to pass multiple possible xpaths to the find_elements() selenium method as boolean "or" conditions
+pipe_operator = '|'
+# NB: specify all known possible xpaths for the listing urls to a list
+list_of_xpaths_listing_urls = [
+    '//a[@class="titlestring"]', 
+    '//a[@class="post-title"]', 
+    '//a[@class="result-title hdrlnk"]',
+    '//a[@class="cl-app-anchor text-only posting-title"]'
+    ]
+# argument #1 finalized: concatenate each element in list with pipe operators separating each:
+xpaths_listing_urls = pipe_operator.join([f'{el}' for el in list_of_xpaths_listing_urls]) 
+
+# # 2nd argument of obtain_listing_urls() method: specify the xpaths for the 'next' page button widget we need to click to navigate to each subsequent page: 
+# # NB: specify all known possible xpaths for the next page buttons (prior to final page) to a list
+# list_of_xpaths_next_page_button = [
+#     '//*[@class="bd-button cl-next-page icon-only"]',
+#     '//*[@id="search-toolbars-1"]/div[2]/button[3]', 
+#     '//*[@class="button next"]'
+#     ]
+# # argument #2 finalized: concatenate each element in list with pipe operators separating each:
+# next_page_button_xpaths = pipe_operator.join([f'{el}' for el in list_of_xpaths_next_page_button]) 
+
+next_page_button_xpaths = '//*[@class="bd-button cl-next-page icon-only"]'
+
+
+def webcrawler_arg_parser(add_help: bool = True):
+    """Specify the optional command-line arguments for the webcrawler:
+    --workers: number of concurrent workers (ie, webdrivers) used to scrape the inner listing pages. By default, a single webdriver scrapes each listing one at a time.
+    --min-delay & --max-delay: initial delay (in seconds) in between any 2 GET requests sent to craigslist--NB: every GET request waits for the shared rate limiter (see Rentals/rate_limiter.py), which slows down if the server responds slowly or is throttling the webcrawler (ie, HTTP 429 or 403).
+    --max-requests-per-second: maximum request rate the rate limiter may ramp up to, as long as craigslist keeps responding quickly (default: the initial rate given by --min-delay).
+    --fetch-backend: whether to scrape the inner listing pages via selenium webdrivers ('selenium'), or via plain HTTP requests parsed with lxml ('http'). NB: the 'http' backend falls back to selenium for any pages that need JavaScript.
+    --skip-known-ids: skip the listings whose IDs have already been scraped, given the listing IDs stored in the SQL 'rental' table ('sql') or in the local index file of the scraped data directory ('index').
+    --sql-config: path to the json SQL configuration file, when using --skip-known-ids sql.
+    --resume: resume the most recent run for the selected region & subregion--ie, reload its crawl journal, and only scrape the listing URLs that have not been journaled yet.
+    --batch-size: number of listings that are cleaned & appended to the CSV file at a time--ie, peak memory is bounded by the batch size rather than by the number of listings.
+    --show-browser: open the Chrome webdrivers in a visible browser window, instead of headless (see Rentals/webdriver_setup.py).
+    --max-pages-per-webdriver: number of pages each webdriver loads before it is recycled (ie, quit and replaced by a new one), to cap Chrome's memory leaks during long runs.
+    --search-page-harvest: parse the price, bedrooms, sqft, neighborhood & date posted of each listing from the search result pages, and only access the inner listing pages of new listings (ie, whose IDs are not known via --skip-known-ids, which defaults to 'index' in this mode). NB: the known listings are then not skipped, but their listing descriptions & attributes are 'nan'--ie, for daily price-tracking runs.
+    --html-archive: save the HTML of each fetched listing page to the compressed archive of the scraped data directory, so the listings can be re-parsed offline (see Rentals/html_archive.py & reparse_html_archive.py).
+    NB: the batch crawl orchestrator (see batch_crawl.py) reuses these arguments, so set add_help=False to use this parser as a parent parser."""
+    parser = argparse.ArgumentParser(description="Craigslist rental listings webcrawler", add_help=add_help)
+    parser.add_argument('--workers', type=int, default=1, help="number of concurrent workers used to scrape the rental listings (default: 1, ie, no concurrency)")
+    parser.add_argument('--min-delay', type=float, default=2, help="minimum number of seconds in between any 2 GET requests to craigslist (default: 2, ie, the same politeness as the former random 2-5 second sleep per listing)")
+    parser.add_argument('--max-delay', type=float, default=5, help="maximum number of seconds in between any 2 GET requests to craigslist (default: 5)")
+    parser.add_argument('--max-requests-per-second', type=float, default=None, help="maximum request rate the adaptive rate limiter may ramp up to (default: 1 / --min-delay)")
+    parser.add_argument('--fetch-backend', choices=list(fetch_backends), default='selenium', help="backend used to fetch the inner listing pages (default: selenium)")
+    parser.add_argument('--skip-known-ids', choices=['sql', 'index'], default=None, help="skip listings whose IDs have already been scraped, via the SQL 'rental' table or the local index file (default: scrape every listing)")
+    parser.add_argument('--sql-config', default=os.path.join('SQL_config', 'config.json'), help="path to the json SQL configuration file (default: SQL_config/config.json)")
+    parser.add_argument('--resume', action='store_true', help="resume the most recent (interrupted) run for the selected region & subregion, via its crawl journal")
+    parser.add_argument('--batch-size', type=int, default=100, help="number of listings cleaned & written to CSV at a time (default: 100)")
+    parser.add_argument('--max-retries', type=int, default=3, help="maximum number of retries of a listing that fails with a transient error, such as a timeout or a webdriver crash (default: 3)")
+    parser.add_argument('--retry-base-delay', type=float, default=2, help="number of seconds to wait before the 1st retry of a listing--NB: the delay doubles with each retry (default: 2)")
+    parser.add_argument('--show-browser', action='store_true', help="open the Chrome webdrivers in a visible browser window (default: headless)")
+    parser.add_argument('--max-pages-per-webdriver', type=int, default=200, help="number of pages each webdriver loads before it is recycled (default: 200)")
+    parser.add_argument('--pagination', choices=['offset', 'next-button'], default='next-button', help="how to crawl over the search result pages: click the next page button via the webdriver, or download them directly via their offsets (default: next-button)")
+    parser.add_argument('--search-page-workers', type=int, default=4, help="number of search result pages downloaded at a time via --pagination offset (default: 4)")
+    parser.add_argument('--price-bands', action='store_true', help="split the search query into price bands that stay under craigslist's cap on the number of search results, and crawl the bands in parallel (NB: implies --pagination offset)")
+    parser.add_argument('--parallel-bands', type=int, default=2, help="number of price bands crawled at a time via --price-bands (default: 2)")
+    parser.add_argument('--shard-bedrooms', action='store_true', help="also split the narrowest price bands by the number of bedrooms, if they still hit the search result cap (default: only split by price)")
+    parser.add_argument('--search-page-harvest', action='store_true', help="harvest the fields of known listings from the search result pages, and only access the inner pages of new listings (default: access every inner listing page)")
+    parser.add_argument('--async-crawler', action='store_true', help="download the search result pages (via their offsets) and the inner listing pages as coroutines over a single aiohttp session, instead of via threads (NB: implies --pagination offset, and ignores --workers & --fetch-backend)")
+    parser.add_argument('--max-in-flight', type=int, default=100, help="maximum number of GET requests in flight at a time via --async-crawler--NB: every request still waits for the rate limiter (default: 100)")
+    parser.add_argument('--http-cache', action='store_true', help="cache the HTTP responses of the subregion lists & search result pages--ie, serve them from scraped_data/http_cache until they expire, and then revalidate them (default: send every GET request as is)")
+    parser.add_argument('--http-cache-max-mb', type=float, default=200, help="maximum size of the HTTP response cache on disk, beyond which the least recently used responses are evicted (default: 200)")
+    parser.add_argument('--html-archive', action='store_true', help="archive the HTML of the fetched listing pages, so the listings can be re-parsed offline (default: do not archive the pages)")
+    return parser
+
+
+def parse_command_line_args():
+    """Parse the optional command-line arguments for the webcrawler (see webcrawler_arg_parser())."""
+    return webcrawler_arg_parser().parse_args()
+
+
+def configure_http_response_cache(args):
+    """Configure the HTTP response cache shared by every non-browser GET request, given the --http-cache & --http-cache-max-mb arguments."""
+    shared_http_response_cache.configure(enabled=args.http_cache, max_bytes=int(args.http_cache_max_mb * 1024 ** 2))
 
-        
-        'Reno, NV': 'https://reno.craigslist.org/',
-
-        'Salem, OR': 'https://salem.craigslist.org/',
-        'Bend, OR': 'bend.craigslist.org',
-        'Eugene, OR':'https://eugene.craigslist.org/',
-        'Wenatchee, WA': 'https://wenatchee.craigslist.org/',
-        'San Luis Obispo, CA': 'https://slo.craigslist.org/',
-        'Orange County, CA': 'https://orangecounty.craigslist.org/',
-        'Bakersfield, CA': 'https://bakersfield.craigslist.org/',
-        'Inland Empire, CA': 'https://inlandempire.craigslist.org/',
-        'Bloomington, IL': 'https://bloomington.craigslist.org/',
-        'Western MAssachusetts':'https://westernmass.craigslist.org/',
-        'Buffalo, NY':'https://buffalo.craigslist.org/',
-        'Baltimore, MD':'https://baltimore.craigslist.org/',
-        'Annapolis, MD':'https://annapolis.craigslist.org/',
-
-        'Nashville, TN':'https://nashville.craigslist.org/',
-        'Charleston, SC':'https://charleston.craigslist.org/',
-        'Ames, IA': 'https://ames.craigslist.org/',
-        'Spokane, WA':'https://spokane.craigslist.org/',
-        'Bellingham, WA':'https://bellingham.craigslist.org/',
-        'Grand Rapids, MI':'https://grandrapids.craigslist.org/',
-        'Ann Arbor, MI':'https://annarbor.craigslist.org/',
-        'Cleveland, OH':'https://cleveland.craigslist.org/',
-        'Columbus, OH':'https://columbus.craigslist.org/',
-        'Akron-Canton, OH': 'https://akroncanton.craigslist.org/',
-        'Orlando, FL':'https://orlando.craigslist.org/',
-        'Twin Falls, ID':'https://twinfalls.craigslist.org/',
-        'Boise, ID':'https://boise.craigslist.org/',
-        'La Crosse, WI':'https://lacrosse.craigslist.org/',
-        'Madison, WI':'https://madison.craigslist.org/',
-        'Milwaukee, WI':'https://milwaukee.craigslist.org/',
-        'Kenohsa/Racine, WI':'https://racine.craigslist.org/',
-        'Kansas City, MO':'https://kansascity.craigslist.org/',
-        'Saint Louis, MO':'https://stlouis.craigslist.org/',
-        'Savannah, GA':'https://savannah.craigslist.org/',
-        'Philadelphia, PA':'https://philadelphia.craigslist.org/',
-        'Scranton, PA':'https://scranton.craigslist.org/',
-        'Erie, PA':'https://erie.craigslist.org/',
-        'Charleston, WV':'https://charlestonwv.craigslist.org/',
-
-
-        'Pittsburgh, PA':'https://pittsburgh.craigslist.org/',
-        'Fargo, ND':'https://fargo.craigslist.org/',
-        'Bismarck, ND':'https://bismarck.craigslist.org/',
-
-
-
-        'Mexico City, Mexico': 'https://mexicocity.craigslist.org/',
-
-        'Montreal, Quebec, Canada':'https://montreal.craigslist.org/',
-        'Ottawa, Canada': 'https://ottawa.craigslist.org/',
-        'Tokyo, Japan': 'https://tokyo.craigslist.org/?lang=en&cc=us',
 
-        }
+def main():
+    # parse any optional command-line arguments
+    args = parse_command_line_args()
+
+    # configure the HTTP response cache before the subregion lists are looked up--NB: the subregion list of each region is only downloaded again once its cached copy expires
+    configure_http_response_cache(args)
+
+    ## Specify the arguments we will use for each component of the Craigslist_Rentals class, so that we will scrape rental data for the given region, subregion, etc.
+
     
     # Prompt user for region:
     region_name  = prompt_user_for_region_and_return_region_name(clist_region_and_urls) #  Prompt user to select specific region on craigslist to search, from terminal, among the various listed metropolitan areas in the U.S. and Canada:
@@ -127,14 +245,9 @@ def main():
 
     # Next, parse clist subregion (if needed):
 
-    # NB: note the following craigslist regions actually *have* subregions. which we will use as an elif condition
-    region_names_with_subregions = ['San Diego, CA', 'Chicago, IL', 'Seattle, WA', 'Los Angeles, CA', 'Phoenix, AZ', 'Portland, OR', 'Dallas/Fort Worth, TX', 'Minneapolis/St. Paul, MN', 'Boston, MA', 'Washington, D.C.', 'Atlanta, GA', 'Miami, FL', 'Hawaii (subregions by island)', 'Detroit, MI', 'New York City, NY', 'Vancouver, Canada', 'Toronto, Canada']
-
     # parse subregion conditions--let's start w/ SF Bay region
     if region_name == 'SF Bay Area, CA': # ie, if user selected SF Bay Area, CA region
         print_sfbay_subregion_names() # print what each sfbay craglslist subregion actually represents--ie, which regions and/or cities. 
-        ## specify each Sf Bay subregion:
-        sfbay_subregion_vals = ['eby', 'nby', 'pen', 'sby', 'scz', 'sfc'] # specify a list of all Bay Area subregions for craigslist site-- NB: craigslist lumps Santa Cruz ('scz') within their sfbay site.  
         # select subregion val: ie, prompt user in terminal to select one of the subregions:
         subregion = inquirer_prompt_user_at_terminal(sfbay_subregion_vals)  # parse the specific value the user selected  
 
@@ -173,6 +286,29 @@ def main():
         print(f'Subregion selected:\n{subregion}')
     
 
+    # run the webcrawler & data pipeline for the selected region & subregion
+    return run_webcrawler_pipeline(region, subregion, args)
+
+
+def run_webcrawler_pipeline(region: str, subregion: str, args) -> dict:
+    """Run the webcrawler and the data pipeline (ie, obtain the listing URLs, scrape the listings, and stream the cleaned data to CSV) for the given craigslist region & subregion codes--e.g., 'sfbay' & 'sby'.
+    NB: args are the parsed command-line arguments (see parse_command_line_args()). Return some statistics on the run--ie, the number of listing URLs, the number of listings written to CSV, and the runtime in seconds."""
+    start_time = time.perf_counter()
+
+    ## Configure the rate limiter shared by every GET request of the webcrawler, given the --min-delay, --max-delay & --max-requests-per-second arguments:
+    rate_limiter_settings = Adaptive_Rate_Limiter.settings_from_delays(args.min_delay, args.max_delay)
+    rate_limiter_settings['max_requests_per_second'] = args.max_requests_per_second if args.max_requests_per_second is not None else rate_limiter_settings['requests_per_second']
+    shared_rate_limiter.configure(**rate_limiter_settings)
+
+    ## Configure the pool of Chrome webdrivers shared by the webcrawler, given the --show-browser & --max-pages-per-webdriver arguments:
+    shared_webdriver_pool.configure(headless=not args.show_browser, max_pages_per_webdriver=args.max_pages_per_webdriver)
+
+    ## Configure the retry policy shared by every listing fetch, given the --max-retries & --retry-base-delay arguments--NB: this also resets the outcome counts of the run
+    shared_retry_policy.configure(max_retries=args.max_retries, base_delay=args.retry_base_delay)
+
+    ## Configure the HTTP response cache shared by every non-browser GET request, given the --http-cache & --http-cache-max-mb arguments--NB: this also resets the cache status counts of the run
+    configure_http_response_cache(args)
+
     ## Specify all other parameters for Craigslist_Rentals() class, including min & max price for searchform, etc.:
     
     ## filter housing category to 'apa'-ie, rental listings (apartments & housing for rent)
@@ -188,48 +324,9 @@ def main():
     # given above arguments, initialize a customized craigslist rental listing URL via the Craigslist_Rentals class, for the selenium webcrawler to access:
     craigslist_crawler = Craigslist_Rentals(region, subregion, housing_category, min_price, max_price, rent_period, sale_date)
 
-    ## Access the craigslist URL via selenium Chrome webdriver
-    craigslist_crawler.load_craigslist_form_URL()
-
-    ## Implement the main web crawler via obtain_listing_urls() method, and obtain the rental listing href URLs from the pages of listings (and append to listing_urls list): 
-    # 1st argument of obtain_listing_urls() method: specify xpaths pertaining to rental listing URLs:
-    # pipe operator will be used to pass multiple possible xpaths to the find_elements() selenium method as boolean "or" conditions
-    pipe_operator = '|'
-    # NB: specify all known possible xpaths for the listing urls to a list
-    list_of_xpaths_listing_urls = [
-        '//a[@class="titlestring"]', 
-        '//a[@class="post-title"]', 
-        '//a[@class="result-title hdrlnk"]',
-        '//a[@class="cl-app-anchor text-only posting-title"]'
-        ]
-    # argument #1 finalized: concatenate each element in list with pipe operators separating each:
-    xpaths_listing_urls = pipe_operator.join([f'{el}' for el in list_of_xpaths_listing_urls]) 
-    
-    # # 2nd argument of obtain_listing_urls() method: specify the xpaths for the 'next' page button widget we need to click to navigate to each subsequent page: 
-    # # NB: specify all known possible xpaths for the next page buttons (prior to final page) to a list
-    # list_of_xpaths_next_page_button = [
-    #     '//*[@class="bd-button cl-next-page icon-only"]',
-    #     '//*[@id="search-toolbars-1"]/div[2]/button[3]', 
-    #     '//*[@class="button next"]'
-    #     ]
-    # # argument #2 finalized: concatenate each element in list with pipe operators separating each:
-    # next_page_button_xpaths = pipe_operator.join([f'{el}' for el in list_of_xpaths_next_page_button]) 
-    
-    next_page_button_xpaths = '//*[@class="bd-button cl-next-page icon-only"]'
-    
-    # implement obtain_listing_urls() method to initiate webcrawler:
-    listing_urls = craigslist_crawler.obtain_listing_urls(xpaths_listing_urls, next_page_button_xpaths)  # method requires 2 arguments: xpaths to rental listing URLs on given page, and xpaths to the next page button widgets
-
-    ## scrape the rental listings' data, and store data as dict of lists:
-    dict_scraped_lists = craigslist_crawler.scrape_listing_data(listing_urls)  
-
-    ## Perform data cleaning on scraped data:
-    dict_scraped_lists = craigslist_crawler.clean_scraped_data(dict_scraped_lists)
+    ## Implement the main web crawler via obtain_listing_urls() method, and obtain the rental listing href URLs from the pages of listings (and append to listing_urls list)--NB: see xpaths_listing_urls & next_page_button_xpaths for the 2 arguments of obtain_listing_urls()
     
-    ## Transform the dictionary of lists to Pandas' DataFrame, and peform additional data cleaning and wrangling:
-    df = craigslist_crawler.dict_to_df_pipeline(dict_scraped_lists)
-
-    ## DataFrame to CSV data pipeline,after cleaning city names data for specific subregions 
+    ## Specify complete path for the scraped data--ie, by referencing the given region & subregion we've selected via CLI for given WebDriver session:
     # specify parent path of the project:
     parent_path = os.getcwd()
 
@@ -238,12 +335,111 @@ def main():
     scraped_data_folder = "scraped_data"
 
     ## Create directory to contain scraped data (if path does not exists):
-
-    ## Specify complete path for the scraped data--ie, by referencing the given region & subregion we've selected via CLI for given WebDriver session:
     scraped_data_path = craigslist_crawler.mk_direc_for_scraped_data(parent_path, scraped_data_folder)
 
-    ## Implement data pipeline:
-    return craigslist_crawler.df_to_CSV_data_pipeline(df, scraped_data_path)
+    ## Given --html-archive, save the HTML of each fetched listing page to the compressed archive within the scraped data directory, so the listings can be re-parsed offline if the xpaths change (see reparse_html_archive.py):
+    if args.html_archive:
+        craigslist_crawler.html_archive = Listing_HTML_Archive(scraped_data_path)
+
+    ## Resume the most recent run for the given region & subregion, if its crawl journal (and listing URLs frontier) exists:
+    crawl_journal = Crawl_Journal.latest(scraped_data_path, region, subregion) if args.resume else None
+
+    if crawl_journal is not None:
+        # reload the listing URLs we obtained during the interrupted run, instead of crawling over the pages of listings again
+        listing_urls = crawl_journal.load_frontier()
+        print(f"\nResuming the webcrawler run of {crawl_journal.date_str}: {len(crawl_journal.load_journaled_records())} of {len(listing_urls)} listings have already been scraped.\n")
+
+    else:
+        if args.resume:
+            print("\nNo crawl journal exists for the selected region & subregion, so the webcrawler will start a new run.\n")
+
+        ## Load the listing IDs that have already been scraped for the given region & subregion, if the user wants to skip these listings--or, in search-page harvest mode, to determine which listings are new:
+        known_listing_ids_source = args.skip_known_ids if args.skip_known_ids is not None or not args.search_page_harvest else 'index'
+        if known_listing_ids_source == 'sql':
+            known_listing_ids_filter = Known_Listing_IDs_Filter(load_known_listing_ids_from_SQL(args.sql_config, region, subregion))
+        elif known_listing_ids_source == 'index':
+            known_listing_ids_filter = Known_Listing_IDs_Filter(load_known_listing_ids_from_index_file(scraped_data_path))
+        else:
+            known_listing_ids_filter = None
+
+        # in search-page harvest mode, parse the fields shown on each search result page--NB: the known listings are not skipped, so the webcrawler crawls over every search result page
+        search_page_harvest = Search_Page_Harvest() if args.search_page_harvest else None
+
+        # implement obtain_listing_urls() method to initiate webcrawler--NB: by default, the webcrawler clicks the next page button of each search result page, unless the pages are downloaded directly via their offsets (ie, given --pagination offset, --price-bands or --async-crawler):
+        pagination_filter = known_listing_ids_filter if search_page_harvest is None else None  # NB: the known listing ID filter lets the webcrawler stop paginating early
+        if args.price_bands:
+            listing_urls = craigslist_crawler.obtain_listing_urls_via_price_bands(xpaths_listing_urls, next_page_button_xpaths, args.parallel_bands, args.search_page_workers, args.shard_bedrooms, pagination_filter, search_page_harvest)
+        elif args.async_crawler:
+            listing_urls = craigslist_crawler.obtain_listing_urls_via_async_crawler(xpaths_listing_urls, next_page_button_xpaths, args.max_in_flight, args.search_page_workers, pagination_filter, search_page_harvest)
+        elif args.pagination == 'offset':
+            listing_urls = craigslist_crawler.obtain_listing_urls_via_offsets(xpaths_listing_urls, next_page_button_xpaths, args.search_page_workers, pagination_filter, search_page_harvest)
+        else:
+            ## Access the craigslist URL via selenium Chrome webdriver
+            craigslist_crawler.load_craigslist_form_URL()
+            listing_urls = craigslist_crawler.obtain_listing_urls(xpaths_listing_urls, next_page_button_xpaths, pagination_filter, search_page_harvest)  # method requires 2 arguments: xpaths to rental listing URLs on given page, and xpaths to the next page button widgets
+
+        # skip the listings whose IDs have already been scraped
+        if known_listing_ids_filter is not None and search_page_harvest is None:
+            listing_urls = known_listing_ids_filter.filter_new_listing_urls(listing_urls)
+
+        # save the listing URLs to crawl (ie, the frontier) to a new crawl journal, to which each listing will be checkpointed as soon as it has been scraped
+        crawl_journal = Crawl_Journal(scraped_data_path, region, subregion)
+        crawl_journal.start_new_crawl(listing_urls)
+
+        # record the harvested fields of the known listings to the journal, so only the inner pages of new listings are accessed
+        if search_page_harvest is not None:
+            search_page_harvest.journal_harvested_listings(crawl_journal, listing_urls, known_listing_ids_filter)
+
+    # only scrape the listing URLs that have not been journaled yet
+    remaining_listing_urls = crawl_journal.remaining_listing_urls(listing_urls)
+
+    ## scrape the rental listings' data, and yield each listing as a single record--NB: each listing is also checkpointed to the crawl journal:
+    if args.async_crawler:
+        # scrape the listings as coroutines over a single aiohttp session, with up to --max-in-flight GET requests in flight (all of which share the rate limiter for craigslist)
+        scraped_listing_records = craigslist_crawler.iter_listing_records_async(remaining_listing_urls, args.max_in_flight, crawl_journal)
+    elif args.workers > 1 or args.fetch_backend != 'selenium':
+        # scrape the listings concurrently, via a pool of workers that share the rate limiter for craigslist
+        scraped_listing_records = craigslist_crawler.iter_listing_records_concurrently(remaining_listing_urls, args.workers, args.fetch_backend, crawl_journal)
+    else:
+        scraped_listing_records = craigslist_crawler.iter_listing_records(remaining_listing_urls, crawl_journal)  
+
+    ## Stream the listings--including any listings journaled before the run was interrupted--to CSV in batches: ie, perform data cleaning, transform each batch to a Pandas' DataFrame, and append it to the CSV file (after cleaning city names data for specific subregions):
+    listing_records = chain(crawl_journal.iter_journaled_listing_records(), scraped_listing_records)
+    with craigslist_crawler.telemetry.stage('scrape_and_write_listings'):  # NB: the listings are scraped as they are streamed to CSV, so this stage includes the scraping, data cleaning & CSV stages
+        written_listing_ids = craigslist_crawler.stream_listing_records_to_csv(listing_records, scraped_data_path, args.batch_size)
+
+    ## add the newly scraped listing IDs to the local index of known listing IDs, so the next run can skip them
+    update_known_listing_ids_index_file(scraped_data_path, written_listing_ids)
+
+    # return the webdriver to the webdriver pool--NB: the batch crawl orchestrator runs several region & subregion jobs within each worker process, so the next job reuses the webdriver
+    craigslist_crawler.release_webdriver()
+
+    # print the number of requests & final request rate for each host
+    requests_by_host = shared_rate_limiter.summary()
+    print(f"\nRate limiter summary:\n{requests_by_host}\n")
+
+    # print the number of listings scraped, expired, retried, and given up on (by failure category)
+    fetch_outcomes = shared_retry_policy.summary()
+    print(f"\nListing fetch outcomes:\n{fetch_outcomes}\n")
+
+    run_stats = {
+        'n_listing_urls': len(listing_urls),
+        'n_listings_scraped': len(remaining_listing_urls),
+        'n_listings_written': len(written_listing_ids),
+        'fetch_outcomes': fetch_outcomes,
+        'seconds': round(time.perf_counter() - start_time, 2),
+        }
+
+    ## Write the run's telemetry (ie, the duration of each stage, pages & bytes downloaded, requests per host, fetch outcomes, and time spent extracting each field) to a json run report next to the CSV file, so the webcrawler's performance can be trended over time:
+    run_report_path = craigslist_crawler.telemetry.write_run_report(scraped_data_path, region, subregion, {
+        'run_stats': run_stats,
+        'requests_by_host': requests_by_host,
+        'http_cache': shared_http_response_cache.summary(),
+        'field_extraction_seconds': craigslist_crawler.field_extraction_timer.summary(),
+        'settings': vars(args),
+        })
+    print(f"\nRun report saved to:\n{run_report_path}\n")
+    return run_stats
 
 if __name__== "__main__":
     main()
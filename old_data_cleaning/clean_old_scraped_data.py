@@ -6,6 +6,9 @@ import glob
 import numpy as np
 import pandas as pd
 
+# import the function to parse given indicator variables (eg, 'duplex', 'flat', 'land') via the registry of the indicator variables--ie, the same as the webcrawler. NB: run this script as a module from the project's root directory (ie, python -m old_data_cleaning.clean_old_scraped_data), so the data_cleaning package can be imported
+from data_cleaning.scraper_and_data_cleaning_functions import parse_attr_indicator_vars
+
 
 ## import old scraped data, which needs to be cleaned  
 def recursively_import_all_CSV_and_concat_to_single_df(parent_direc, fn_regex=r'*.csv'):
@@ -97,16 +100,8 @@ df = rename_cols(df, dict_rename_cols)
 
 
 
-# create indicator var using numpy and Pandas' str.contains() based on scraped rental listing attributes and descriptions  
-def indicator_vars_from_scraped_data(df, col_to_parse, attr_substr):
-    return pd.Series(np.where(df[col_to_parse].str.contains(attr_substr), 1, 0))
-
-
-# 'flat:
-df['flat'] = indicator_vars_from_scraped_data(df, 'attr_vars', 'flat')
-
-# land
-df['land'] = indicator_vars_from_scraped_data(df, 'attr_vars', 'land')
+# 'flat & land--ie, parse both indicator vars via a single scan of attr_vars:
+parse_attr_indicator_vars(df, ['flat', 'land'])
 
 
 # 3 c) Move the 2 new indicator cols to the corresponding locations to match the webcrawler
@@ -174,11 +169,8 @@ def main():
     df = rename_cols(df, dict_rename_cols)
     
     # 3 b) Add and parse additional indicator var cols:
-    # 'flat:
-    df['flat'] = indicator_vars_from_scraped_data(df, 'attr_vars', 'flat') 
-
-    # land
-    df['land'] = indicator_vars_from_scraped_data(df, 'attr_vars', 'land')
+    # 'flat & land--ie, parse both indicator vars via a single scan of attr_vars:
+    parse_attr_indicator_vars(df, ['flat', 'land'])
 
     # 3 c) Move the 2 new indicator cols to the corresponding locations to match the webcrawler
 
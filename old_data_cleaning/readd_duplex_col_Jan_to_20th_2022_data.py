@@ -6,6 +6,9 @@ import glob
 import numpy as np
 import pandas as pd
 
+# import the function to parse given indicator variables (eg, 'duplex', 'flat', 'land') via the registry of the indicator variables--ie, the same as the webcrawler. NB: run this script as a module from the project's root directory (ie, python -m old_data_cleaning.readd_duplex_col_Jan_to_20th_2022_data), so the data_cleaning package can be imported
+from data_cleaning.scraper_and_data_cleaning_functions import parse_attr_indicator_vars
+
 # for datetime manipulation and filtering
 import datetime
 datetime.datetime.strptime
@@ -133,20 +136,14 @@ index_for_single_fam = look_up_index_loc_of_col(
     'single_fam'  # look up index location for 'single_fam' col
     )
 
-# create indicator var using numpy and Pandas' str.contains() based on scraped rental listing attributes and descriptions  
-def indicator_vars_from_scraped_data(df, col_to_parse, attr_substr):
-    return pd.Series(np.where(df[col_to_parse].str.contains(attr_substr), 1, 0))
-
-
-
-# Now, apply indicator_vars...() function to each df in the dictionaries of dfs:
+# Now, apply parse_attr_indicator_vars() function to each df in the dictionaries of dfs:
 def apply_func_to_dict_of_dfs_and_create_col(dict):
     """Create duplex indicator var col for each dataframe in a dictionary of dataframes"""
     for key in dict:
-        dict[key]['duplex'] = indicator_vars_from_scraped_data(dict[key], 'attr_vars', 'duplex')
+        parse_attr_indicator_vars(dict[key], ['duplex'])
     return dict 
 
-### Create and add duplex housing type indicator var via indicator_vars...() function to each subregion dictionary of dfs:
+### Create and add duplex housing type indicator var via parse_attr_indicator_vars() function to each subregion dictionary of dfs:
 
 # South Bay
 sby_dict = apply_func_to_dict_of_dfs_and_create_col(sby_dict)
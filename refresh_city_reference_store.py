@@ -0,0 +1,47 @@
+"""Refresh command of the city reference store: scrape the city names of the given region(s) from the wikipedia tables, and save them as a new version of the store (see data_cleaning/city_reference_store.py).
+
+The ETL (see data_pipelines/Pandas_and_SQL_ETL_and_data_cleaning.py) only loads the latest version of the city names from the store, so run this command whenever the ETL reports that the city names are older than the TTL.
+NB: a refreshed version is only saved if the wikipedia tables could be scraped--ie, otherwise the previous version (or the bundled snapshot) is kept.
+
+Example usage:
+    python refresh_city_reference_store.py --region sfbay --region phoenix --if-stale"""
+import argparse
+
+from data_cleaning.city_reference_store import shared_city_reference_store
+from data_pipelines.Pandas_and_SQL_ETL_and_data_cleaning import city_names_wiki_urls, obtain_city_names_from_wiki
+
+
+def parse_refresh_command_line_args():
+    """Parse the command-line arguments for the refresh command."""
+    parser = argparse.ArgumentParser(description="Scrape the city names of the given region(s) from wikipedia, and save them as a new version of the city reference store")
+    parser.add_argument('--region', action='append', choices=sorted(city_names_wiki_urls), help="region code to refresh--e.g., sfbay (default: every region)")
+    parser.add_argument('--if-stale', action='store_true', help="only refresh the regions whose latest city names are older than the TTL")
+    parser.add_argument('--ttl-days', type=float, default=shared_city_reference_store.ttl_days, help=f"number of days after which the city names are stale (default: {shared_city_reference_store.ttl_days})")
+    parser.add_argument('--store-path', default=shared_city_reference_store.store_path, help="directory of the city reference store (default: scraped_data/city_reference)")
+    return parser.parse_args()
+
+
+def refresh_region(region: str, if_stale: bool = False):
+    """Scrape & save the city names of a region as a new version--NB: unless if_stale is given and the latest city names are not stale yet."""
+    if if_stale:
+        city_reference = shared_city_reference_store.load(region)
+        if not shared_city_reference_store.is_stale(city_reference):
+            print(f"Skipped the {region} city names, which are not stale yet: {city_reference}")
+            return
+    city_names = obtain_city_names_from_wiki(region)
+    if not city_names:
+        print(f"\nNo {region} city names could be scraped from wikipedia, so the previous version is kept.\n")
+        return
+    city_reference = shared_city_reference_store.save(region, city_names, city_names_wiki_urls[region])
+    print(f"Saved {city_reference}")
+
+
+def main():
+    args = parse_refresh_command_line_args()
+    shared_city_reference_store.configure(ttl_days=args.ttl_days, store_path=args.store_path)
+    for region in args.region or sorted(city_names_wiki_urls):
+        refresh_region(region, args.if_stale)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Offline reparse mode: re-run the field extraction & data cleaning over the raw HTML archive of a given region & subregion, without any network access.
+
+Given main.py's --html-archive argument, every listing page fetched by the webcrawler is saved to a compressed, content-addressed archive within the scraped data directory
+(see Rentals/html_archive.py). So, once craigslist changes its HTML--and hence the xpaths of listing_field_xpaths need to be updated--
+the historical listings can be re-parsed from the archive instead of re-crawling them:
+a.) the archived pages are split into chunks, which a pool of worker processes decompress & parse via lxml, given the current xpaths.
+b.) each chunk is cleaned & transformed via the same clean_scraped_data() & dict_to_df_pipeline() methods as the webcrawler--NB: the date_of_webcrawler col is the date on which each page was fetched.
+c.) the chunks are written to a single CSV file within the 'reparsed' subdirectory of the scraped data directory (ie, so the CSV files of the webcrawler runs are left as is).
+
+Example usage:
+    python reparse_html_archive.py --region sfbay --subregion sby --processes 4 --since 2023-09-01"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Rentals.selenium_webcrawler import Craigslist_Rentals
+from Rentals.html_archive import Listing_HTML_Archive, extract_archived_listing_records
+from Rentals.listing_page_fields import listing_records_to_dict_of_lists
+
+
+# specify the name of the subdirectory of the scraped data directory to contain the re-parsed CSV files
+reparsed_data_folder = 'reparsed'
+
+# specify the craigslist crawler of each worker process (see initialize_reparse_worker())
+worker_craigslist_crawler = None
+
+
+def parse_reparse_command_line_args():
+    """Parse the command-line arguments for the offline reparse mode."""
+    parser = argparse.ArgumentParser(description="Re-parse the archived craigslist rental listing pages of a given region & subregion, without any network access")
+    parser.add_argument('--region', required=True, help="craigslist region code--e.g., sfbay")
+    parser.add_argument('--subregion', default=None, help="craigslist subregion code--e.g., sby (default: None, ie, for regions that do not have any subregions)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help="number of worker processes used to parse the archived pages (default: number of CPUs)")
+    parser.add_argument('--chunk-size', type=int, default=500, help="number of archived pages parsed & cleaned by a worker process at a time (default: 500)")
+    parser.add_argument('--since', default=None, help="only re-parse the pages fetched on or after the given date, in YYYY-mm-dd format (default: every archived page)")
+    return parser.parse_args()
+
+
+def initialize_craigslist_crawler(region: str, subregion: str) -> Craigslist_Rentals:
+    """Initialize a Craigslist_Rentals instance for the given region & subregion, whose data cleaning methods we reuse--NB: no webdriver is borrowed, since the crawler never accesses any webpage."""
+    # NB: use the same search parameters as main.py
+    housing_category, min_price, max_price, rent_period, sale_date = 'apa', 50, 12000, 3, "all+dates"
+    return Craigslist_Rentals(region, subregion, housing_category, min_price, max_price, rent_period, sale_date)
+
+
+def initialize_reparse_worker(region: str, subregion: str):
+    """Initialize the craigslist crawler of a given worker process once, rather than for each chunk of archived pages."""
+    global worker_craigslist_crawler
+    worker_craigslist_crawler = initialize_craigslist_crawler(region, subregion)
+
+
+def reparse_chunk(scraped_data_path: str, index_entries: list):
+    """Parse a chunk of archived pages, and clean & transform the scraped data to a DataFrame (via the clean_scraped_data() & dict_to_df_pipeline() methods). Return None if none of the pages could be loaded."""
+    archived_listing_records = extract_archived_listing_records(scraped_data_path, index_entries)
+    if not archived_listing_records:
+        return None
+    listing_urls, fetch_dates, listing_records = zip(*archived_listing_records)
+    dict_scraped_lists = listing_records_to_dict_of_lists(list(listing_urls), list(listing_records), fetch_dates)
+    dict_scraped_lists = worker_craigslist_crawler.clean_scraped_data(dict_scraped_lists)
+    return worker_craigslist_crawler.dict_to_df_pipeline(dict_scraped_lists)
+
+
+def main():
+    args = parse_reparse_command_line_args()
+    start_time = time.perf_counter()
+
+    # locate the scraped data directory of the given region & subregion--ie, the same directory as main.py--and its html archive
+    craigslist_crawler = initialize_craigslist_crawler(args.region, args.subregion)
+    scraped_data_path = craigslist_crawler.mk_direc_for_scraped_data(os.getcwd(), "scraped_data")
+    index_entries = Listing_HTML_Archive(scraped_data_path).load_index(args.since)
+    if not index_entries:
+        print(f"\nThe html archive of {scraped_data_path} does not contain any pages to re-parse.\n")
+        return
+
+    reparsed_data_path = os.path.join(scraped_data_path, reparsed_data_folder)
+    os.makedirs(reparsed_data_path, exist_ok=True)
+
+    ## split the archived pages into chunks, and parse & clean each chunk via the pool of worker processes
+    chunks = [index_entries[i:i + args.chunk_size] for i in range(0, len(index_entries), args.chunk_size)]
+    print(f"\nRe-parsing {len(index_entries)} archived pages in {len(chunks)} chunks, via {args.processes} worker processes.\n")
+
+    n_listings_written = 0
+    mode = 'w'  # overwrite any CSV file from an earlier reparse of the same day with the 1st chunk, and then append each subsequent chunk
+    with ProcessPoolExecutor(max_workers=args.processes, initializer=initialize_reparse_worker, initargs=(args.region, args.subregion)) as executor:
+        for df in executor.map(reparse_chunk, [scraped_data_path] * len(chunks), chunks):
+            if df is None:
+                continue
+            # clean city names data for specific subregions, and write the chunk to CSV
+            craigslist_crawler.df_to_CSV_data_pipeline(df, reparsed_data_path, mode)
+            n_listings_written += len(df)
+            mode = 'a'
+
+    print(f"\n{n_listings_written} listings have been re-parsed and written to CSV within:\n{reparsed_data_path}\nin {round(time.perf_counter() - start_time, 2)} seconds.\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from Rentals.city_name_resolver import City_Name_Resolver, clean_city_names_for_subregion
+from Rentals.clean_city_names import clean_city_names_for_sf, clean_given_city_names_data, sf_neighborhoods, sj_neighborhoods, santa_clara_neighborhoods, oakland_neighborhoods, hayward_neighborhoods, alameda_neighborhoods, richmond_neighborhoods
+from Rentals.clean_santa_cruz_data import clean_mislabelled_santa_cruz_data, san_cruz_cities
+
+
+def clean_city_names_via_chained_functions(df: pd.DataFrame, subregion: str) -> pd.DataFrame:
+    """The former chain of city names cleaning functions of each subregion--ie, the reference output of the city name resolvers."""
+    if subregion == 'sfc':
+        return clean_city_names_for_sf(sf_neighborhoods, df)
+    if subregion == 'scz':
+        return clean_mislabelled_santa_cruz_data(san_cruz_cities, df)
+    if subregion == 'sby':
+        df = clean_given_city_names_data('San Jose', sj_neighborhoods, df)
+        return clean_given_city_names_data('Santa Clara', santa_clara_neighborhoods, df)
+    if subregion == 'eby':
+        df = clean_given_city_names_data('Oakland', oakland_neighborhoods, df)
+        df = clean_given_city_names_data('Hayward', hayward_neighborhoods, df)
+        df = clean_given_city_names_data('Alameda', alameda_neighborhoods, df)
+        return clean_given_city_names_data('Richmond', richmond_neighborhoods, df)
+    return df
+
+
+def synthetic_raw_city_names(n_rows: int, seed: int = 0) -> list:
+    """Return raw city names drawn from every subregion's neighborhood names--in various cases, within longer names, split via '/'--plus missing & unmatched city names."""
+    synthetic_random = random.Random(seed)
+    names = sf_neighborhoods + sj_neighborhoods + santa_clara_neighborhoods + oakland_neighborhoods + hayward_neighborhoods + alameda_neighborhoods + richmond_neighborhoods + san_cruz_cities + ['Redding', 'Palo Alto', 'San Mateo', '']
+    case_variants = [str, str.lower, str.upper, str.title]
+    raw_city_names = []
+    for _ in range(n_rows):
+        draw = synthetic_random.random()
+        if draw < 0.05:
+            raw_city_names.append(None)
+        elif draw < 0.1:
+            raw_city_names.append(np.nan)
+        else:
+            raw_city_name = synthetic_random.choice(case_variants)(synthetic_random.choice(names))
+            if draw < 0.3:
+                raw_city_name = f"{raw_city_name}/{synthetic_random.choice(names)}"
+            elif draw < 0.4:
+                raw_city_name = f"north {raw_city_name} area"
+            raw_city_names.append(raw_city_name)
+    return raw_city_names
+
+
+class Test_City_Name_Resolver(unittest.TestCase):
+
+    def setUp(self):
+        raw_city_names = synthetic_raw_city_names(5000)
+        self.df = pd.DataFrame({
+            'ids': [str(7600000000 + i) for i in range(len(raw_city_names))],
+            'cities': raw_city_names,
+            'sub_region': [random.Random(i).choice(['scz', 'sby']) for i in range(len(raw_city_names))],
+            })
+
+    def assert_same_as_chained_functions(self, subregion: str):
+        resolved_df = clean_city_names_for_subregion(self.df.copy(), subregion)
+        reference_df = clean_city_names_via_chained_functions(self.df.copy(), subregion)
+        self.assertEqual(resolved_df.index.tolist(), reference_df.index.tolist())
+        self.assertEqual(resolved_df['cities'].tolist(), list(reference_df['cities']))
+
+    def test_sfc_is_the_same_as_chained_functions(self):
+        self.assert_same_as_chained_functions('sfc')
+
+    def test_scz_is_the_same_as_chained_functions(self):
+        self.assert_same_as_chained_functions('scz')
+
+    def test_sby_is_the_same_as_chained_functions(self):
+        self.assert_same_as_chained_functions('sby')
+
+    def test_eby_is_the_same_as_chained_functions(self):
+        self.assert_same_as_chained_functions('eby')
+
+    def test_other_subregions_are_left_as_is(self):
+        self.assertIs(clean_city_names_for_subregion(self.df, 'pen'), self.df)
+
+    def test_rules_are_applied_in_order(self):
+        """A resolved city name is checked against the later rules only--ie, the same as a chain of calls."""
+        city_name_resolver = City_Name_Resolver([('Alpha', ['a']), ('Beta', ['alpha']), ('Gamma', ['x'])])
+        self.assertEqual(city_name_resolver.resolve_city_names(['A street', 'Other', None, 'x/a']), ['Beta', 'Other', None, 'Gamma'])
+        self.assertEqual(city_name_resolver.cache_info(), {'distinct_city_names': 4, 'hits': 0, 'misses': 4})
+
+    def test_unmatched_city_names_are_dropped(self):
+        city_name_resolver = City_Name_Resolver([('San Francisco', ['Mission'])], unmatched='drop')
+        self.assertEqual(city_name_resolver.resolve_city_names(['MISSION bay', 'Redding', 'Redding']), ['San Francisco', None, None])
+        self.assertEqual(city_name_resolver.cache_info()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
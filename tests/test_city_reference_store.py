@@ -0,0 +1,60 @@
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from data_cleaning.city_reference_store import City_Reference, City_Reference_Store, bundled_city_reference_path, refreshed_at_format
+
+
+class Test_City_Reference_Store(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.tmp_dir.name, 'snapshots')
+        os.makedirs(self.snapshot_path)
+        refreshed_at = (datetime.datetime.now() - datetime.timedelta(days=10)).strftime(refreshed_at_format)
+        City_Reference('testbay', 3, refreshed_at, ['https://en.wikipedia.org/wiki/Test_Bay'], ['Alpha', 'Beta']).to_json(os.path.join(self.snapshot_path, 'testbay.json'))
+        self.store = City_Reference_Store(store_path=os.path.join(self.tmp_dir.name, 'store'), snapshot_path=self.snapshot_path, ttl_days=180)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def load_city_names(self, region: str) -> tuple:
+        """Return the city names of the region, and the reminder printed if they are stale."""
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            city_names = self.store.load_city_names(region)
+        return city_names, stdout.getvalue()
+
+    def test_empty_store_falls_back_to_the_snapshot(self):
+        self.assertEqual(self.load_city_names('testbay'), (['Alpha', 'Beta'], ''))
+        self.assertEqual((self.store.load('testbay').origin, self.store.load('testbay').version), ('snapshot', 3))
+        self.assertFalse(os.path.exists(self.store.region_path('testbay')))  # NB: the snapshot is not copied into the store
+
+    def test_saved_version_takes_precedence_over_the_snapshot(self):
+        self.store.save('testbay', ['Gamma'])
+        self.store.configure(ttl_days=180)  # ie, clear the in-memory copies, so the version is read from disk
+        city_reference = self.store.load('testbay')
+        self.assertEqual((city_reference.origin, city_reference.version, city_reference.city_names), ('store', 1, ['Gamma']))
+        self.assertEqual(self.store.versions('testbay'), [1])
+
+    def test_stale_snapshot_prints_a_refresh_reminder(self):
+        self.store.configure(ttl_days=5)
+        city_names, reminder = self.load_city_names('testbay')
+        self.assertEqual(city_names, ['Alpha', 'Beta'])
+        self.assertIn('python refresh_city_reference_store.py --region testbay', reminder)
+
+    def test_unknown_region_raises_key_error(self):
+        with self.assertRaises(KeyError):
+            self.store.load('atlantis')
+
+    def test_bundled_snapshots_are_loadable(self):
+        store = City_Reference_Store(store_path=os.path.join(self.tmp_dir.name, 'store'), snapshot_path=bundled_city_reference_path, ttl_days=None)
+        for region in ('sfbay', 'phoenix'):
+            self.assertEqual(store.load(region).origin, 'snapshot')
+            self.assertTrue(store.load_city_names(region))
+
+
+if __name__ == '__main__':
+    unittest.main()
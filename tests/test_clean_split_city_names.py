@@ -0,0 +1,41 @@
+import unittest
+
+import pandas as pd
+import pytest
+
+# NB: the ETL imports pyodbc, which needs the ODBC driver manager (ie, libodbc) to be installed
+etl = pytest.importorskip('data_pipelines.Pandas_and_SQL_ETL_and_data_cleaning', exc_type=ImportError)
+
+
+class Test_Clean_Split_City_Names(unittest.TestCase):
+    """Check the city names cleaning of the ETL on a small DataFrame of raw city names."""
+
+    address_criteria = [' Rd,', ' Blvd,']
+    neighborhood_criteria = ['Downtown', 'Ca.']
+    split_city_delimiters = [',', '/']
+    incorrect_city_names = {'Mtn View': 'Mountain View'}
+    cities_not_in_region = {'Redding': ''}
+    cities_that_need_extra_cleaning = {'San los': 'San Carlos'}
+
+    def clean_cities(self, cities: list) -> list:
+        df = pd.DataFrame({'cities': cities})
+        df = etl.clean_split_city_names(df, self.address_criteria, self.neighborhood_criteria, self.split_city_delimiters, self.incorrect_city_names, self.cities_not_in_region, self.cities_that_need_extra_cleaning)
+        return df['cities'].tolist()
+
+    def test_criteria_are_matched_literally(self):
+        """A regex metacharacter of the criteria (ie, the '.' of 'Ca.') only matches itself--so 'Campbell' is left as is, rather than losing its 'Cam'."""
+        self.assertEqual(self.clean_cities(['Campbell', 'San Jose Ca.']), ['Campbell', 'San Jose'])
+
+    def test_split_and_misspelled_city_names(self):
+        self.assertEqual(self.clean_cities(['Oakland/Berkeley', '123 Main Rd, Mtn View', 'Downtown San Mateo']), ['Oakland', 'Mountain View', 'San Mateo'])
+
+    def test_literal_nan_city_names_are_removed(self):
+        """A whole 'nan' value is removed regardless of its case (ie, 'Nan', once capitalized), but a city name that contains 'nan' is kept."""
+        self.assertEqual(self.clean_cities(['nan', 'NaN', 'San Fernando', None, 'Sunnyvale']), ['San Fernando', 'Sunnyvale'])
+
+    def test_cities_not_in_region_are_removed_case_insensitive(self):
+        self.assertEqual(self.clean_cities(['REDDING', 'redding', 'Redding', 'Palo Alto']), ['Palo Alto'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import threading
+import unittest
+
+from data_cleaning.configurable_settings import Configurable_Settings
+
+
+class Counting_Settings(Configurable_Settings):
+
+    settings_owner_name = 'counting settings'
+
+    def __init__(self):
+        self.limit = 1
+        self.name = 'a'
+        self.n_resets = 0
+        self.lock = threading.Lock()
+
+    def reset_after_configure(self, settings: dict):
+        self.n_resets += 1
+
+
+class Test_Configurable_Settings(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = Counting_Settings()
+
+    def test_configure_sets_the_settings_and_resets(self):
+        self.settings.configure(limit=2, name='b')
+        self.assertEqual((self.settings.limit, self.settings.name, self.settings.n_resets), (2, 'b', 1))
+
+    def test_unknown_setting_leaves_the_settings_as_is(self):
+        with self.assertRaisesRegex(AttributeError, "The counting settings has no setting named 'limt'"):
+            self.settings.configure(limit=2, limt=3)
+        self.assertEqual((self.settings.limit, self.settings.n_resets), (1, 0))
+        self.assertFalse(hasattr(self.settings, 'limt'))
+
+    def test_update_settings_returns_the_changed_settings(self):
+        self.assertEqual(self.settings.update_settings({'limit': 1, 'name': 'c'}), {'name': 'c'})
+        self.assertEqual(self.settings.n_resets, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
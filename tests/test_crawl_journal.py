@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+import unittest
+
+from Rentals.crawl_journal import Crawl_Journal
+from Rentals.listing_page_fields import listing_field_xpaths, nan_listing_record
+
+
+def listing_record(listing_id: str) -> dict:
+    """Return a record in which every scraped field is given--ie, the listing ID, and the field name otherwise."""
+    return {field_name: listing_id if field_name == 'ids' else field_name for field_name in listing_field_xpaths}
+
+
+class Test_Crawl_Journal(unittest.TestCase):
+
+    listing_urls = [f'https://sfbay.craigslist.org/sby/apa/d/{i}.html' for i in range(4)]
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.crawl_journal = Crawl_Journal(self.tmp_dir.name, 'sfbay', 'sby', date_str='09_30_2023')
+        self.crawl_journal.start_new_crawl(self.listing_urls)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_file_names(self):
+        self.assertEqual(os.path.basename(self.crawl_journal.journal_path), 'crawl_journal_sfbay_sby_09_30_2023.jsonl')
+        self.assertEqual(os.path.basename(Crawl_Journal(self.tmp_dir.name, 'phoenix', None, '09_30_2023').frontier_path), 'crawl_frontier_phoenix_09_30_2023.json')
+
+    def test_resume_skips_the_journaled_listings(self):
+        self.crawl_journal.record_listing(self.listing_urls[2], listing_record('2'))
+        self.crawl_journal.record_listings([(self.listing_urls[0], listing_record('0')), (self.listing_urls[1], nan_listing_record())])
+        self.assertEqual(self.crawl_journal.load_frontier(), self.listing_urls)
+        # NB: a listing in which every field is missing is not journaled, so it is retried on resume
+        self.assertEqual(self.crawl_journal.remaining_listing_urls(self.listing_urls), self.listing_urls[1:2] + self.listing_urls[3:])
+        dict_of_lists = self.crawl_journal.load_dict_of_lists(self.listing_urls)
+        self.assertEqual((dict_of_lists['listing_urls'], dict_of_lists['ids']), ([self.listing_urls[0], self.listing_urls[2]], ['0', '2']))
+        self.assertEqual([record.ids for record in self.crawl_journal.iter_journaled_listing_records()], ['2', '0'])
+
+    def test_truncated_last_line_is_skipped_and_terminated(self):
+        self.crawl_journal.record_listing(self.listing_urls[0], listing_record('0'))
+        with open(self.crawl_journal.journal_path, 'a', encoding='utf-8') as fh:
+            fh.write('{"listing_url": "https://sfbay.craigslist.org/sby/apa/d/1.html", "ids"')  # ie, a crash while writing the line
+        resumed_journal = Crawl_Journal.latest(self.tmp_dir.name, 'sfbay', 'sby')
+        self.assertEqual(resumed_journal.journal_path, self.crawl_journal.journal_path)
+        resumed_journal.record_listing(self.listing_urls[1], listing_record('1'))
+        self.assertEqual(list(resumed_journal.load_journaled_records()), self.listing_urls[:2])
+
+    def test_latest_journal_is_the_last_saved_frontier(self):
+        self.assertIsNone(Crawl_Journal.latest(self.tmp_dir.name, 'sfbay', 'eby'))
+        later_journal = Crawl_Journal(self.tmp_dir.name, 'sfbay', 'sby', date_str='10_01_2023')
+        later_journal.start_new_crawl(self.listing_urls[:1])
+        os.utime(later_journal.frontier_path, (time.time() + 10, time.time() + 10))
+        self.assertEqual(Crawl_Journal.latest(self.tmp_dir.name, 'sfbay', 'sby').date_str, '10_01_2023')
+
+
+if __name__ == '__main__':
+    unittest.main()
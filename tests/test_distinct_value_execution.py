@@ -0,0 +1,61 @@
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning.distinct_value_execution import Distinct_Value_Execution
+
+
+def describe_value(value) -> str:
+    """Row-wise transform that tells apart every value--ie, including the type of each missing value."""
+    return f"{type(value).__name__}:{value}"
+
+
+class Test_Distinct_Value_Execution(unittest.TestCase):
+
+    def setUp(self):
+        self.distinct_value_execution = Distinct_Value_Execution()
+        synthetic_random = random.Random(0)
+        values = ['San Jose', 'san jose', 'Oakland', '', None, np.nan, pd.NaT, 3, 3.0]
+        self.series = pd.Series([synthetic_random.choice(values) for _ in range(1000)], index=range(5000, 6000), name='cities', dtype=object)
+
+    def test_missing_values_of_each_type_are_kept_apart(self):
+        first_positions, row_positions = Distinct_Value_Execution.distinct_value_positions(pd.Series(['a', None, np.nan, 'a', None, pd.NaT, np.nan], dtype=object))
+        self.assertEqual(first_positions.tolist(), [0, 1, 2, 5])
+        self.assertEqual(row_positions.tolist(), [0, 1, 2, 0, 1, 3, 2])
+
+    def test_apply_is_the_same_as_map(self):
+        transformed_series = self.distinct_value_execution.apply(self.series, lambda series: series.map(describe_value), 'describe')
+        pd.testing.assert_series_equal(transformed_series, self.series.map(describe_value))
+
+    def test_apply_is_the_same_as_str_methods(self):
+        """NB: the Pandas' str methods return None for None, but NaN for NaN--so a transform may tell apart the missing values."""
+        series = self.series.where(self.series.map(lambda value: not isinstance(value, (int, float)) or pd.isna(value)), 'x')
+        transformed_series = self.distinct_value_execution.apply(series, lambda series: series.str.upper(), 'upper')
+        self.assertEqual(transformed_series.map(describe_value).tolist(), series.str.upper().map(describe_value).tolist())
+
+    def test_apply_to_array_is_the_same_as_the_whole_array(self):
+        values = self.series.astype(str).to_numpy()
+
+        def transform(values: np.ndarray) -> tuple:
+            return np.char.str_len(values.astype(str)), np.char.lower(values.astype(str))
+
+        for transformed_array, expected_array in zip(self.distinct_value_execution.apply_to_array(values, transform, 'lengths'), transform(values)):
+            self.assertEqual(transformed_array.tolist(), expected_array.tolist())
+
+    def test_report_records_the_hit_rate(self):
+        self.distinct_value_execution.apply(self.series, lambda series: series.map(describe_value), 'describe')
+        n_distinct_values = len(set(self.series.map(describe_value)))
+        self.assertEqual(self.distinct_value_execution.report()['describe']['distinct_values'], n_distinct_values)
+        self.assertEqual(self.distinct_value_execution.report()['describe']['hit_rate'], round(1 - n_distinct_values / 1000, 4))
+
+    def test_disabled_mode_applies_the_transform_to_every_row(self):
+        self.distinct_value_execution.configure(enabled=False)
+        transformed_series = self.distinct_value_execution.apply(self.series, lambda series: series.map(describe_value), 'describe')
+        pd.testing.assert_series_equal(transformed_series, self.series.map(describe_value))
+        self.assertEqual(self.distinct_value_execution.report()['describe']['hit_rate'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
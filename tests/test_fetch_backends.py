@@ -0,0 +1,116 @@
+import contextlib
+import io
+import unittest
+
+from Rentals.crawler_telemetry import Crawler_Telemetry
+from Rentals.fetch_backends import HTTP_Listing_Fetch_Backend, extract_listing_fields_from_html, page_needs_javascript
+from Rentals.listing_page_fields import listing_field_xpaths, nan_val
+from Rentals.retry_policy import Retry_Policy
+
+listing_page = """<html><body><section><section>
+<h1><span><span>a</span><span>b</span><span>c</span><span>San Mateo</span></span><span class="price">$2,500</span></h1>
+<section><div></div><div><p>post id: 7600000001</p></div>
+<section id="postingbody"><div class="print-information">QR Code Link to This Post</div>Sunny 1br<br>near   Caltrain</section>
+</section></section></section></body></html>"""
+
+javascript_page = "<html><body><div id='app'></div><script>render()</script></body></html>"
+
+
+class Fake_Response(object):
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+        self.from_cache = False
+
+
+class Fake_Response_Cache(object):
+    """Respond to every URL with the given response--ie, without sending any GET request."""
+
+    def __init__(self, response: Fake_Response):
+        self.response = response
+        self.n_gets = 0
+
+    def get(self, url, session=None, rate_limiter=None, timeout=None):
+        self.n_gets += 1
+        return self.response
+
+
+class Fake_Selenium_Backend(object):
+
+    def __init__(self):
+        self.fetched_urls = []
+
+    def fetch_listing_once(self, list_url: str) -> dict:
+        self.fetched_urls.append(list_url)
+        return {'ids': 'via selenium'}
+
+    def restart_worker_webdriver(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class Fake_Craigslist_Crawler(object):
+
+    def __init__(self):
+        self.field_extraction_timer = None
+        self.html_archive = None
+        self.retry_policy = Retry_Policy(max_retries=0)
+        self.telemetry = Crawler_Telemetry()
+
+
+class Test_Listing_Fields_From_HTML(unittest.TestCase):
+
+    def test_fields_are_parsed_like_selenium(self):
+        record = extract_listing_fields_from_html(listing_page)
+        self.assertEqual(list(record), list(listing_field_xpaths))
+        self.assertEqual((record['ids'], record['prices'], record['cities']), ('post id: 7600000001', '$2,500', 'San Mateo'))
+        self.assertEqual(record['listing_descrip'], 'Sunny 1br\nnear Caltrain')  # ie, sans the hidden print-only text
+        self.assertEqual(record['date_posted'], nan_val)
+
+    def test_page_needs_javascript_only_if_every_key_field_is_missing(self):
+        self.assertFalse(page_needs_javascript(extract_listing_fields_from_html(listing_page)))
+        self.assertTrue(page_needs_javascript(extract_listing_fields_from_html(javascript_page)))
+        self.assertFalse(page_needs_javascript({'ids': nan_val, 'prices': '$1', 'listing_descrip': nan_val}))
+
+
+class Test_HTTP_Listing_Fetch_Backend(unittest.TestCase):
+
+    list_url = 'https://sfbay.craigslist.org/pen/apa/d/1.html'
+
+    def fetch_backend(self, status_code: int, text: str) -> HTTP_Listing_Fetch_Backend:
+        fetch_backend = HTTP_Listing_Fetch_Backend(Fake_Craigslist_Crawler(), response_cache=Fake_Response_Cache(Fake_Response(status_code, text)))
+        fetch_backend.selenium_fallback = Fake_Selenium_Backend()
+        return fetch_backend
+
+    def fetch_listing(self, fetch_backend: HTTP_Listing_Fetch_Backend) -> dict:
+        with contextlib.redirect_stdout(io.StringIO()):  # ie, silence the retry policy & fallback messages
+            record = fetch_backend.fetch_listing(self.list_url)
+            fetch_backend.close()
+        return record
+
+    def test_parsed_page_does_not_fall_back_to_selenium(self):
+        fetch_backend = self.fetch_backend(200, listing_page)
+        self.assertEqual(self.fetch_listing(fetch_backend)['prices'], '$2,500')
+        self.assertEqual((fetch_backend.n_selenium_fallbacks, fetch_backend.selenium_fallback.fetched_urls), (0, []))
+        self.assertEqual(fetch_backend.telemetry.counters['n_bytes_downloaded'], len(listing_page.encode()))
+
+    def test_javascript_page_falls_back_to_selenium(self):
+        fetch_backend = self.fetch_backend(200, javascript_page)
+        self.assertEqual(self.fetch_listing(fetch_backend), {'ids': 'via selenium'})
+        self.assertEqual((fetch_backend.n_selenium_fallbacks, fetch_backend.selenium_fallback.fetched_urls), (1, [self.list_url]))
+
+    def test_error_response_does_not_fall_back_to_selenium(self):
+        """An expired listing (or an error response) is classified by the retry policy, rather than fetched again via selenium."""
+        for status_code, outcome in [(404, 'expired'), (503, 'failed_transient'), (429, 'failed_throttled')]:
+            fetch_backend = self.fetch_backend(status_code, javascript_page)
+            self.assertEqual(set(self.fetch_listing(fetch_backend).values()), {nan_val})
+            self.assertEqual(fetch_backend.selenium_fallback.fetched_urls, [])
+            self.assertIn(outcome, fetch_backend.retry_policy.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
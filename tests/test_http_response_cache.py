@@ -0,0 +1,101 @@
+import datetime
+import hashlib
+import os
+import tempfile
+import time
+import unittest
+
+from requests.structures import CaseInsensitiveDict
+
+from Rentals.http_response_cache import HTTP_Response_Cache, url_class_ttl
+
+
+class Stub_Response(object):
+
+    def __init__(self, status_code: int, content: bytes, headers: dict = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.elapsed = datetime.timedelta(seconds=0.1)
+
+
+class Stub_Session(object):
+    """Respond to each GET request with the next of the given responses, and record the headers of every request--ie, without any network access."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.request_headers = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.request_headers.append(headers)
+        return self.responses.pop(0)
+
+
+class Test_HTTP_Response_Cache(unittest.TestCase):
+
+    search_url = 'https://sfbay.craigslist.org/search/apa?s=120'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.response_cache = HTTP_Response_Cache(cache_path=self.tmp_dir.name, enabled=True)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_url_classes(self):
+        self.assertEqual(url_class_ttl('https://sfbay.craigslist.org/'), ('region_homepage', 7 * 24 * 3600))
+        self.assertEqual(url_class_ttl(self.search_url), ('search_page', 10 * 60))
+        self.assertEqual(url_class_ttl('https://sfbay.craigslist.org/sfc/apa/d/1.html'), ('listing_page', None))
+        self.assertEqual(url_class_ttl('https://example.com/other'), (None, None))
+
+    def test_fresh_response_is_served_without_a_request(self):
+        session = Stub_Session(Stub_Response(200, b'<html>page 1</html>', {'Content-Type': 'text/html; charset=utf-8'}))
+        self.assertEqual(self.response_cache.get(self.search_url, session).cache_status, 'miss')
+        cached_response = self.response_cache.get(self.search_url, session)
+        self.assertEqual((cached_response.cache_status, cached_response.from_cache, cached_response.text), ('hit', True, '<html>page 1</html>'))
+        self.assertEqual(len(session.request_headers), 1)
+        self.assertEqual(self.response_cache.summary()['hit'], 1)
+
+    def test_cache_key_is_the_full_url(self):
+        """Each URL (ie, including its query string) is cached under the sha256 hash of the URL."""
+        session = Stub_Session(Stub_Response(200, b'page 1'), Stub_Response(200, b'page 2'))
+        self.response_cache.get(self.search_url, session)
+        self.assertEqual(self.response_cache.get(self.search_url.replace('120', '240'), session).content, b'page 2')
+        url_hash = hashlib.sha256(self.search_url.encode('utf-8')).hexdigest()
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, 'objects', url_hash[:2], f"{url_hash}.gz")))
+        self.assertEqual(self.response_cache.load_entry(self.search_url)['content'], b'page 1')
+
+    def test_expired_response_is_revalidated(self):
+        self.response_cache.store_entry(self.search_url, 200, {'ETag': '"v1"', 'Content-Type': 'text/html'}, b'old page', fetched_at=time.time() - 11 * 60)
+        session = Stub_Session(Stub_Response(304, b'', {'ETag': '"v1"'}))
+        cached_response = self.response_cache.get(self.search_url, session)
+        self.assertEqual(session.request_headers[0]['If-None-Match'], '"v1"')
+        self.assertEqual((cached_response.cache_status, cached_response.status_code, cached_response.content), ('revalidated', 200, b'old page'))
+        self.assertEqual(self.response_cache.get(self.search_url, session).cache_status, 'hit')  # ie, the revalidation resets the TTL
+
+    def test_uncacheable_responses_are_bypassed(self):
+        listing_url = 'https://sfbay.craigslist.org/sfc/apa/d/1.html'
+        session = Stub_Session(Stub_Response(200, b'listing'), Stub_Response(200, b'listing'), Stub_Response(503, b''), Stub_Response(200, b'', {'Cache-Control': 'no-store'}))
+        self.assertEqual([self.response_cache.get(url, session).cache_status for url in (listing_url, listing_url, self.search_url, self.search_url)], ['bypass'] * 4)
+        self.assertIsNone(self.response_cache.load_entry(self.search_url))
+
+    def test_disabled_cache_sends_every_request(self):
+        self.response_cache.configure(enabled=False)
+        session = Stub_Session(Stub_Response(200, b'page 1'), Stub_Response(200, b'page 1'))
+        self.assertEqual([self.response_cache.get(self.search_url, session).cache_status for _ in range(2)], ['bypass', 'bypass'])
+        self.assertNotIn('If-None-Match', session.request_headers[1])
+
+    def test_least_recently_used_responses_are_evicted(self):
+        urls = [f'https://sfbay.craigslist.org/search/apa?s={offset}' for offset in (0, 120, 240)]
+        for url in urls:
+            self.response_cache.store_entry(url, 200, {}, os.urandom(2000))
+        self.response_cache.configure(max_bytes=int(self.response_cache.total_bytes * 0.9))  # NB: reloads the LRU index from the cache directory
+        self.response_cache.load_entry(urls[0])  # ie, urls[1] is now the least recently used response
+        self.response_cache.store_entry(urls[2], 200, {}, os.urandom(2000))
+        self.assertIsNone(self.response_cache.load_entry(urls[1]))
+        self.assertIsNotNone(self.response_cache.load_entry(urls[0]))
+        self.assertEqual(self.response_cache.summary()['evicted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
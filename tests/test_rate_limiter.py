@@ -0,0 +1,79 @@
+import contextlib
+import io
+import time
+import unittest
+
+from Rentals.rate_limiter import Adaptive_Rate_Limiter, Host_Token_Bucket
+
+
+class Test_Host_Token_Bucket(unittest.TestCase):
+
+    def setUp(self):
+        self.bucket = Host_Token_Bucket(requests_per_second=2, burst=1)
+        self.bucket.last_refill_time = 100.0
+
+    def test_concurrent_reservations_go_into_debt(self):
+        """Each reservation without a refill waits for one more token--ie, the workers are scheduled one after the other."""
+        self.assertEqual([self.bucket.reserve(100.0) for _ in range(3)], [0, 0.5, 1.0])
+        self.assertEqual(self.bucket.tokens, -2)
+
+    def test_tokens_refill_up_to_burst(self):
+        self.bucket.reserve(100.0)
+        self.assertEqual(self.bucket.reserve(100.5), 0)
+        self.assertEqual(self.bucket.reserve(200.0), 0)  # NB: an idle host does not accumulate more than burst tokens
+        self.assertEqual(self.bucket.tokens, 0)
+
+    def test_paused_host_waits_until_the_end_of_the_pause(self):
+        self.bucket.paused_until = 110.0
+        self.assertEqual(self.bucket.reserve(100.0), 10.0)
+        self.assertEqual(self.bucket.reserve(111.0), 0)
+
+
+class Test_Adaptive_Rate_Limiter(unittest.TestCase):
+
+    url = 'https://sfbay.craigslist.org/search/apa'
+    host = 'sfbay.craigslist.org'
+
+    def setUp(self):
+        self.rate_limiter = Adaptive_Rate_Limiter(requests_per_second=1, max_requests_per_second=1.02, min_requests_per_second=0.3,
+                                                  jitter=0, slow_response_seconds=5, backoff_factor=2, recovery_step=0.01, cooldown_seconds=30)
+
+    def record_response(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):  # ie, silence the backoff messages
+            self.rate_limiter.record_response(self.url, **kwargs)
+
+    def rate(self) -> float:
+        return self.rate_limiter.buckets_by_host[self.host].requests_per_second
+
+    def test_slow_responses_back_off_down_to_the_floor(self):
+        self.record_response(response_seconds=6)
+        self.assertEqual(self.rate(), 0.5)
+        self.record_response(response_seconds=6)
+        self.record_response(response_seconds=6)
+        self.assertEqual(self.rate(), 0.3)
+        self.assertEqual(self.rate_limiter.n_backoffs_by_host[self.host], 3)
+        self.assertEqual(self.rate_limiter.buckets_by_host[self.host].paused_until, 0)  # NB: only a throttling response pauses the host
+
+    def test_fast_responses_recover_up_to_the_ceiling(self):
+        for _ in range(5):
+            self.record_response(response_seconds=0.1, status_code=200)
+        self.assertEqual(self.rate(), 1.02)
+        self.assertNotIn(self.host, self.rate_limiter.n_backoffs_by_host)
+
+    def test_throttling_response_pauses_the_host_for_the_cooldown(self):
+        before = time.monotonic()
+        self.record_response(response_seconds=0.1, status_code=429)
+        bucket = self.rate_limiter.buckets_by_host[self.host]
+        self.assertEqual(bucket.requests_per_second, 0.5)
+        self.assertGreaterEqual(bucket.paused_until, before + 30)
+        self.assertGreater(self.rate_limiter.reserve(self.url), 29)
+
+    def test_configure_resets_the_hosts(self):
+        self.rate_limiter.reserve(self.url)
+        self.rate_limiter.configure(requests_per_second=4)
+        self.assertEqual(self.rate_limiter.summary(), {})
+        self.assertEqual(self.rate_limiter.max_requests_per_second, 4)  # ie, the ceiling is raised to the new initial rate
+
+
+if __name__ == '__main__':
+    unittest.main()
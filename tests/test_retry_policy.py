@@ -0,0 +1,95 @@
+import asyncio
+import contextlib
+import io
+import unittest
+
+import requests
+from lxml import etree
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from Rentals.listing_page_fields import nan_listing_record
+from Rentals.retry_policy import Listing_Fetch_Failure, Retry_Policy, classify_exception, classify_status_code
+
+
+class Test_Failure_Classification(unittest.TestCase):
+
+    def test_classify_status_code(self):
+        self.assertEqual([classify_status_code(status_code) for status_code in (200, 304, 404, 410, 429, 403, 500, 503)],
+                         [None, None, 'expired', 'expired', 'throttled', 'throttled', 'transient', 'transient'])
+
+    def test_classify_exception(self):
+        self.assertEqual(classify_exception(Listing_Fetch_Failure('throttled')), 'throttled')
+        self.assertEqual(classify_exception(TimeoutException()), 'transient')  # NB: a subclass of WebDriverException
+        self.assertEqual(classify_exception(WebDriverException()), 'driver_crash')
+        self.assertEqual(classify_exception(requests.ConnectionError()), 'transient')
+        self.assertEqual(classify_exception(etree.ParserError('Document is empty')), 'transient')
+        self.assertIsNone(classify_exception(KeyError('price')))
+
+
+class Test_Retry_Policy(unittest.TestCase):
+
+    list_url = 'https://sfbay.craigslist.org/sfc/apa/d/1.html'
+
+    def setUp(self):
+        self.retry_policy = Retry_Policy(max_retries=2, base_delay=0, jitter=0)
+
+    def fetch(self, attempts: list, **kwargs) -> dict:
+        """Fetch via an attempt that raises (or returns) each of the given attempts in turn--NB: the failure messages are silenced."""
+        attempts = iter(attempts)
+
+        def fetch_attempt(list_url: str) -> dict:
+            attempt = next(attempts)
+            if isinstance(attempt, Exception):
+                raise attempt
+            return attempt
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.retry_policy.fetch_with_retries(self.list_url, fetch_attempt, **kwargs)
+
+    def test_backoff_delay_doubles_up_to_the_ceiling(self):
+        retry_policy = Retry_Policy(base_delay=2, max_delay=10, jitter=0)
+        self.assertEqual([retry_policy.backoff_delay(n_retry) for n_retry in range(1, 6)], [2, 4, 8, 10, 10])
+        retry_policy.configure(jitter=0.5)
+        self.assertTrue(all(2 <= retry_policy.backoff_delay(1) <= 3 for _ in range(100)))
+
+    def test_transient_failure_is_retried(self):
+        self.assertEqual(self.fetch([TimeoutException(), {'price': '$1'}]), {'price': '$1'})
+        self.assertEqual(self.retry_policy.summary(), {'transient': 1, 'retries': 1, 'scraped': 1})
+
+    def test_expired_listing_is_not_retried(self):
+        self.assertEqual(self.fetch([Listing_Fetch_Failure('expired'), {'price': '$1'}]), nan_listing_record())
+        self.assertEqual(self.retry_policy.summary(), {'expired': 1})
+
+    def test_driver_crash_restarts_the_webdriver(self):
+        n_restarts = []
+        self.fetch([WebDriverException(), {'price': '$1'}], restart_webdriver=lambda: n_restarts.append(1))
+        self.assertEqual(len(n_restarts), 1)
+
+    def test_exhausted_retries_give_up(self):
+        self.assertEqual(self.fetch([requests.ConnectionError()] * 3), nan_listing_record())
+        self.assertEqual(self.retry_policy.summary(), {'transient': 3, 'retries': 2, 'failed_transient': 1})
+        with self.assertRaises(Listing_Fetch_Failure) as raised:
+            self.fetch([Listing_Fetch_Failure('throttled')] * 3, raise_on_give_up=True)
+        self.assertEqual(raised.exception.category, 'throttled')
+
+    def test_unknown_exception_is_raised_as_is(self):
+        with self.assertRaises(KeyError):
+            self.fetch([KeyError('price')])
+
+    def test_async_fetch_counts_the_same_outcomes(self):
+        attempts = iter([TimeoutException(), {'price': '$1'}])
+
+        async def fetch_attempt(list_url: str) -> dict:
+            attempt = next(attempts)
+            if isinstance(attempt, Exception):
+                raise attempt
+            return attempt
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            record = asyncio.run(self.retry_policy.fetch_with_retries_async(self.list_url, fetch_attempt))
+        self.assertEqual(record, {'price': '$1'})
+        self.assertEqual(self.retry_policy.summary(), {'transient': 1, 'retries': 1, 'scraped': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
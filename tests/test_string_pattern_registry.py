@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning.string_pattern_registry import String_Pattern_Registry
+
+
+class Test_String_Pattern_Registry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = String_Pattern_Registry(max_patterns=2)
+
+    def test_patterns_are_memoized(self):
+        compiled_pattern = self.registry.pattern(['a', 'b'])
+        self.assertIs(self.registry.pattern(('a', 'b')), compiled_pattern)  # NB: a list & a tuple of the same substrings share the pattern
+        self.assertIsNot(self.registry.pattern(['a', 'b'], case=False), compiled_pattern)
+        self.assertEqual(self.registry.cache_info(), {'patterns': 2, 'hits': 1, 'misses': 2})
+
+    def test_least_recently_used_pattern_is_evicted(self):
+        self.registry.pattern(['a'])
+        self.registry.pattern(['b'])
+        self.registry.pattern(['a'])  # ie, 'b' is now the least recently used pattern
+        self.registry.pattern(['c'])
+        self.assertEqual(self.registry.cache_info()['patterns'], 2)
+        self.assertIn((('a',), True, False, False), self.registry.patterns)
+        self.assertNotIn((('b',), True, False, False), self.registry.patterns)
+
+    def test_configure_clears_the_patterns(self):
+        self.registry.pattern(['a'])
+        self.registry.configure(max_patterns=10)
+        self.assertEqual(self.registry.cache_info(), {'patterns': 0, 'hits': 0, 'misses': 0})
+        with self.assertRaises(AttributeError):
+            self.registry.configure(no_such_setting=1)
+
+    def test_substrings_are_escaped(self):
+        replaced = self.registry.replace(pd.Series(['Campbell Ca.', 'Cat']), ['Ca.'], '')
+        self.assertEqual(replaced.tolist(), ['Campbell ', 'Cat'])
+
+    def test_replace_whole_value(self):
+        replaced = self.registry.replace(pd.Series(['Nan', 'nan', 'San Fernando']), ['nan'], '', case=False, whole_value=True)
+        self.assertEqual(replaced.tolist(), ['', '', 'San Fernando'])
+
+    def test_split_part(self):
+        series = pd.Series(['Oakland/Berkeley', 'San Jose', None, 'a,b/c'], index=[10, 11, 12, 13])
+        first_parts = self.registry.split_part(series, [',', '/'], 0)
+        self.assertEqual(first_parts.index.tolist(), [10, 11, 12, 13])
+        self.assertEqual(first_parts.tolist()[:2] + first_parts.tolist()[3:], ['Oakland', 'San Jose', 'a'])
+        self.assertTrue(np.isnan(first_parts[12]))
+        # NB: a part beyond the number of parts is NaN, the same as Series.str.split(...).str[part]
+        self.assertEqual(self.registry.split_part(series, [',', '/'], 1).isna().tolist(), [False, True, True, False])
+        self.assertEqual(self.registry.split_part(series, [',', '/'], -1).tolist()[3], 'c')
+
+    def test_replace_from_dict_matches_longest_key_first(self):
+        replaced = self.registry.replace_from_dict(pd.Series(['Westgate On Saratoga .', 'St. Helena']), {'.': '', 'Westgate On Saratoga .': 'Saratoga'})
+        self.assertEqual(replaced.tolist(), ['Saratoga', 'St Helena'])
+
+
+if __name__ == '__main__':
+    unittest.main()